@@ -0,0 +1,256 @@
+"""
+Banc d'essai de Data Filter : génère des jeux de données synthétiques (même schéma que
+items.csv : types mélangés, valeurs nulles, marqueurs N/A, texte accentué, listes) et
+chronomètre chaque étape du traitement pour chaque format.
+
+Pour chaque étape sont relevés la durée, le débit (lignes par seconde) et le pic de
+mémoire (tracemalloc, mesuré lors d'une seconde exécution pour ne pas fausser la durée).
+Les résultats sont écrits en JSON ; --comparer signale les régressions par rapport à
+un fichier de résultats précédent (code de sortie 1).
+
+Exemples :
+    python benchmark.py --tailles 10000 100000
+    python benchmark.py --tailles 1000000 --formats csv jsonl --sans-memoire
+    python benchmark.py --comparer Outputs/benchmark_reference.json
+"""
+
+import argparse
+import contextlib
+import csv
+import datetime
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Any, Callable, Iterator, Optional
+
+import data_filter as df
+
+FORMATS = ('csv', 'json', 'jsonl', 'yaml', 'xml')
+TAILLES_PAR_DEFAUT = (10_000, 100_000)
+# YAML (PyYAML pur Python) est très lent : au-delà, le format est ignoré sauf demande explicite
+TAILLE_MAX_YAML = 10_000
+SEUIL_REGRESSION = 0.10  # Baisse de débit tolérée avant de signaler une régression
+
+# --- GÉNÉRATION DES DONNÉES SYNTHÉTIQUES ---
+
+NOMS = ('Clavier Méca', 'Souris Optique', 'Écran 4K', 'Casque Audio', 'Webcam', 'Microphone',
+        'Câble USB', 'Support écran', 'Ampoule connectée', 'Hub USB', 'Enceinte Bluetooth',
+        'Tablette graphique', 'Disque SSD', 'Chargeur rapide', 'Lampe de bureau')
+MARQUEURS_NULS = ('', 'N/A', 'N.A.', 'null', 'NaN')
+BOOLEENS = ('True', 'FALSE', 'Vrai', 'faux', '0', '1', 'T', 'F', 'OUI')
+
+
+def generer_enregistrements(nb_lignes: int, graine: int = 2025) -> Iterator[Dict[str, str]]:
+    """
+    Produit des enregistrements bruts (chaînes, comme lus depuis un CSV) au schéma de items.csv.
+    La génération est déterministe pour une graine donnée.
+    """
+    aleatoire = random.Random(graine)
+    choix = aleatoire.choice
+    hasard = aleatoire.random
+    entier = aleatoire.randint
+    for i in range(1, nb_lignes + 1):
+        tirage = hasard()
+        if tirage < 0.05:
+            price = choix(MARQUEURS_NULS)
+        elif tirage < 0.07:
+            price = 'quarante'
+        elif tirage < 0.4:
+            price = str(entier(1, 2000))
+        else:
+            price = f"{hasard() * 2000:.2f}"
+        quantity = choix(MARQUEURS_NULS) if hasard() < 0.1 else str(entier(0, 100))
+        notes = ",".join(str(entier(0, 20)) for _ in range(entier(0, 4)))
+        yield {
+            'id': str(i),
+            'name': f"{choix(NOMS)} {entier(1, 500)}",
+            'price': price,
+            'quantity': quantity,
+            'discontinued': choix(BOOLEENS),
+            'note_list': notes,
+        }
+
+
+def ecrire_csv_brut(chemin: str, nb_lignes: int):
+    """Écrit le jeu synthétique en CSV, marqueurs N/A compris (source réaliste pour load_csv)."""
+    with open(chemin, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'name', 'price', 'quantity', 'discontinued', 'note_list'])
+        writer.writeheader()
+        writer.writerows(generer_enregistrements(nb_lignes))
+
+
+# --- MESURES ---
+
+def mesurer(fonction: Callable[[], Any], avec_memoire: bool, repetitions: int = 1) -> Dict[str, Any]:
+    """
+    Exécute 'fonction' (sa sortie console est masquée) et retourne sa meilleure durée sur
+    'repetitions' exécutions, puis son pic de mémoire Python lors d'une exécution sous tracemalloc.
+    """
+    duree = float('inf')
+    for _ in range(repetitions):
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            debut = time.perf_counter()
+            fonction()
+            duree = min(duree, time.perf_counter() - debut)
+    mesure: Dict[str, Any] = {'secondes': round(duree, 6)}
+    if avec_memoire:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fonction()
+            mesure['memoire_pic_octets'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return mesure
+
+
+def etapes_benchmark(nb_lignes: int, formats: List[str], dossier: str) -> Iterator[tuple]:
+    """
+    Prépare les données d'une taille et produit les étapes à mesurer :
+    (nom de l'étape, format ou None, fonction sans argument).
+    """
+    chemin_csv = os.path.join(dossier, f"items_{nb_lignes}.csv")
+    ecrire_csv_brut(chemin_csv, nb_lignes)
+    brutes = list(generer_enregistrements(nb_lignes))
+    valeurs = [value for record in brutes for value in record.values()]
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = df.load_csv(chemin_csv)
+
+    yield 'convertir_type', None, lambda: list(map(df.convertir_type, valeurs))
+    yield 'nettoyer_donnees', None, lambda: df.nettoyer_donnees(brutes)
+
+    sauvegardes = {
+        'csv': df.save_csv, 'json': df.save_json, 'jsonl': df.save_jsonl,
+        'yaml': df.save_yaml, 'xml': df.save_xml,
+    }
+    chargements = {
+        'csv': df.load_csv, 'json': df.load_json, 'jsonl': df.load_jsonl,
+        'yaml': df.load_yaml, 'xml': df.load_xml,
+    }
+    for format_fichier in formats:
+        chemin = os.path.join(dossier, f"sortie_{nb_lignes}.{format_fichier}")
+        source = chemin_csv if format_fichier == 'csv' else chemin
+        yield 'save', format_fichier, lambda f=format_fichier, c=chemin: sauvegardes[f](data, c)
+        if format_fichier == 'json':
+            chemin_compact = os.path.join(dossier, f"sortie_{nb_lignes}_compact.json")
+            yield 'save_compact', 'json', lambda: df.save_json(data, chemin_compact, compact=True)
+        yield 'load', format_fichier, lambda f=format_fichier, s=source: chargements[f](s)
+
+    yield 'filtre_simple', None, lambda: df.filtrer_expression(data, "price > 500")
+    yield 'filtre_combine', None, lambda: df.filtrer_expression(
+        data, "price > 500 ET (name contient 'é' OU quantity <= 10) ET NON discontinued = False")
+    criteres = [('discontinued', False), ('price', True), ('name', False)]
+    yield 'tri_multicritere', None, lambda: df.selection_lignes(data, df.calculer_ordre_tri(data, criteres, False))
+    yield 'statistiques', None, lambda: df.afficher_tableau_statistiques(df.calculer_statistiques(data))
+    yield 'conversion_colonnes', None, lambda: df.TableColonnes.depuis_datalist(data)
+
+
+def executer_benchmark(tailles: List[int], formats: List[str], avec_memoire: bool,
+                       formats_explicites: bool, repetitions: int = 1) -> List[Dict[str, Any]]:
+    """Mesure toutes les étapes pour chaque taille ; affiche et retourne les mesures."""
+    mesures = []
+    with tempfile.TemporaryDirectory(prefix='data_filter_bench_') as dossier:
+        for nb_lignes in tailles:
+            formats_taille = [f for f in formats
+                              if f != 'yaml' or formats_explicites or nb_lignes <= TAILLE_MAX_YAML]
+            print(f"\n=== {nb_lignes:,} lignes ({', '.join(formats_taille)}) ===")
+            for etape, format_fichier, fonction in etapes_benchmark(nb_lignes, formats_taille, dossier):
+                mesure = mesurer(fonction, avec_memoire, repetitions)
+                mesure.update({
+                    'etape': etape,
+                    'format': format_fichier,
+                    'lignes': nb_lignes,
+                    'lignes_par_seconde': round(nb_lignes / mesure['secondes']) if mesure['secondes'] else None,
+                })
+                mesures.append(mesure)
+                nom = etape if format_fichier is None else f"{etape} ({format_fichier})"
+                memoire = (f"  pic {mesure['memoire_pic_octets'] / 2 ** 20:>8.1f} Mo"
+                           if 'memoire_pic_octets' in mesure else "")
+                print(f"{nom:<26} {mesure['secondes']:>9.3f} s  {mesure['lignes_par_seconde'] or 0:>12,} lignes/s{memoire}")
+    return mesures
+
+
+# --- RÉSULTATS ET COMPARAISON ---
+
+def _commit_git() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(mesures: List[Dict[str, Any]], reference: Dict[str, Any], seuil: float) -> List[str]:
+    """Liste des régressions : étapes dont le débit a baissé de plus de 'seuil' (fraction)."""
+    anciennes = {(m['etape'], m['format'], m['lignes']): m for m in reference.get('mesures', [])}
+    regressions = []
+    for mesure in mesures:
+        ancienne = anciennes.get((mesure['etape'], mesure['format'], mesure['lignes']))
+        if not ancienne or not ancienne.get('lignes_par_seconde') or not mesure.get('lignes_par_seconde'):
+            continue
+        variation = mesure['lignes_par_seconde'] / ancienne['lignes_par_seconde'] - 1
+        if variation < -seuil:
+            nom = mesure['etape'] if mesure['format'] is None else f"{mesure['etape']} ({mesure['format']})"
+            regressions.append(f"{nom}, {mesure['lignes']:,} lignes : "
+                               f"{ancienne['lignes_par_seconde']:,} -> {mesure['lignes_par_seconde']:,} lignes/s "
+                               f"({variation:+.0%})")
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Banc d'essai de Data Filter (données synthétiques).")
+    parser.add_argument('--tailles', type=int, nargs='+', default=list(TAILLES_PAR_DEFAUT),
+                        help="nombres de lignes à tester (ex. 10000 1000000 10000000)")
+    parser.add_argument('--formats', nargs='+', choices=FORMATS,
+                        help=f"formats à tester (défaut : tous ; YAML limité à {TAILLE_MAX_YAML:,} lignes)")
+    parser.add_argument('--sans-memoire', action='store_true',
+                        help="ne pas mesurer le pic de mémoire (deux fois plus rapide)")
+    parser.add_argument('--repetitions', type=int, default=1,
+                        help="exécutions par étape, la meilleure durée est retenue (réduit le bruit)")
+    parser.add_argument('--sortie', default=os.path.join('Outputs', 'benchmark.json'),
+                        help="fichier JSON des résultats")
+    parser.add_argument('--comparer', help="fichier de résultats de référence")
+    parser.add_argument('--seuil', type=float, default=SEUIL_REGRESSION,
+                        help="baisse de débit tolérée avant régression (défaut : 0.10)")
+    options = parser.parse_args(arguments)
+
+    mesures = executer_benchmark(sorted(options.tailles), options.formats or list(FORMATS),
+                                 not options.sans_memoire, options.formats is not None, options.repetitions)
+    resultats = {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_git(),
+        'python': platform.python_version(),
+        'plateforme': platform.platform(),
+        'processeurs': os.cpu_count(),
+        'repetitions': options.repetitions,
+        'mesures': mesures,
+    }
+    os.makedirs(os.path.dirname(options.sortie) or '.', exist_ok=True)
+    with open(options.sortie, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats écrits dans '{options.sortie}'.")
+
+    if options.comparer:
+        with open(options.comparer, 'r', encoding='utf-8') as f:
+            regressions = comparer(mesures, json.load(f), options.seuil)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) par rapport à '{options.comparer}' :")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"Aucune régression par rapport à '{options.comparer}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
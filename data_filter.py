@@ -1,21 +1,242 @@
 import sys
+import contextlib
 import csv
+import functools
+from array import array
 import json
-import statistics
-from typing import List, Dict, Any, Union, Tuple, Callable
-from collections import Counter
+from typing import List, Dict, Any, Union, Tuple, Callable, Iterable, Iterator, Optional
+from collections import Counter, OrderedDict, deque
+import itertools
 import math
-import locale
-import copy
-import yaml  # Importation pour YAML (J9)
-import xml.etree.ElementTree as ET  # Importation pour XML (J9)
+import glob
+import mmap
+import os
+import operator
+import hashlib
+import heapq
+import io
+import pickle
+import tempfile
+import time
+import bisect
+import re
+# Modules lourds importés au premier usage seulement (démarrage rapide, voir REGISTRE DES FORMATS) :
+# yaml et xml.etree.ElementTree (J9), statistics, locale, argparse, concurrent.futures.
 
 # Alias de type pour clarifier la structure des données internes
 DataList = List[Dict[str, Any]]
+# Flux d'enregistrements produit paresseusement (mode streaming)
+FluxDonnees = Iterator[Dict[str, Any]]
+
+
+# --- INSTRUMENTATION (MESURES PAR ÉTAPE) ---
+# Les étapes de chargement, conversion, filtre, tri, statistiques et sauvegarde peuvent être
+# mesurées : temps réel et CPU, lignes en entrée et en sortie, octets lus ou écrits, et sur
+# demande pic de mémoire (tracemalloc) et profil cProfile de l'étape. Chaque mesure est un
+# dictionnaire conservé en mémoire (mesures_etapes) et écrit en JSON, une ligne par étape,
+# dans le journal choisi. Les étapes imbriquées (ex. conversion pendant un chargement)
+# portent une profondeur > 0 ; mémoire et profil ne concernent que les étapes de premier niveau.
+#
+# Désactivée (par défaut), l'instrumentation se réduit à un test de booléen par appel d'étape.
+# Activation : activer_instrumentation() ou variables d'environnement DATA_FILTER_METRIQUES=1,
+# DATA_FILTER_METRIQUES_JOURNAL=<fichier> (stderr par défaut), DATA_FILTER_METRIQUES_MEMOIRE=1,
+# DATA_FILTER_PROFIL=<dossier des fichiers .prof>.
+
+NB_MAX_MESURES = 10000  # Mesures conservées en mémoire (les plus anciennes sont oubliées)
+
+_instrumentation_active = False
+_config_instrumentation: Dict[str, Any] = {'journal': None, 'journal_ouvert': False, 'memoire': False,
+                                           'profil': None}
+_mesures: deque = deque(maxlen=NB_MAX_MESURES)
+_profondeur_etapes = 0
+_compteur_profils = itertools.count(1)
+
+
+def activer_instrumentation(journal: Union[str, io.TextIOBase, None] = None, memoire: bool = False,
+                            profil: Optional[str] = None):
+    """
+    Active les mesures. 'journal' : fichier (chemin, ouvert en ajout) ou flux recevant une ligne
+    JSON par étape (aucun journal si None) ; 'memoire' : pic mémoire via tracemalloc (ralentit
+    nettement les étapes) ; 'profil' : dossier où écrire un profil cProfile par étape.
+    """
+    global _instrumentation_active
+    desactiver_instrumentation()
+    journal_ouvert = isinstance(journal, str)
+    if journal_ouvert:
+        journal = open(journal, 'a', encoding='utf-8', buffering=1)
+    if profil:
+        os.makedirs(profil, exist_ok=True)
+    _config_instrumentation.update(journal=journal, journal_ouvert=journal_ouvert, memoire=memoire, profil=profil)
+    _instrumentation_active = True
+
+
+def desactiver_instrumentation():
+    """Désactive les mesures (celles déjà prises restent disponibles)."""
+    global _instrumentation_active
+    _instrumentation_active = False
+    if _config_instrumentation['journal_ouvert']:
+        _config_instrumentation['journal'].close()  # Seul un journal ouvert ici est refermé
+    _config_instrumentation.update(journal=None, journal_ouvert=False, memoire=False, profil=None)
+
+
+def mesures_etapes(etape: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Mesures enregistrées (toutes, ou celles d'une étape), de la plus ancienne à la plus récente."""
+    return [mesure for mesure in _mesures if etape is None or mesure['etape'] == etape]
+
+
+def reinitialiser_mesures():
+    _mesures.clear()
+
+
+def enregistrer_mesure(mesure: Dict[str, Any]):
+    """Conserve une mesure et l'écrit dans le journal (une ligne JSON)."""
+    _mesures.append(mesure)
+    journal = _config_instrumentation['journal']
+    if journal is not None:
+        journal.write(json.dumps(mesure, ensure_ascii=False, default=str) + "\n")
+
+
+def _nb_lignes(objet: Any) -> Optional[int]:
+    """Nombre de lignes d'un argument ou d'un résultat d'étape (None si inconnu, ex. un flux)."""
+    if isinstance(objet, bool) or objet is None:
+        return None
+    if isinstance(objet, int):
+        return objet
+    if isinstance(objet, tuple):
+        return _nb_lignes(objet[0]) if objet else None
+    if isinstance(objet, (str, bytes, dict)) or not hasattr(objet, '__len__'):
+        return None
+    return len(objet)
+
+
+class MesureEtape:
+    """Contexte de mesure d'une étape : with MesureEtape('tri') as mesure: ... mesure.completer(...)."""
+
+    def __init__(self, etape: str, **details: Any):
+        self.mesure: Dict[str, Any] = {'etape': etape, **details}
+
+    def completer(self, **details: Any):
+        """Ajoute des informations à la mesure (lignes, octets...) ; les valeurs None sont ignorées."""
+        self.mesure.update((cle, valeur) for cle, valeur in details.items() if valeur is not None)
+
+    def __enter__(self) -> 'MesureEtape':
+        global _profondeur_etapes
+        self.profondeur = _profondeur_etapes
+        _profondeur_etapes += 1
+        self.tracemalloc = self.profil = None
+        if self.profondeur == 0 and _config_instrumentation['memoire']:
+            import tracemalloc  # Importé seulement si la mesure mémoire est demandée
+            self.tracemalloc = tracemalloc
+            self.tracemalloc_demarre = not tracemalloc.is_tracing()
+            if self.tracemalloc_demarre:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        if self.profondeur == 0 and _config_instrumentation['profil']:
+            import cProfile
+            self.profil = cProfile.Profile()
+            self.profil.enable()
+        self.debut_cpu = time.process_time()
+        self.debut = time.perf_counter()
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> bool:
+        global _profondeur_etapes
+        secondes = time.perf_counter() - self.debut
+        cpu_secondes = time.process_time() - self.debut_cpu
+        mesure = self.mesure
+        if self.profil is not None:
+            self.profil.disable()
+            chemin = os.path.join(_config_instrumentation['profil'],
+                                  f"{mesure['etape']}_{os.getpid()}_{next(_compteur_profils)}.prof")
+            self.profil.dump_stats(chemin)
+            mesure['profil'] = chemin
+        if self.tracemalloc is not None:
+            mesure['memoire_pic_octets'] = self.tracemalloc.get_traced_memory()[1]
+            if self.tracemalloc_demarre:
+                self.tracemalloc.stop()
+        mesure.update(secondes=round(secondes, 6), cpu_secondes=round(cpu_secondes, 6),
+                      profondeur=self.profondeur, horodatage=round(time.time(), 3))
+        if type_exception is not None:
+            mesure['erreur'] = type_exception.__name__
+        _profondeur_etapes -= 1
+        enregistrer_mesure(mesure)
+        return False
+
+
+class _MesureInactive:
+    """Contexte sans effet, utilisé quand l'instrumentation est désactivée."""
+
+    def completer(self, **details: Any):
+        pass
+
+    def __enter__(self) -> '_MesureInactive':
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> bool:
+        return False
+
+
+_MESURE_INACTIVE = _MesureInactive()
+
+
+def mesurer_etape(etape: str, **details: Any) -> Union[MesureEtape, _MesureInactive]:
+    """Contexte de mesure d'une portion de code (sans effet si l'instrumentation est désactivée)."""
+    return MesureEtape(etape, **details) if _instrumentation_active else _MESURE_INACTIVE
+
+
+def _activer_instrumentation_environnement():
+    """Active l'instrumentation si la variable DATA_FILTER_METRIQUES (ou DATA_FILTER_PROFIL) est définie."""
+    actif = os.environ.get('DATA_FILTER_METRIQUES', '').strip().lower() not in ('', '0', 'non', 'false')
+    profil = os.environ.get('DATA_FILTER_PROFIL') or None
+    if actif or profil:
+        activer_instrumentation(journal=os.environ.get('DATA_FILTER_METRIQUES_JOURNAL') or sys.stderr,
+                                memoire=os.environ.get('DATA_FILTER_METRIQUES_MEMOIRE', '') not in ('', '0'),
+                                profil=profil)
+
+
+def instrumenter(etape: str) -> Callable[[Callable], Callable]:
+    """
+    Décorateur d'étape : mesure chaque appel quand l'instrumentation est active.
+    Les lignes en entrée sont lues sur le premier argument (données), celles en sortie sur le
+    résultat ; le paramètre 'filepath' donne les octets lus (chargement) ou écrits (sauvegarde).
+    """
+    def decorateur(fonction: Callable) -> Callable:
+        code = fonction.__code__  # Noms des paramètres, sans importer inspect (démarrage plus rapide)
+        parametres = list(code.co_varnames[:code.co_argcount + code.co_kwonlyargcount])
+        position_chemin = parametres.index('filepath') if 'filepath' in parametres else None
+        donnees_en_entree = bool(parametres) and parametres[0] in ('data', 'records')
+
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            if not _instrumentation_active:
+                return fonction(*args, **kwargs)
+
+            chemin = kwargs.get('filepath')
+            if chemin is None and position_chemin is not None and position_chemin < len(args):
+                chemin = args[position_chemin]
+            with MesureEtape(etape, fonction=fonction.__name__) as mesure:
+                if donnees_en_entree and args:
+                    mesure.completer(lignes_entree=_nb_lignes(args[0]))
+                if etape == 'chargement' and chemin and os.path.exists(chemin):
+                    mesure.completer(fichier=chemin, octets_lus=os.path.getsize(chemin))
+                resultat = fonction(*args, **kwargs)
+                lignes_sortie = _nb_lignes(resultat)
+                mesure.completer(lignes_sortie=mesure.mesure.get('lignes_entree') if lignes_sortie is None
+                                 and etape == 'sauvegarde' else lignes_sortie)
+                if etape == 'sauvegarde' and chemin and os.path.exists(chemin):
+                    mesure.completer(fichier=chemin, octets_ecrits=os.path.getsize(chemin))
+            return resultat
+        return enveloppe
+    return decorateur
 
 
 # --- FONCTIONS UTILITAIRES POUR LA ROBUSTESSE (J2) ---
 
+# Marqueurs reconnus par convertir_type (après strip().lower())
+VALEURS_NULLES = frozenset(('', 'n/a', 'na', 'n.a.', 'nan', 'null'))
+VALEURS_VRAIES = frozenset(('true', 'vrai', 't', '1'))
+VALEURS_FAUSSES = frozenset(('false', 'faux', 'f', '0'))
+
 def convertir_type(value: Any) -> Any:
     """
     Tente de convertir une chaîne de caractères en int, float ou booléen.
@@ -41,7 +262,7 @@ def convertir_type(value: Any) -> Any:
     lower_value = value.strip().lower()
 
     # Traiter les chaînes vides ou les placeholders comme None
-    if lower_value in ('', 'n/a', 'na', 'n.a.', 'nan', 'null'):
+    if lower_value in VALEURS_NULLES:
         return None
 
     # Tentative de conversion numérique
@@ -55,55 +276,760 @@ def convertir_type(value: Any) -> Any:
         pass  # La conversion numérique a échoué
 
     # Tentative de conversion booléenne
-    if lower_value in ('true', 'vrai', 't', '1'):
+    if lower_value in VALEURS_VRAIES:
         return True
-    if lower_value in ('false', 'faux', 'f', '0'):
+    if lower_value in VALEURS_FAUSSES:
         return False
 
     return value  # Retourne la chaîne si aucune conversion n'est possible
 
 
-def nettoyer_donnees(data: DataList) -> DataList:
+# --- MOTEUR DE CONVERSION PAR COLONNE ---
+# Au lieu d'appeler convertir_type cellule par cellule, on échantillonne chaque colonne
+# pour en déduire le type, puis on convertit la colonne entière avec un convertisseur
+# spécialisé. Chaque convertisseur retombe sur convertir_type dès qu'une cellule ne
+# correspond pas : le résultat est toujours identique à celui de convertir_type.
+
+TAILLE_LOT = 10000  # Nombre d'enregistrements convertis ensemble
+TAILLE_ECHANTILLON = 200  # Nombre de valeurs examinées pour deviner le type d'une colonne
+TAILLE_MAX_CACHE = 10000  # Nombre maximal de chaînes mémorisées par colonne
+SEUIL_CARDINALITE_FAIBLE = 0.5  # Proportion de valeurs distinctes sous laquelle on mémorise
+
+_ABSENT = object()  # Valeur absente (d'un cache, d'un enregistrement) : différente de None
+
+
+def _convertir_entier(value: Any) -> Any:
+    """Convertisseur d'une colonne d'entiers : int() direct, convertir_type en cas d'échec."""
+    if value.__class__ is str:
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return convertir_type(value)
+
+
+def _convertir_flottant(value: Any) -> Any:
+    """Convertisseur d'une colonne de flottants (une chaîne sans point reste un entier)."""
+    if value.__class__ is str and '.' in value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return convertir_type(value)
+
+
+def _convertir_texte(value: Any) -> Any:
+    """
+    Convertisseur d'une colonne de texte : une chaîne qui commence par une lettre
+    (hors 'i'/'n' de inf/nan) ne peut pas être un nombre, on évite donc les try/except.
+    """
+    if value.__class__ is str:
+        lower_value = value.strip().lower()
+        premier = lower_value[:1]
+        if premier.isalpha() and premier not in ('i', 'n'):
+            if lower_value in VALEURS_VRAIES:
+                return True
+            if lower_value in VALEURS_FAUSSES:
+                return False
+            return value
+    return convertir_type(value)
+
+
+CONVERTISSEURS_PAR_TYPE: Dict[str, Callable[[Any], Any]] = {
+    'int': _convertir_entier,
+    'float': _convertir_flottant,
+    'texte': _convertir_texte,
+}
+
+
+def _memoiser(convertisseur: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Ajoute un cache des chaînes déjà converties (colonnes à faible cardinalité)."""
+    cache: Dict[str, Any] = {}
+
+    def convertisseur_memoise(value: Any) -> Any:
+        if value.__class__ is not str:
+            return convertisseur(value)
+        resultat = cache.get(value, _ABSENT)
+        if resultat is _ABSENT:
+            resultat = convertisseur(value)
+            if len(cache) < TAILLE_MAX_CACHE:
+                cache[value] = resultat
+        return resultat
+
+    return convertisseur_memoise
+
+
+def inferer_type_colonne(echantillon: List[Any]) -> str:
+    """
+    Devine le type d'une colonne à partir d'un échantillon de valeurs brutes.
+    Retourne 'int', 'float', 'bool', 'texte', 'vide' (que des nulls), 'type' (valeurs
+    déjà typées, ex. JSON) ou 'mixte'.
+    """
+    types = set()
+    for value in echantillon:
+        if value.__class__ is not str:
+            if value is not None:
+                return 'type'
+            continue
+        converti = convertir_type(value)
+        if converti is not None:
+            types.add(type(converti))
+
+    if not types:
+        return 'vide'
+    if types == {int}:
+        return 'int'
+    if types <= {int, float}:
+        return 'float'
+    if types == {bool}:
+        return 'bool'
+    if types <= {str, bool}:
+        return 'texte'
+    return 'mixte'
+
+
+def creer_convertisseur(echantillon: List[Any]) -> Tuple[str, Callable[[Any], Any]]:
+    """Choisit le convertisseur spécialisé (mémorisé si peu de valeurs distinctes) d'une colonne."""
+    type_colonne = inferer_type_colonne(echantillon)
+    convertisseur = CONVERTISSEURS_PAR_TYPE.get(type_colonne, convertir_type)
+
+    if type_colonne != 'type':
+        chaines = [v for v in echantillon if v.__class__ is str]
+        if chaines and len(set(chaines)) <= SEUIL_CARDINALITE_FAIBLE * len(chaines):
+            convertisseur = _memoiser(convertisseur)
+    return type_colonne, convertisseur
+
+
+def convertir_colonne(valeurs: List[Any], type_colonne: str, convertisseur: Callable[[Any], Any]) -> List[Any]:
+    """Convertit toute une colonne d'un coup (map en C), cellule par cellule seulement si besoin."""
+    if type_colonne == 'int' and set(map(type, valeurs)) == {str}:
+        try:
+            return list(map(int, valeurs))
+        except ValueError:
+            pass  # Au moins une cellule n'est pas un entier : conversion cellule par cellule
+    return list(map(convertisseur, valeurs))
+
+
+def _convertir_lot(lot: DataList, convertisseurs: Dict[str, Tuple[str, Callable[[Any], Any]]]) -> DataList:
+    """Convertit un lot d'enregistrements colonne par colonne."""
+    cles = tuple(lot[0])
+    if all(tuple(item) == cles for item in lot) and all(cle in convertisseurs for cle in cles):
+        colonnes = [convertir_colonne(list(map(operator.itemgetter(cle), lot)), *convertisseurs[cle])
+                    for cle in cles]
+        return [dict(zip(cles, valeurs)) for valeurs in zip(*colonnes)]
+
+    # Enregistrements hétérogènes (ex. JSON) : conversion ligne par ligne
+    return [{k: convertisseurs[k][1](v) if k in convertisseurs else convertir_type(v) for k, v in item.items()}
+            for item in lot]
+
+
+def preparer_convertisseurs(lot: DataList) -> Dict[str, Tuple[str, Callable[[Any], Any]]]:
+    """Échantillonne un lot d'enregistrements et prépare un convertisseur par colonne."""
+    pas = max(1, len(lot) // TAILLE_ECHANTILLON)
+    echantillon_lignes = lot[::pas]
+    cles = dict.fromkeys(cle for item in echantillon_lignes for cle in item)
+    return {cle: creer_convertisseur([item.get(cle) for item in echantillon_lignes if cle in item])
+            for cle in cles}
+
+
+def nettoyer_flux(records: Iterable[Dict[str, Any]]) -> FluxDonnees:
+    """
+    Version paresseuse de nettoyer_donnees : les enregistrements sont convertis par lots
+    de TAILLE_LOT (mémoire bornée), avec des convertisseurs choisis sur le premier lot.
+    """
+    records = iter(records)
+    convertisseurs = None
+    if _instrumentation_active:
+        yield from _nettoyer_flux_mesure(records)
+        return
+    while True:
+        lot = list(itertools.islice(records, TAILLE_LOT))
+        if not lot:
+            return
+        if convertisseurs is None:
+            convertisseurs = preparer_convertisseurs(lot)
+        yield from _convertir_lot(lot, convertisseurs)
+
+
+def _nettoyer_flux_mesure(records: Iterator[Dict[str, Any]]) -> FluxDonnees:
+    """
+    nettoyer_flux instrumenté : seul le temps de conversion des lots est compté (pas celui de
+    la lecture du flux source), puis enregistré comme une étape 'conversion' à la fin du flux.
+    """
+    secondes = cpu_secondes = 0.0
+    nb_lignes = 0
+    convertisseurs = None
+    try:
+        while True:
+            lot = list(itertools.islice(records, TAILLE_LOT))
+            if not lot:
+                return
+            debut, debut_cpu = time.perf_counter(), time.process_time()
+            if convertisseurs is None:
+                convertisseurs = preparer_convertisseurs(lot)
+            convertis = _convertir_lot(lot, convertisseurs)
+            secondes += time.perf_counter() - debut
+            cpu_secondes += time.process_time() - debut_cpu
+            nb_lignes += len(lot)
+            yield from convertis
+    finally:
+        enregistrer_mesure({'etape': 'conversion', 'fonction': 'nettoyer_flux', 'lignes_entree': nb_lignes,
+                            'lignes_sortie': nb_lignes, 'secondes': round(secondes, 6),
+                            'cpu_secondes': round(cpu_secondes, 6), 'profondeur': _profondeur_etapes,
+                            'horodatage': round(time.time(), 3)})
+
+
+def nettoyer_donnees(data: Iterable[Dict[str, Any]]) -> DataList:
     """
     Applique la fonction convertir_type à chaque valeur dans la liste de dictionnaires.
     C'est crucial pour les données lues depuis CSV (où tout est une chaîne).
     """
-    donnees_nettoyees = []
-    for item in data:
-        nettoye = {k: convertir_type(v) for k, v in item.items()}
-        donnees_nettoyees.append(nettoye)
-    return donnees_nettoyees
+    return list(nettoyer_flux(data))
+
+
+# --- STOCKAGE EN COLONNES (ALTERNATIVE À DataList) ---
+# Une colonne stocke ses valeurs dans un tableau typé (array) plutôt qu'en objets Python :
+#   - 'int'   : array('q')                   - 'float' : array('d')
+#   - 'num'   : array('d') + bitmap des entiers (colonne mixte int/float, ex. 'price')
+#   - 'bool'  : bytearray (un octet par valeur)
+#   - 'str'   : codes array('B', 'H', 'i' puis 'q' selon le nombre de chaînes distinctes)
+#               vers un dictionnaire de chaînes distinctes, partagé après une sélection
+#               jusqu'à ce que l'une des colonnes doive y ajouter une chaîne (copie à l'écriture)
+#   - 'objet' : liste Python (types mélangés, listes...)
+# Un bitmap de validité (1 bit par ligne) indique les valeurs None.
+
+ENTIER_MIN, ENTIER_MAX = -2 ** 63, 2 ** 63 - 1
+ENTIER_EXACT_FLOAT = 2 ** 53  # Au-delà, un entier ne tient plus exactement dans un float
+# Types des codes de chaînes, du plus compact au plus large, avec le plus grand code admis
+TYPES_CODES_CHAINES = (('B', 2 ** 8 - 1), ('H', 2 ** 16 - 1), ('i', 2 ** 31 - 1), ('q', 2 ** 63 - 1))
+_CODE_MAX = dict(TYPES_CODES_CHAINES)
+
+
+def _type_stockage(value: Any) -> str:
+    """Détermine le type de stockage en colonne adapté à une valeur non nulle."""
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if ENTIER_MIN <= value <= ENTIER_MAX else 'objet'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    return 'objet'
+
+
+class Colonne:
+    """Colonne typée avec bitmap de validité (voir l'en-tête de section)."""
+
+    __slots__ = ('type', 'taille', 'validite', 'valeurs', 'entiers', 'dictionnaire', 'index_dictionnaire',
+                 'dictionnaire_partage')
+
+    def __init__(self, taille: int = 0):
+        # Une colonne neuve est 'vide' : elle ne contient que des None
+        self.type = 'vide'
+        self.taille = taille
+        self.validite = bytearray((taille + 7) // 8)
+        self.valeurs: Any = None
+        self.entiers: Optional[bytearray] = None
+        self.dictionnaire: List[str] = []
+        self.index_dictionnaire: Dict[str, int] = {}
+        self.dictionnaire_partage = False  # Vrai si le dictionnaire est aussi celui d'une autre colonne
+
+    @classmethod
+    def depuis_valeurs(cls, valeurs: Iterable[Any]) -> 'Colonne':
+        """Construit une colonne à partir d'une suite de valeurs (type choisi automatiquement)."""
+        colonne = cls()
+        for value in valeurs:
+            colonne.ajouter(value)
+        return colonne
+
+    def _initialiser_stockage(self, type_colonne: str):
+        """Prépare un stockage vide du type demandé."""
+        self.type = type_colonne
+        self.entiers = None
+        self.dictionnaire = []
+        self.index_dictionnaire = {}
+        self.dictionnaire_partage = False
+        if type_colonne == 'int':
+            self.valeurs = array('q')
+        elif type_colonne in ('float', 'num'):
+            self.valeurs = array('d')
+            if type_colonne == 'num':
+                self.entiers = bytearray()
+        elif type_colonne == 'bool':
+            self.valeurs = bytearray()
+        elif type_colonne == 'str':
+            self.valeurs = array(TYPES_CODES_CHAINES[0][0])
+        else:
+            self.valeurs = []
+
+    def _promouvoir(self, type_valeur: str):
+        """Change le type de la colonne pour accueillir une valeur d'un nouveau type."""
+        if self.type == 'vide':
+            nouveau_type = type_valeur
+        elif {self.type, type_valeur} <= {'int', 'float', 'num'}:
+            nouveau_type = 'num'
+        else:
+            nouveau_type = 'objet'
+
+        anciennes_valeurs = list(self)
+        self._initialiser_stockage(nouveau_type)
+        self.taille = 0
+        self.validite = bytearray()
+        for value in anciennes_valeurs:
+            self.ajouter(value)
+
+    def ajouter(self, value: Any):
+        """Ajoute une valeur en fin de colonne (avec promotion de type si nécessaire)."""
+        if value is not None and self.type != 'objet':
+            type_valeur = _type_stockage(value)
+            if self.type == 'num' and type_valeur in ('int', 'float'):
+                if type_valeur == 'int' and abs(value) > ENTIER_EXACT_FLOAT:
+                    self._promouvoir('objet')
+            elif type_valeur != self.type:
+                self._promouvoir(type_valeur)
+
+        i = self.taille
+        if i % 8 == 0:
+            self.validite.append(0)
+        if value is not None:
+            self.validite[i >> 3] |= 1 << (i & 7)
+
+        type_colonne = self.type
+        if type_colonne == 'vide':
+            pass
+        elif type_colonne == 'str':
+            if value is None:
+                self.valeurs.append(0)
+            else:
+                code = self.index_dictionnaire.get(value)
+                if code is None:
+                    code = self._nouveau_code(value)
+                self.valeurs.append(code)
+        elif type_colonne == 'objet':
+            self.valeurs.append(value)
+        elif type_colonne == 'num':
+            if i % 8 == 0:
+                self.entiers.append(0)
+            if value is None:
+                self.valeurs.append(0.0)
+            else:
+                self.valeurs.append(float(value))
+                if not isinstance(value, float):
+                    self.entiers[i >> 3] |= 1 << (i & 7)
+        else:
+            self.valeurs.append(0 if value is None else value)
+        self.taille = i + 1
+
+    def _nouveau_code(self, texte: str) -> int:
+        """
+        Ajoute une chaîne au dictionnaire et retourne son code. Un dictionnaire partagé est
+        d'abord recopié, et les codes passent au type plus large quand le code ne tient plus.
+        """
+        if self.dictionnaire_partage:
+            self.dictionnaire = list(self.dictionnaire)
+            self.index_dictionnaire = {texte: code for code, texte in enumerate(self.dictionnaire)}
+            self.dictionnaire_partage = False
+        code = len(self.dictionnaire)
+        self.index_dictionnaire[texte] = code
+        self.dictionnaire.append(texte)
+        codes = self.valeurs
+        if code > _CODE_MAX[codes.typecode]:
+            typecode = next(t for t, maximum in TYPES_CODES_CHAINES if code <= maximum)
+            self.valeurs = array(typecode, codes)
+        return code
+
+    def est_valide(self, i: int) -> bool:
+        """Indique si la ligne i contient une valeur (et non None)."""
+        return bool(self.validite[i >> 3] & (1 << (i & 7)))
+
+    def nb_valides(self) -> int:
+        """Nombre de valeurs non nulles (comptage des bits du bitmap)."""
+        return bin(int.from_bytes(self.validite, 'little')).count('1')
+
+    def __len__(self) -> int:
+        return self.taille
+
+    def __getitem__(self, i: int) -> Any:
+        if not self.validite[i >> 3] & (1 << (i & 7)):
+            return None
+        type_colonne = self.type
+        if type_colonne == 'str':
+            return self.dictionnaire[self.valeurs[i]]
+        if type_colonne == 'bool':
+            return bool(self.valeurs[i])
+        if type_colonne == 'num' and self.entiers[i >> 3] & (1 << (i & 7)):
+            return int(self.valeurs[i])
+        return self.valeurs[i]
+
+    def __iter__(self) -> Iterator[Any]:
+        type_colonne = self.type
+        if type_colonne == 'vide':
+            yield from itertools.repeat(None, self.taille)
+            return
+        validite = self.validite
+        valeurs = self.valeurs
+        sans_nulls = self.nb_valides() == self.taille
+        if sans_nulls and type_colonne in ('int', 'float', 'objet'):
+            yield from valeurs
+        elif sans_nulls and type_colonne == 'str':
+            yield from map(self.dictionnaire.__getitem__, valeurs)
+        else:
+            for i in range(self.taille):
+                if validite[i >> 3] & (1 << (i & 7)):
+                    yield self[i]
+                else:
+                    yield None
+
+    def selection(self, indices: Iterable[int]) -> 'Colonne':
+        """
+        Construit la colonne réduite/réordonnée aux lignes indiquées.
+        Le dictionnaire des chaînes est partagé avec la colonne d'origine : les deux colonnes
+        sont marquées et la première qui ajoute une chaîne en fait sa propre copie.
+        """
+        indices = indices if isinstance(indices, (list, array, range)) else list(indices)
+        nouvelle = Colonne()
+        nouvelle._initialiser_stockage(self.type)
+        nouvelle.taille = len(indices)
+        nouvelle.validite = _selection_bitmap(self.validite, indices)
+        if self.type == 'vide':
+            return nouvelle
+
+        valeurs = self.valeurs
+        if self.type == 'objet':
+            nouvelle.valeurs = [valeurs[i] for i in indices]
+        elif self.type == 'bool':
+            nouvelle.valeurs = bytearray(valeurs[i] for i in indices)
+        else:
+            # valeurs peut être un array ou une vue mémoire (colonne relue depuis le cache)
+            typecode = valeurs.typecode if isinstance(valeurs, array) else valeurs.format
+            nouvelle.valeurs = array(typecode, [valeurs[i] for i in indices])
+
+        if self.type == 'num':
+            nouvelle.entiers = _selection_bitmap(self.entiers, indices)
+        elif self.type == 'str':
+            nouvelle.dictionnaire = self.dictionnaire
+            nouvelle.index_dictionnaire = self.index_dictionnaire
+            nouvelle.dictionnaire_partage = self.dictionnaire_partage = True
+        return nouvelle
+
+    def rendre_modifiable(self):
+        """Recopie en mémoire une colonne projetée depuis un fichier de cache (vues en lecture seule)."""
+        if isinstance(self.validite, memoryview):
+            self.validite = bytearray(self.validite)
+        if isinstance(self.entiers, memoryview):
+            self.entiers = bytearray(self.entiers)
+        if isinstance(self.valeurs, memoryview):
+            if self.type == 'bool':
+                self.valeurs = bytearray(self.valeurs)
+            else:
+                self.valeurs = array(self.valeurs.format, self.valeurs)
+        if self.type == 'str' and len(self.index_dictionnaire) != len(self.dictionnaire):
+            self.index_dictionnaire = {texte: code for code, texte in enumerate(self.dictionnaire)}
+
+    def indices_correspondants(self, test: Callable[[Any], bool]) -> array:
+        """
+        Retourne les indices des lignes dont la valeur satisfait 'test'.
+        Pour une colonne de chaînes, le test n'est évalué qu'une fois par valeur distincte.
+        """
+        if self.type == 'str':
+            codes_retenus = {code for code, texte in enumerate(self.dictionnaire) if test(texte)}
+            garder_nulls = test(None)
+            validite = self.validite
+            return array('q', [
+                i for i, code in enumerate(self.valeurs)
+                if (code in codes_retenus if validite[i >> 3] & (1 << (i & 7)) else garder_nulls)
+            ])
+        return array('q', [i for i, value in enumerate(self) if test(value)])
+
+    def valeurs_numeriques(self) -> Iterable[float]:
+        """Valeurs numériques non nulles (les booléens comptent, comme isinstance(x, int))."""
+        if self.type == 'float' and self.nb_valides() == self.taille:
+            return self.valeurs  # Aucune copie nécessaire
+        if self.type in ('int', 'float', 'num', 'bool'):
+            return array('d', [float(v) for v in self if v is not None])
+        if self.type == 'objet':
+            return array('d', [float(v) for v in self.valeurs if isinstance(v, (int, float))])
+        return array('d')
+
+    def compter_types(self) -> Counter:
+        """Distribution des types Python (même nommage que type(value).__name__)."""
+        nb_valides = self.nb_valides()
+        types = Counter()
+        if self.taille - nb_valides:
+            types['None'] = self.taille - nb_valides
+        if self.type == 'num':
+            nb_entiers = bin(int.from_bytes(self.entiers, 'little')).count('1')
+            types['int'] += nb_entiers
+            types['float'] += nb_valides - nb_entiers
+        elif self.type == 'objet':
+            types.update(type(v).__name__ for v in self.valeurs if v is not None)
+        elif self.type != 'vide' and nb_valides:
+            types[self.type] = nb_valides
+        return types
+
+    def taille_memoire(self) -> int:
+        """Estimation de l'occupation mémoire de la colonne (en octets)."""
+        total = sys.getsizeof(self.validite)
+        if self.valeurs is not None:
+            total += sys.getsizeof(self.valeurs)
+        if self.entiers is not None:
+            total += sys.getsizeof(self.entiers)
+        total += sum(sys.getsizeof(texte) for texte in self.dictionnaire)
+        if self.type == 'objet':
+            total += sum(sys.getsizeof(v) for v in self.valeurs)
+        return total
+
+
+def _selection_bitmap(bitmap: bytearray, indices: Iterable[int]) -> bytearray:
+    """Construit le bitmap correspondant à une sélection de lignes."""
+    resultat = bytearray((len(indices) + 7) // 8)
+    for j, i in enumerate(indices):
+        if bitmap[i >> 3] & (1 << (i & 7)):
+            resultat[j >> 3] |= 1 << (j & 7)
+    return resultat
+
+
+class TableColonnes:
+    """
+    Table orientée colonnes, utilisable partout où une DataList est attendue :
+    len(), itération et table[i] produisent des dictionnaires (une ligne).
+    Une clé absente d'un enregistrement est représentée par None.
+    """
+
+    def __init__(self):
+        self.colonnes: Dict[str, Colonne] = {}
+        self.nb_lignes = 0
+        self.index: Optional['IndexDonnees'] = None  # Index secondaires, construits à la demande
+        self.lecture_seule = False  # Vrai si les colonnes sont des vues sur un fichier de cache
+
+    @classmethod
+    def depuis_flux(cls, records: Iterable[Dict[str, Any]]) -> 'TableColonnes':
+        """Construit une table à partir d'une DataList ou d'un flux d'enregistrements."""
+        table = cls()
+        for record in records:
+            table.ajouter_ligne(record)
+        return table
+
+    depuis_datalist = depuis_flux
+
+    def ajouter_ligne(self, record: Dict[str, Any]):
+        """Ajoute un enregistrement (les nouvelles colonnes sont complétées par des None)."""
+        if self.lecture_seule:
+            for colonne in self.colonnes.values():
+                colonne.rendre_modifiable()
+            self.lecture_seule = False
+        colonnes = self.colonnes
+        for key in record:
+            if key not in colonnes:
+                colonnes[key] = Colonne(self.nb_lignes)
+        for key, colonne in colonnes.items():
+            colonne.ajouter(record.get(key))
+        self.nb_lignes += 1
+        self.index = None  # Les index ne reflètent plus la table
+
+    def vers_datalist(self) -> DataList:
+        """Reconvertit la table en liste de dictionnaires."""
+        return list(self)
+
+    def noms_colonnes(self) -> List[str]:
+        return list(self.colonnes.keys())
+
+    def colonne(self, nom: str) -> Colonne:
+        """Retourne la colonne demandée (une colonne de None si elle n'existe pas)."""
+        return self.colonnes.get(nom) or Colonne(self.nb_lignes)
+
+    def selection(self, indices: Iterable[int]) -> 'TableColonnes':
+        """Nouvelle table réduite/réordonnée aux lignes indiquées (filtre ou tri)."""
+        indices = indices if isinstance(indices, (list, array, range)) else list(indices)
+        table = TableColonnes()
+        table.colonnes = {nom: colonne.selection(indices) for nom, colonne in self.colonnes.items()}
+        table.nb_lignes = len(indices)
+        return table
+
+    def taille_memoire(self) -> int:
+        """Estimation de l'occupation mémoire de la table (en octets)."""
+        return sum(colonne.taille_memoire() for colonne in self.colonnes.values())
+
+    def __len__(self) -> int:
+        return self.nb_lignes
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        noms = self.noms_colonnes()
+        for valeurs in zip(*self.colonnes.values()):
+            yield dict(zip(noms, valeurs))
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Dict[str, Any], DataList]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.nb_lignes))]
+        if i < 0:
+            i += self.nb_lignes
+        if not 0 <= i < self.nb_lignes:
+            raise IndexError("Indice de ligne hors limites.")
+        return {nom: colonne[i] for nom, colonne in self.colonnes.items()}
+
+
+# Les fonctions de manipulation acceptent indifféremment l'une ou l'autre représentation
+Donnees = Union[DataList, TableColonnes]
+
+
+def valeurs_colonne(data: Donnees, cle: str, lignes: Optional[Iterable[int]] = None) -> Iterable[Any]:
+    """
+    Valeurs d'une colonne, ligne par ligne (None si la clé est absente).
+    Si 'lignes' est fourni, seules les lignes à ces positions sont lues, dans cet ordre.
+    """
+    if isinstance(data, TableColonnes):
+        colonne = data.colonne(cle)
+        return colonne if lignes is None else map(colonne.__getitem__, lignes)
+    if lignes is None:
+        return (item.get(cle) for item in data)
+    return (data[i].get(cle) for i in lignes)
+
+
+def taille_memoire_datalist(data: DataList) -> int:
+    """Estimation de l'occupation mémoire d'une DataList (dictionnaires + valeurs, en octets)."""
+    total = sys.getsizeof(data)
+    for row in data:
+        total += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row.values())
+    return total
+
+
+# --- FICHIERS COMPRESSÉS (GZIP, BZIP2, XZ, ZSTANDARD) ---
+# Tous les chargements et sauvegardes passent par ouvrir_fichier : un fichier compressé est
+# décompressé (ou compressé) au fil de la lecture, sans fichier intermédiaire sur le disque.
+# La compression est reconnue aux premiers octets du fichier en lecture (même mal nommé),
+# à l'extension en écriture : donnees.csv.gz, export.jsonl.xz, archive.xml.bz2...
+# Les modules gzip, bz2 et lzma ne sont importés qu'au premier fichier concerné ; Zstandard
+# demande Python 3.14 (compression.zstd) ou le paquet zstandard.
+# Les lectures et écritures passent par des tampons de TAILLE_TAMPON_IO octets : peu d'appels
+# système et des blocs compressés de bonne taille, ce qui compte sur un stockage réseau.
+
+TAILLE_TAMPON_IO = 1024 * 1024  # Taille des tampons de lecture et d'écriture (octets)
+NIVEAU_COMPRESSION = 6  # Niveau gzip / bzip2 / xz : bon compromis entre taille et vitesse
+
+# Nom -> (extensions, premiers octets caractéristiques)
+COMPRESSIONS: Dict[str, Tuple[Tuple[str, ...], bytes]] = {
+    'gzip': (('.gz', '.gzip'), b'\x1f\x8b'),
+    'bz2': (('.bz2',), b'BZh'),
+    'xz': (('.xz', '.lzma'), b'\xfd7zXZ\x00'),
+    'zstd': (('.zst', '.zstd'), b'\x28\xb5\x2f\xfd'),
+}
+
+
+def _ouvrir_binaire_compresse(chemin: str, compression: str, mode: str) -> io.BufferedIOBase:
+    """Flux binaire (décompressé ou compressant) sur un fichier compressé, 'rb' ou 'wb'."""
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(chemin, mode, compresslevel=NIVEAU_COMPRESSION)
+    if compression == 'bz2':
+        import bz2
+        return bz2.open(chemin, mode, compresslevel=NIVEAU_COMPRESSION)
+    if compression == 'xz':
+        import lzma
+        return lzma.open(chemin, mode, preset=None if 'r' in mode else NIVEAU_COMPRESSION)
+    try:
+        from compression import zstd  # Python 3.14+
+    except ImportError:
+        try:
+            import zstandard as zstd
+        except ImportError:
+            raise ValueError("Les fichiers Zstandard (.zst) demandent Python 3.14 "
+                             "ou le paquet 'zstandard' (pip install zstandard).") from None
+    return zstd.open(chemin, mode)
+
+
+def compression_fichier(chemin: str, ecriture: bool = False) -> Optional[str]:
+    """
+    Compression d'un fichier ('gzip', 'bz2', 'xz', 'zstd') ou None. En lecture, les premiers
+    octets d'un fichier existant font foi ; sinon (et en écriture), l'extension.
+    """
+    if not ecriture and os.path.isfile(chemin):
+        with open(chemin, 'rb') as f:
+            debut = f.read(8)
+        for nom, (_, magie) in COMPRESSIONS.items():
+            if debut.startswith(magie):
+                return nom
+        return None
+    extension = os.path.splitext(chemin)[1].lower()
+    for nom, (extensions, _) in COMPRESSIONS.items():
+        if extension in extensions:
+            return nom
+    return None
+
+
+def chemin_sans_compression(chemin: str) -> str:
+    """Chemin sans son extension de compression ('items.csv.gz' -> 'items.csv')."""
+    racine, extension = os.path.splitext(chemin)
+    if any(extension.lower() in extensions for extensions, _ in COMPRESSIONS.values()):
+        return racine
+    return chemin
+
+
+def ouvrir_fichier(chemin: str, mode: str = 'r', encoding: Optional[str] = 'utf-8',
+                   newline: Optional[str] = None) -> io.IOBase:
+    """
+    Ouvre un fichier, compressé ou non, avec des tampons de TAILLE_TAMPON_IO octets.
+    'mode' : 'r' ou 'w' (texte, avec 'encoding' et 'newline'), 'rb' ou 'wb' (binaire).
+    """
+    binaire = 'b' in mode
+    mode_binaire = mode[0] + 'b'
+    compression = compression_fichier(chemin, ecriture=mode[0] != 'r')
+    if compression is None:
+        if binaire:
+            return open(chemin, mode_binaire, buffering=TAILLE_TAMPON_IO)
+        return open(chemin, mode[0], buffering=TAILLE_TAMPON_IO, encoding=encoding, newline=newline)
+
+    flux = _ouvrir_binaire_compresse(chemin, compression, mode_binaire)
+    # Un grand tampon regroupe les petites lectures/écritures en gros blocs (dé)compressés
+    flux = io.BufferedReader(flux, TAILLE_TAMPON_IO) if mode[0] == 'r' else io.BufferedWriter(flux, TAILLE_TAMPON_IO)
+    if binaire:
+        return flux
+    return io.TextIOWrapper(flux, encoding=encoding, newline=newline)
+
+
+def _par_lots(records: Iterable[Any], taille: int = TAILLE_LOT) -> Iterator[List[Any]]:
+    """Découpe un itérable en listes de 'taille' éléments (écritures groupées)."""
+    records = iter(records)
+    while True:
+        lot = list(itertools.islice(records, taille))
+        if not lot:
+            return
+        yield lot
 
 
 # --- FONCTIONS DE CHARGEMENT (J2/J9) ---
 
+@instrumenter('chargement')
 def load_json(filepath: str) -> DataList:
-    """Charge les données depuis un fichier JSON."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        raw_data = json.load(f)
+    """Charge les données depuis un fichier JSON (décodé élément par élément, voir _iter_json_brut)."""
+    data = list(iter_json(filepath))
+    print(f"Succès : {len(data)} enregistrements JSON chargés.")
+    return data
 
-    if isinstance(raw_data, list):
-        print(f"Succès : {len(raw_data)} enregistrements JSON chargés.")
-        return nettoyer_donnees(raw_data)
-    else:
-        raise ValueError("Format JSON invalide : La racine doit être une liste d'enregistrements.")
+
+@instrumenter('chargement')
+def load_jsonl(filepath: str) -> DataList:
+    """Charge les données depuis un fichier JSON Lines (un objet JSON par ligne)."""
+    data = list(iter_jsonl(filepath))
+    print(f"Succès : {len(data)} enregistrements JSON Lines chargés.")
+    return data
 
 
+@instrumenter('chargement')
 def load_csv(filepath: str) -> DataList:
     """Charge les données depuis un fichier CSV."""
-    data = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data.append(row)
+    # Conversion ligne par ligne : on ne garde jamais deux copies complètes du fichier.
+    data = list(flux_csv(filepath))
 
     print(f"Succès : {len(data)} enregistrements CSV chargés.")
-    return nettoyer_donnees(data)
+    return data
 
 
+@instrumenter('chargement')
 def load_yaml(filepath: str) -> DataList:
     """Charge les données depuis un fichier YAML (J9)."""
-    with open(filepath, 'r', encoding='utf-8') as f:
+    import yaml
+    with ouvrir_fichier(filepath) as f:
         raw_data = yaml.safe_load(f)
 
     if isinstance(raw_data, list):
@@ -114,659 +1040,4702 @@ def load_yaml(filepath: str) -> DataList:
         raise ValueError("Format YAML invalide : La racine doit être une liste d'enregistrements.")
 
 
-def load_xml(filepath: str) -> DataList:
+@instrumenter('chargement')
+def load_xml(filepath: str, item_tag: Optional[str] = None) -> DataList:
     """
     Charge les données depuis un fichier XML (J9).
     Le XML est converti en une liste de dictionnaires.
     On suppose que le fichier a une structure de liste d'éléments similaires (ex: <root><item>...</item><item>...</item></root>).
+    Par défaut, chaque enfant de la racine est un enregistrement ; 'item_tag' permet de désigner
+    la balise des enregistrements, à n'importe quelle profondeur.
+    La lecture est incrémentale (voir _iter_xml_brut) : l'arbre complet n'est jamais construit.
     """
-    tree = ET.parse(filepath)
-    root = tree.getroot()
-    data = []
-
-    # On itère sur les enfants de la racine (ce qui représente les enregistrements)
-    for element in root:
-        record = {}
-        # Les champs sont les sous-éléments ou les attributs
-
-        # 1. Traiter les sous-éléments comme des champs
-        for child in element:
-            record[child.tag] = child.text
-
-        # 2. Traiter les attributs de l'élément comme des champs (préfixés si besoin)
-        for attr, value in element.attrib.items():
-            record[attr] = value
-
-        if record:
-            data.append(record)
+    data = list(nettoyer_flux(_iter_xml_brut(filepath, item_tag)))
 
     if not data:
-        raise ValueError("Format XML invalide ou vide : Aucune balise enfant trouvée sous l'élément racine.")
+        raise ValueError("Format XML invalide ou vide : Aucune balise enfant trouvée sous l'élément racine."
+                         if item_tag is None else f"Aucun enregistrement <{item_tag}> trouvé dans le fichier XML.")
 
     print(f"Succès : {len(data)} enregistrements XML chargés.")
-    return nettoyer_donnees(data)
-
+    return data
 
-def charger_donnees() -> DataList:
-    """Gère le sous-menu pour le chargement des données (J2/J9)."""
-    while True:
-        print("\n" + "-" * 50)
-        print("          SOUS-MENU CHARGEMENT")
-        print("          Format(s) supporté(s) : 1, 2, 3, 4 (J9)")
-        print("-" * 50)
-        print("1. Charger un fichier CSV")
-        print("2. Charger un fichier JSON")
-        print("3. Charger un fichier YAML (J9 - Activé)")
-        print("4. Charger un fichier XML (J9 - Activé)")
-        print("0. Annuler et Retour au Menu Principal")
-        print("-" * 50)
 
-        choix = input("Votre choix de format : ").strip()
+# --- CHARGEMENT EN FLUX (STREAMING) ---
+# Les fonctions iter_* produisent les enregistrements déjà convertis un par un.
+# Elles servent de source au pipeline en flux (voir traitement_flux).
 
-        if choix == '0':
-            return []
+def iter_csv(filepath: str) -> FluxDonnees:
+    """Lit un fichier CSV ligne par ligne et produit des enregistrements convertis."""
+    with ouvrir_fichier(filepath, newline='') as f:
+        yield from nettoyer_flux(csv.DictReader(f))
 
-        if choix in ('1', '2', '3', '4'):
-            filepath = input("Entrez le chemin du fichier : ").strip()
-            if not filepath:
-                print("Chemin du fichier non valide.")
-                continue
 
-            try:
-                if choix == '1':
-                    return load_csv(filepath)
-                elif choix == '2':
-                    return load_json(filepath)
-                elif choix == '3':
-                    return load_yaml(filepath)
-                elif choix == '4':
-                    return load_xml(filepath)
-            except FileNotFoundError:
-                print(f"Erreur : Le fichier à l'emplacement '{filepath}' n'a pas été trouvé.")
-            except ValueError as ve:
-                print(f"Erreur de format de fichier : {ve}")
-            except Exception as e:
-                print(f"Erreur lors du chargement ou du traitement du fichier ({type(e).__name__}): {e}")
+# --- CHARGEMENT CSV PARALLÈLE ---
+# Le fichier est découpé en plages d'octets qui commencent toujours au début d'un enregistrement :
+# un saut de ligne n'est une frontière que si le nombre de guillemets lus depuis le début du
+# fichier est pair (il n'est donc pas à l'intérieur d'un champ entre guillemets, comme dans
+# la colonne 'note_list' de items.csv). Chaque plage est analysée et convertie par un processus,
+# et les résultats sont restitués dans l'ordre du fichier.
+# Limite : un guillemet isolé au milieu d'un champ non délimité (ex. 12"5) fausse le découpage ;
+# iter_csv reste alors la référence.
 
-        else:
-            print("Choix invalide.")
+SEUIL_CSV_PARALLELE = 64 * 1024 * 1024  # Taille à partir de laquelle la lecture CSV passe en parallèle
+TAILLE_MORCEAU_CSV = 16 * 1024 * 1024  # Taille visée d'une plage confiée à un processus
+TAILLE_BLOC_LECTURE = 1024 * 1024  # Taille des blocs lus pour repérer les frontières
 
-        input("Appuyez sur Entrée pour continuer...")
 
+def _bornes_csv(filepath: str, taille_morceau: int) -> List[int]:
+    """
+    Positions (en octets) des débuts d'enregistrements servant de frontières :
+    [fin de l'en-tête, frontière 1, ..., taille du fichier].
+    """
+    bornes: List[int] = []
+    cible = 0  # On cherche d'abord la fin de la ligne d'en-tête
+    nb_guillemets = 0
+    position = 0
+    with open(filepath, 'rb') as f:
+        while True:
+            bloc = f.read(TAILLE_BLOC_LECTURE)
+            if not bloc:
+                break
+            curseur = 0
+            while curseur < len(bloc):
+                if position + curseur < cible:
+                    # Avance rapide jusqu'à la prochaine cible en comptant les guillemets
+                    saut = min(len(bloc), cible - position)
+                    nb_guillemets += bloc.count(b'"', curseur, saut)
+                    curseur = saut
+                    continue
+                fin_ligne = bloc.find(b'\n', curseur)
+                if fin_ligne < 0:
+                    nb_guillemets += bloc.count(b'"', curseur)
+                    break
+                nb_guillemets += bloc.count(b'"', curseur, fin_ligne)
+                curseur = fin_ligne + 1
+                if nb_guillemets % 2 == 0:
+                    bornes.append(position + curseur)
+                    cible = position + curseur + taille_morceau
+            position += len(bloc)
+
+    if not bornes or bornes[-1] != position:
+        bornes.append(position)
+    return bornes
+
+
+def _analyser_morceau_csv(filepath: str, debut: int, fin: int, fieldnames: List[str]) -> DataList:
+    """Tâche d'un processus : lit, analyse et convertit une plage d'octets du fichier CSV."""
+    with open(filepath, 'rb') as f:
+        f.seek(debut)
+        texte = f.read(fin - debut).decode('utf-8')
+    return nettoyer_donnees(csv.DictReader(io.StringIO(texte, newline=''), fieldnames=fieldnames))
+
+
+def flux_csv(filepath: str) -> FluxDonnees:
+    """
+    Enregistrements convertis d'un CSV : les gros fichiers sont découpés et analysés en
+    parallèle (iter_csv_parallele), les autres lus séquentiellement (iter_csv). Un fichier
+    compressé ne peut pas être découpé en plages d'octets : il est toujours lu séquentiellement.
+    """
+    if os.path.getsize(filepath) >= SEUIL_CSV_PARALLELE and (os.cpu_count() or 1) > 1 \
+            and compression_fichier(filepath) is None:
+        return iter_csv_parallele(filepath)
+    return iter_csv(filepath)
 
-# --- FONCTIONS DE SAUVEGARDE (J3/J9) ---
 
-def get_all_headers(data: DataList) -> List[str]:
+def iter_csv_parallele(filepath: str, nb_processus: Optional[int] = None,
+                       taille_morceau: int = TAILLE_MORCEAU_CSV) -> FluxDonnees:
     """
-    Récupère l'ensemble des clés (en-têtes) présentes dans toutes les lignes de données.
+    Produit les enregistrements convertis d'un CSV analysé en parallèle, dans l'ordre du fichier.
+    Le nombre de plages en cours est borné pour garder une mémoire maîtrisée.
+    Un fichier compressé est lu séquentiellement (iter_csv).
     """
-    headers = set()
-    for row in data:
-        headers.update(row.keys())
-
-    if data:
-        ordered_headers = list(data[0].keys())
-        for h in sorted(list(headers - set(ordered_headers))):
-            ordered_headers.append(h)
-        return ordered_headers
+    if compression_fichier(filepath) is not None:
+        yield from iter_csv(filepath)
+        return
+    bornes = _bornes_csv(filepath, taille_morceau)
+    with open(filepath, 'rb') as f:
+        en_tete = f.read(bornes[0]).decode('utf-8')
+    fieldnames = next(csv.reader(io.StringIO(en_tete, newline='')), [])
+    if not fieldnames:
+        return
 
-    return list(sorted(list(headers)))
+    from concurrent.futures import ProcessPoolExecutor
+    nb_processus = nb_processus or os.cpu_count() or 1
+    plages = iter(zip(bornes, bornes[1:]))
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        en_cours = deque()
+        for debut, fin in plages:
+            en_cours.append(executeur.submit(_analyser_morceau_csv, filepath, debut, fin, fieldnames))
+            if len(en_cours) >= 2 * nb_processus:
+                yield from en_cours.popleft().result()
+        while en_cours:
+            yield from en_cours.popleft().result()
 
 
-def save_json(data: DataList, filepath: str):
-    """Sauvegarde les données au format JSON."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
-    print(f"Succès : {len(data)} enregistrements sauvegardés au format JSON dans '{filepath}'.")
+TAILLE_MORCEAU_JSON = 1024 * 1024  # Caractères lus à la fois par le décodeur JSON incrémental
+_BLANCS_JSON = re.compile(r'[ \t\n\r]*')
+_SUITE_NOMBRE_JSON = frozenset('0123456789.eE+-')
+# Une erreur de décodage à moins de MARGE_TRONCATURE_JSON caractères de la fin du tampon peut
+# venir d'un élément coupé par la lecture (littéral 'fals', échappement '\\u12', exposant '1e')
+MARGE_TRONCATURE_JSON = 6
 
 
-def save_csv(data: DataList, filepath: str):
-    """Sauvegarde les données au format CSV."""
-    if not data:
-        raise ValueError("Impossible de sauvegarder : la liste de données est vide.")
+def _iter_json_brut(filepath: str) -> FluxDonnees:
+    """
+    Décode un tableau JSON (racine = liste) élément par élément : le texte est lu par
+    morceaux de TAILLE_MORCEAU_JSON et chaque élément est décodé avec raw_decode dès qu'il
+    est complet. Seuls le morceau courant et l'élément en cours sont gardés en mémoire.
+    Une erreur de syntaxe est signalée dès qu'elle est rencontrée : le décodeur ne lit un
+    morceau de plus que si l'erreur touche la fin du tampon (élément tronqué).
+    """
+    raw_decode = json.JSONDecoder().raw_decode
+    with ouvrir_fichier(filepath) as f:
+        tampon = ""
+        position = 0
+        fin_fichier = False
+
+        def completer() -> bool:
+            """Ajoute le morceau suivant au tampon, en oubliant la partie déjà décodée."""
+            nonlocal tampon, position, fin_fichier
+            morceau = f.read(TAILLE_MORCEAU_JSON)
+            fin_fichier = not morceau
+            tampon = tampon[position:] + morceau
+            position = 0
+            return not fin_fichier
+
+        def sauter_blancs() -> bool:
+            """Avance jusqu'au prochain caractère significatif (lu si besoin) ; False en fin de fichier."""
+            nonlocal position
+            while True:
+                position = _BLANCS_JSON.match(tampon, position).end()
+                if position < len(tampon):
+                    return True
+                if not completer():
+                    return False
+
+        def fin_prematuree() -> ValueError:
+            return ValueError("Format JSON invalide : fin de fichier avant la fin de la liste.")
+
+        # '[' initial : tout autre premier caractère est rejeté sans lire la suite
+        if not sauter_blancs() or tampon[position] != '[':
+            raise ValueError("Format JSON invalide : La racine doit être une liste d'enregistrements.")
+        position += 1
+        if not sauter_blancs():
+            raise fin_prematuree()
+        if tampon[position] == ']':
+            return
 
-    headers = get_all_headers(data)
+        while True:
+            try:
+                element, fin = raw_decode(tampon, position)
+            except json.JSONDecodeError as e:
+                tronque = e.msg.startswith('Unterminated string') or len(tampon) - e.pos <= MARGE_TRONCATURE_JSON
+                if tronque and not fin_fichier and completer():
+                    continue
+                raise ValueError(f"Format JSON invalide : {e}") from None
+            # Un élément qui touche la fin du tampon peut être tronqué (ex. le nombre 12|34)
+            if not fin_fichier and (fin == len(tampon) or (
+                    type(element) in (int, float) and tampon[fin] in _SUITE_NOMBRE_JSON)):
+                completer()
+                continue
+            yield element
 
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
-        writer.writeheader()
-        writer.writerows(data)
+            position = fin
+            if not sauter_blancs():
+                raise fin_prematuree()
+            caractere = tampon[position]
+            if caractere == ']':
+                return
+            if caractere != ',':
+                raise ValueError(f"Format JSON invalide : ',' ou ']' attendu, '{caractere}' trouvé.")
+            position += 1
+            if not sauter_blancs():
+                raise fin_prematuree()
 
-    print(f"Succès : {len(data)} enregistrements sauvegardés au format CSV dans '{filepath}'.")
 
+def iter_json(filepath: str) -> FluxDonnees:
+    """Produit les enregistrements convertis d'un fichier JSON (racine = liste, voir _iter_json_brut)."""
+    yield from nettoyer_flux(_iter_json_brut(filepath))
 
-def save_yaml(data: DataList, filepath: str):
-    """Sauvegarde les données au format YAML (J9)."""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        yaml.dump(data, f, allow_unicode=True, default_flow_style=False)
-    print(f"Succès : {len(data)} enregistrements sauvegardés au format YAML dans '{filepath}'.")
 
+def _iter_jsonl_brut(filepath: str) -> FluxDonnees:
+    """Décode un fichier JSON Lines ligne par ligne (les lignes vides sont ignorées)."""
+    decoder = json.JSONDecoder().decode
+    with ouvrir_fichier(filepath) as f:
+        for numero, ligne in enumerate(f, 1):
+            if ligne.isspace() or not ligne:
+                continue
+            try:
+                yield decoder(ligne)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Format JSON Lines invalide (ligne {numero}) : {e}") from None
 
-def save_xml(data: DataList, filepath: str, root_tag: str = 'racine', item_tag: str = 'enregistrement'):
-    """Sauvegarde les données au format XML (J9)."""
-    if not data:
-        raise ValueError("Impossible de sauvegarder : la liste de données est vide.")
 
-    root = ET.Element(root_tag)
+def iter_jsonl(filepath: str) -> FluxDonnees:
+    """Produit les enregistrements convertis d'un fichier JSON Lines."""
+    yield from nettoyer_flux(_iter_jsonl_brut(filepath))
 
-    for record in data:
-        item = ET.SubElement(root, item_tag)
-        for key, value in record.items():
-            # Convertir toutes les valeurs en chaîne pour l'écriture XML
-            value_str = "" if value is None else str(value)
 
-            # Utiliser la balise pour le champ
-            field = ET.SubElement(item, key)
-            field.text = value_str
+def iter_yaml(filepath: str) -> FluxDonnees:
+    """Produit les enregistrements d'un fichier YAML (racine = liste)."""
+    import yaml
+    with ouvrir_fichier(filepath) as f:
+        raw_data = yaml.safe_load(f)
 
-    # Créer l'arbre et sauvegarder
-    tree = ET.ElementTree(root)
-    # Utiliser un bel affichage pour la lisibilité
-    ET.indent(tree, space="  ", level=0)
-    tree.write(filepath, encoding='utf-8', xml_declaration=True)
+    if not isinstance(raw_data, list):
+        raise ValueError("Format YAML invalide : La racine doit être une liste d'enregistrements.")
+    yield from nettoyer_flux(raw_data)
 
-    print(f"Succès : {len(data)} enregistrements sauvegardés au format XML dans '{filepath}'.")
 
+def _iter_xml_brut(filepath: str, item_tag: Optional[str] = None) -> FluxDonnees:
+    """
+    Parcourt un fichier XML avec iterparse : chaque enregistrement est extrait puis
+    détaché de son parent, de même que tout élément refermé hors d'un enregistrement
+    (enveloppes, métadonnées) ; la mémoire reste donc stable quelle que soit la taille.
+    Les enregistrements sont les enfants directs de la racine, ou les éléments de balise
+    'item_tag' si elle est précisée (les premiers rencontrés, pas leurs descendants).
+    Les valeurs sont produites telles quelles (chaînes).
+    """
+    import xml.etree.ElementTree as ET
+    ancetres: List[ET.Element] = []  # Éléments ouverts, de la racine à l'élément courant
+    profondeur_record = 0  # Profondeur de l'enregistrement en cours (0 : aucun)
+    with ouvrir_fichier(filepath, 'rb') as f:
+        for event, element in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                ancetres.append(element)
+                if not profondeur_record and (len(ancetres) == 2 if item_tag is None else element.tag == item_tag):
+                    profondeur_record = len(ancetres)
+                continue
 
-def sauvegarder_donnees(data: DataList):
-    """(J3/J9) Gère le sous-menu de sauvegarde."""
-    if not data:
-        print("\n[SOUS-MENU SAUVEGARDE] Aucune donnée à sauvegarder.")
-        input("Appuyez sur Entrée pour continuer...")
-        return
+            profondeur = len(ancetres)
+            ancetres.pop()
+            if profondeur_record and profondeur > profondeur_record:
+                continue  # Champ de l'enregistrement en cours : lu à la fin de l'enregistrement
+            if profondeur != profondeur_record:
+                if ancetres:
+                    ancetres[-1].remove(element)  # Élément hors enregistrement, déjà parcouru
+                continue
+            profondeur_record = 0
 
-    while True:
-        print("\n" + "-" * 50)
-        print("          SOUS-MENU SAUVEGARDE")
-        print("          Format(s) supporté(s) : 1, 2, 3, 4 (J9)")
-        print("-" * 50)
-        print("1. Sauvegarder en CSV")
-        print("2. Sauvegarder en JSON")
-        print("3. Sauvegarder en YAML (J9 - Activé)")
-        print("4. Sauvegarder en XML (J9 - Activé)")
-        print("0. Annuler et Retour au Menu Principal")
-        print("-" * 50)
+            # Les champs sont les sous-éléments, puis les attributs de l'élément
+            record = {child.tag: child.text for child in element}
+            record.update(element.attrib)
 
-        choix = input("Votre choix de format : ").strip()
+            if ancetres:
+                ancetres[-1].remove(element)  # Libère l'enregistrement déjà traité
 
-        if choix == '0':
-            return
+            if record:
+                yield record
 
-        if choix in ('1', '2', '3', '4'):
-            filepath = input("Entrez le chemin du fichier de sortie : ").strip()
-            if not filepath:
-                print("Chemin du fichier non valide.")
-                continue
 
-            try:
-                if choix == '1':
-                    save_csv(data, filepath)
-                elif choix == '2':
-                    save_json(data, filepath)
-                elif choix == '3':
-                    save_yaml(data, filepath)
-                elif choix == '4':
-                    save_xml(data, filepath)
-
-                input("Sauvegarde terminée. Appuyez sur Entrée pour continuer...")
-                return
-            except ValueError as ve:
-                print(f"Erreur de données : {ve}")
-            except Exception as e:
-                print(f"Erreur lors de la sauvegarde du fichier ({type(e).__name__}): {e}")
+def iter_xml(filepath: str, item_tag: Optional[str] = None) -> FluxDonnees:
+    """Produit les enregistrements convertis d'un fichier XML (voir _iter_xml_brut)."""
+    yield from nettoyer_flux(_iter_xml_brut(filepath, item_tag))
 
-        else:
-            print("Choix invalide.")
 
-        input("Appuyez sur Entrée pour continuer...")
+# --- CACHE BINAIRE DES JEUX DE DONNÉES ---
+# Après un premier chargement, les données converties sont écrites dans le dossier de cache
+# au format colonnes (mêmes tampons que TableColonnes). Un rechargement du même fichier
+# inchangé projette le cache en mémoire (mmap) : aucune analyse ni conversion n'est refaite.
+#
+# Fichier de cache : MAGIE_CACHE | longueur de l'en-tête (8 octets) | en-tête JSON | tampons
+# alignés sur 8 octets. L'en-tête décrit la source (taille, date, empreinte) et les colonnes.
+# Le dossier de cache peut être choisi par variable d'environnement : son contenu n'est donc
+# jamais exécuté. Les colonnes 'objet' (listes, types mélangés) y sont écrites en JSON, et
+# une colonne dont les valeurs ne se relisent pas à l'identique en JSON empêche la mise en cache.
 
+MAGIE_CACHE = b'DFCACHE2'
+CACHE_ACTIF = os.environ.get('DATA_FILTER_CACHE', '1') != '0'
+DOSSIER_CACHE = os.environ.get('DATA_FILTER_CACHE_DIR',
+                               os.path.join(os.path.expanduser('~'), '.cache', 'data_filter'))
+TAILLE_MAX_CACHE_DISQUE = 2 * 1024 * 1024 * 1024  # Au-delà, les caches les moins récents sont supprimés
+SEUIL_SOURCE_CACHE = 1024 * 1024  # Les petits fichiers se rechargent assez vite sans cache
+FORMATS_TAMPONS_CACHE = frozenset('BHiqd')  # Types des tableaux numériques relus depuis un cache
 
-# --- FONCTIONS DE MANIPULATION DES DONNÉES (J4+) ---
 
-def afficher_donnees(data: DataList):
-    """Affiche un aperçu des données actuellement chargées."""
-    if not data:
-        print("\n[APERÇU DES DONNÉES] Aucune donnée chargée.")
-        return
+def _empreinte_source(filepath: str) -> Dict[str, Any]:
+    """
+    Identifie l'état d'un fichier source : taille, date de modification (ns) et empreinte
+    BLAKE2 de tout son contenu. Une modification qui conserve la taille, voire la date,
+    invalide donc le cache ; la lecture séquentielle reste bien plus rapide qu'une analyse.
+    """
+    etat = os.stat(filepath)
+    empreinte = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for bloc in iter(functools.partial(f.read, TAILLE_TAMPON_IO), b''):
+            empreinte.update(bloc)
+    return {'taille': etat.st_size, 'mtime_ns': etat.st_mtime_ns, 'empreinte': empreinte.hexdigest()}
 
-    print(f"\n[APERÇU DES DONNÉES] {len(data)} enregistrement(s) chargé(s).")
 
-    lignes_a_afficher = 5
-    print("-" * 50)
+def chemin_cache(filepath: str) -> str:
+    """Chemin du fichier de cache associé à une source (nommé d'après son chemin absolu)."""
+    nom = hashlib.sha1(os.path.abspath(filepath).encode('utf-8', 'surrogatepass')).hexdigest()
+    return os.path.join(DOSSIER_CACHE, nom + '.dfc')
 
-    try:
-        header = list(data[0].keys())
-        print(" | ".join(header))
-        print("-" * 50)
 
-        for i, row in enumerate(data):
-            if i >= lignes_a_afficher:
-                break
-            display_values = [repr(row.get(col, '')) for col in header]
-            print(" | ".join(display_values))
+def _identique_en_json(value: Any) -> bool:
+    """Indique si une valeur se relit à l'identique après un aller-retour JSON (types compris)."""
+    if value is None or isinstance(value, (str, bool, int)):
+        return True
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if type(value) is list:
+        return all(map(_identique_en_json, value))
+    if type(value) is dict:
+        return all(isinstance(cle, str) and _identique_en_json(v) for cle, v in value.items())
+    return False
 
-        if len(data) > lignes_a_afficher:
-            print(f"... ({len(data) - lignes_a_afficher} autres enregistrements)")
 
-    except IndexError:
-        print("Les données sont chargées mais la structure est vide ou incorrecte.")
-    input("\nAppuyez sur Entrée pour continuer...")
+def ecrire_cache(table: TableColonnes, filepath: str, source: Dict[str, Any]) -> str:
+    """
+    Écrit la table dans le cache de 'filepath' (écriture atomique) ; retourne le chemin du cache.
+    Lève ValueError si une colonne 'objet' contient une valeur non représentable en JSON.
+    """
+    tampons: List[Any] = []
+    position = 0
+
+    def placer(tampon: Any) -> List[int]:
+        """Réserve l'emplacement d'un tampon (aligné sur 8 octets) et retourne [position, longueur]."""
+        nonlocal position
+        longueur = memoryview(tampon).nbytes
+        emplacement = [position, longueur]
+        tampons.append(tampon)
+        bourrage = -longueur % 8
+        if bourrage:
+            tampons.append(bytes(bourrage))
+        position += longueur + bourrage
+        return emplacement
+
+    descriptions = []
+    for nom, colonne in table.colonnes.items():
+        description = {'nom': nom, 'type': colonne.type, 'taille': colonne.taille,
+                       'validite': placer(colonne.validite)}
+        if colonne.type in ('int', 'float', 'num', 'str'):
+            valeurs = colonne.valeurs
+            description['format'] = valeurs.typecode if isinstance(valeurs, array) else valeurs.format
+            description['taille_element'] = valeurs.itemsize
+            description['valeurs'] = placer(valeurs)
+        elif colonne.type == 'bool':
+            description['valeurs'] = placer(colonne.valeurs)
+        elif colonne.type == 'objet':
+            if not all(map(_identique_en_json, colonne.valeurs)):
+                raise ValueError(f"la colonne '{nom}' contient des valeurs non représentables en JSON")
+            description['valeurs'] = placer(json.dumps(colonne.valeurs, ensure_ascii=False).encode('utf-8'))
+        if colonne.type == 'num':
+            description['entiers'] = placer(colonne.entiers)
+        if colonne.type == 'str':
+            textes = [texte.encode('utf-8', 'surrogatepass') for texte in colonne.dictionnaire]
+            description['bornes_dictionnaire'] = placer(array('q', itertools.accumulate(map(len, textes), initial=0)))
+            description['dictionnaire'] = placer(b''.join(textes))
+        descriptions.append(description)
+
+    en_tete = json.dumps({
+        'source': source, 'nb_lignes': len(table), 'colonnes': descriptions, 'ordre_octets': sys.byteorder,
+    }).encode('utf-8')
+    en_tete += b' ' * (-len(en_tete) % 8)
+
+    os.makedirs(DOSSIER_CACHE, exist_ok=True)
+    destination = chemin_cache(filepath)
+    descripteur, temporaire = tempfile.mkstemp(suffix='.tmp', dir=DOSSIER_CACHE)
+    try:
+        with os.fdopen(descripteur, 'wb') as f:
+            f.write(MAGIE_CACHE)
+            f.write(len(en_tete).to_bytes(8, 'little'))
+            f.write(en_tete)
+            for tampon in tampons:
+                f.write(tampon)
+        os.replace(temporaire, destination)
+    except BaseException:
+        os.remove(temporaire)
+        raise
+    return destination
+
+
+def _decoder_cache(projection: mmap.mmap) -> Tuple[Dict[str, Any], int, Dict[str, Any]]:
+    """
+    Vérifie entièrement un fichier de cache projeté, sans créer de vue sur la projection :
+    retourne l'en-tête, la position des tampons et les valeurs déjà décodées (colonnes 'objet'
+    et dictionnaires des chaînes). Lève ValueError ou KeyError si le fichier est invalide.
+    """
+    if projection[:len(MAGIE_CACHE)] != MAGIE_CACHE:
+        raise ValueError("Fichier de cache invalide.")
+    longueur_en_tete = int.from_bytes(projection[8:16], 'little')
+    base = 16 + longueur_en_tete
+    en_tete = json.loads(projection[16:base])
+    if en_tete['ordre_octets'] != sys.byteorder:
+        raise ValueError("Cache écrit sur une plateforme incompatible.")
+
+    def octets(emplacement: List[int]) -> bytes:
+        debut, longueur = emplacement
+        if debut < 0 or longueur < 0 or base + debut + longueur > len(projection):
+            raise ValueError("Fichier de cache tronqué.")
+        return projection[base + debut:base + debut + longueur]
+
+    decodees: Dict[str, Any] = {}
+    nb_lignes = en_tete['nb_lignes']
+    for description in en_tete['colonnes']:
+        nom, taille = description['nom'], description['taille']
+        if taille != nb_lignes or description['validite'][1] != (taille + 7) // 8:
+            raise ValueError(f"Colonne '{nom}' incohérente dans le cache.")
+        octets(description['validite'])
+        if description['type'] in ('int', 'float', 'num', 'str'):
+            format_valeurs = description['format']
+            if format_valeurs not in FORMATS_TAMPONS_CACHE \
+                    or array(format_valeurs).itemsize != description['taille_element'] \
+                    or description['valeurs'][1] != taille * description['taille_element']:
+                raise ValueError(f"Colonne '{nom}' incompatible avec cette plateforme.")
+            octets(description['valeurs'])
+        elif description['type'] == 'bool':
+            octets(description['valeurs'])
+        elif description['type'] == 'objet':
+            decodees[nom] = json.loads(octets(description['valeurs']))
+        if description['type'] == 'num':
+            octets(description['entiers'])
+        if description['type'] == 'str':
+            bornes = array('q', octets(description['bornes_dictionnaire']))
+            textes = octets(description['dictionnaire'])
+            decodees[nom] = [textes[bornes[i]:bornes[i + 1]].decode('utf-8', 'surrogatepass')
+                             for i in range(len(bornes) - 1)]
+    return en_tete, base, decodees
+
+
+def lire_cache(chemin: str) -> Tuple[Dict[str, Any], TableColonnes]:
+    """
+    Projette un fichier de cache en mémoire et reconstruit la table sans copie des tampons
+    numériques (les colonnes sont des vues en lecture seule sur le fichier). La projection
+    est refermée si le fichier est invalide.
+    """
+    with open(chemin, 'rb') as f:
+        projection = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        en_tete, base, decodees = _decoder_cache(projection)
+    except BaseException:
+        projection.close()
+        raise
+    vue = memoryview(projection)
+
+    def tranche(emplacement: List[int]) -> memoryview:
+        debut, longueur = emplacement
+        return vue[base + debut:base + debut + longueur]
+
+    table = TableColonnes()
+    table.nb_lignes = en_tete['nb_lignes']
+    for description in en_tete['colonnes']:
+        colonne = Colonne()
+        colonne.type = description['type']
+        colonne.taille = description['taille']
+        colonne.validite = tranche(description['validite'])
+        if colonne.type in ('int', 'float', 'num', 'str'):
+            colonne.valeurs = tranche(description['valeurs']).cast(description['format'])
+        elif colonne.type == 'bool':
+            colonne.valeurs = tranche(description['valeurs'])
+        elif colonne.type == 'objet':
+            colonne.valeurs = decodees[description['nom']]
+        if colonne.type == 'num':
+            colonne.entiers = tranche(description['entiers'])
+        if colonne.type == 'str':
+            colonne.dictionnaire = decodees[description['nom']]
+        table.colonnes[description['nom']] = colonne
+    table.lecture_seule = True
+    return en_tete['source'], table
+
+
+def _evincer_caches(a_conserver: str):
+    """Supprime les caches les moins récemment utilisés tant que le dossier dépasse sa taille maximale."""
+    fichiers = []
+    for entree in os.scandir(DOSSIER_CACHE):
+        if entree.name.endswith('.dfc') and entree.path != a_conserver:
+            etat = entree.stat()
+            fichiers.append((etat.st_mtime, etat.st_size, entree.path))
+    total = sum(taille for _, taille, _ in fichiers) + os.path.getsize(a_conserver)
+    for _, taille, chemin in sorted(fichiers):
+        if total <= TAILLE_MAX_CACHE_DISQUE:
+            break
+        try:
+            os.remove(chemin)
+            total -= taille
+        except OSError:
+            pass  # Cache encore projeté en mémoire (Windows) : on le laisse
 
 
-def afficher_statistiques(data: DataList):
+@instrumenter('chargement')
+def charger_avec_cache(filepath: str, chargeur: Callable[[str], DataList],
+                       parametres: Optional[Dict[str, Any]] = None,
+                       lire: Optional[Callable[[str], FluxDonnees]] = None) -> Donnees:
     """
-    (J5/J6) Calcule et affiche les statistiques (Min/Max/Moyenne/Médiane/Mode/Écart-type)
-    et la distribution des types pour chaque colonne.
+    Charge un fichier via son cache s'il est à jour (TableColonnes projetée en mémoire),
+    sinon avec 'chargeur', puis écrit le cache pour les prochains chargements.
+    'parametres' (options du chargeur) fait partie de la clé : d'autres options invalident le cache.
+    Si le format sait lire en flux ('lire'), un fichier à mettre en cache est converti directement
+    en colonnes au fil de la lecture : la table sert à la fois au cache et de résultat, sans
+    construire de DataList intermédiaire.
     """
-    print("\n[STATISTIQUES ET ANALYSE DE STRUCTURE] (Jour 6)")
-    if not data:
-        print("Veuillez d'abord charger les données.")
-        input("Appuyez sur Entrée pour continuer...")
-        return
+    if not CACHE_ACTIF or os.path.getsize(filepath) < SEUIL_SOURCE_CACHE:
+        return chargeur(filepath)
+
+    source = _empreinte_source(filepath)
+    if parametres:
+        source['parametres'] = parametres
+    cache = chemin_cache(filepath)
+    if os.path.exists(cache):
+        try:
+            source_cache, table = lire_cache(cache)
+            if source_cache == source:
+                os.utime(cache)  # Marque le cache comme récemment utilisé (éviction LRU)
+                print(f"Succès : {len(table)} enregistrements chargés depuis le cache ('{cache}').")
+                return table
+            os.remove(cache)  # La source a changé : le cache est périmé
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Note : cache ignoré ({type(e).__name__}: {e}).")
+
+    if lire is not None:
+        data = TableColonnes.depuis_flux(lire(filepath))
+        print(f"Succès : {len(data)} enregistrements chargés.")
+        table = data
+    else:
+        data = chargeur(filepath)
+        table = data if isinstance(data, TableColonnes) else TableColonnes.depuis_datalist(data)
+    try:
+        _evincer_caches(ecrire_cache(table, filepath, source))
+    except (OSError, ValueError) as e:
+        print(f"Note : impossible d'écrire le cache ({e}).")
+    return data
 
-    stats_numeriques: Dict[str, List[float]] = {}
-    structure_types: Dict[str, Counter] = {}
-    mode_results: Dict[str, List[Any]] = {}  # Utilisation de List[Any] pour stocker toutes les valeurs
 
-    # 1. Collecter les valeurs
-    for item in data:
-        for key, value in item.items():
+def charger_donnees() -> Donnees:
+    """Gère le sous-menu pour le chargement des données (J2/J9), formats du registre."""
+    while True:
+        print("\n" + "-" * 50)
+        print("          SOUS-MENU CHARGEMENT")
+        print("-" * 50)
+        choix = _choisir_format('charger', "Charger un fichier")
+        if choix is None:
+            return []
 
-            if key not in structure_types:
-                structure_types[key] = Counter()
+        filepath = input("Entrez le chemin du fichier : ").strip()
+        if not filepath:
+            print("Chemin du fichier non valide.")
+            continue
 
-            # Enregistrement des types pour l'analyse de structure
-            type_name = 'None' if value is None else type(value).__name__
-            structure_types[key][type_name] += 1
+        try:
+            format_donnees = detecter_format(filepath) if choix == 'A' else choix
+            if choix == 'A':
+                print(f"Format détecté : {format_donnees.libelle}.")
+            options = format_donnees.options_chargement() if format_donnees.options_chargement else {}
+            # Le format et ses options font partie de la clé du cache
+            lire = format_donnees.lire and (lambda chemin: format_donnees.lire(chemin, **options))
+            return charger_avec_cache(filepath, lambda chemin: format_donnees.charger(chemin, **options),
+                                      {'format': format_donnees.nom, **options}, lire)
+        except FileNotFoundError:
+            print(f"Erreur : Le fichier à l'emplacement '{filepath}' n'a pas été trouvé.")
+        except ValueError as ve:
+            print(f"Erreur de format de fichier : {ve}")
+        except Exception as e:
+            print(f"Erreur lors du chargement ou du traitement du fichier ({type(e).__name__}): {e}")
 
-            # Collection pour les statistiques numériques
-            if isinstance(value, (int, float)):
-                if key not in stats_numeriques:
-                    stats_numeriques[key] = []
-                stats_numeriques[key].append(float(value))
+        input("Appuyez sur Entrée pour continuer...")
 
-                # Collection pour le Mode
-            if key not in mode_results:
-                mode_results[key] = []
-            mode_results[key].append(value)
 
-    # --- PARTIE J5/J6 : STATISTIQUES NUMÉRIQUES ---
-    print("\n--- Statistiques de Tendance Centrale et de Dispersion (Numérique) ---")
+# --- FONCTIONS DE SAUVEGARDE (J3/J9) ---
 
-    if not stats_numeriques:
-        print("Aucune colonne purement numérique (int ou float) n'a été trouvée pour cette analyse.")
+def get_all_headers(data: Donnees) -> List[str]:
+    """
+    Récupère l'ensemble des clés (en-têtes) présentes dans toutes les lignes de données.
+    Lues dans le catalogue s'il est connu (immédiat), sinon par un parcours des lignes.
+    """
+    catalogue = catalogue_connu(data)
+    if catalogue is None:
+        return _entetes_parcours(data)
+    noms = catalogue.noms_colonnes()
+    if isinstance(data, TableColonnes) or not data:
+        return noms
+    # Même ordre qu'un parcours : clés de la première ligne, puis les autres clés triées
+    premiere = list(data[0].keys())
+    return premiere + sorted(set(noms).difference(premiere))
+
+
+@instrumenter('sauvegarde')
+def save_json(data: Donnees, filepath: str, compact: bool = False):
+    """
+    Sauvegarde les données au format JSON.
+    En mode compact, chaque enregistrement est écrit sur une ligne sans espaces
+    (voir ecrire_json_flux) : fichier plus petit et écriture bien plus rapide.
+    """
+    if compact:
+        ecrire_json_flux(data, filepath, compact=True)
     else:
-        header_num = f"{'Colonne':<20} | {'Min':<10} | {'Max':<10} | {'Moyenne':<10} | {'Médiane':<10} | {'Écart-type':<12} | {'Nbs Comptés':<12}"
+        with ouvrir_fichier(filepath, 'w') as f:
+            # json ne sait sérialiser que des listes : une TableColonnes est reconvertie
+            json.dump(data if isinstance(data, list) else list(data), f, indent=4)
+    print(f"Succès : {len(data)} enregistrements sauvegardés au format JSON dans '{filepath}'.")
+
+
+@instrumenter('sauvegarde')
+def save_csv(data: Donnees, filepath: str):
+    """Sauvegarde les données au format CSV."""
+    if not data:
+        raise ValueError("Impossible de sauvegarder : la liste de données est vide.")
+
+    ecrire_csv_flux(data, filepath, headers=get_all_headers(data))
+
+    print(f"Succès : {len(data)} enregistrements sauvegardés au format CSV dans '{filepath}'.")
+
+
+@instrumenter('sauvegarde')
+def save_yaml(data: Donnees, filepath: str):
+    """Sauvegarde les données au format YAML (J9)."""
+    import yaml
+    with ouvrir_fichier(filepath, 'w') as f:
+        yaml.dump(data if isinstance(data, list) else list(data), f, allow_unicode=True, default_flow_style=False)
+    print(f"Succès : {len(data)} enregistrements sauvegardés au format YAML dans '{filepath}'.")
+
+
+@instrumenter('sauvegarde')
+def save_xml(data: Donnees, filepath: str, root_tag: str = 'racine', item_tag: str = 'enregistrement',
+             indentation: Optional[str] = "  "):
+    """
+    Sauvegarde les données au format XML (J9).
+    L'écriture est incrémentale (voir ecrire_xml_flux) : aucun arbre ElementTree n'est construit.
+    """
+    if not data:
+        raise ValueError("Impossible de sauvegarder : la liste de données est vide.")
+
+    count = ecrire_xml_flux(data, filepath, root_tag, item_tag, indentation)
+    print(f"Succès : {count} enregistrements sauvegardés au format XML dans '{filepath}'.")
+
+
+# --- SAUVEGARDE EN FLUX (STREAMING) ---
+# Chaque fonction consomme un itérable d'enregistrements et écrit au fil de l'eau.
+# Elles retournent le nombre d'enregistrements écrits (inconnu à l'avance en mode flux).
+# Les enregistrements sont sérialisés par lots de TAILLE_LOT : un seul appel d'écriture par lot
+# (writerows, un texte assemblé) au lieu d'un ou plusieurs appels par enregistrement.
+
+def ecrire_csv_flux(records: Iterable[Dict[str, Any]], filepath: str,
+                    headers: Optional[List[str]] = None) -> int:
+    """
+    Écrit les enregistrements en CSV au fur et à mesure.
+    Sans en-têtes fournis, ceux du premier enregistrement sont utilisés
+    (les clés supplémentaires des lignes suivantes sont ignorées).
+    """
+    records = iter(records)
+    if headers is None:
+        premier = next(records, None)
+        if premier is None:
+            raise ValueError("Impossible de sauvegarder : aucun enregistrement à écrire.")
+        headers = list(premier.keys())
+        records = itertools.chain([premier], records)
+
+    count = 0
+    with ouvrir_fichier(filepath, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=headers, extrasaction='ignore')
+        writer.writeheader()
+        for lot in _par_lots(records):
+            writer.writerows(lot)
+            count += len(lot)
+    return count
+
+
+_encoder_json = json.JSONEncoder().encode  # Encodeur créé une fois (json.dumps avec options en recrée un)
+_encoder_json_compact = json.JSONEncoder(separators=(',', ':')).encode
+
+
+def ecrire_json_flux(records: Iterable[Dict[str, Any]], filepath: str, compact: bool = False) -> int:
+    """Écrit une liste JSON enregistrement par enregistrement (sans la construire en mémoire)."""
+    encoder = _encoder_json_compact if compact else _encoder_json
+    count = 0
+    with ouvrir_fichier(filepath, 'w') as f:
+        f.write("[")
+        for lot in _par_lots(records):
+            f.write((",\n" if count else "\n") + ",\n".join(map(encoder, lot)))
+            count += len(lot)
+        f.write("\n]\n" if count else "]\n")
+    return count
+
+
+@instrumenter('sauvegarde')
+def save_jsonl(records: Iterable[Dict[str, Any]], filepath: str) -> int:
+    """Écrit au format JSON Lines : un objet JSON par ligne."""
+    count = 0
+    with ouvrir_fichier(filepath, 'w') as f:
+        for lot in _par_lots(records):
+            f.write("\n".join(map(_encoder_json, lot)) + "\n")
+            count += len(lot)
+    return count
+
+
+def ecrire_yaml_flux(records: Iterable[Dict[str, Any]], filepath: str) -> int:
+    """
+    Écrit une liste YAML lot par lot : chaque lot est sérialisé comme une liste,
+    et leur concaténation forme une liste YAML valide.
+    """
+    import yaml
+    count = 0
+    with ouvrir_fichier(filepath, 'w') as f:
+        for lot in _par_lots(records):
+            yaml.dump(lot, f, allow_unicode=True, default_flow_style=False)
+            count += len(lot)
+        if not count:
+            f.write("[]\n")
+    return count
+
+
+def ecrire_xml_flux(records: Iterable[Dict[str, Any]], filepath: str,
+                    root_tag: str = 'racine', item_tag: str = 'enregistrement',
+                    indentation: Optional[str] = "  ") -> int:
+    """
+    Écrit le XML balise par balise, sans construire d'arbre ElementTree.
+    Les enregistrements d'un lot sont assemblés puis écrits en une fois ; 'indentation'
+    (None ou '' pour un XML compact) reproduit la mise en forme de ET.indent, y compris
+    les éléments vides abrégés ('<enregistrement />', '<racine />').
+    """
+    from xml.sax.saxutils import escape as xml_escape
+    if indentation:
+        ouverture, fermeture = f"{indentation}<{item_tag}>\n", f"{indentation}</{item_tag}>\n"
+        vide = f"{indentation}<{item_tag} />\n"
+        marge, fin_ligne = indentation * 2, "\n"
+    else:
+        ouverture, fermeture, vide = f"<{item_tag}>", f"</{item_tag}>", f"<{item_tag} />"
+        marge = fin_ligne = ""
+    balises: Dict[str, Tuple[str, str, str]] = {}  # Balises de champ pré-formatées, par clé
+
+    count = 0
+    with ouvrir_fichier(filepath, 'w') as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n")
+        for lot in _par_lots(records):
+            morceaux = [] if count else [f"<{root_tag}>{fin_ligne}"]
+            for record in lot:
+                if not record:
+                    morceaux.append(vide)
+                    continue
+                morceaux.append(ouverture)
+                for key, value in record.items():
+                    balise = balises.get(key)
+                    if balise is None:
+                        balise = balises[key] = (f"{marge}<{key}>", f"</{key}>{fin_ligne}",
+                                                 f"{marge}<{key} />{fin_ligne}")
+                    if value is None or value == "":
+                        morceaux.append(balise[2])
+                    else:
+                        morceaux.append(balise[0] + xml_escape(str(value)) + balise[1])
+                morceaux.append(fermeture)
+            f.write("".join(morceaux))
+            count += len(lot)
+        f.write(f"</{root_tag}>" if count else f"<{root_tag} />")  # Comme ElementTree.write : sans fin de ligne
+    return count
+
+
+def sauvegarder_donnees(data: Donnees):
+    """(J3/J9) Gère le sous-menu de sauvegarde, formats du registre."""
+    if not data:
+        print("\n[SOUS-MENU SAUVEGARDE] Aucune donnée à sauvegarder.")
+        input("Appuyez sur Entrée pour continuer...")
+        return
+
+    while True:
+        print("\n" + "-" * 50)
+        print("          SOUS-MENU SAUVEGARDE")
+        print("-" * 50)
+        format_donnees = _choisir_format('sauvegarder', "Sauvegarder en")
+        if format_donnees is None:
+            return
+
+        filepath = input("Entrez le chemin du fichier de sortie : ").strip()
+        if not filepath:
+            print("Chemin du fichier non valide.")
+            continue
+
+        try:
+            options = format_donnees.options_sauvegarde() if format_donnees.options_sauvegarde else {}
+            format_donnees.sauvegarder(data, filepath, **options)
+            input("Sauvegarde terminée. Appuyez sur Entrée pour continuer...")
+            return
+        except ValueError as ve:
+            print(f"Erreur de données : {ve}")
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde du fichier ({type(e).__name__}): {e}")
+
+        input("Appuyez sur Entrée pour continuer...")
+
+
+# --- REGISTRE DES FORMATS ---
+# Chaque format déclare ses fonctions (chargement, lecture en flux, sauvegarde, écriture en flux),
+# ses extensions et un test des premiers octets du fichier. Menus, traitement en flux et mode lot
+# passent par ce registre : un format ajouté avec enregistrer_format() est disponible partout.
+# Les dépendances lourdes d'un format (yaml, ElementTree) ne sont importées qu'à son premier usage.
+#
+# Formats tiers : les modules listés dans la variable DATA_FILTER_FORMATS (séparés par des
+# virgules) sont importés à la première consultation du registre ; ils appellent
+# enregistrer_format() lors de leur import, et peuvent remplacer un format existant.
+
+TAILLE_ENTETE_DETECTION = 4096  # Octets lus pour reconnaître le format d'un fichier
+
+
+class FormatDonnees:
+    """
+    Description d'un format de fichier. 'lire' produit un flux d'enregistrements convertis et
+    'ecrire' écrit un flux en retournant le nombre d'enregistrements ; 'charger' et 'sauvegarder'
+    sont les versions interactives (messages de succès), déduites des deux premières si absentes.
+    'reconnaitre' teste les premiers octets ; 'options_chargement' / 'options_sauvegarde'
+    demandent à l'utilisateur les options propres au format (arguments nommés).
+    """
+
+    __slots__ = ('nom', 'libelle', 'extensions', 'lire', 'ecrire', 'charger', 'sauvegarder',
+                 'reconnaitre', 'options_chargement', 'options_sauvegarde')
+
+    def __init__(self, nom: str, libelle: str, extensions: Iterable[str],
+                 lire: Optional[Callable[..., FluxDonnees]] = None,
+                 ecrire: Optional[Callable[..., int]] = None,
+                 charger: Optional[Callable[..., DataList]] = None,
+                 sauvegarder: Optional[Callable[..., Any]] = None,
+                 reconnaitre: Optional[Callable[[bytes], bool]] = None,
+                 options_chargement: Optional[Callable[[], Dict[str, Any]]] = None,
+                 options_sauvegarde: Optional[Callable[[], Dict[str, Any]]] = None):
+        if lire is None and charger is None and ecrire is None and sauvegarder is None:
+            raise ValueError(f"Le format '{nom}' ne déclare aucune fonction de lecture ou d'écriture.")
+        self.nom = nom
+        self.libelle = libelle
+        self.extensions = tuple(ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in extensions)
+        self.lire = lire
+        self.ecrire = ecrire
+        self.charger = charger or (lire and (lambda filepath, **options: list(lire(filepath, **options))))
+        self.sauvegarder = sauvegarder or ecrire
+        self.reconnaitre = reconnaitre
+        self.options_chargement = options_chargement
+        self.options_sauvegarde = options_sauvegarde
+
+
+_formats: Dict[str, FormatDonnees] = {}  # Par nom, dans l'ordre d'enregistrement (numéros des menus)
+_formats_extensions: Dict[str, str] = {}
+_formats_externes_charges = False
+
+
+def enregistrer_format(format_donnees: FormatDonnees) -> FormatDonnees:
+    """Ajoute un format au registre (ou remplace celui du même nom, en gardant sa place)."""
+    ancien = _formats.get(format_donnees.nom)
+    if ancien is not None:
+        for extension in ancien.extensions:
+            if _formats_extensions.get(extension) == ancien.nom:
+                del _formats_extensions[extension]
+    _formats[format_donnees.nom] = format_donnees
+    for extension in format_donnees.extensions:
+        _formats_extensions[extension] = format_donnees.nom
+    return format_donnees
+
+
+def _charger_formats_externes():
+    """Importe une fois les modules de formats tiers listés dans DATA_FILTER_FORMATS."""
+    global _formats_externes_charges
+    if _formats_externes_charges:
+        return
+    _formats_externes_charges = True
+    import importlib
+    for module in filter(None, (nom.strip() for nom in os.environ.get('DATA_FILTER_FORMATS', '').split(','))):
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Note : module de format '{module}' ignoré ({e}).", file=sys.stderr)
+
+
+def formats_disponibles(operation: Optional[str] = None) -> List[FormatDonnees]:
+    """Formats enregistrés, éventuellement limités à ceux qui offrent 'operation' ('lire', 'ecrire'...)."""
+    _charger_formats_externes()
+    return [f for f in _formats.values() if operation is None or getattr(f, operation) is not None]
+
+
+def format_par_nom(nom: str) -> FormatDonnees:
+    _charger_formats_externes()
+    format_donnees = _formats.get(nom.lower())
+    if format_donnees is None:
+        raise ValueError(f"Format inconnu : '{nom}' (formats disponibles : {', '.join(_formats)}).")
+    return format_donnees
+
+
+def detecter_format(chemin: str, format_impose: Optional[str] = None) -> FormatDonnees:
+    """
+    Format d'un fichier : celui imposé, sinon d'après l'extension, sinon d'après ses premiers
+    octets (fichier existant). Les formats enregistrés en dernier sont testés en premier.
+    Une extension de compression est ignorée et un fichier compressé est examiné décompressé.
+    """
+    if format_impose:
+        return format_par_nom(format_impose)
+    _charger_formats_externes()
+    # 'items.csv.gz' : le format est l'extension qui précède celle de la compression
+    nom = _formats_extensions.get(os.path.splitext(chemin_sans_compression(chemin))[1].lower())
+    if nom is not None:
+        return _formats[nom]
+    if os.path.isfile(chemin):
+        with ouvrir_fichier(chemin, 'rb') as f:  # Premiers octets décompressés
+            entete = f.read(TAILLE_ENTETE_DETECTION)
+        entete = entete[3:] if entete.startswith(b'\xef\xbb\xbf') else entete  # BOM UTF-8
+        entete = entete.lstrip()
+        for format_donnees in reversed(list(_formats.values())):
+            if format_donnees.reconnaitre is not None and entete and format_donnees.reconnaitre(entete):
+                return format_donnees
+    raise ValueError(f"Format non reconnu pour '{chemin}' (préciser le format).")
+
+
+def _reconnaitre_jsonl(entete: bytes) -> bool:
+    """Première ligne = un objet JSON complet (un tableau ou un objet sur plusieurs lignes = JSON)."""
+    premiere_ligne, fin_ligne, _ = entete.partition(b'\n')
+    if not (fin_ligne and premiere_ligne.startswith(b'{')):
+        return False
+    try:
+        return isinstance(json.loads(premiere_ligne), dict)
+    except ValueError:
+        return False
+
+
+def _reconnaitre_csv(entete: bytes) -> bool:
+    """Dernier recours : une première ligne de texte contenant un séparateur."""
+    premiere_ligne = entete.split(b'\n', 1)[0]
+    return b',' in premiere_ligne and b'\x00' not in premiere_ligne
+
+
+def _options_chargement_xml() -> Dict[str, Any]:
+    item_tag = input("Balise des enregistrements (Entrée = enfants de la racine) : ").strip()
+    return {'item_tag': item_tag} if item_tag else {}
+
+
+def _options_sauvegarde_json() -> Dict[str, Any]:
+    compact = input("Format compact (plus rapide, sans indentation) ? (o/N) : ").strip().lower() == 'o'
+    return {'compact': compact}
+
+
+def _options_sauvegarde_xml() -> Dict[str, Any]:
+    root_tag = input("Balise racine (Entrée = 'racine') : ").strip() or 'racine'
+    item_tag = input("Balise des enregistrements (Entrée = 'enregistrement') : ").strip() or 'enregistrement'
+    indenter = input("Indenter le fichier ? (O/n) : ").strip().lower() != 'n'
+    return {'root_tag': root_tag, 'item_tag': item_tag, 'indentation': "  " if indenter else None}
+
+
+def _sauvegarder_jsonl(data: Donnees, filepath: str):
+    count = save_jsonl(data, filepath)
+    print(f"Succès : {count} enregistrements sauvegardés au format JSON Lines dans '{filepath}'.")
+
+
+# Formats intégrés, dans l'ordre historique des menus (1. CSV ... 5. JSON Lines)
+enregistrer_format(FormatDonnees('csv', 'CSV', ['.csv'], flux_csv, ecrire_csv_flux, load_csv, save_csv,
+                                 reconnaitre=_reconnaitre_csv))
+enregistrer_format(FormatDonnees('json', 'JSON', ['.json'], iter_json, ecrire_json_flux, load_json, save_json,
+                                 reconnaitre=lambda entete: entete[:1] in (b'[', b'{'),
+                                 options_sauvegarde=_options_sauvegarde_json))
+enregistrer_format(FormatDonnees('yaml', 'YAML', ['.yaml', '.yml'], iter_yaml, ecrire_yaml_flux, load_yaml, save_yaml,
+                                 reconnaitre=lambda entete: entete.startswith((b'---', b'- ', b'%YAML'))))
+enregistrer_format(FormatDonnees('xml', 'XML', ['.xml'], iter_xml, ecrire_xml_flux, load_xml, save_xml,
+                                 reconnaitre=lambda entete: entete.startswith(b'<'),
+                                 options_chargement=_options_chargement_xml,
+                                 options_sauvegarde=_options_sauvegarde_xml))
+enregistrer_format(FormatDonnees('jsonl', 'JSON Lines', ['.jsonl', '.ndjson'], iter_jsonl, save_jsonl,
+                                 load_jsonl, _sauvegarder_jsonl, reconnaitre=_reconnaitre_jsonl))
+
+
+def _choisir_format(operation: str, verbe: str) -> Union[FormatDonnees, str, None]:
+    """
+    Affiche les formats offrant 'operation' et retourne celui choisi, 'A' pour la détection
+    automatique (si proposée), ou None pour un retour au menu principal.
+    """
+    formats = formats_disponibles(operation)
+    while True:
+        for numero, format_donnees in enumerate(formats, 1):
+            print(f"{numero}. {verbe} {format_donnees.libelle} ({', '.join(format_donnees.extensions)})")
+        if operation in ('charger', 'lire'):
+            print("A. Détection automatique (extension ou contenu du fichier)")
+        print("0. Annuler et Retour au Menu Principal")
+        print("-" * 50)
+        choix = input("Votre choix de format : ").strip().upper()
+        if choix == '0':
+            return None
+        if choix == 'A' and operation in ('charger', 'lire'):
+            return 'A'
+        if choix.isdigit() and 1 <= int(choix) <= len(formats):
+            return formats[int(choix) - 1]
+        print("Choix invalide.")
+
+
+# --- FONCTIONS DE MANIPULATION DES DONNÉES (J4+) ---
+
+def afficher_donnees(data: Donnees):
+    """Affiche un aperçu des données actuellement chargées."""
+    if not data:
+        print("\n[APERÇU DES DONNÉES] Aucune donnée chargée.")
+        return
+
+    print(f"\n[APERÇU DES DONNÉES] {len(data)} enregistrement(s) chargé(s).")
+
+    lignes_a_afficher = 5
+    print("-" * 50)
+
+    try:
+        header = list(data[0].keys())
+        print(" | ".join(header))
+        print("-" * 50)
+
+        for i, row in enumerate(data):
+            if i >= lignes_a_afficher:
+                break
+            display_values = [repr(row.get(col, '')) for col in header]
+            print(" | ".join(display_values))
+
+        if len(data) > lignes_a_afficher:
+            print(f"... ({len(data) - lignes_a_afficher} autres enregistrements)")
+
+    except IndexError:
+        print("Les données sont chargées mais la structure est vide ou incorrecte.")
+    input("\nAppuyez sur Entrée pour continuer...")
+
+
+# --- STATISTIQUES EN UN SEUL PASSAGE (ACCUMULATEURS FUSIONNABLES) ---
+# Chaque colonne est résumée par des accumulateurs de taille bornée, alimentés en un
+# seul passage : Welford (moyenne/variance), min/max exacts, esquisse KLL (médiane et
+# percentiles, erreur de rang configurable) et Misra-Gries (mode). Deux accumulateurs
+# calculés sur des morceaux différents se fusionnent, ce qui permet le calcul en flux
+# et en parallèle.
+
+ERREUR_QUANTILES = 0.01  # Erreur de rang visée pour la médiane et les percentiles
+CAPACITE_MODE = 1000  # Nombre de compteurs conservés pour la recherche du mode
+TYPES_AFFICHES = ['int', 'float', 'bool', 'str', 'None', 'list', 'dict', 'autres']
+
+
+class AccumulateurNumerique:
+    """Nombre, moyenne et variance (algorithme de Welford), minimum et maximum exacts."""
+
+    def __init__(self):
+        self.nb_valeurs = 0
+        self.moyenne = 0.0
+        self.m2 = 0.0  # Somme des carrés des écarts à la moyenne
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def ajouter(self, x: float):
+        self.nb_valeurs += 1
+        delta = x - self.moyenne
+        self.moyenne += delta / self.nb_valeurs
+        self.m2 += delta * (x - self.moyenne)
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+    def fusionner(self, autre: 'AccumulateurNumerique'):
+        """Combine deux accumulateurs (formule de Chan et al.)."""
+        if not autre.nb_valeurs:
+            return
+        total = self.nb_valeurs + autre.nb_valeurs
+        delta = autre.moyenne - self.moyenne
+        self.moyenne += delta * autre.nb_valeurs / total
+        self.m2 += autre.m2 + delta * delta * self.nb_valeurs * autre.nb_valeurs / total
+        self.nb_valeurs = total
+        self.minimum = min(self.minimum, autre.minimum)
+        self.maximum = max(self.maximum, autre.maximum)
+
+    def ecart_type(self) -> float:
+        """Écart-type d'échantillon (comme statistics.stdev), NaN avec moins de 2 valeurs."""
+        if self.nb_valeurs < 2:
+            return float('nan')
+        return math.sqrt(self.m2 / (self.nb_valeurs - 1))
+
+
+class SketchQuantiles:
+    """
+    Esquisse KLL de quantiles : une pile de compacteurs où chaque élément du niveau h
+    représente 2**h valeurs. Taille O(k log(n/k)), erreur de rang de l'ordre de 'erreur'.
+    Tant qu'aucune compaction n'a eu lieu, les résultats sont exacts.
+    """
+
+    def __init__(self, erreur: float = ERREUR_QUANTILES):
+        self.erreur = erreur
+        self.k = max(8, math.ceil(2.0 / erreur))
+        self.compacteurs: List[List[float]] = [[]]
+        self.decalages: List[int] = [0]  # Alternance des éléments conservés à chaque compaction
+        self.taille = 0
+        self.capacite_totale = self._capacite(0)
+
+    def _capacite(self, niveau: int) -> int:
+        profondeur = len(self.compacteurs) - niveau - 1
+        return max(2, math.ceil((2 / 3) ** profondeur * self.k))
+
+    def _ajouter_niveau(self):
+        self.compacteurs.append([])
+        self.decalages.append(0)
+        self.capacite_totale = sum(self._capacite(h) for h in range(len(self.compacteurs)))
+
+    @property
+    def exact(self) -> bool:
+        return len(self.compacteurs) == 1
+
+    def ajouter(self, x: float):
+        self.compacteurs[0].append(x)
+        self.taille += 1
+        if self.taille >= self.capacite_totale:
+            self._compresser()
+
+    def _compresser(self):
+        while self.taille >= self.capacite_totale:
+            for niveau, compacteur in enumerate(self.compacteurs):
+                if len(compacteur) >= self._capacite(niveau):
+                    if niveau + 1 == len(self.compacteurs):
+                        self._ajouter_niveau()
+                    compacteur.sort()
+                    # Une valeur sur deux monte d'un niveau (son poids double)
+                    reste = [compacteur.pop()] if len(compacteur) % 2 else []
+                    self.compacteurs[niveau + 1].extend(compacteur[self.decalages[niveau]::2])
+                    self.decalages[niveau] ^= 1
+                    self.compacteurs[niveau] = reste
+                    break
+            self.taille = sum(len(c) for c in self.compacteurs)
+
+    def fusionner(self, autre: 'SketchQuantiles'):
+        while len(self.compacteurs) < len(autre.compacteurs):
+            self._ajouter_niveau()
+        for niveau, compacteur in enumerate(autre.compacteurs):
+            self.compacteurs[niveau].extend(compacteur)
+        self.taille = sum(len(c) for c in self.compacteurs)
+        self._compresser()
+
+    def quantile(self, q: float) -> float:
+        """Valeur de rang q (0 <= q <= 1) ; la médiane exacte suit statistics.median."""
+        if self.exact:
+            valeurs = sorted(self.compacteurs[0])
+            if q == 0.5:
+                import statistics
+                return statistics.median(valeurs)
+            return valeurs[min(len(valeurs) - 1, max(0, math.ceil(q * len(valeurs)) - 1))]
+
+        ponderees = sorted((x, 1 << niveau) for niveau, c in enumerate(self.compacteurs) for x in c)
+        cible = q * sum(poids for _, poids in ponderees)
+        cumul = 0
+        for x, poids in ponderees:
+            cumul += poids
+            if cumul >= cible:
+                return x
+        return ponderees[-1][0]
+
+
+class SketchMode:
+    """
+    Recherche des valeurs fréquentes (Misra-Gries) avec au plus 'capacite' compteurs.
+    Les effectifs sont exacts tant que le nombre de valeurs distinctes reste sous la capacité,
+    sinon ils sont sous-estimés d'au plus n / (capacite + 1).
+    """
+
+    def __init__(self, capacite: int = CAPACITE_MODE):
+        self.capacite = capacite
+        self.compteurs: Dict[Any, int] = {}
+        self.exact = True
+
+    def ajouter(self, value: Any):
+        compteurs = self.compteurs
+        try:
+            if value in compteurs:
+                compteurs[value] += 1
+                return
+        except TypeError:
+            return  # Valeur non hachable (liste...) : ignorée pour le mode
+        if len(compteurs) < self.capacite:
+            compteurs[value] = 1
+            return
+        # Tableau plein : on décrémente tous les compteurs (la nouvelle valeur est absorbée)
+        self.exact = False
+        for cle in list(compteurs):
+            if compteurs[cle] == 1:
+                del compteurs[cle]
+            else:
+                compteurs[cle] -= 1
+
+    def fusionner(self, autre: 'SketchMode'):
+        for cle, nombre in autre.compteurs.items():
+            self.compteurs[cle] = self.compteurs.get(cle, 0) + nombre
+        self.exact = self.exact and autre.exact
+        if len(self.compteurs) > self.capacite:
+            seuil = sorted(self.compteurs.values(), reverse=True)[self.capacite]
+            self.compteurs = {cle: nombre - seuil for cle, nombre in self.compteurs.items() if nombre > seuil}
+            self.exact = False
+
+    def plus_frequent(self) -> Optional[Tuple[Any, int]]:
+        """(valeur, effectif) la plus fréquente ; en cas d'égalité, la première rencontrée."""
+        if not self.compteurs:
+            return None
+        return max(self.compteurs.items(), key=lambda paire: paire[1])
+
+
+class StatistiquesColonne:
+    """Accumulateurs d'une colonne : types, statistiques numériques, quantiles et mode."""
+
+    def __init__(self, erreur_quantiles: float = ERREUR_QUANTILES, capacite_mode: int = CAPACITE_MODE):
+        self.types = Counter()
+        self.numerique = AccumulateurNumerique()
+        self.quantiles = SketchQuantiles(erreur_quantiles)
+        self.mode = SketchMode(capacite_mode)
+
+    def ajouter(self, value: Any):
+        # Enregistrement des types pour l'analyse de structure
+        self.types['None' if value is None else type(value).__name__] += 1
+        # Les booléens comptent comme numériques (isinstance(True, int))
+        if isinstance(value, (int, float)):
+            self.ajouter_numerique(float(value))
+        self.mode.ajouter(value)
+
+    def ajouter_numerique(self, x: float):
+        self.numerique.ajouter(x)
+        self.quantiles.ajouter(x)
+
+    def fusionner(self, autre: 'StatistiquesColonne'):
+        self.types.update(autre.types)
+        self.numerique.fusionner(autre.numerique)
+        self.quantiles.fusionner(autre.quantiles)
+        self.mode.fusionner(autre.mode)
+
+
+class StatistiquesDonnees:
+    """Statistiques de toutes les colonnes d'un jeu de données, d'un flux ou d'un morceau."""
+
+    def __init__(self, erreur_quantiles: float = ERREUR_QUANTILES, capacite_mode: int = CAPACITE_MODE):
+        self.erreur_quantiles = erreur_quantiles
+        self.capacite_mode = capacite_mode
+        self.colonnes: Dict[str, StatistiquesColonne] = {}
+        self.nb_enregistrements = 0
+
+    def colonne(self, cle: str) -> StatistiquesColonne:
+        if cle not in self.colonnes:
+            self.colonnes[cle] = StatistiquesColonne(self.erreur_quantiles, self.capacite_mode)
+        return self.colonnes[cle]
+
+    def ajouter_enregistrement(self, record: Dict[str, Any]):
+        self.nb_enregistrements += 1
+        for key, value in record.items():
+            self.colonne(key).ajouter(value)
+
+    def ajouter_flux(self, records: Iterable[Dict[str, Any]]) -> 'StatistiquesDonnees':
+        for record in records:
+            self.ajouter_enregistrement(record)
+        return self
+
+    def ajouter_table(self, table: TableColonnes) -> 'StatistiquesDonnees':
+        """Alimente les accumulateurs colonne par colonne (types lus depuis le bitmap)."""
+        self.nb_enregistrements += len(table)
+        for key, colonne in table.colonnes.items():
+            stats = self.colonne(key)
+            stats.types.update(colonne.compter_types())
+            for x in colonne.valeurs_numeriques():
+                stats.ajouter_numerique(x)
+            for value in colonne:
+                stats.mode.ajouter(value)
+        return self
+
+    def fusionner(self, autre: 'StatistiquesDonnees') -> 'StatistiquesDonnees':
+        self.nb_enregistrements += autre.nb_enregistrements
+        for key, stats in autre.colonnes.items():
+            self.colonne(key).fusionner(stats)
+        return self
+
+    def en_dict(self) -> Dict[str, Any]:
+        """Résumé sérialisable (JSON) : types, statistiques numériques et mode de chaque colonne."""
+        colonnes = {}
+        for key, colonne in self.colonnes.items():
+            resume: Dict[str, Any] = {'types': dict(colonne.types)}
+            numerique = colonne.numerique
+            if numerique.nb_valeurs:
+                resume.update({
+                    'min': numerique.minimum, 'max': numerique.maximum, 'moyenne': numerique.moyenne,
+                    'mediane': colonne.quantiles.quantile(0.5), 'p25': colonne.quantiles.quantile(0.25),
+                    'p75': colonne.quantiles.quantile(0.75), 'ecart_type': numerique.ecart_type(),
+                    'nb_valeurs': numerique.nb_valeurs,
+                })
+            most_common = colonne.mode.plus_frequent()
+            if most_common:
+                resume['mode'] = most_common[0] if isinstance(most_common[0], (str, int, float, bool)) \
+                    or most_common[0] is None else repr(most_common[0])
+                resume['effectif_mode'] = most_common[1]
+            colonnes[key] = resume
+        return {'nb_enregistrements': self.nb_enregistrements, 'colonnes': colonnes}
+
+
+@instrumenter('statistiques')
+def calculer_statistiques(data: Union[Donnees, Iterable[Dict[str, Any]]],
+                          erreur_quantiles: float = ERREUR_QUANTILES,
+                          capacite_mode: int = CAPACITE_MODE) -> StatistiquesDonnees:
+    """Calcule les statistiques d'une DataList, d'une TableColonnes ou d'un flux en un seul passage."""
+    stats = StatistiquesDonnees(erreur_quantiles, capacite_mode)
+    if isinstance(data, TableColonnes):
+        return stats.ajouter_table(data)
+    return stats.ajouter_flux(data)
+
+
+def _statistiques_lot(lot: DataList) -> StatistiquesDonnees:
+    """Tâche exécutée par un processus de calcul : statistiques d'un lot d'enregistrements."""
+    return calculer_statistiques(lot)
+
+
+@instrumenter('statistiques')
+def calculer_statistiques_parallele(records: Iterable[Dict[str, Any]], nb_processus: Optional[int] = None,
+                                    taille_lot: int = TAILLE_LOT) -> StatistiquesDonnees:
+    """
+    Calcule les statistiques d'un flux en répartissant des lots entre plusieurs processus,
+    puis fusionne les accumulateurs. Le nombre de lots en cours est borné (mémoire constante).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    nb_processus = nb_processus or os.cpu_count() or 1
+    resultat = StatistiquesDonnees()
+    records = iter(records)
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        en_cours = deque()
+        while True:
+            lot = list(itertools.islice(records, taille_lot))
+            if lot:
+                en_cours.append(executeur.submit(_statistiques_lot, lot))
+            if en_cours and (not lot or len(en_cours) >= 2 * nb_processus):
+                resultat.fusionner(en_cours.popleft().result())
+            if not lot and not en_cours:
+                return resultat
+
+
+def afficher_tableau_statistiques(stats: StatistiquesDonnees):
+    """Affiche les statistiques numériques puis la structure et le mode de chaque colonne."""
+    # --- PARTIE J5/J6 : STATISTIQUES NUMÉRIQUES ---
+    print("\n--- Statistiques de Tendance Centrale et de Dispersion (Numérique) ---")
+
+    colonnes_numeriques = sorted(cle for cle, c in stats.colonnes.items() if c.numerique.nb_valeurs)
+    if not colonnes_numeriques:
+        print("Aucune colonne purement numérique (int ou float) n'a été trouvée pour cette analyse.")
+    else:
+        header_num = (f"{'Colonne':<20} | {'Min':<10} | {'Max':<10} | {'Moyenne':<10} | {'Médiane':<10} | "
+                      f"{'P25':<10} | {'P75':<10} | {'Écart-type':<12} | {'Nbs Comptés':<12}")
         print("-" * len(header_num))
         print(header_num)
         print("-" * len(header_num))
 
-        for key in sorted(stats_numeriques.keys()):
-            values = stats_numeriques[key]
-            if not values: continue
+        approximation = False
+        for key in colonnes_numeriques:
+            colonne = stats.colonnes[key]
+            numerique = colonne.numerique
+            quantiles = colonne.quantiles
+            approximation = approximation or not quantiles.exact
+
+            print(
+                f"{key:<20} | {numerique.minimum:<10.2f} | {numerique.maximum:<10.2f} | {numerique.moyenne:<10.2f} | "
+                f"{quantiles.quantile(0.5):<10.2f} | {quantiles.quantile(0.25):<10.2f} | "
+                f"{quantiles.quantile(0.75):<10.2f} | {numerique.ecart_type():<12.2f} | {numerique.nb_valeurs:<12}")
+
+        print("-" * len(header_num))
+        if approximation:
+            print(f"Note : médiane et percentiles estimés (erreur de rang ~{stats.erreur_quantiles:.1%}).")
+
+    # --- PARTIE J6 : ANALYSE DE STRUCTURE ET MODE ---
+    print("\n--- Analyse de la Structure des Données et Mode (Tous Types) ---")
+
+    if not stats.colonnes:
+        print("Aucun enregistrement ou colonne trouvé pour l'analyse.")
+        return
+
+    header_types = f"{'Colonne':<20} | " + " | ".join(
+        f"{t:<6}" for t in TYPES_AFFICHES) + " | Mode (Plus Fréquent)"
+    print("-" * len(header_types))
+    print(header_types)
+    print("-" * len(header_types))
+
+    for key in sorted(stats.colonnes.keys()):
+        colonne = stats.colonnes[key]
+        output = f"{key:<20} | "
+
+        most_common = colonne.mode.plus_frequent()
+        if most_common and most_common[1] > 0:
+            mode_value, mode_count = most_common
+            # Effectif approché (borne basse) si la colonne a trop de valeurs distinctes
+            mode_count = mode_count if colonne.mode.exact else f"≥{mode_count}"
+
+            if mode_value is None:
+                mode_display = f"None ({mode_count})"
+            elif isinstance(mode_value, str) and len(mode_value) > 20:
+                mode_display = f"'{mode_value[:17]}...' ({mode_count})"
+            else:
+                mode_display = f"'{repr(mode_value)}' ({mode_count})"
+        else:
+            mode_display = "N/A"
+
+        for type_name in TYPES_AFFICHES:
+            count = colonne.types.get(type_name, 0)
+            output += f"{count:<6} | "
+
+        output += mode_display
+
+        print(output)
+
+    print("-" * len(header_types))
+
+
+def afficher_statistiques(data: Donnees):
+    """
+    (J5/J6) Calcule et affiche les statistiques (Min/Max/Moyenne/Médiane/Mode/Écart-type)
+    et la distribution des types pour chaque colonne.
+    """
+    print("\n[STATISTIQUES ET ANALYSE DE STRUCTURE] (Jour 6)")
+    if not data:
+        print("Veuillez d'abord charger les données.")
+        input("Appuyez sur Entrée pour continuer...")
+        return
+
+    # 1. Structure lue dans le catalogue : immédiate, sans parcourir les données
+    afficher_catalogue(obtenir_catalogue(data))
+    print(cache_requetes.en_texte())
+
+    # 2. Statistiques détaillées : un seul passage sur les données, mémoire bornée par colonne
+    if input("\nCalculer les statistiques détaillées (Min/Max/Médiane/Mode...) ? (O/n) : ").strip().lower() != 'n':
+        afficher_tableau_statistiques(calculer_statistiques(data))
+
+    input("Appuyez sur Entrée pour continuer...")
+
+
+def afficher_catalogue(catalogue: 'CatalogueDonnees'):
+    """Affiche la structure tenue à jour par le catalogue : types, valeurs nulles et cardinalité."""
+    print(f"\n--- Structure des Données ({catalogue.nb_lignes} enregistrement(s), "
+          f"{len(catalogue.colonnes)} colonne(s)) ---")
+    header = f"{'Colonne':<20} | " + " | ".join(f"{t:<6}" for t in TYPES_AFFICHES) + " | Distinctes"
+    print("-" * len(header))
+    print(header)
+    print("-" * len(header))
+    for nom, colonne in catalogue.colonnes.items():
+        autres = sum(nb for type_name, nb in colonne.types.items() if type_name not in TYPES_AFFICHES)
+        comptes = [autres if t == 'autres' else colonne.types.get(t, 0) for t in TYPES_AFFICHES]
+        print(f"{nom:<20} | " + " | ".join(f"{nb:<6}" for nb in comptes) + f" | {colonne.cardinalite_texte()}")
+    print("-" * len(header))
+    if not all(colonne.cardinalite_exacte for colonne in catalogue.colonnes.values()):
+        print("Note : '≤' indique une borne haute du nombre de valeurs distinctes (après filtrage).")
+
+
+# Opérateurs proposés par le sous-menu de filtrage (J7)
+OPERATEURS_FILTRE = {
+    '1': '=',
+    '2': '!=',
+    '3': '>',
+    '4': '<',
+    '5': '>=',
+    '6': '<=',
+    '7': 'contient (texte)',
+    '8': 'commence par (texte)',
+    '9': 'contient un de (texte)',
+}
+
+COMPARATEURS = {'>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+
 
-            count = len(values)
-            minimum = min(values)
-            maximum = max(values)
-            moyenne = statistics.mean(values)
-            mediane = statistics.median(values)
+# --- RECHERCHE TEXTUELLE (CASSE ET ACCENTS IGNORÉS) ---
+# Les opérateurs texte comparent des formes normalisées : casse repliée (casefold) et accents
+# retirés, pour que 'meca' trouve 'Méca' et 'ECRAN' trouve 'Écran'. 'contient un de' accepte
+# plusieurs termes séparés par '|', cherchés en un seul parcours de chaque texte (Aho-Corasick).
 
+SEPARATEUR_TERMES = '|'
+SEUIL_AHO_CORASICK = 16  # En dessous, quelques tests 'terme in texte' (natifs) sont plus rapides
+_LIGATURES = str.maketrans({'œ': 'oe', 'æ': 'ae'})
+
+
+@functools.lru_cache(maxsize=65536)
+def _normaliser_non_ascii(texte: str) -> str:
+    import unicodedata
+    decompose = unicodedata.normalize('NFKD', texte)
+    return ''.join(c for c in decompose if not unicodedata.combining(c)).casefold().translate(_LIGATURES)
+
+
+def normaliser_texte(texte: str) -> str:
+    """Forme de comparaison d'un texte : casse repliée et accents retirés ('Écran' -> 'ecran')."""
+    # Pour un texte ASCII, casefold() équivaut à lower() (plus rapide) et il n'y a aucun accent
+    return texte.lower() if texte.isascii() else _normaliser_non_ascii(texte)
+
+
+def decouper_termes(valeur_cible_str: str) -> List[str]:
+    """Termes normalisés d'une recherche multiple 'terme1|terme2|...' (termes vides ignorés)."""
+    termes = [normaliser_texte(terme.strip()) for terme in valeur_cible_str.split(SEPARATEUR_TERMES)]
+    return list(dict.fromkeys(terme for terme in termes if terme))
+
+
+def invite_valeur_cible(operateur: str) -> str:
+    """Message de saisie de la valeur cible d'un opérateur de filtre."""
+    if operateur == 'contient un de (texte)':
+        return f"Entrez les termes recherchés, séparés par '{SEPARATEUR_TERMES}' (ex. souris{SEPARATEUR_TERMES}clavier) : "
+    return f"Entrez la valeur cible pour l'opération '{operateur}' : "
+
+
+class AutomateMotifs:
+    """
+    Automate d'Aho-Corasick : trouve en un seul parcours d'un texte lesquels de nombreux
+    motifs y apparaissent (coût proportionnel à la longueur du texte, pas au nombre de motifs).
+    """
+
+    def __init__(self, motifs: List[str]):
+        self.motifs = motifs
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.sorties: List[frozenset] = [frozenset()]
+        sorties: List[set] = [set()]
+        for numero, motif in enumerate(motifs):
+            etat = 0
+            for caractere in motif:
+                suivant = self.transitions[etat].get(caractere)
+                if suivant is None:
+                    suivant = self.transitions[etat][caractere] = len(self.transitions)
+                    self.transitions.append({})
+                    sorties.append(set())
+                etat = suivant
+            sorties[etat].add(numero)
+
+        # Liens d'échec calculés en largeur ; les sorties héritent de celles de leur lien
+        self.echecs = [0] * len(self.transitions)
+        file = deque(self.transitions[0].values())
+        while file:
+            etat = file.popleft()
+            for caractere, suivant in self.transitions[etat].items():
+                file.append(suivant)
+                echec = self.echecs[etat]
+                while echec and caractere not in self.transitions[echec]:
+                    echec = self.echecs[echec]
+                cible = self.transitions[echec].get(caractere, 0)
+                self.echecs[suivant] = cible if cible != suivant else 0
+                sorties[suivant] |= sorties[self.echecs[suivant]]
+        self.sorties = [frozenset(sortie) for sortie in sorties]
+
+    def trouver(self, texte: str) -> set:
+        """Numéros des motifs présents dans 'texte'."""
+        transitions, echecs, sorties = self.transitions, self.echecs, self.sorties
+        trouves = set()
+        etat = 0
+        for caractere in texte:
+            while etat and caractere not in transitions[etat]:
+                etat = echecs[etat]
+            etat = transitions[etat].get(caractere, 0)
+            if sorties[etat]:
+                trouves |= sorties[etat]
+        return trouves
+
+    def present(self, texte: str) -> bool:
+        """Vrai dès qu'un des motifs apparaît dans 'texte'."""
+        transitions, echecs, sorties = self.transitions, self.echecs, self.sorties
+        etat = 0
+        for caractere in texte:
+            while etat and caractere not in transitions[etat]:
+                etat = echecs[etat]
+            etat = transitions[etat].get(caractere, 0)
+            if sorties[etat]:
+                return True
+        return False
+
+
+def chercheur_termes(termes: List[str]) -> Callable[[str], bool]:
+    """Test 'un des termes apparaît dans le texte normalisé' : Aho-Corasick si les termes sont nombreux."""
+    if not termes:
+        return lambda texte: False
+    if len(termes) >= SEUIL_AHO_CORASICK:
+        return AutomateMotifs(termes).present
+    if len(termes) == 1:
+        terme = termes[0]
+        return lambda texte: terme in texte
+    return lambda texte: any(terme in texte for terme in termes)
+
+
+def construire_test(operateur: str, valeur_cible_str: str) -> Callable[[Any], bool]:
+    """
+    Prépare une seule fois la fonction de test d'une valeur pour un critère de filtrage.
+    La conversion de la valeur cible et le choix de l'opérateur sont faits ici,
+    et non plus à chaque ligne parcourue.
+    """
+    valeur_cible = convertir_type(valeur_cible_str)
+
+    if operateur == '=':
+        return lambda valeur_item: valeur_item == valeur_cible
+
+    if operateur == '!=':
+        return lambda valeur_item: valeur_item != valeur_cible
+
+    if operateur in COMPARATEURS:
+        if not isinstance(valeur_cible, (int, float)):
+            # Comparaison numérique impossible : aucune ligne ne correspond
+            return lambda valeur_item: False
+        comparer = COMPARATEURS[operateur]
+        return lambda valeur_item: isinstance(valeur_item, (int, float)) and comparer(valeur_item, valeur_cible)
+
+    # Texte : comparaison des formes normalisées (casse et accents ignorés)
+    cible_normalisee = normaliser_texte(valeur_cible_str)
+
+    if operateur == 'contient (texte)':
+        return lambda valeur_item: isinstance(valeur_item, str) and cible_normalisee in normaliser_texte(valeur_item)
+
+    if operateur == 'commence par (texte)':
+        return lambda valeur_item: (isinstance(valeur_item, str)
+                                    and normaliser_texte(valeur_item).startswith(cible_normalisee))
+
+    if operateur == 'contient un de (texte)':
+        present = chercheur_termes(decouper_termes(valeur_cible_str))
+        return lambda valeur_item: isinstance(valeur_item, str) and present(normaliser_texte(valeur_item))
+
+    raise ValueError(f"Opérateur de filtrage inconnu : '{operateur}'.")
+
+
+def construire_predicat(cle: str, operateur: str, valeur_cible_str: str) -> Callable[[Dict[str, Any]], bool]:
+    """Prépare la fonction de test d'un enregistrement complet (voir construire_test)."""
+    test = construire_test(operateur, valeur_cible_str)
+    return lambda item: test(item.get(cle))
+
+
+# --- INDEX SECONDAIRES (HACHAGE ET TRIÉ) ---
+# Un index est construit à la première recherche sur une colonne puis réutilisé tant que
+# le jeu de données ne change pas. Les résultats sont des positions de lignes triées
+# (ordre d'origine conservé) et respectent exactement la sémantique de construire_test.
+
+class IndexHachage:
+    """Index valeur -> positions, pour les opérateurs '=' et '!='."""
+
+    def __init__(self, valeurs: Iterable[Any]):
+        self.positions: Dict[Any, List[int]] = {}
+        self.nb_lignes = 0
+        for i, value in enumerate(valeurs):
+            self.nb_lignes = i + 1
             try:
-                ecart_type = statistics.stdev(values)
-            except statistics.StatisticsError:
-                ecart_type = float('nan')
+                self.positions.setdefault(value, []).append(i)
+            except TypeError:
+                pass  # Valeur non hachable (liste) : jamais égale à une valeur cible convertie
+
+    def egal(self, cible: Any) -> List[int]:
+        try:
+            return self.positions.get(cible, [])
+        except TypeError:
+            return []
+
+    def different(self, cible: Any) -> List[int]:
+        egaux = set(self.egal(cible))
+        return [i for i in range(self.nb_lignes) if i not in egaux]
+
+
+class IndexTrie:
+    """Index trié interrogé par dichotomie (bisect) : recherches en O(log n + k)."""
+
+    def __init__(self, cles_positions: Iterable[Tuple[Any, int]]):
+        paires = sorted(cles_positions)
+        self.cles = [cle for cle, _ in paires]
+        self.positions = array('q', [position for _, position in paires])
+
+    def _tranche(self, debut: int, fin: int) -> List[int]:
+        return sorted(self.positions[debut:fin])
+
+    def superieur(self, cible: Any, inclus: bool) -> List[int]:
+        debut = (bisect.bisect_left if inclus else bisect.bisect_right)(self.cles, cible)
+        return self._tranche(debut, len(self.cles))
+
+    def inferieur(self, cible: Any, inclus: bool) -> List[int]:
+        fin = (bisect.bisect_right if inclus else bisect.bisect_left)(self.cles, cible)
+        return self._tranche(0, fin)
+
+    def prefixe(self, prefixe: str) -> List[int]:
+        """Positions des clés commençant par 'prefixe' : l'intervalle [prefixe, prefixe suivant[."""
+        debut = bisect.bisect_left(self.cles, prefixe)
+        if not prefixe:
+            return self._tranche(debut, len(self.cles))
+        dernier = ord(prefixe[-1])
+        if dernier >= sys.maxunicode:
+            fin = len(self.cles)
+            while fin > debut and not self.cles[fin - 1].startswith(prefixe):
+                fin -= 1
+        else:
+            fin = bisect.bisect_left(self.cles, prefixe[:-1] + chr(dernier + 1))
+        return self._tranche(debut, fin)
+
+
+class IndexTexte:
+    """
+    Index de recherche textuelle d'une colonne, bâti sur ses textes normalisés distincts :
+    - colonne normalisée encodée (numéro du texte distinct de chaque ligne, -1 hors chaîne) ;
+    - positions des lignes de chaque texte distinct, contiguës (tableau + débuts) ;
+    - listes de trigrammes : trigramme -> numéros des textes qui le contiennent ('contient') ;
+    - index trié des textes distincts, interrogé par dichotomie ('commence par').
+    Une recherche ne teste que les textes distincts candidats, puis rassemble leurs lignes.
+    """
+
+    def __init__(self, valeurs: Iterable[Any]):
+        numeros: Dict[str, int] = {}
+        numeros_bruts: Dict[str, int] = {}  # Valeur brute -> numéro : chaque valeur n'est normalisée qu'une fois
+        self.textes: List[str] = []
+        self.lignes = array('l')  # Colonne normalisée encodée
+        ajouter = self.lignes.append
+        for value in valeurs:
+            if not isinstance(value, str):
+                ajouter(-1)
+                continue
+            numero = numeros_bruts.get(value)
+            if numero is None:
+                texte = normaliser_texte(value)
+                numero = numeros.get(texte)
+                if numero is None:
+                    numero = numeros[texte] = len(self.textes)
+                    self.textes.append(texte)
+                numeros_bruts[value] = numero
+            ajouter(numero)
+
+        # Positions regroupées par texte distinct (tri par comptage, ordre des lignes conservé)
+        effectifs = [0] * (len(self.textes) + 1)
+        for numero in self.lignes:
+            effectifs[numero + 1] += 1
+        self.debuts = array('q', itertools.accumulate(effectifs[1:], initial=0))
+        curseurs = list(self.debuts)
+        self.positions = array('q', bytes(8 * curseurs[-1]))
+        for i, numero in enumerate(self.lignes):
+            if numero >= 0:
+                self.positions[curseurs[numero]] = i
+                curseurs[numero] += 1
+
+        trigrammes: Dict[str, array] = {}
+        for numero, texte in enumerate(self.textes):
+            for trigramme in {texte[j:j + 3] for j in range(len(texte) - 2)}:
+                liste = trigrammes.get(trigramme)
+                if liste is None:
+                    liste = trigrammes[trigramme] = array('l')
+                liste.append(numero)
+        self.trigrammes = trigrammes
+        self.tri = IndexTrie((texte, numero) for numero, texte in enumerate(self.textes))
+
+    def _lignes_de(self, numeros: Iterable[int]) -> List[int]:
+        """Positions (triées) des lignes dont le texte est l'un de 'numeros'."""
+        debuts, positions = self.debuts, self.positions
+        return sorted(itertools.chain.from_iterable(
+            positions[debuts[numero]:debuts[numero + 1]] for numero in numeros))
+
+    def _candidats(self, motif: str) -> Iterable[int]:
+        """Textes distincts pouvant contenir 'motif' : ceux qui ont tous ses trigrammes."""
+        if len(motif) < 3:
+            return range(len(self.textes))
+        listes = []
+        for trigramme in {motif[j:j + 3] for j in range(len(motif) - 2)}:
+            liste = self.trigrammes.get(trigramme)
+            if liste is None:
+                return ()
+            listes.append(liste)
+        listes.sort(key=len)
+        candidats = set(listes[0])
+        for liste in listes[1:]:
+            candidats.intersection_update(liste)
+            if not candidats:
+                break
+        return candidats
+
+    def contient(self, motif: str) -> List[int]:
+        motif = normaliser_texte(motif)
+        textes = self.textes
+        return self._lignes_de(numero for numero in self._candidats(motif) if motif in textes[numero])
+
+    def commence_par(self, prefixe: str) -> List[int]:
+        return self._lignes_de(self.tri.prefixe(normaliser_texte(prefixe)))
+
+    def contient_un_de(self, termes: List[str]) -> List[int]:
+        """Lignes contenant au moins un des termes (normalisés, voir decouper_termes)."""
+        if not termes:
+            return []
+        if all(len(terme) >= 3 for terme in termes):
+            candidats = set().union(*(self._candidats(terme) for terme in termes))
+        else:
+            candidats = range(len(self.textes))
+        present = chercheur_termes(termes)
+        textes = self.textes
+        return self._lignes_de(numero for numero in candidats if present(textes[numero]))
+
+
+class IndexDonnees:
+    """Ensemble des index d'un jeu de données (un de chaque sorte par colonne, construits à la demande)."""
+
+    def __init__(self, data: 'Donnees'):
+        self.data = data
+        self.nb_lignes = len(data)
+        self.hachage: Dict[str, IndexHachage] = {}
+        self.tries_numeriques: Dict[str, IndexTrie] = {}
+        self.textes: Dict[str, IndexTexte] = {}
+
+    def _valeurs(self, cle: str) -> Iterable[Any]:
+        return valeurs_colonne(self.data, cle)
+
+    def index_hachage(self, cle: str) -> IndexHachage:
+        if cle not in self.hachage:
+            self.hachage[cle] = IndexHachage(self._valeurs(cle))
+        return self.hachage[cle]
+
+    def index_numerique(self, cle: str) -> IndexTrie:
+        if cle not in self.tries_numeriques:
+            # Mêmes valeurs que le filtre par balayage : int, float (et bool), hors NaN
+            self.tries_numeriques[cle] = IndexTrie(
+                (value, i) for i, value in enumerate(self._valeurs(cle))
+                if isinstance(value, (int, float)) and value == value)
+        return self.tries_numeriques[cle]
+
+    def index_texte(self, cle: str) -> IndexTexte:
+        if cle not in self.textes:
+            self.textes[cle] = IndexTexte(self._valeurs(cle))
+        return self.textes[cle]
+
+    def rechercher(self, cle: str, operateur: str, valeur_cible_str: str) -> Optional[List[int]]:
+        """
+        Positions (triées) des lignes satisfaisant le critère, ou None si aucun index
+        ne peut servir cet opérateur.
+        """
+        valeur_cible = convertir_type(valeur_cible_str)
+        if operateur == '=':
+            return self.index_hachage(cle).egal(valeur_cible)
+        if operateur == '!=':
+            return self.index_hachage(cle).different(valeur_cible)
+        if operateur in COMPARATEURS:
+            if not isinstance(valeur_cible, (int, float)):
+                return []
+            index = self.index_numerique(cle)
+            if operateur in ('>', '>='):
+                return index.superieur(valeur_cible, inclus=(operateur == '>='))
+            return index.inferieur(valeur_cible, inclus=(operateur == '<='))
+        if operateur == 'commence par (texte)':
+            return self.index_texte(cle).commence_par(valeur_cible_str)
+        if operateur == 'contient (texte)':
+            return self.index_texte(cle).contient(valeur_cible_str)
+        if operateur == 'contient un de (texte)':
+            return self.index_texte(cle).contient_un_de(decouper_termes(valeur_cible_str))
+        return None
+
+
+_index_datalist: Optional[IndexDonnees] = None
+
+
+def obtenir_index(data: 'Donnees') -> IndexDonnees:
+    """
+    Retourne les index du jeu de données, en les recréant s'il a changé.
+    Une TableColonnes porte ses propres index ; pour une DataList, seuls ceux
+    de la dernière liste interrogée sont conservés (même objet et même taille).
+    """
+    global _index_datalist
+    if isinstance(data, TableColonnes):
+        if data.index is None:
+            data.index = IndexDonnees(data)
+        return data.index
+
+    if _index_datalist is None or _index_datalist.data is not data or _index_datalist.nb_lignes != len(data):
+        _index_datalist = IndexDonnees(data)
+    return _index_datalist
+
+
+def invalider_index(data: 'Donnees'):
+    """À appeler après une modification en place des données (ex. édition de champs)."""
+    global _index_datalist
+    if isinstance(data, TableColonnes):
+        data.index = None
+    elif _index_datalist is not None and _index_datalist.data is data:
+        _index_datalist = None
+
+
+def selection_lignes(data: 'Donnees', positions: Iterable[int]) -> 'Donnees':
+    """Extrait les lignes aux positions données, dans la même représentation que 'data'."""
+    if isinstance(data, TableColonnes):
+        return data.selection(positions)
+    return [data[i] for i in positions]
+
+
+# --- CATALOGUE DU JEU DE DONNÉES (SCHÉMA) ---
+# Le catalogue résume la structure des données : ordre des colonnes et, par colonne, la
+# distribution des types (dont les valeurs nulles) et le nombre de valeurs distinctes.
+# Il est calculé une fois au chargement, puis dérivé à chaque opération sans nouveau parcours
+# complet : un tri (permutation) le conserve tel quel, un filtre ne relit que la plus petite
+# des deux parties (lignes gardées ou lignes retirées), une modification de champs ne relit
+# que les colonnes touchées. Les en-têtes et l'analyse de structure sont alors immédiats.
+# Les catalogues sont immuables : chaque état de l'historique garde le sien.
+
+
+class CatalogueColonne:
+    """
+    Résumé d'une colonne : types des valeurs (un champ absent compte comme None, comme dans
+    une TableColonnes) et nombre de valeurs distinctes non nulles. Après un filtre ou un
+    ajout, la cardinalité n'est plus qu'une borne haute (cardinalite_exacte à False).
+    """
+
+    __slots__ = ('types', 'cardinalite', 'cardinalite_exacte')
+
+    def __init__(self, types: Counter, cardinalite: int, cardinalite_exacte: bool = True):
+        self.types = types
+        self.cardinalite = cardinalite
+        self.cardinalite_exacte = cardinalite_exacte
+
+    @classmethod
+    def depuis_valeurs(cls, valeurs: Iterable[Any]) -> 'CatalogueColonne':
+        valeurs = valeurs if isinstance(valeurs, (list, Colonne)) else list(valeurs)
+        if isinstance(valeurs, Colonne):
+            types = valeurs.compter_types()
+        else:
+            types = Counter({classe.__name__: nb for classe, nb in Counter(map(type, valeurs)).items()})
+            types['None'] = types.pop('NoneType', 0)
+            if not types['None']:
+                del types['None']
+        try:
+            distinctes = set(valeurs)
+        except TypeError:  # Valeurs non hachables (listes, dictionnaires)
+            distinctes = set(map(repr, valeurs))
+            distinctes.discard('None')
+        distinctes.discard(None)
+        return cls(types, len(distinctes))
+
+    @property
+    def nb_nulls(self) -> int:
+        return self.types.get('None', 0)
+
+    def cardinalite_texte(self) -> str:
+        return str(self.cardinalite) if self.cardinalite_exacte else f"≤{self.cardinalite}"
+
+
+class CatalogueDonnees:
+    """Catalogue d'un jeu de données : nombre de lignes et CatalogueColonne par colonne, dans l'ordre."""
+
+    __slots__ = ('nb_lignes', 'colonnes')
+
+    def __init__(self, nb_lignes: int, colonnes: Dict[str, CatalogueColonne]):
+        self.nb_lignes = nb_lignes
+        self.colonnes = colonnes
+
+    @classmethod
+    def depuis_donnees(cls, data: Donnees, lignes: Optional[List[int]] = None,
+                       noms: Optional[List[str]] = None) -> 'CatalogueDonnees':
+        """Catalogue complet de 'data' (ou des seules lignes aux positions 'lignes')."""
+        if noms is None:
+            noms = _entetes_parcours(data)
+        colonnes = {}
+        for nom in noms:
+            if lignes is None and isinstance(data, TableColonnes):
+                valeurs = data.colonne(nom)
+            else:
+                valeurs = list(valeurs_colonne(data, nom, lignes))
+            colonnes[nom] = CatalogueColonne.depuis_valeurs(valeurs)
+        return cls(len(data) if lignes is None else len(lignes), colonnes)
+
+    def noms_colonnes(self) -> List[str]:
+        return list(self.colonnes)
+
+    def apres_selection(self, data: Donnees, positions: List[int]) -> 'CatalogueDonnees':
+        """
+        Catalogue des lignes de 'data' aux 'positions' (filtre ou tri), 'self' décrivant 'data'.
+        Seule la plus petite partie est relue : les lignes gardées, ou les lignes retirées
+        dont les types sont alors soustraits.
+        """
+        nb_gardees = len(positions)
+        if nb_gardees == self.nb_lignes:
+            return self  # Permutation (tri) : mêmes lignes, même catalogue
+        if nb_gardees <= self.nb_lignes // 2:
+            catalogue = CatalogueDonnees.depuis_donnees(data, positions, self.noms_colonnes())
+        else:
+            catalogue = self._soustraire_lignes(data, positions)
+        if not isinstance(data, TableColonnes):
+            # Dans une DataList, une colonne sans valeur dans les lignes gardées peut en être absente
+            for nom, colonne in list(catalogue.colonnes.items()):
+                if colonne.nb_nulls == nb_gardees and not any(nom in data[i] for i in positions):
+                    del catalogue.colonnes[nom]
+        return catalogue
+
+    def _soustraire_lignes(self, data: Donnees, positions: List[int]) -> 'CatalogueDonnees':
+        """Catalogue des lignes gardées, obtenu en soustrayant les types des lignes retirées."""
+        nb_gardees = len(positions)
+        gardees = bytearray(self.nb_lignes)
+        for i in positions:
+            gardees[i] = 1
+        retirees = list(itertools.compress(range(self.nb_lignes), map(operator.not_, gardees)))
+        partie_retiree = CatalogueDonnees.depuis_donnees(data, retirees, self.noms_colonnes())
+        colonnes = {}
+        for nom, colonne in self.colonnes.items():
+            types = colonne.types - partie_retiree.colonnes[nom].types
+            nb_non_nulls = sum(types.values()) - types.get('None', 0)
+            cardinalite = min(colonne.cardinalite, nb_non_nulls)
+            colonnes[nom] = CatalogueColonne(types, cardinalite, colonne.cardinalite_exacte and cardinalite == 0)
+        return CatalogueDonnees(nb_gardees, colonnes)
+
+    def apres_modification(self, nouvelles: Dict[str, Optional[Iterable[Any]]]) -> 'CatalogueDonnees':
+        """Catalogue après une modification de champs (valeurs d'une colonne, ou None pour la retirer)."""
+        colonnes = dict(self.colonnes)
+        for nom, valeurs in nouvelles.items():
+            if valeurs is None:
+                colonnes.pop(nom, None)
+            else:
+                colonnes[nom] = CatalogueColonne.depuis_valeurs(valeurs)
+        return CatalogueDonnees(self.nb_lignes, colonnes)
+
+    def apres_renommage(self, renommage: Dict[str, str]) -> 'CatalogueDonnees':
+        """Catalogue après un renommage de colonnes {ancien: nouveau} (ordre conservé)."""
+        return CatalogueDonnees(self.nb_lignes, {renommage.get(nom, nom): colonne
+                                                 for nom, colonne in self.colonnes.items()})
+
+    def fusionner(self, autre: 'CatalogueDonnees') -> 'CatalogueDonnees':
+        """
+        Catalogue de la concaténation de deux jeux de données (ajout de lignes). Une colonne
+        absente d'une partie y compte comme None ; la cardinalité devient une borne haute.
+        """
+        colonnes = {}
+        for nom in itertools.chain(self.colonnes, (nom for nom in autre.colonnes if nom not in self.colonnes)):
+            parties = [(catalogue.colonnes.get(nom), catalogue.nb_lignes) for catalogue in (self, autre)]
+            types = Counter()
+            cardinalites = []
+            for colonne, nb_lignes in parties:
+                if colonne is None:
+                    types['None'] += nb_lignes
+                else:
+                    types.update(colonne.types)
+                    cardinalites.append(colonne.cardinalite)
+            exacte = len(cardinalites) == 1 and all(c is None or c.cardinalite_exacte for c, _ in parties)
+            colonnes[nom] = CatalogueColonne(+types, sum(cardinalites), exacte)
+        return CatalogueDonnees(self.nb_lignes + autre.nb_lignes, colonnes)
+
+
+def _entetes_parcours(data: Donnees) -> List[str]:
+    """
+    En-têtes par parcours complet : clés de la première ligne, puis les autres clés
+    rencontrées, triées (une TableColonnes connaît directement ses colonnes).
+    """
+    if isinstance(data, TableColonnes):
+        return data.noms_colonnes()
+
+    headers = set()
+    for row in data:
+        headers.update(row.keys())
+
+    if data:
+        ordered_headers = list(data[0].keys())
+        for h in sorted(list(headers - set(ordered_headers))):
+            ordered_headers.append(h)
+        return ordered_headers
+
+    return list(sorted(list(headers)))
+
+
+# Catalogue du dernier jeu de données manipulé (comme _index_datalist, un seul est conservé)
+_catalogue_courant: Optional[Tuple[Donnees, CatalogueDonnees]] = None
+
+
+def associer_catalogue(data: Donnees, catalogue: Optional[CatalogueDonnees]):
+    """Mémorise le catalogue (déjà calculé) du jeu de données 'data'."""
+    global _catalogue_courant
+    _catalogue_courant = (data, catalogue) if catalogue is not None else None
+
+
+def catalogue_connu(data: Donnees) -> Optional[CatalogueDonnees]:
+    """Catalogue déjà calculé pour 'data' (même objet et même taille), sinon None."""
+    if _catalogue_courant is not None:
+        donnees, catalogue = _catalogue_courant
+        if donnees is data and catalogue.nb_lignes == len(data):
+            return catalogue
+    return None
+
+
+def obtenir_catalogue(data: Donnees) -> CatalogueDonnees:
+    """Catalogue de 'data', calculé (un parcours complet) s'il n'est pas déjà connu."""
+    catalogue = catalogue_connu(data)
+    if catalogue is None:
+        catalogue = CatalogueDonnees.depuis_donnees(data)
+        associer_catalogue(data, catalogue)
+    return catalogue
+
+
+def invalider_catalogue(data: Donnees):
+    """À appeler après une modification en place des données qui ne passe pas par l'historique."""
+    global _catalogue_courant
+    if _catalogue_courant is not None and _catalogue_courant[0] is data:
+        _catalogue_courant = None
+
+
+# --- HISTORIQUE (UNDO/REDO) PAR INSTANTANÉS LÉGERS ---
+# Aucun état n'est copié : l'historique garde le jeu de données de base et, pour chaque état,
+# le vecteur des positions de ses lignes dans la base (sous-ensemble après un filtre,
+# permutation après un tri, composés au fil des opérations). Une modification de champs est
+# appliquée à la base et mémorisée par un delta de colonnes, rejoué dans un sens ou dans l'autre.
+# Annuler ou rétablir ne coûte que la reconstruction des k lignes de l'état visé.
+
+BUDGET_HISTORIQUE = 256 * 1024 * 1024  # Au-delà, les états les plus anciens sont oubliés
+_compteur_versions = itertools.count(1)  # Numéros de version des états (jamais réutilisés)
+
+
+def _vecteur_positions(positions: Iterable[int], nb_lignes_base: int) -> array:
+    """Vecteur de positions compact (4 octets par ligne si la base le permet)."""
+    return array('i' if nb_lignes_base < 2 ** 31 else 'q', positions)
+
+
+class DeltaColonnes:
+    """
+    Modification de champs réversible.
+    DataList : positions (dans la base) des lignes touchées et, par colonne, leurs valeurs avant
+    et après (_ABSENT si le champ n'existe pas, None au lieu d'une liste si toutes sont absentes).
+    TableColonnes : objets Colonne avant et après (None si la colonne n'existe pas) et ordre des colonnes.
+    """
+
+    def __init__(self, positions: Optional[array], avant: Dict[str, Any], apres: Dict[str, Any],
+                 ordre_avant: Optional[List[str]] = None, ordre_apres: Optional[List[str]] = None):
+        self.positions = positions
+        self.avant = avant
+        self.apres = apres
+        self.ordre_avant = ordre_avant
+        self.ordre_apres = ordre_apres
+
+    def appliquer(self, base: Donnees, annuler: bool = False):
+        """Applique la modification à la base (ou la défait si 'annuler')."""
+        valeurs_colonnes = self.avant if annuler else self.apres
+        if isinstance(base, TableColonnes):
+            colonnes = {**base.colonnes, **valeurs_colonnes}
+            ordre = self.ordre_avant if annuler else self.ordre_apres
+            base.colonnes = {nom: colonnes[nom] for nom in ordre if colonnes.get(nom) is not None}
+        else:
+            lignes = base if self.positions is None else [base[i] for i in self.positions]
+            for nom, valeurs in valeurs_colonnes.items():
+                if valeurs is None:
+                    for row in lignes:
+                        row.pop(nom, None)
+                    continue
+                for row, value in zip(lignes, valeurs):
+                    if value is _ABSENT:
+                        row.pop(nom, None)
+                    else:
+                        row[nom] = value
+        invalider_index(base)
+
+    def taille_memoire(self) -> int:
+        """Estimation de la mémoire retenue par le delta (en octets)."""
+        total = 0  # Les positions sont celles de l'état, déjà comptées par celui-ci
+        comptees = set()  # Un renommage référence la même colonne avant et après
+        for cote in (self.avant, self.apres):
+            for valeurs in cote.values():
+                if valeurs is None or id(valeurs) in comptees:
+                    continue
+                comptees.add(id(valeurs))
+                total += valeurs.taille_memoire() if isinstance(valeurs, Colonne) else sys.getsizeof(valeurs)
+        return total
+
+
+class EtatHistorique:
+    """Un état de l'historique : positions de ses lignes dans la base (None = toutes, dans l'ordre)."""
+
+    __slots__ = ('description', 'lignes', 'delta', 'catalogue', 'version')
+
+    def __init__(self, description: str, lignes: Optional[array] = None, delta: Optional[DeltaColonnes] = None,
+                 catalogue: Optional[CatalogueDonnees] = None):
+        self.description = description
+        self.lignes = lignes
+        self.delta = delta  # Modification de champs qui a mené à cet état
+        self.catalogue = catalogue  # Schéma de l'état (None s'il n'a pas été calculé)
+        self.version = next(_compteur_versions)  # Identifie le contenu de l'état (cache des requêtes)
+
+    def taille_memoire(self) -> int:
+        total = sys.getsizeof(self.lignes) if self.lignes is not None else 0
+        return total + (self.delta.taille_memoire() if self.delta is not None else 0)  # Catalogue négligeable
+
+
+class HistoriqueDonnees:
+    """
+    Historique Undo/Redo linéaire (voir l'en-tête de section).
+    'donnees' est la matérialisation de l'état courant : si les données manipulées ne sont
+    plus cet objet (nouveau chargement, conversion...), l'historique repart de celles-ci.
+    """
+
+    def __init__(self, budget: int = BUDGET_HISTORIQUE):
+        self.budget = budget
+        self.base: Donnees = []
+        self.donnees: Donnees = []
+        self.etats: List[EtatHistorique] = [EtatHistorique("État initial")]
+        self.position = 0
+
+    def reinitialiser(self, data: Donnees, description: str = "État initial"):
+        """Repart de 'data' comme nouvelle base, sans aucun état à annuler."""
+        self.base = data
+        self.donnees = data
+        self.etats = [EtatHistorique(description, catalogue=catalogue_connu(data))]
+        self.position = 0
+        cache_requetes.vider()  # Les résultats portaient sur l'ancienne base
+
+    def _synchroniser(self, data: Donnees):
+        if data is not self.donnees:
+            self.reinitialiser(data)
+
+    def _materialiser(self) -> Donnees:
+        etat = self.etats[self.position]
+        self.donnees = self.base if etat.lignes is None else selection_lignes(self.base, etat.lignes)
+        associer_catalogue(self.donnees, etat.catalogue)
+        return self.donnees
+
+    def _ajouter_etat(self, etat: EtatHistorique) -> Donnees:
+        """Ajoute un état après l'état courant (les états rétablissables sont oubliés)."""
+        del self.etats[self.position + 1:]
+        self.etats.append(etat)
+        self.position += 1
+        self.evincer()
+        return self._materialiser()
+
+    def evincer(self):
+        """Oublie les états les plus anciens tant que le budget mémoire est dépassé."""
+        total = self.taille_memoire()
+        while total > self.budget and self.position > 0:
+            total -= self.etats.pop(0).taille_memoire()
+            self.position -= 1
+
+    def enregistrer_selection(self, data: Donnees, positions: Iterable[int], description: str) -> Donnees:
+        """
+        Enregistre un filtre ou un tri : 'positions' désigne les lignes retenues de 'data',
+        dans leur nouvel ordre. Retourne les données du nouvel état.
+        """
+        self._synchroniser(data)
+        positions = positions if isinstance(positions, (list, array, range)) else list(positions)
+        catalogue = catalogue_connu(data)
+        if catalogue is not None:
+            catalogue = catalogue.apres_selection(data, positions)
+        lignes = self.etats[self.position].lignes
+        if lignes is not None:
+            positions = map(lignes.__getitem__, positions)
+        return self._ajouter_etat(EtatHistorique(description, _vecteur_positions(positions, len(self.base)),
+                                                 catalogue=catalogue))
+
+    def modifier_colonnes(self, data: Donnees, nouvelles: Dict[str, Optional[List[Any]]], description: str) -> Donnees:
+        """
+        Enregistre et applique une modification de champs : pour chaque colonne, la liste de ses
+        nouvelles valeurs (alignée sur les lignes de 'data') ou None pour la retirer.
+        Les lignes de la base hors de l'état courant gardent leurs valeurs (None pour une nouvelle colonne).
+        """
+        self._synchroniser(data)
+        base = self.base
+        lignes = self.etats[self.position].lignes
+        catalogue = catalogue_connu(data)
+        if catalogue is not None:
+            catalogue = catalogue.apres_modification(nouvelles)
+
+        if isinstance(base, TableColonnes):
+            avant, apres = {}, {}
+            for nom, valeurs in nouvelles.items():
+                ancienne = base.colonnes.get(nom)
+                avant[nom] = ancienne
+                if valeurs is None:
+                    apres[nom] = None
+                elif lignes is None:
+                    apres[nom] = Colonne.depuis_valeurs(valeurs)
+                else:
+                    completes = list(ancienne) if ancienne is not None else [None] * len(base)
+                    for i, value in zip(lignes, valeurs):
+                        completes[i] = value
+                    apres[nom] = Colonne.depuis_valeurs(completes)
+            ordre_avant = base.noms_colonnes()
+            ordre_apres = ordre_avant + [nom for nom in nouvelles if nom not in base.colonnes]
+            delta = DeltaColonnes(None, avant, apres, ordre_avant, ordre_apres)
+        else:
+            avant = {nom: [row.get(nom, _ABSENT) for row in data] for nom in nouvelles}
+            delta = DeltaColonnes(lignes, avant, dict(nouvelles))
+
+        delta.appliquer(base)
+        return self._ajouter_etat(EtatHistorique(description, lignes, delta, catalogue))
+
+    def renommer_colonnes(self, data: Donnees, renommage: Dict[str, str], description: str) -> Donnees:
+        """
+        Enregistre et applique un renommage {ancien: nouveau}. Une TableColonnes change seulement
+        le nom de ses colonnes (aucune valeur copiée) ; une DataList déplace la clé dans chaque ligne.
+        """
+        self._synchroniser(data)
+        base = self.base
+        lignes = self.etats[self.position].lignes
+        catalogue = catalogue_connu(data)
+        if catalogue is not None:
+            catalogue = catalogue.apres_renommage(renommage)
+
+        avant: Dict[str, Any] = {}
+        apres: Dict[str, Any] = {}
+        for ancien, nouveau in renommage.items():
+            valeurs = base.colonnes.get(ancien) if isinstance(base, TableColonnes) \
+                else [row.get(ancien, _ABSENT) for row in data]
+            avant[ancien], avant[nouveau] = valeurs, None
+            apres[nouveau], apres[ancien] = valeurs, None
+        if isinstance(base, TableColonnes):
+            ordre_avant = base.noms_colonnes()
+            delta = DeltaColonnes(None, avant, apres, ordre_avant, [renommage.get(nom, nom) for nom in ordre_avant])
+        else:
+            delta = DeltaColonnes(lignes, avant, apres)
+
+        delta.appliquer(base)
+        return self._ajouter_etat(EtatHistorique(description, lignes, delta, catalogue))
+
+    def peut_annuler(self) -> bool:
+        return self.position > 0
+
+    def peut_retablir(self) -> bool:
+        return self.position < len(self.etats) - 1
+
+    def annuler(self) -> Donnees:
+        """Revient à l'état précédent."""
+        if self.peut_annuler():
+            delta = self.etats[self.position].delta
+            if delta is not None:
+                delta.appliquer(self.base, annuler=True)
+            self.position -= 1
+            self._materialiser()
+        return self.donnees
+
+    def retablir(self) -> Donnees:
+        """Rejoue l'état suivant (après une annulation)."""
+        if self.peut_retablir():
+            self.position += 1
+            delta = self.etats[self.position].delta
+            if delta is not None:
+                delta.appliquer(self.base)
+            self._materialiser()
+        return self.donnees
+
+    def taille_memoire(self) -> int:
+        """Mémoire retenue par les états (la base, partagée, n'est pas comptée)."""
+        return sum(etat.taille_memoire() for etat in self.etats)
+
+
+historique = HistoriqueDonnees()
+
+
+# --- CACHE DES RÉSULTATS DE REQUÊTES (FILTRES ET TRIS) ---
+# Les mêmes filtres et tris reviennent souvent : leur résultat (vecteur de positions de lignes)
+# est mémorisé, avec pour clé la version du jeu de données et la requête normalisée (colonne,
+# opérateur, valeur cible convertie, critères de tri). La version est celle de l'état courant de
+# l'historique : tout chargement, filtre, tri ou modification de champs crée un nouvel état, donc
+# une nouvelle version, et les anciens résultats ne sont plus atteints. Annuler ou rétablir
+# revient à un état déjà connu : ses résultats restent valables et sont réutilisés.
+# Les entrées les moins récemment utilisées sont oubliées au-delà du budget mémoire.
+
+BUDGET_CACHE_REQUETES = 64 * 1024 * 1024  # Mémoire maximale des vecteurs de positions mémorisés
+
+
+def version_donnees(data: Donnees) -> Optional[int]:
+    """Version du jeu de données s'il est l'état courant de l'historique, sinon None (pas de cache)."""
+    if data is historique.donnees:
+        return historique.etats[historique.position].version
+    return None
+
+
+def _cle_valeur_cible(operateur: str, valeur_cible_str: str) -> Any:
+    """Valeur cible sous la forme réellement comparée par construire_test."""
+    if operateur == 'contient un de (texte)':
+        return frozenset(decouper_termes(valeur_cible_str))  # L'ordre des termes est indifférent
+    if operateur.endswith('(texte)'):
+        return normaliser_texte(valeur_cible_str)
+    # Les tests ne reposent que sur == et les comparaisons : '10', '10.0' (et 'true', '1') sont équivalents
+    return convertir_type(valeur_cible_str)
+
+
+def normaliser_filtre(arbre: Tuple) -> Tuple:
+    """
+    Forme canonique d'un arbre de filtre : valeurs cibles converties, sous-critères d'un ET/OU
+    sans ordre (frozenset). 'a ET b' et 'b ET a' ont ainsi la même clé de cache.
+    """
+    nature = arbre[0]
+    if nature == 'cond':
+        _, cle, operateur, valeur_str = arbre
+        return ('cond', cle, operateur, _cle_valeur_cible(operateur, valeur_str))
+    if nature == 'non':
+        return ('non', normaliser_filtre(arbre[1]))
+    return (nature, frozenset(map(normaliser_filtre, arbre[1])))
+
+
+class CacheRequetes:
+    """Cache LRU des résultats de requêtes (voir l'en-tête de section), borné en mémoire."""
+
+    def __init__(self, budget: int = BUDGET_CACHE_REQUETES):
+        self.budget = budget
+        self.entrees: Dict[Tuple, Tuple[array, Any]] = OrderedDict()
+        self.taille = 0
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _taille_entree(positions: array) -> int:
+        return sys.getsizeof(positions) + 200  # Clé, tuple et entrée du dictionnaire (estimation)
+
+    def lire(self, version: Optional[int], requete: Tuple) -> Optional[Tuple[array, Any]]:
+        """Résultat mémorisé (positions, complément) de la requête, ou None."""
+        if version is None:
+            return None
+        cle = (version, requete)
+        resultat = self.entrees.get(cle)
+        if resultat is None:
+            self.echecs += 1
+            return None
+        self.entrees.move_to_end(cle)
+        self.succes += 1
+        return resultat
+
+    def ecrire(self, version: Optional[int], requete: Tuple, positions: Iterable[int],
+               nb_lignes: int, complement: Any = None) -> array:
+        """Mémorise un résultat ; retourne les positions sous forme de vecteur compact."""
+        if not isinstance(positions, array) or positions.typecode not in 'iq':
+            positions = _vecteur_positions(positions, nb_lignes)
+        if version is None:
+            return positions
+        taille = self._taille_entree(positions)
+        if taille > self.budget:
+            return positions  # Plus grand que tout le cache : inutile d'évincer le reste
+        cle = (version, requete)
+        ancienne = self.entrees.pop(cle, None)
+        if ancienne is not None:
+            self.taille -= self._taille_entree(ancienne[0])
+        self.entrees[cle] = (positions, complement)
+        self.taille += taille
+        self.evincer()
+        return positions
+
+    def evincer(self):
+        """Oublie les entrées les moins récemment utilisées tant que le budget est dépassé."""
+        while self.taille > self.budget and self.entrees:
+            _, (positions, _) = self.entrees.popitem(last=False)
+            self.taille -= self._taille_entree(positions)
+            self.evictions += 1
+
+    def vider(self):
+        """Oublie tous les résultats (les compteurs sont conservés)."""
+        self.entrees.clear()
+        self.taille = 0
+
+    def statistiques(self) -> Dict[str, Any]:
+        total = self.succes + self.echecs
+        return {'succes': self.succes, 'echecs': self.echecs, 'evictions': self.evictions,
+                'taux_succes': self.succes / total if total else 0.0,
+                'entrees': len(self.entrees), 'octets': self.taille, 'budget': self.budget}
+
+    def en_texte(self) -> str:
+        stats = self.statistiques()
+        return (f"Cache des requêtes : {stats['succes']} succès, {stats['echecs']} échec(s) "
+                f"({stats['taux_succes']:.0%} de succès), {stats['entrees']} résultat(s) en mémoire "
+                f"({stats['octets'] / 2 ** 20:.2f} Mo / {stats['budget'] / 2 ** 20:.0f} Mo), "
+                f"{stats['evictions']} éviction(s)")
+
+
+cache_requetes = CacheRequetes()
+
+
+# --- EXPRESSIONS DE FILTRE (ET / OU / NON) ---
+# Une expression telle que : price > 50 AND (name contient 'souris' OR quantity <= 10)
+# est analysée en arbre, puis compilée UNE fois en un prédicat appliqué en un seul passage.
+# Noeuds de l'arbre : ('cond', cle, operateur, valeur_str), ('et', [...]), ('ou', [...]), ('non', noeud)
+
+MOTS_OPERATEURS = {
+    '=': '=', '==': '=',
+    '!=': '!=', '<>': '!=',
+    '>': '>', '<': '<', '>=': '>=', '<=': '<=',
+    'contient': 'contient (texte)', 'contains': 'contient (texte)',
+    'commence': 'commence par (texte)', 'startswith': 'commence par (texte)',
+    'contient_un': 'contient un de (texte)', 'contains_any': 'contient un de (texte)',
+}
+MOTS_ET = ('and', 'et', '&&')
+MOTS_OU = ('or', 'ou', '||')
+MOTS_NON = ('not', 'non', '!')
+
+# Coût relatif d'évaluation d'un critère (les opérateurs texte font un lower() par ligne)
+COUT_OPERATEUR = {'=': 1.0, '!=': 1.0, '>': 1.5, '<': 1.5, '>=': 1.5, '<=': 1.5,
+                  'contient (texte)': 3.0, 'commence par (texte)': 2.5, 'contient un de (texte)': 4.0}
+# Sélectivité supposée lorsqu'aucun échantillon de données n'est disponible
+SELECTIVITE_PAR_DEFAUT = {'=': 0.1, '!=': 0.9, '>': 0.35, '<': 0.35, '>=': 0.35, '<=': 0.35,
+                          'contient (texte)': 0.2, 'commence par (texte)': 0.15, 'contient un de (texte)': 0.3}
+
+_MOTIF_JETON = re.compile(r"""\s*(?:
+    (?P<chaine>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<symbole>!=|<>|>=|<=|==|&&|\|\||[=<>()!])
+  | (?P<mot>[^\s()=!<>'"&|]+)
+)""", re.VERBOSE)
+
+
+def _decouper_expression(expression: str) -> List[Tuple[str, str]]:
+    """Découpe une expression de filtre en jetons (type, texte)."""
+    jetons = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        correspondance = _MOTIF_JETON.match(expression, position)
+        if not correspondance or correspondance.end() == position:
+            raise ValueError(f"Expression de filtre invalide près de : '{expression[position:]}'")
+        position = correspondance.end()
+        type_jeton = correspondance.lastgroup
+        texte = correspondance.group(type_jeton)
+        if type_jeton == 'chaine':
+            texte = re.sub(r"\\(.)", r"\1", texte[1:-1])
+        jetons.append((type_jeton, texte))
+    return jetons
+
+
+class _AnalyseurFiltre:
+    """Analyseur descendant récursif : expr := terme (OU terme)* ; terme := facteur (ET facteur)*."""
+
+    def __init__(self, expression: str):
+        self.jetons = _decouper_expression(expression)
+        self.position = 0
+
+    def _courant(self) -> Tuple[str, str]:
+        return self.jetons[self.position] if self.position < len(self.jetons) else ('fin', '')
+
+    def _est_mot_cle(self, mots: Tuple[str, ...]) -> bool:
+        type_jeton, texte = self._courant()
+        return type_jeton in ('mot', 'symbole') and texte.lower() in mots
+
+    def analyser(self) -> Tuple:
+        if not self.jetons:
+            raise ValueError("Expression de filtre vide.")
+        noeud = self._expression()
+        if self.position != len(self.jetons):
+            raise ValueError(f"Élément inattendu dans l'expression : '{self._courant()[1]}'")
+        return noeud
+
+    def _expression(self) -> Tuple:
+        enfants = [self._terme()]
+        while self._est_mot_cle(MOTS_OU):
+            self.position += 1
+            enfants.append(self._terme())
+        return enfants[0] if len(enfants) == 1 else ('ou', enfants)
+
+    def _terme(self) -> Tuple:
+        enfants = [self._facteur()]
+        while self._est_mot_cle(MOTS_ET):
+            self.position += 1
+            enfants.append(self._facteur())
+        return enfants[0] if len(enfants) == 1 else ('et', enfants)
+
+    def _facteur(self) -> Tuple:
+        if self._est_mot_cle(MOTS_NON):
+            self.position += 1
+            return ('non', self._facteur())
+        if self._courant() == ('symbole', '('):
+            self.position += 1
+            noeud = self._expression()
+            if self._courant() != ('symbole', ')'):
+                raise ValueError("Parenthèse fermante manquante dans l'expression.")
+            self.position += 1
+            return noeud
+        return self._condition()
+
+    def _condition(self) -> Tuple:
+        type_jeton, cle = self._courant()
+        if type_jeton not in ('mot', 'chaine'):
+            raise ValueError(f"Nom de colonne attendu, trouvé : '{cle or 'fin'}'")
+        self.position += 1
+
+        type_jeton, texte = self._courant()
+        operateur = MOTS_OPERATEURS.get(texte.lower()) if type_jeton in ('mot', 'symbole') else None
+        if operateur is None:
+            raise ValueError(f"Opérateur attendu après '{cle}', trouvé : '{texte or 'fin'}'")
+        self.position += 1
+        # 'commence par' s'écrit en deux mots
+        if texte.lower() == 'commence' and self._courant()[1].lower() == 'par':
+            self.position += 1
+
+        type_jeton, valeur = self._courant()
+        if type_jeton not in ('mot', 'chaine'):
+            raise ValueError(f"Valeur attendue après '{cle} {texte}', trouvé : '{valeur or 'fin'}'")
+        self.position += 1
+        return ('cond', cle, operateur, valeur)
+
+
+def analyser_filtre(expression: str) -> Tuple:
+    """Analyse une expression de filtre et retourne son arbre (lève ValueError si invalide)."""
+    return _AnalyseurFiltre(expression).analyser()
+
+
+def _acces_ligne(cle: str) -> Callable[[Dict[str, Any]], Any]:
+    """Accès à une colonne depuis un enregistrement (dictionnaire)."""
+    return lambda item: item.get(cle)
+
+
+def compiler_filtre(arbre: Tuple, acces: Callable[[str], Callable[[Any], Any]] = _acces_ligne,
+                    echantillon: Optional[List[Any]] = None) -> Tuple[Tuple, Callable[[Any], bool], float, float]:
+    """
+    Compile un arbre de filtre en prédicat.
+    Retourne (arbre réordonné, prédicat, coût estimé, sélectivité estimée).
+
+    'acces' fournit, pour une colonne, la fonction qui lit sa valeur à partir d'un élément
+    (un dictionnaire par défaut, un numéro de ligne pour une TableColonnes).
+    Les sous-critères d'un ET/OU sont réordonnés pour évaluer d'abord les moins coûteux
+    et les plus sélectifs ; la sélectivité est mesurée sur 'echantillon' lorsqu'il est fourni.
+    """
+    nature = arbre[0]
+
+    if nature == 'cond':
+        _, cle, operateur, valeur_str = arbre
+        lire = acces(cle)
+        test = construire_test(operateur, valeur_str)
+        predicat = lambda element: test(lire(element))
+        if echantillon:
+            selectivite = sum(1 for element in echantillon if predicat(element)) / len(echantillon)
+        else:
+            selectivite = SELECTIVITE_PAR_DEFAUT[operateur]
+        return arbre, predicat, COUT_OPERATEUR[operateur], selectivite
+
+    if nature == 'non':
+        enfant, predicat_enfant, cout, selectivite = compiler_filtre(arbre[1], acces, echantillon)
+        return ('non', enfant), (lambda element: not predicat_enfant(element)), cout, 1.0 - selectivite
+
+    compiles = [compiler_filtre(enfant, acces, echantillon) for enfant in arbre[1]]
+    if nature == 'et':
+        # Rang d'un critère : coût / probabilité d'éliminer la ligne (le plus petit d'abord)
+        compiles.sort(key=lambda c: c[2] / (1.0 - c[3]) if c[3] < 1.0 else math.inf)
+        selectivite = math.prod(c[3] for c in compiles)
+    else:
+        # Pour un OU, on commence par le critère qui a le plus de chances de réussir
+        compiles.sort(key=lambda c: c[2] / c[3] if c[3] > 0.0 else math.inf)
+        selectivite = 1.0 - math.prod(1.0 - c[3] for c in compiles)
+
+    predicats = [c[1] for c in compiles]
+    if nature == 'et':
+        if len(predicats) == 2:
+            premier, second = predicats
+            predicat = lambda element: premier(element) and second(element)
+        else:
+            predicat = lambda element: all(p(element) for p in predicats)
+    else:
+        if len(predicats) == 2:
+            premier, second = predicats
+            predicat = lambda element: premier(element) or second(element)
+        else:
+            predicat = lambda element: any(p(element) for p in predicats)
+
+    return (nature, [c[0] for c in compiles]), predicat, sum(c[2] for c in compiles), selectivite
+
+
+def filtre_en_texte(arbre: Tuple) -> str:
+    """Réécrit un arbre de filtre sous forme lisible (dans l'ordre d'évaluation)."""
+    nature = arbre[0]
+    if nature == 'cond':
+        _, cle, operateur, valeur_str = arbre
+        if operateur.endswith('(texte)'):
+            return f"{cle} {operateur.replace(' (texte)', '')} {valeur_str!r}"
+        return f"{cle} {operateur} {convertir_type(valeur_str)!r}"
+    if nature == 'non':
+        return f"NON ({filtre_en_texte(arbre[1])})"
+    separateur = ' ET ' if nature == 'et' else ' OU '
+    return separateur.join(
+        f"({filtre_en_texte(enfant)})" if enfant[0] in ('et', 'ou') else filtre_en_texte(enfant)
+        for enfant in arbre[1])
+
+
+def _echantillon(nb_elements: int, taille: int = TAILLE_ECHANTILLON) -> range:
+    """Positions régulièrement espacées servant à estimer la sélectivité des critères."""
+    return range(0, nb_elements, max(1, nb_elements // taille))
+
+
+def filtrer_expression(data: Donnees, expression: str) -> Tuple[Donnees, str]:
+    """
+    Applique une expression de filtre en un seul passage sur les données.
+    Retourne (données filtrées, expression telle qu'évaluée après réordonnancement).
+    """
+    positions, texte = positions_expression(data, expression)
+    return selection_lignes(data, positions), texte
+
+
+def positions_expression(data: Donnees, expression: str) -> Tuple[array, str]:
+    """
+    Comme filtrer_expression, mais retourne les positions des lignes retenues
+    (vecteur de sélection) au lieu des données filtrées.
+    """
+    positions, arbre = positions_filtre(data, analyser_filtre(expression))
+    return positions, filtre_en_texte(arbre)
+
+
+def compiler_filtre_donnees(data: Donnees, arbre: Tuple) -> Tuple[Tuple, Callable[[Any], bool], float, float]:
+    """
+    Compile un arbre de filtre pour ces données (voir compiler_filtre) : le prédicat reçoit
+    un numéro de ligne pour une TableColonnes, un dictionnaire pour une DataList.
+    """
+    if isinstance(data, TableColonnes):
+        acces = lambda cle: data.colonne(cle).__getitem__
+        echantillon = list(_echantillon(len(data)))
+    else:
+        acces = _acces_ligne
+        echantillon = [data[i] for i in _echantillon(len(data))]
+    return compiler_filtre(arbre, acces, echantillon)
+
+
+@instrumenter('filtre')
+def positions_filtre(data: Donnees, arbre: Tuple, lignes: Optional[Iterable[int]] = None) -> Tuple[array, Tuple]:
+    """
+    Positions des lignes qui vérifient un arbre de filtre, parmi 'lignes' (toutes par défaut,
+    l'ordre est conservé). Retourne aussi l'arbre dans son ordre d'évaluation.
+    Sur toutes les lignes, le résultat passe par le cache des requêtes.
+    """
+    if lignes is None:
+        # Sur toutes les lignes, le résultat dépend seulement de la version des données et du filtre
+        version, requete = version_donnees(data), ('filtre', normaliser_filtre(arbre))
+        resultat = cache_requetes.lire(version, requete)
+        if resultat is not None:
+            return resultat[0], resultat[1] or arbre
+        positions, arbre = _positions_filtre(data, arbre, None)
+        return cache_requetes.ecrire(version, requete, positions, len(data), arbre), arbre
+    return _positions_filtre(data, arbre, lignes)
+
+
+def _positions_filtre(data: Donnees, arbre: Tuple, lignes: Optional[Iterable[int]]) -> Tuple[array, Tuple]:
+    arbre, predicat, _, _ = compiler_filtre_donnees(data, arbre)
+
+    # Si le premier critère évalué peut être servi par un index, on ne parcourt que ses lignes
+    premier = arbre if arbre[0] == 'cond' else arbre[1][0] if arbre[0] == 'et' else None
+    if lignes is None and premier is not None and premier[0] == 'cond':
+        lignes = obtenir_index(data).rechercher(*premier[1:])
+
+    if isinstance(data, TableColonnes):
+        lignes = range(len(data)) if lignes is None else lignes
+        return array('q', filter(predicat, lignes)), arbre
+
+    if lignes is None:
+        return array('q', itertools.compress(range(len(data)), map(predicat, data))), arbre
+    return array('q', (i for i in lignes if predicat(data[i]))), arbre
+
+
+def gerer_filtrage(data: Donnees) -> Donnees:
+    """(J7) Gère le sous-menu de filtrage simple."""
+    print("\n" + "-" * 50)
+    print("          SOUS-MENU FILTRAGE SIMPLE (J7)")
+    print("-" * 50)
+
+    if not data:
+        print("Veuillez d'abord charger les données.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    headers = get_all_headers(data)
+
+    print("Colonnes disponibles pour le filtrage :")
+    for i, header in enumerate(headers, 1):
+        print(f"{i}. {header}")
+
+    print("-" * 50)
+    print("E. Saisir une expression combinée (ET / OU / NON)")
+    print("   ex. : price > 50 ET (name contient 'souris' OU quantity <= 10)")
+    print("0. Annuler et Retour au Menu Principal")
+
+    # --- Étape 1 : Choix de la Colonne ---
+    try:
+        choix_colonne = input("Choisissez le numéro de la colonne à filtrer (ou 0 pour annuler) : ").strip()
+        if choix_colonne == '0':
+            return data
+
+        if choix_colonne.upper() == 'E':
+            return _filtrer_par_expression(data)
+
+        index_colonne = int(choix_colonne) - 1
+        if not (0 <= index_colonne < len(headers)):
+            print("Choix de colonne invalide.")
+            input("Appuyez sur Entrée pour continuer...")
+            return data
+
+        cle_filtre = headers[index_colonne]
+    except ValueError:
+        print("Entrée invalide. Veuillez entrer un numéro.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    # --- Étape 2 : Choix de l'Opérateur ---
+    operateurs = OPERATEURS_FILTRE
+
+    print(f"\nOpérateurs disponibles pour la colonne '{cle_filtre}' :")
+    for num, op in operateurs.items():
+        print(f"{num}. {op}")
+
+    choix_op = input("Choisissez le numéro de l'opérateur : ").strip()
+    if choix_op not in operateurs:
+        print("Opérateur invalide.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    operateur = operateurs[choix_op]
+
+    # --- Étape 3 : Saisie de la Valeur Cible ---
+    valeur_cible_str = input(invite_valeur_cible(operateur)).strip()
+
+    valeur_cible_convertie = convertir_type(valeur_cible_str)
+
+    print(f"\nApplication du filtre : {cle_filtre} {operateur} {repr(valeur_cible_convertie)}...")
+
+    # --- Étape 4 : Application du Filtre ---
+    # Le résultat est un vecteur de positions : l'historique le conserve sans copier les lignes.
+    positions = positions_critere(data, cle_filtre, operateur, valeur_cible_str)
+
+    # --- Étape 5 : Résultat et Retour ---
+    description = f"Filtre : {cle_filtre} {operateur} {repr(valeur_cible_convertie)}"
+    return _resultat_filtrage(data, positions, description)
+
+
+@instrumenter('filtre')
+def positions_critere(data: Donnees, cle_filtre: str, operateur: str, valeur_cible_str: str) -> array:
+    """Positions des lignes vérifiant un critère simple 'colonne opérateur valeur'."""
+    # Même clé qu'une expression réduite à ce critère : les deux saisies partagent le résultat
+    arbre = ('cond', cle_filtre, operateur, valeur_cible_str)
+    version, requete = version_donnees(data), ('filtre', normaliser_filtre(arbre))
+    resultat = cache_requetes.lire(version, requete)
+    if resultat is not None:
+        return resultat[0]
+
+    # Recherche par index (hachage ou trié) si possible, au lieu d'un parcours complet
+    positions = obtenir_index(data).rechercher(cle_filtre, operateur, valeur_cible_str)
+    if positions is None and isinstance(data, TableColonnes):
+        # Parcours de la seule colonne concernée, sans reconstruire de dictionnaires
+        test = construire_test(operateur, valeur_cible_str)
+        positions = data.colonne(cle_filtre).indices_correspondants(test)
+    elif positions is None:
+        predicat = construire_predicat(cle_filtre, operateur, valeur_cible_str)
+        positions = [i for i, item in enumerate(data) if predicat(item)]
+    return cache_requetes.ecrire(version, requete, positions, len(data), arbre)
+
+
+def _filtrer_par_expression(data: Donnees) -> Donnees:
+    """Saisie et application d'une expression de filtre combinée (ET / OU / NON)."""
+    expression = input("Entrez l'expression de filtre : ").strip()
+    try:
+        positions, ordre_evaluation = positions_expression(data, expression)
+    except ValueError as ve:
+        print(f"Erreur : {ve}")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    print(f"\nFiltre évalué (en un seul passage) : {ordre_evaluation}")
+    return _resultat_filtrage(data, positions, f"Filtre : {ordre_evaluation}")
+
+
+def _resultat_filtrage(data: Donnees, positions: List[int], description: str) -> Donnees:
+    """Affiche le bilan d'un filtrage, l'enregistre dans l'historique et retourne les données à conserver."""
+    nb_total = len(data)
+    nb_filtre = len(positions)
+    print(f"\nFiltre appliqué avec succès : {nb_filtre} enregistrement(s) conservé(s) sur {nb_total}.")
+
+    if nb_filtre == 0:
+        print("Aucun enregistrement ne correspond au critère de filtrage.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    donnees_filtrees = historique.enregistrer_selection(data, positions, description)
+    print("Les données ont été mises à jour avec le résultat du filtre.")
+    input("Appuyez sur Entrée pour continuer...")
+    return donnees_filtrees
+
+
+def configurer_locale_tri() -> bool:
+    """Active la collation française si possible ; retourne True si le tri linguistique est disponible."""
+    import locale
+    try:
+        # Tenter de définir la locale pour un tri linguistique correct
+        locale.setlocale(locale.LC_COLLATE, 'fr_FR.UTF-8')
+        print("Note: Tri linguistique (français) activé.")
+        return True
+    except locale.Error:
+        try:
+            locale.setlocale(locale.LC_COLLATE, 'fr_FR')
+            print("Note: Tri linguistique (français) activé (locale générique).")
+            return True
+        except locale.Error:
+            print("AVERTISSEMENT: Locale 'fr' non disponible. Retour au tri par défaut (Unicode).")
+            locale.setlocale(locale.LC_COLLATE, 'C')
+            return False
+
+
+def fabrique_cle_tri(use_locale_sort: bool) -> Callable[[Any], Tuple[int, Any]]:
+    """
+    Retourne la fonction clé de tri d'une valeur : (rang du type, valeur).
+    Le résultat de locale.strxfrm est mémorisé pour chaque chaîne distincte.
+    """
+    import locale
+    cache_collation: Dict[str, str] = {}
+
+    def cle_tri_valeur(value: Any) -> Tuple[int, Any]:
+        # La logique de tri par rang et type est cruciale pour la stabilité.
+        # bool est testé AVANT int (isinstance(True, int) est vrai) : le rang est
+        # calculé une fois par valeur, pas à chaque comparaison.
+        classe = value.__class__
+        if classe is bool:
+            # Rang 1 : Booléen
+            return (1, value)
+        if classe is int or classe is float:
+            # Rang 0 : Numérique
+            return (0, value)
+        if classe is str:
+            # Rang 2 : Chaîne (avec tri linguistique si possible)
+            if use_locale_sort:
+                transformee = cache_collation.get(value)
+                if transformee is None:
+                    transformee = cache_collation[value] = locale.strxfrm(value)
+                return (2, transformee)
+            return (2, value)
+        if value is None:
+            # Rang 3 : None (toujours à la fin)
+            return (3, 0)
+
+        # Rang 4 : Types complexes
+        return (4, str(value))
+
+    return cle_tri_valeur
+
+
+@instrumenter('tri')
+def calculer_ordre_tri(data: Donnees, critere_tri: List[Tuple[str, bool]], use_locale_sort: bool,
+                       lignes: Optional[List[int]] = None, limite: Optional[int] = None) -> Union[List[int], array]:
+    """
+    Calcule en UN seul tri la permutation des lignes pour une liste de critères
+    [(colonne, décroissant), ...], le premier étant le critère principal.
+    'lignes' restreint le tri à ces positions ; avec 'limite', seules les 'limite' premières
+    positions sont calculées (top-k par tas, en O(n log k) au lieu de O(n log n)).
+
+    Chaque ligne reçoit une clé composite plate (sans tuples imbriqués, pour des comparaisons
+    rapides). Une colonne d'un seul type contribue directement sa valeur, sinon le couple
+    (rang du type, valeur). Si les sens sont mélangés, une colonne décroissante est inversée :
+    opposé de la valeur si elle est numérique, sinon opposé de son rang parmi les valeurs
+    distinctes. L'ordre d'origine des lignes égales est conservé, comme avec des tris successifs.
+    Sur toutes les lignes, la permutation passe par le cache des requêtes.
+    """
+    if lignes is None:
+        version = version_donnees(data)
+        requete = ('tri', tuple(critere_tri), use_locale_sort, limite)
+        resultat = cache_requetes.lire(version, requete)
+        if resultat is not None:
+            return resultat[0]
+        ordre = _calculer_ordre_tri(data, critere_tri, use_locale_sort, None, limite)
+        return cache_requetes.ecrire(version, requete, ordre, len(data))
+    return _calculer_ordre_tri(data, critere_tri, use_locale_sort, lignes, limite)
+
+
+def _calculer_ordre_tri(data: Donnees, critere_tri: List[Tuple[str, bool]], use_locale_sort: bool,
+                        lignes: Optional[List[int]], limite: Optional[int]) -> List[int]:
+    cle_tri_valeur = fabrique_cle_tri(use_locale_sort)
+    sens_melanges = len({reverse_sort for _, reverse_sort in critere_tri}) > 1
+
+    parties: List[List[Any]] = []
+    # Sous-étapes : calcul des clés (dont strxfrm en mode linguistique), puis tri proprement dit
+    with mesurer_etape('tri.cles', locale=use_locale_sort):
+        for cle_tri, reverse_sort in critere_tri:
+            cles = list(map(cle_tri_valeur, valeurs_colonne(data, cle_tri, lignes)))
+            rangs_types = {cle[0] for cle in cles}
+            homogene = len(rangs_types) == 1
+
+            if sens_melanges and reverse_sort:
+                if homogene and rangs_types <= {0, 1}:
+                    parties.append([-cle[1] for cle in cles])
+                else:
+                    rangs = {cle: -rang for rang, cle in enumerate(sorted(set(cles)))}
+                    parties.append(list(map(rangs.__getitem__, cles)))
+            elif homogene:
+                parties.append([cle[1] for cle in cles])
+            else:
+                parties.append([cle[0] for cle in cles])
+                parties.append([cle[1] for cle in cles])
+
+        composites = parties[0] if len(parties) == 1 else list(zip(*parties))
+    reverse_global = not sens_melanges and critere_tri[0][1]
+    rangs = range(len(composites))
+    with mesurer_etape('tri.ordre', limite=limite):
+        if limite is None:
+            ordre = sorted(rangs, key=composites.__getitem__, reverse=reverse_global)
+        else:
+            # nsmallest / nlargest équivalent à sorted(...)[:limite], égalités comprises
+            selection = heapq.nlargest if reverse_global else heapq.nsmallest
+            ordre = selection(limite, rangs, key=composites.__getitem__)
+    return ordre if lignes is None else [lignes[i] for i in ordre]
+
+
+def gerer_tri(data: Donnees) -> Donnees:
+    """(J8) Gère le sous-menu de tri multicritère."""
+    if not data:
+        print("\n[SOUS-MENU TRI] Veuillez d'abord charger les données.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    headers = get_all_headers(data)
+
+    # Liste de tuples pour stocker les critères: [(clé_colonne, reverse_bool), ...]
+    critere_tri: List[Tuple[str, bool]] = []
+
+    while True:
+        print("\n" + "-" * 50)
+        print("          SOUS-MENU TRI (J8 - Multicritère et Linguistique)")
+
+        # Afficher les critères déjà sélectionnés
+        if critere_tri:
+            print(f"Critères actuels ({len(critere_tri)}) :")
+            for i, (cle, reverse) in enumerate(critere_tri, 1):
+                direction = "DESC" if reverse else "ASC"
+                print(f"  {i}. {cle} ({direction})")
+            print("-" * 50)
+
+        # Afficher les colonnes disponibles avec index
+        print("Colonnes disponibles :")
+        for i, header in enumerate(headers, 1):
+            print(f"{i}. {header}")
+
+        print("-" * 50)
+        print("A. Ajouter un critère de tri (Niveau supérieur)")
+        print("E. Exécuter le tri")
+        print("0. Annuler et Retour au Menu Principal")
+        print("-" * 50)
+
+        choix_action = input("Votre choix (A, E, ou 0) : ").strip().upper()
+
+        if choix_action == '0':
+            return data
+
+        if choix_action == 'E':
+            if not critere_tri:
+                print("Veuillez ajouter au moins un critère avant d'exécuter.")
+                continue
+            break  # Sortir de la boucle pour exécuter le tri
+
+        if choix_action == 'A':
+            # 1. Choix de la colonne
+            choix_colonne = input("Choisissez le NUMÉRO de la colonne à ajouter : ").strip()
+            try:
+                index_colonne = int(choix_colonne) - 1
+                if 0 <= index_colonne < len(headers):
+                    cle_tri = headers[index_colonne]
+                else:
+                    print("Choix de colonne invalide.")
+                    continue
+            except ValueError:
+                print("Entrée invalide. Veuillez entrer un numéro.")
+                continue
+
+            # 2. Choix de l'ordre
+            choix_ordre = input(
+                f"Sens du tri pour '{cle_tri}' (a/A pour Ascendant, d/D pour Descendant) : ").strip().lower()
+            if choix_ordre not in ('a', 'd'):
+                print("Ordre de tri invalide. Utilisez 'a' ou 'd'.")
+                continue
+
+            reverse_sort = (choix_ordre == 'd')
+
+            # Ajout du critère à la liste
+            critere_tri.append((cle_tri, reverse_sort))
+            print(f"Critère '{cle_tri}' ajouté comme niveau {len(critere_tri)}.")
+
+        else:
+            print("Action invalide.")
+            continue
+
+    # --- Exécution du Tri Multicritère ---
+    print(f"\nExécution du tri sur {len(critere_tri)} critère(s)...")
+
+    # 1. Configuration de la locale pour le tri linguistique (si possible)
+    use_locale_sort = configurer_locale_tri()
+
+    # 2. Un seul tri sur une clé composite, puis réordonnancement des lignes
+    ordre = calculer_ordre_tri(data, critere_tri, use_locale_sort)
+    description = "Tri : " + ", ".join(f"{cle} ({'DESC' if reverse else 'ASC'})" for cle, reverse in critere_tri)
+    data_triee = historique.enregistrer_selection(data, ordre, description)
+
+    print("Tri multicritère terminé. Les données ont été mises à jour.")
+    input("Appuyez sur Entrée pour continuer...")
+    return data_triee
+
+
+# --- TRI EXTERNE (DONNÉES PLUS GRANDES QUE LA MÉMOIRE) ---
+# Le flux est découpé en morceaux qui tiennent dans un budget mémoire ; chaque morceau est
+# trié puis écrit dans un fichier temporaire (pickle, en-têtes stockés une seule fois par paquet).
+# Les fichiers sont ensuite fusionnés (heapq.merge) avec le même ordre que gerer_tri.
+
+BUDGET_TRI_EXTERNE = 256 * 1024 * 1024  # Mémoire allouée à un morceau (octets)
+LIGNES_PAR_PAQUET = 1000  # Enregistrements sérialisés ensemble dans un fichier temporaire
+
+
+class _Inverse:
+    """Enveloppe qui inverse l'ordre d'une clé (critère décroissant dans un tri à sens mélangés)."""
+
+    __slots__ = ('valeur',)
+
+    def __init__(self, valeur: Any):
+        self.valeur = valeur
+
+    def __lt__(self, autre: '_Inverse') -> bool:
+        return autre.valeur < self.valeur
+
+    def __eq__(self, autre: '_Inverse') -> bool:
+        # Seules deux enveloppes de même rang sont comparées entre elles
+        return self.valeur == autre.valeur
+
+
+def _inverser_cle(cle: Tuple[int, Any]) -> Tuple[int, Any]:
+    """Inverse une clé (rang, valeur) ; les valeurs numériques sont simplement négativées."""
+    rang, valeur = cle
+    if rang in (0, 1, 3):
+        return (-rang, -valeur)
+    return (-rang, _Inverse(valeur))
+
+
+def fabrique_cle_ligne(critere_tri: List[Tuple[str, bool]], use_locale_sort: bool,
+                       sens_melanges: bool) -> Callable[[Dict[str, Any]], Tuple]:
+    """Clé composite d'un enregistrement, comparable d'un morceau à l'autre (contrairement aux rangs)."""
+    cle_tri_valeur = fabrique_cle_tri(use_locale_sort)
+    if not sens_melanges:
+        return lambda record: tuple(cle_tri_valeur(record.get(cle)) for cle, _ in critere_tri)
+    return lambda record: tuple(
+        _inverser_cle(cle_tri_valeur(record.get(cle))) if reverse_sort else cle_tri_valeur(record.get(cle))
+        for cle, reverse_sort in critere_tri)
+
+
+def _taille_enregistrement(record: Dict[str, Any]) -> int:
+    """Estimation de l'occupation mémoire d'un enregistrement (dictionnaire + valeurs + clé de tri)."""
+    return 2 * (sys.getsizeof(record) + sum(sys.getsizeof(v) for v in record.values()))
+
+
+def _ecrire_morceau(morceau: DataList, dossier: str) -> str:
+    """Sérialise un morceau trié par paquets ; retourne le chemin du fichier temporaire."""
+    descripteur, chemin = tempfile.mkstemp(suffix='.tri', dir=dossier)
+    with os.fdopen(descripteur, 'wb') as f:
+        for debut in range(0, len(morceau), LIGNES_PAR_PAQUET):
+            paquet = morceau[debut:debut + LIGNES_PAR_PAQUET]
+            cles = tuple(paquet[0])
+            if all(tuple(record) == cles for record in paquet):
+                # En-têtes communs : seules les valeurs sont écrites
+                pickle.dump((cles, [tuple(record.values()) for record in paquet]), f, pickle.HIGHEST_PROTOCOL)
+            else:
+                pickle.dump((None, paquet), f, pickle.HIGHEST_PROTOCOL)
+    return chemin
+
+
+def _lire_morceau(chemin: str) -> FluxDonnees:
+    """Relit un morceau trié, enregistrement par enregistrement."""
+    with open(chemin, 'rb') as f:
+        while True:
+            try:
+                cles, paquet = pickle.load(f)
+            except EOFError:
+                return
+            if cles is None:
+                yield from paquet
+            else:
+                for valeurs in paquet:
+                    yield dict(zip(cles, valeurs))
+
+
+def tri_externe(records: Iterable[Dict[str, Any]], critere_tri: List[Tuple[str, bool]], use_locale_sort: bool,
+                budget_octets: int = BUDGET_TRI_EXTERNE, dossier_temp: Optional[str] = None) -> FluxDonnees:
+    """
+    Trie un flux d'enregistrements de taille quelconque avec une mémoire bornée par 'budget_octets'.
+    Produit les enregistrements triés au fil de l'eau (prêts pour ecrire_*_flux).
+    """
+    sens_melanges = len({reverse_sort for _, reverse_sort in critere_tri}) > 1
+    # Sans mélange de sens, un tri/fusion 'reverse' conserve la stabilité sans envelopper les clés
+    reverse_global = not sens_melanges and critere_tri[0][1]
+    cle_ligne = fabrique_cle_ligne(critere_tri, use_locale_sort, sens_melanges)
+
+    with tempfile.TemporaryDirectory(prefix='data_filter_tri_', dir=dossier_temp) as dossier:
+        fichiers = []
+        morceau: DataList = []
+        taille_morceau = 0
+        for record in records:
+            morceau.append(record)
+            taille_morceau += _taille_enregistrement(record)
+            if taille_morceau >= budget_octets:
+                morceau.sort(key=cle_ligne, reverse=reverse_global)
+                fichiers.append(_ecrire_morceau(morceau, dossier))
+                morceau = []
+                taille_morceau = 0
+
+        morceau.sort(key=cle_ligne, reverse=reverse_global)
+        if not fichiers:
+            # Tout a tenu en mémoire : aucun fichier temporaire nécessaire
+            yield from morceau
+            return
+
+        if morceau:
+            fichiers.append(_ecrire_morceau(morceau, dossier))
+        del morceau
+        # heapq.merge départage les égalités par ordre des morceaux : le tri reste stable
+        yield from heapq.merge(*(_lire_morceau(chemin) for chemin in fichiers), key=cle_ligne,
+                               reverse=reverse_global)
+
+
+def _saisir_criteres_tri(headers: List[str], saisie: str) -> List[Tuple[str, bool]]:
+    """Traduit une saisie du type '3d,2a' (numéro de colonne + sens) en critères de tri."""
+    critere_tri = []
+    for morceau in saisie.split(','):
+        morceau = morceau.strip().lower()
+        sens = morceau[-1:] if morceau[-1:] in ('a', 'd') else 'a'
+        numero = morceau.rstrip('ad')
+        critere_tri.append((_choisir_colonnes(headers, numero)[0], sens == 'd'))
+    return critere_tri
+
+
+# --- PLAN DE REQUÊTE DIFFÉRÉ (FILTRE, TRI, PROJECTION, LIMITE) ---
+# En mode différé, les actions ne sont pas exécutées : elles s'ajoutent à un plan logique.
+# Avant l'affichage ou la sauvegarde du résultat, le plan est optimisé :
+#   - les filtres passent avant les tris et les projections (ils ne dépendent pas de l'ordre) ;
+#   - les filtres adjacents sont fusionnés en un seul ET (un seul passage, critères réordonnés) ;
+#   - deux tris successifs deviennent un seul tri (critères du second, puis ceux du premier) ;
+#   - un tri suivi d'une limite devient un top-k (tas de k éléments, O(n log k)).
+# L'exécution ne manipule que des positions de lignes : seul le résultat final est construit.
+#
+# Étapes : ('filtre', arbre), ('tri', critères), ('topk', critères, k), ('projection', colonnes),
+# ('limite', k). Le coût est estimé en comparaisons (coût des opérateurs pour un filtre).
+
+def colonnes_filtre(arbre: Tuple) -> set:
+    """Ensemble des colonnes lues par un arbre de filtre."""
+    if arbre[0] == 'cond':
+        return {arbre[1]}
+    if arbre[0] == 'non':
+        return colonnes_filtre(arbre[1])
+    return set().union(*map(colonnes_filtre, arbre[1]))
+
+
+def _fusionner_filtres(premier: Tuple, second: Tuple) -> Tuple:
+    """ET de deux arbres de filtre, aplati (un ET imbriqué rejoint le ET parent)."""
+    enfants = []
+    for arbre in (premier, second):
+        enfants.extend(arbre[1] if arbre[0] == 'et' else [arbre])
+    return ('et', enfants)
+
+
+def _etape_en_texte(etape: Tuple) -> str:
+    nature = etape[0]
+    if nature == 'filtre':
+        return f"FILTRE {filtre_en_texte(etape[1])}"
+    if nature in ('tri', 'topk'):
+        criteres = ", ".join(f"{cle} {'DESC' if reverse else 'ASC'}" for cle, reverse in etape[1])
+        return f"TRI {criteres}" if nature == 'tri' else f"TOP-{etape[2]} {criteres}"
+    if nature == 'projection':
+        return f"PROJECTION {', '.join(etape[1])}"
+    return f"LIMITE {etape[1]}"
+
+
+class PlanRequete:
+    """Plan logique différé sur un jeu de données (voir l'en-tête de section)."""
+
+    def __init__(self, data: Donnees):
+        self.data = data
+        self.etapes: List[Tuple] = []
+        self.colonnes = get_all_headers(data)  # Colonnes visibles après les projections
+
+    def _verifier_colonnes(self, colonnes: Iterable[str]):
+        absentes = [cle for cle in colonnes if cle not in self.colonnes]
+        if absentes:
+            raise ValueError(f"Colonne(s) absente(s) à ce stade du plan : {', '.join(absentes)}")
+
+    def filtrer(self, expression: str):
+        arbre = analyser_filtre(expression)
+        self._verifier_colonnes(colonnes_filtre(arbre))
+        self.etapes.append(('filtre', arbre))
+
+    def trier(self, critere_tri: List[Tuple[str, bool]]):
+        self._verifier_colonnes(cle for cle, _ in critere_tri)
+        self.etapes.append(('tri', critere_tri))
+
+    def projeter(self, colonnes: List[str]):
+        self._verifier_colonnes(colonnes)
+        self.etapes.append(('projection', colonnes))
+        self.colonnes = colonnes
+
+    def limiter(self, nombre: int):
+        if nombre < 0:
+            raise ValueError("La limite doit être positive.")
+        self.etapes.append(('limite', nombre))
+
+    def optimiser(self) -> List[Tuple]:
+        """Retourne le plan réécrit (le plan saisi n'est pas modifié)."""
+        etapes = list(self.etapes)
+        modifie = True
+        while modifie:
+            modifie = False
+            i = 0
+            while i < len(etapes) - 1:
+                a, b = etapes[i], etapes[i + 1]
+                remplacement = None
+                if a[0] == 'filtre' and b[0] == 'filtre':
+                    remplacement = [('filtre', _fusionner_filtres(a[1], b[1]))]
+                elif b[0] == 'filtre' and a[0] in ('tri', 'projection'):
+                    remplacement = [b, a]  # Filtrer d'abord : moins de lignes à trier
+                elif a[0] == 'tri' and b[0] == 'tri':
+                    cles_second = {cle for cle, _ in b[1]}
+                    remplacement = [('tri', b[1] + [c for c in a[1] if c[0] not in cles_second])]
+                elif a[0] == 'tri' and b[0] == 'limite':
+                    remplacement = [('topk', a[1], b[1])]
+                elif a[0] in ('topk', 'limite') and b[0] == 'limite':
+                    remplacement = [a[:-1] + (min(a[-1], b[1]),)]
+                elif a[0] == 'projection' and b[0] in ('tri', 'topk', 'limite'):
+                    remplacement = [b, a]  # La projection n'est appliquée qu'au résultat
+                elif a[0] == 'projection' and b[0] == 'projection':
+                    remplacement = [b]
+                if remplacement is None:
+                    i += 1
+                    continue
+                etapes[i:i + 2] = remplacement
+                modifie = True
+        return etapes
+
+    def estimer(self, etapes: List[Tuple]) -> List[Tuple[Tuple, float, float]]:
+        """Pour chaque étape : (étape, lignes estimées en sortie, coût estimé)."""
+        nb_lignes = float(len(self.data))
+        estimations = []
+        for etape in etapes:
+            nature = etape[0]
+            cout = 0.0
+            if nature == 'filtre':
+                arbre, _, cout_ligne, selectivite = compiler_filtre_donnees(self.data, etape[1])
+                etape = ('filtre', arbre)  # Critères dans leur ordre d'évaluation
+                cout = nb_lignes * cout_ligne
+                nb_lignes *= selectivite
+            elif nature == 'tri':
+                cout = nb_lignes * max(1.0, math.log2(nb_lignes or 1))
+            elif nature == 'topk':
+                cout = nb_lignes * max(1.0, math.log2(etape[2] or 1))
+                nb_lignes = min(nb_lignes, etape[2])
+            elif nature == 'limite':
+                nb_lignes = min(nb_lignes, etape[1])
+            estimations.append((etape, nb_lignes, cout))
+        return estimations
+
+    def expliquer(self) -> str:
+        """Plan saisi et plan optimisé, avec les coûts estimés (sans rien exécuter)."""
+        textes = []
+        for titre, etapes in (("Plan saisi", self.etapes), ("Plan optimisé", self.optimiser())):
+            textes.append(f"{titre} :")
+            total = 0.0
+            for etape, nb_lignes, cout in self.estimer(etapes):
+                total += cout
+                textes.append(f"  {_etape_en_texte(etape):<50} ~{nb_lignes:>12,.0f} lignes  coût ~{cout:,.0f}")
+            textes.append(f"  Coût total estimé : ~{total:,.0f}")
+        return "\n".join(textes)
+
+    def executer(self) -> Tuple[Optional[List[int]], Optional[List[str]]]:
+        """
+        Exécute le plan optimisé. Retourne (positions des lignes du résultat ou None pour toutes,
+        colonnes à conserver ou None pour toutes).
+        """
+        data = self.data
+        positions: Optional[List[int]] = None
+        colonnes = None
+        use_locale_sort = None
+        for etape in self.optimiser():
+            nature = etape[0]
+            if nature == 'filtre':
+                positions, _ = positions_filtre(data, etape[1], positions)
+            elif nature in ('tri', 'topk'):
+                if use_locale_sort is None:
+                    use_locale_sort = configurer_locale_tri()
+                limite = etape[2] if nature == 'topk' else None
+                positions = calculer_ordre_tri(data, etape[1], use_locale_sort, positions, limite)
+            elif nature == 'limite':
+                positions = (range(len(data)) if positions is None else positions)[:etape[1]]
+            else:
+                colonnes = etape[1]
+        return positions, colonnes
+
+    def resultat(self) -> Donnees:
+        """Exécute le plan et construit le résultat (seules les lignes et colonnes retenues)."""
+        positions, colonnes = self.executer()
+        data = self.data
+        if colonnes is None:
+            return data if positions is None else selection_lignes(data, positions)
+
+        lignes = range(len(data)) if positions is None else positions
+        if isinstance(data, TableColonnes):
+            table = TableColonnes()
+            table.colonnes = {cle: data.colonne(cle).selection(lignes) for cle in colonnes}
+            table.nb_lignes = len(lignes)
+            return table
+        return [{cle: data[i].get(cle) for cle in colonnes} for i in lignes]
+
+
+def gerer_plan(data: Donnees) -> Donnees:
+    """
+    Mode différé : les filtres, tris, projections et limites sont ajoutés à un plan
+    (PlanRequete), optimisé puis exécuté en une fois à l'affichage ou à la sauvegarde.
+    """
+    if not data:
+        print("\n[MODE DIFFÉRÉ] Veuillez d'abord charger les données.")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
+
+    plan = PlanRequete(data)
+    while True:
+        print("\n" + "-" * 50)
+        print("          MODE DIFFÉRÉ - PLAN DE REQUÊTE")
+        print("-" * 50)
+        if plan.etapes:
+            for i, etape in enumerate(plan.etapes, 1):
+                print(f"  {i}. {_etape_en_texte(etape)}")
+        else:
+            print("  (plan vide)")
+        print("-" * 50)
+        print("Colonnes disponibles :")
+        for i, header in enumerate(plan.colonnes, 1):
+            print(f"{i}. {header}")
+        print("-" * 50)
+        print("F. Ajouter un filtre (expression ET / OU / NON)")
+        print("T. Ajouter un tri (ex. : 3d,1a)")
+        print("P. Ajouter une projection (ex. : 1,3,4)")
+        print("L. Ajouter une limite (nombre de lignes)")
+        print("V. Voir le plan optimisé et les coûts estimés")
+        print("A. Afficher le résultat")
+        print("S. Sauvegarder le résultat")
+        print("X. Appliquer le résultat aux données")
+        print("0. Abandonner le plan et Retour au Menu Principal")
+        print("-" * 50)
+
+        choix = input("Votre choix : ").strip().upper()
+        try:
+            if choix == '0':
+                return data
+            elif choix == 'F':
+                plan.filtrer(input("Entrez l'expression de filtre : ").strip())
+            elif choix == 'T':
+                plan.trier(_saisir_criteres_tri(plan.colonnes, input("Critères de tri : ").strip()))
+            elif choix == 'P':
+                plan.projeter(_choisir_colonnes(plan.colonnes, input("Colonnes à conserver : ").strip()))
+            elif choix == 'L':
+                plan.limiter(int(input("Nombre maximal de lignes : ").strip()))
+            elif choix == 'V':
+                print("\n" + plan.expliquer())
+                input("\nAppuyez sur Entrée pour continuer...")
+            elif choix == 'A':
+                afficher_donnees(plan.resultat())
+            elif choix == 'S':
+                sauvegarder_donnees(plan.resultat())
+            elif choix == 'X':
+                positions, colonnes = plan.executer()
+                description = "Plan : " + " | ".join(map(_etape_en_texte, plan.optimiser()))
+                if positions is not None:
+                    data = historique.enregistrer_selection(data, positions, description)
+                if colonnes is not None:
+                    retirees = [cle for cle in get_all_headers(data) if cle not in colonnes]
+                    data = historique.modifier_colonnes(data, dict.fromkeys(retirees), description)
+                print(f"Plan appliqué : {len(data)} enregistrement(s).")
+                input("Appuyez sur Entrée pour continuer...")
+                return data
+            else:
+                print("Choix invalide.")
+        except (ValueError, IndexError) as e:
+            print(f"Erreur : {e}")
+
+
+def gerer_historique(data: Donnees) -> Donnees:
+    """(J12) Gère les opérations Undo/Redo (voir HistoriqueDonnees)."""
+    if data is not historique.donnees:
+        historique.reinitialiser(data)
+
+    while True:
+        print("\n" + "-" * 50)
+        print("          HISTORIQUE - UNDO/REDO (J12)")
+        print("-" * 50)
+        for i, etat in enumerate(historique.etats):
+            marque = "->" if i == historique.position else "  "
+            print(f"{marque} {i}. {etat.description}")
+        print(f"Mémoire de l'historique : {historique.taille_memoire() / 2 ** 20:.2f} Mo"
+              f" (budget : {historique.budget / 2 ** 20:.0f} Mo)")
+        print("-" * 50)
+        print("U. Annuler (Undo)")
+        print("R. Rétablir (Redo)")
+        print("B. Modifier le budget mémoire")
+        print("0. Retour au Menu Principal")
+        print("-" * 50)
+
+        choix = input("Votre choix : ").strip().upper()
+        if choix == '0':
+            return historique.donnees
+        if choix == 'U':
+            if not historique.peut_annuler():
+                print("Rien à annuler.")
+                continue
+            historique.annuler()
+            print(f"Annulé. {len(historique.donnees)} enregistrement(s).")
+        elif choix == 'R':
+            if not historique.peut_retablir():
+                print("Rien à rétablir.")
+                continue
+            historique.retablir()
+            print(f"Rétabli. {len(historique.donnees)} enregistrement(s).")
+        elif choix == 'B':
+            try:
+                historique.budget = int(float(input("Nouveau budget (en Mo) : ").strip()) * 2 ** 20)
+                historique.evincer()
+            except ValueError:
+                print("Entrée invalide. Veuillez entrer un nombre.")
+        else:
+            print("Choix invalide.")
+
+
+# --- CHAMPS CALCULÉS ET PROJECTIONS (J12) ---
+# Une colonne calculée est définie par une expression sur les autres colonnes, par exemple
+# total = price * quantity  ou  libelle = upper(name) + ' (' + str(id) + ')'.
+# L'expression est analysée une fois (syntaxe Python restreinte, sans accès au reste du
+# programme) puis évaluée colonne par colonne, par lots de TAILLE_LOT lignes : chaque opération
+# est un map() sur des listes de valeurs, et non une évaluation par dictionnaire de ligne.
+# Une valeur absente ou une opération impossible (None * 2, 'a' / 3, division par zéro) donne None.
+#
+# Ajouts, retraits et renommages passent par l'historique (annulables) et le catalogue.
+# Sur une TableColonnes, retirer ou renommer une colonne ne copie aucune valeur.
+
+FONCTIONS_EXPRESSION: Dict[str, Callable] = {
+    'abs': abs, 'round': round, 'min': min, 'max': max, 'len': len,
+    'str': str, 'int': int, 'float': float,
+    'lower': str.lower, 'upper': str.upper, 'strip': str.strip,
+}
+
+_OPERATEURS_EXPRESSION: Dict[type, Callable[[Any, Any], Any]] = {}  # Rempli au premier usage (module ast)
+
+
+_ERREURS_EXPRESSION = (TypeError, ValueError, ZeroDivisionError, OverflowError, AttributeError)
+
+
+def _sans_erreur(fonction: Callable, nb_arguments: int = 0) -> Callable:
+    """Version de 'fonction' qui retourne None au lieu d'échouer (valeur nulle ou de type inattendu)."""
+    # Versions à 1 et 2 arguments sans *args : ce sont les plus fréquentes, appelées à chaque ligne
+    if nb_arguments == 1:
+        def appel_1(a):
+            try:
+                return fonction(a)
+            except _ERREURS_EXPRESSION:
+                return None
+        return appel_1
+    if nb_arguments == 2:
+        def appel_2(a, b):
+            try:
+                return fonction(a, b)
+            except _ERREURS_EXPRESSION:
+                return None
+        return appel_2
+
+    def appel(*valeurs):
+        try:
+            return fonction(*valeurs)
+        except _ERREURS_EXPRESSION:
+            return None
+    return appel
 
-            print(
-                f"{key:<20} | {minimum:<10.2f} | {maximum:<10.2f} | {moyenne:<10.2f} | {mediane:<10.2f} | {ecart_type:<12.2f} | {count:<12}")
 
-        print("-" * len(header_num))
+_NUMERIQUES = (int, float)  # bool compris (isinstance(True, int))
 
-    # --- PARTIE J6 : ANALYSE DE STRUCTURE ET MODE ---
-    print("\n--- Analyse de la Structure des Données et Mode (Tous Types) ---")
 
-    if not structure_types:
-        print("Aucun enregistrement ou colonne trouvé pour l'analyse.")
-    else:
-        types_disponibles = ['int', 'float', 'bool', 'str', 'None', 'list', 'dict', 'autres']
+def _masque_valides(arguments: List[Any], types: Optional[Tuple[type, ...]]) -> Optional[List[bool]]:
+    """
+    Masque des lignes où chaque argument colonne est utilisable : instance de 'types' si précisé,
+    sinon différent de None. Calculé par map() de fonctions natives, sans boucle Python.
+    None si toutes les lignes sont valides.
+    """
+    masque = None
+    for argument in arguments:
+        if not isinstance(argument, list):
+            continue
+        valides = map(isinstance, argument, itertools.repeat(types)) if types \
+            else map(operator.is_not, argument, itertools.repeat(None))
+        masque = list(valides) if masque is None else list(map(operator.and_, masque, valides))
+    return None if masque is None or all(masque) else masque
 
-        header_types = f"{'Colonne':<20} | " + " | ".join(
-            f"{t:<6}" for t in types_disponibles) + " | Mode (Plus Fréquent)"
-        print("-" * len(header_types))
-        print(header_types)
-        print("-" * len(header_types))
 
-        for key in sorted(structure_types.keys()):
-            output = f"{key:<20} | "
+def _appliquer_vecteur(fonction: Callable, arguments: List[Any], taille: int,
+                       propagation: Optional[str] = None) -> Any:
+    """
+    Applique 'fonction' élément par élément à des arguments colonnes (listes) ou constantes.
+    'propagation' : 'numerique' (toute valeur non numérique donne None), 'nulle' (None donne None)
+    ou None (valeurs transmises telles quelles). Les lignes valides sont calculées par un map()
+    direct ; la version protégée n'est utilisée que si ce calcul échoue.
+    """
+    types = _NUMERIQUES if propagation == 'numerique' else None
+    # Une constante inutilisable (ex. 'a' dans prix * 'a') donne None pour toutes les lignes
+    if propagation and any(not isinstance(a, list) and (not isinstance(a, types) if types else a is None)
+                           for a in arguments):
+        return None
+    if not any(isinstance(argument, list) for argument in arguments):
+        return _sans_erreur(fonction)(*arguments)
 
-            all_values = mode_results[key]
-            mode_counter = Counter(all_values)
+    masque = _masque_valides(arguments, types) if propagation else None
+    if masque is not None:
+        arguments = [list(itertools.compress(argument, masque)) if isinstance(argument, list) else argument
+                     for argument in arguments]
+        taille = len(arguments[0]) if isinstance(arguments[0], list) else sum(masque)
 
-            try:
-                most_common = mode_counter.most_common(1)
+    colonnes = [argument if isinstance(argument, list) else itertools.repeat(argument, taille)
+                for argument in arguments]
+    try:
+        resultat = list(map(fonction, *colonnes))
+    except _ERREURS_EXPRESSION:
+        colonnes = [argument if isinstance(argument, list) else itertools.repeat(argument, taille)
+                    for argument in arguments]
+        resultat = list(map(_sans_erreur(fonction, len(arguments)), *colonnes))
 
-                if most_common and most_common[0][1] > 0:
-                    mode_value = most_common[0][0]
-                    mode_count = most_common[0][1]
+    if masque is None:
+        return resultat
+    valeurs = iter(resultat)  # Replace les résultats, None pour les lignes écartées
+    return [next(valeurs) if valide else None for valide in masque]
 
-                    if mode_value is None:
-                        mode_display = f"None ({mode_count})"
-                    elif isinstance(mode_value, str) and len(mode_value) > 20:
-                        mode_display = f"'{mode_value[:17]}...' ({mode_count})"
-                    else:
-                        mode_display = f"'{repr(mode_value)}' ({mode_count})"
-                else:
-                    mode_display = "N/A"
 
-            except Exception:
-                mode_display = "Erreur Mode"
+def compiler_expression(expression: str, colonnes: List[str]) -> Tuple[Callable[[Dict[str, List[Any]], int], Any], List[str]]:
+    """
+    Compile une expression de colonne calculée. Retourne (evaluer, colonnes utilisées), où
+    evaluer(valeurs, taille) reçoit les listes de valeurs des colonnes utilisées pour un lot de
+    'taille' lignes et retourne la liste des résultats (ou une constante).
+    Lève ValueError si l'expression est invalide ou cite une colonne inconnue.
+    """
+    import ast
+    if not _OPERATEURS_EXPRESSION:
+        _OPERATEURS_EXPRESSION.update({
+            ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+            ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+            ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+            ast.Gt: operator.gt, ast.GtE: operator.ge,
+            ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Not: operator.not_,
+        })
+    try:
+        arbre = ast.parse(expression.strip(), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Expression invalide : {e.msg}") from e
+
+    utilisees: List[str] = []
+
+    def colonne(nom: str):
+        if nom not in colonnes:
+            raise ValueError(f"Colonne inconnue dans l'expression : '{nom}'")
+        if nom not in utilisees:
+            utilisees.append(nom)
+        return lambda valeurs, taille: valeurs[nom]
+
+    def compiler(noeud) -> Callable[[Dict[str, List[Any]], int], Any]:
+        if isinstance(noeud, ast.Constant) and isinstance(noeud.value, (int, float, str, bool, type(None))):
+            valeur = noeud.value
+            return lambda valeurs, taille: valeur
+        if isinstance(noeud, ast.Name):
+            if noeud.id in ('True', 'False', 'None'):
+                valeur = {'True': True, 'False': False, 'None': None}[noeud.id]
+                return lambda valeurs, taille: valeur
+            return colonne(noeud.id)
+        if isinstance(noeud, ast.BinOp) and type(noeud.op) in _OPERATEURS_EXPRESSION:
+            fonction, gauche, droite = _OPERATEURS_EXPRESSION[type(noeud.op)], compiler(noeud.left), compiler(noeud.right)
+            # + concatène aussi les chaînes ; les autres opérateurs sont purement numériques
+            propagation = 'nulle' if isinstance(noeud.op, ast.Add) else 'numerique'
+            return lambda valeurs, taille: _appliquer_vecteur(
+                fonction, [gauche(valeurs, taille), droite(valeurs, taille)], taille, propagation)
+        if isinstance(noeud, ast.UnaryOp) and type(noeud.op) in _OPERATEURS_EXPRESSION:
+            fonction, operande = _OPERATEURS_EXPRESSION[type(noeud.op)], compiler(noeud.operand)
+            propagation = None if isinstance(noeud.op, ast.Not) else 'numerique'
+            return lambda valeurs, taille: _appliquer_vecteur(
+                fonction, [operande(valeurs, taille)], taille, propagation)
+        if isinstance(noeud, ast.Compare) and len(noeud.ops) == 1 and type(noeud.ops[0]) in _OPERATEURS_EXPRESSION:
+            fonction = _OPERATEURS_EXPRESSION[type(noeud.ops[0])]
+            gauche, droite = compiler(noeud.left), compiler(noeud.comparators[0])
+            # == et != comparent aussi à None ; un ordre avec None n'a pas de sens
+            propagation = None if isinstance(noeud.ops[0], (ast.Eq, ast.NotEq)) else 'nulle'
+            return lambda valeurs, taille: _appliquer_vecteur(
+                fonction, [gauche(valeurs, taille), droite(valeurs, taille)], taille, propagation)
+        if isinstance(noeud, ast.BoolOp):
+            fonction = (lambda a, b: a and b) if isinstance(noeud.op, ast.And) else (lambda a, b: a or b)
+            operandes = [compiler(valeur) for valeur in noeud.values]
+
+            def combiner(valeurs, taille):
+                resultat = operandes[0](valeurs, taille)
+                for operande in operandes[1:]:
+                    resultat = _appliquer_vecteur(fonction, [resultat, operande(valeurs, taille)], taille)
+                return resultat
+            return combiner
+        if isinstance(noeud, ast.IfExp):
+            test, si_vrai, si_faux = compiler(noeud.test), compiler(noeud.body), compiler(noeud.orelse)
+            return lambda valeurs, taille: _appliquer_vecteur(
+                lambda t, a, b: a if t else b,
+                [test(valeurs, taille), si_vrai(valeurs, taille), si_faux(valeurs, taille)], taille)
+        if isinstance(noeud, ast.Call) and isinstance(noeud.func, ast.Name) and not noeud.keywords:
+            nom_fonction = noeud.func.id
+            if nom_fonction == 'col':
+                # col('nom avec espaces') : colonne dont le nom n'est pas un identifiant Python
+                if len(noeud.args) != 1 or not isinstance(noeud.args[0], ast.Constant) \
+                        or not isinstance(noeud.args[0].value, str):
+                    raise ValueError("col() attend un nom de colonne entre guillemets.")
+                return colonne(noeud.args[0].value)
+            if nom_fonction in FONCTIONS_EXPRESSION:
+                fonction = FONCTIONS_EXPRESSION[nom_fonction]
+                arguments = [compiler(argument) for argument in noeud.args]
+                return lambda valeurs, taille: _appliquer_vecteur(
+                    fonction, [argument(valeurs, taille) for argument in arguments], taille, 'nulle')
+            raise ValueError(f"Fonction inconnue : '{nom_fonction}' "
+                             f"(disponibles : {', '.join(FONCTIONS_EXPRESSION)}, col).")
+        raise ValueError(f"Élément non autorisé dans l'expression : '{ast.unparse(noeud)}'")
+
+    return compiler(arbre), utilisees
+
+
+def analyser_colonne_calculee(texte: str) -> Tuple[str, str]:
+    """Sépare 'nom = expression' en (nom, expression)."""
+    nom, signe, expression = texte.partition('=')
+    nom = nom.strip()
+    if not signe or not nom or not expression.strip() or expression.lstrip().startswith('='):
+        raise ValueError("Format attendu : nom_colonne = expression (ex. total = price * quantity).")
+    return nom, expression.strip()
+
+
+def evaluer_expression(data: Donnees, expression: str, taille_lot: int = TAILLE_LOT) -> List[Any]:
+    """Valeurs de l'expression pour chaque ligne de 'data', évaluées par lots de colonnes."""
+    if catalogue_connu(data) is not None or isinstance(data, TableColonnes) or not data:
+        evaluer, utilisees = compiler_expression(expression, get_all_headers(data))
+    else:
+        # Sans catalogue, les clés de la première ligne évitent le plus souvent un parcours complet
+        try:
+            evaluer, utilisees = compiler_expression(expression, list(data[0]))
+        except ValueError:
+            evaluer, utilisees = compiler_expression(expression, get_all_headers(data))
+    if isinstance(data, TableColonnes):
+        colonnes = {nom: list(data.colonne(nom)) for nom in utilisees}  # Décodées une fois
+    resultat: List[Any] = []
+    for debut in range(0, len(data), taille_lot):
+        fin = min(debut + taille_lot, len(data))
+        if isinstance(data, TableColonnes):
+            valeurs = {nom: colonne[debut:fin] for nom, colonne in colonnes.items()}
+        else:
+            lot_lignes = data[debut:fin]
+            valeurs = {nom: [row.get(nom) for row in lot_lignes] for nom in utilisees}
+        lot = evaluer(valeurs, fin - debut)
+        resultat.extend(lot if isinstance(lot, list) else itertools.repeat(lot, fin - debut))
+    return resultat
 
-            for type_name in types_disponibles:
-                count = structure_types[key].get(type_name, 0)
-                output += f"{count:<6} | "
 
-            output += mode_display
+def ajouter_colonne_calculee(data: Donnees, definition: str) -> Donnees:
+    """Ajoute (ou remplace) la colonne 'nom = expression' ; l'opération est annulable."""
+    nom, expression = analyser_colonne_calculee(definition)
+    valeurs = evaluer_expression(data, expression)
+    return historique.modifier_colonnes(data, {nom: valeurs}, f"Champ calculé : {nom} = {expression}")
 
-            print(output)
 
-        print("-" * len(header_types))
+def retirer_colonnes(data: Donnees, colonnes: List[str]) -> Donnees:
+    """Retire des colonnes (projection) ; l'opération est annulable."""
+    return historique.modifier_colonnes(data, dict.fromkeys(colonnes), f"Retrait : {', '.join(colonnes)}")
 
-    input("Appuyez sur Entrée pour continuer...")
 
+def renommer_colonne(data: Donnees, ancien: str, nouveau: str) -> Donnees:
+    """Renomme une colonne ; l'opération est annulable."""
+    headers = get_all_headers(data)
+    if ancien not in headers:
+        raise ValueError(f"Colonne inconnue : '{ancien}'")
+    if not nouveau or nouveau in headers:
+        raise ValueError(f"Nom de colonne invalide ou déjà utilisé : '{nouveau}'")
+    return historique.renommer_colonnes(data, {ancien: nouveau}, f"Renommage : {ancien} -> {nouveau}")
 
-def gerer_filtrage(data: DataList) -> DataList:
-    """(J7) Gère le sous-menu de filtrage simple."""
-    print("\n" + "-" * 50)
-    print("          SOUS-MENU FILTRAGE SIMPLE (J7)")
-    print("-" * 50)
 
+def gerer_champs(data: Donnees) -> Donnees:
+    """(J12) Gère l'ajout de champs calculés, le retrait (projection) et le renommage de champs."""
+    print("\n[GESTION DES CHAMPS]")
     if not data:
         print("Veuillez d'abord charger les données.")
         input("Appuyez sur Entrée pour continuer...")
         return data
 
-    headers = get_all_headers(data)
+    while True:
+        headers = get_all_headers(data)
+        print("\n" + "-" * 50)
+        print("          GESTION DES CHAMPS (J12)")
+        print("-" * 50)
+        print("Colonnes actuelles :")
+        for i, header in enumerate(headers, 1):
+            print(f"{i}. {header}")
+        print("-" * 50)
+        print("C. Ajouter une colonne calculée (ex. total = price * quantity)")
+        print("R. Retirer des colonnes")
+        print("G. Garder uniquement certaines colonnes (projection)")
+        print("N. Renommer une colonne")
+        print("0. Retour au Menu Principal")
+        print("-" * 50)
 
-    print("Colonnes disponibles pour le filtrage :")
-    for i, header in enumerate(headers, 1):
-        print(f"{i}. {header}")
+        choix = input("Votre choix : ").strip().upper()
+        try:
+            if choix == '0':
+                return data
+            if choix == 'C':
+                print("Opérateurs : + - * / // % ** < <= > >= == != and or not, x if condition else y")
+                print(f"Fonctions : {', '.join(FONCTIONS_EXPRESSION)}, col('nom avec espaces')")
+                data = ajouter_colonne_calculee(data, input("Définition : ").strip())
+                print("Colonne calculée ajoutée.")
+            elif choix == 'R':
+                colonnes = _choisir_colonnes(headers, input("Colonnes à retirer, ex. 2,5 : ").strip())
+                if len(colonnes) == len(headers):
+                    raise ValueError("Impossible de retirer toutes les colonnes.")
+                data = retirer_colonnes(data, colonnes)
+                print(f"{len(colonnes)} colonne(s) retirée(s).")
+            elif choix == 'G':
+                gardees = _choisir_colonnes(headers, input("Colonnes à garder, ex. 1,3,4 : ").strip())
+                retirees = [header for header in headers if header not in gardees]
+                if retirees:
+                    data = retirer_colonnes(data, retirees)
+                print(f"{len(gardees)} colonne(s) conservée(s).")
+            elif choix == 'N':
+                ancien = _choisir_colonnes(headers, input("Numéro de la colonne à renommer : ").strip())[0]
+                data = renommer_colonne(data, ancien, input("Nouveau nom : ").strip())
+                print("Colonne renommée.")
+            else:
+                print("Choix invalide.")
+        except ValueError as e:
+            print(f"Erreur : {e}")
+
+
+# --- REGROUPEMENT ET AGRÉGATION (GROUP BY) ---
+# Les lignes sont regroupées selon les valeurs d'une ou plusieurs colonnes clés, en un seul
+# passage : une table de hachage associe à chaque clé l'état de ses agrégats (nombre, somme...).
+# Chaque fonction d'agrégat sait ajouter une valeur à un état et fusionner deux états partiels.
+# Au-delà de MAX_GROUPES_MEMOIRE groupes, les états partiels sont écrits dans des fichiers
+# temporaires répartis par hachage de la clé, puis chaque partition est fusionnée à son tour :
+# la mémoire reste bornée quel que soit le nombre de groupes, et l'entrée peut être un flux.
+# Le résultat est un nouveau jeu de données (une ligne par groupe, dans l'ordre de première
+# apparition sans débordement) qui se trie, se filtre et se sauvegarde comme les autres.
+# Les agrégats numériques ignorent les valeurs non numériques (booléens comptés comme 0/1).
+
+MAX_GROUPES_MEMOIRE = 500_000  # Groupes gardés en mémoire avant d'écrire les états partiels
+NB_PARTITIONS_GROUPES = 16  # Fichiers temporaires entre lesquels les groupes débordés sont répartis
+
+
+class FonctionAgregat:
+    """
+    Fonction d'agrégat. 'initial' crée l'état vide d'un groupe, 'ajouter' retourne l'état après
+    une valeur, 'fusionner' combine deux états partiels et 'resultat' donne la valeur finale.
+    Les états doivent être sérialisables (pickle) pour pouvoir déborder sur disque.
+    Sans colonne, la fonction reçoit True pour chaque ligne (ex. nombre de lignes du groupe).
+    """
 
-    print("-" * 50)
-    print("0. Annuler et Retour au Menu Principal")
+    __slots__ = ('nom', 'libelle', 'initial', 'ajouter', 'fusionner', 'resultat')
 
-    # --- Étape 1 : Choix de la Colonne ---
-    try:
-        choix_colonne = input("Choisissez le numéro de la colonne à filtrer (ou 0 pour annuler) : ").strip()
-        if choix_colonne == '0':
-            return data
+    def __init__(self, nom: str, libelle: str, initial: Callable[[], Any], ajouter: Callable[[Any, Any], Any],
+                 fusionner: Callable[[Any, Any], Any], resultat: Callable[[Any], Any] = lambda etat: etat):
+        self.nom = nom
+        self.libelle = libelle
+        self.initial = initial
+        self.ajouter = ajouter
+        self.fusionner = fusionner
+        self.resultat = resultat
 
-        index_colonne = int(choix_colonne) - 1
-        if not (0 <= index_colonne < len(headers)):
-            print("Choix de colonne invalide.")
-            input("Appuyez sur Entrée pour continuer...")
-            return data
 
-        cle_filtre = headers[index_colonne]
-    except ValueError:
-        print("Entrée invalide. Veuillez entrer un numéro.")
-        input("Appuyez sur Entrée pour continuer...")
-        return data
+_agregats: Dict[str, FonctionAgregat] = {}
+ALIAS_AGREGATS = {'count': 'nombre', 'sum': 'somme', 'mean': 'moyenne', 'avg': 'moyenne'}
 
-    # --- Étape 2 : Choix de l'Opérateur ---
-    operateurs = {
-        '1': '=',
-        '2': '!=',
-        '3': '>',
-        '4': '<',
-        '5': '>=',
-        '6': '<=',
-        '7': 'contient (texte)',
-        '8': 'commence par (texte)',
-    }
 
-    print(f"\nOpérateurs disponibles pour la colonne '{cle_filtre}' :")
-    for num, op in operateurs.items():
-        print(f"{num}. {op}")
+def enregistrer_agregat(fonction: FonctionAgregat) -> FonctionAgregat:
+    """Ajoute une fonction d'agrégat (ou remplace celle du même nom)."""
+    _agregats[fonction.nom] = fonction
+    return fonction
 
-    choix_op = input("Choisissez le numéro de l'opérateur : ").strip()
-    if choix_op not in operateurs:
-        print("Opérateur invalide.")
-        input("Appuyez sur Entrée pour continuer...")
-        return data
 
-    operateur = operateurs[choix_op]
+def agregat_par_nom(nom: str) -> FonctionAgregat:
+    nom = nom.strip().lower()
+    fonction = _agregats.get(ALIAS_AGREGATS.get(nom, nom))
+    if fonction is None:
+        raise ValueError(f"Fonction d'agrégat inconnue : '{nom}' (disponibles : {', '.join(_agregats)}).")
+    return fonction
 
-    # --- Étape 3 : Saisie de la Valeur Cible ---
-    valeur_cible_str = input(f"Entrez la valeur cible pour l'opération '{operateur}' : ").strip()
 
-    valeur_cible_convertie = convertir_type(valeur_cible_str)
+def _ajouter_minimum(etat: Any, value: Any) -> Any:
+    if isinstance(value, (int, float)) and value == value and (etat is None or value < etat):
+        return value
+    return etat
 
-    print(f"\nApplication du filtre : {cle_filtre} {operateur} {repr(valeur_cible_convertie)}...")
 
-    # --- Étape 4 : Application du Filtre ---
-    donnees_filtrees = []
-    nb_total = len(data)
+def _ajouter_maximum(etat: Any, value: Any) -> Any:
+    if isinstance(value, (int, float)) and value == value and (etat is None or value > etat):
+        return value
+    return etat
+
+
+enregistrer_agregat(FonctionAgregat(
+    'nombre', "Nombre de valeurs non nulles (de lignes sans colonne)", lambda: 0,
+    lambda etat, value: etat if value is None else etat + 1, operator.add))
+enregistrer_agregat(FonctionAgregat(
+    'somme', "Somme des valeurs numériques", lambda: 0,
+    lambda etat, value: etat + value if isinstance(value, (int, float)) else etat, operator.add))
+enregistrer_agregat(FonctionAgregat(
+    'moyenne', "Moyenne des valeurs numériques", lambda: (0, 0),
+    lambda etat, value: (etat[0] + value, etat[1] + 1) if isinstance(value, (int, float)) else etat,
+    lambda a, b: (a[0] + b[0], a[1] + b[1]),
+    lambda etat: etat[0] / etat[1] if etat[1] else None))
+enregistrer_agregat(FonctionAgregat(
+    'min', "Minimum numérique", lambda: None, _ajouter_minimum,
+    lambda a, b: b if a is None else _ajouter_minimum(a, b)))
+enregistrer_agregat(FonctionAgregat(
+    'max', "Maximum numérique", lambda: None, _ajouter_maximum,
+    lambda a, b: b if a is None else _ajouter_maximum(a, b)))
+
+
+_MOTIF_AGREGAT = re.compile(r"\s*(\w+)\s*(?:\(\s*(.*?)\s*\))?\s*$")
+
+
+def analyser_agregats(texte: str) -> List[Tuple[str, Optional[str]]]:
+    """Traduit 'somme(price), moyenne(price), nombre' en [(fonction, colonne ou None), ...]."""
+    agregats = []
+    for morceau in filter(str.strip, texte.split(',')):
+        correspondance = _MOTIF_AGREGAT.match(morceau)
+        if not correspondance:
+            raise ValueError(f"Agrégat invalide : '{morceau.strip()}' (attendu : fonction(colonne)).")
+        nom, colonne = correspondance.groups()
+        colonne = (colonne or '').strip('\'"') or None
+        agregats.append((agregat_par_nom(nom).nom, None if colonne == '*' else colonne))
+    if not agregats:
+        raise ValueError("Indiquez au moins un agrégat (ex. nombre, somme(price)).")
+    return agregats
+
+
+def colonnes_regroupement(cles: List[str], agregats: List[Tuple[str, Optional[str]]]) -> List[str]:
+    """Colonnes du résultat : les clés, puis un 'fonction_colonne' (ou 'fonction') par agrégat."""
+    return cles + [nom if colonne is None else f"{nom}_{colonne}" for nom, colonne in agregats]
+
+
+def _cle_hachable(valeur: Any) -> Any:
+    """Valeur utilisable dans une clé de groupe (une liste devient un tuple)."""
+    if isinstance(valeur, list):
+        return tuple(map(_cle_hachable, valeur))
+    try:
+        hash(valeur)
+        return valeur
+    except TypeError:
+        return repr(valeur)
 
-    is_text_operator = operateur in ('contient (texte)', 'commence par (texte)')
 
-    for item in data:
-        valeur_item = item.get(cle_filtre)
-        match = False
+def _ecrire_partitions(groupes: Dict[Tuple, List[Any]], fichiers: List[str]):
+    """Ajoute les états partiels des groupes à leur partition (hachage de la clé)."""
+    partitions: List[List[Tuple[Tuple, List[Any]]]] = [[] for _ in fichiers]
+    for cle, etats in groupes.items():
+        partitions[hash(cle) % len(fichiers)].append((cle, etats))
+    for chemin, partition in zip(fichiers, partitions):
+        if partition:
+            with open(chemin, 'ab') as f:
+                pickle.dump(partition, f, pickle.HIGHEST_PROTOCOL)
 
-        try:
-            # Opérateurs numériques et d'égalité
-            if operateur == '=':
-                match = (valeur_item == valeur_cible_convertie)
-
-            elif operateur == '!=':
-                match = (valeur_item != valeur_cible_convertie)
-
-            elif operateur in ('>', '<', '>=', '<='):
-                if isinstance(valeur_item, (int, float)) and isinstance(valeur_cible_convertie, (int, float)):
-                    if operateur == '>':
-                        match = (valeur_item > valeur_cible_convertie)
-                    elif operateur == '<':
-                        match = (valeur_item < valeur_cible_convertie)
-                    elif operateur == '>=':
-                        match = (valeur_item >= valeur_cible_convertie)
-                    elif operateur == '<=':
-                        match = (valeur_item <= valeur_cible_convertie)
-
-            # Opérateurs de texte (recherche)
-            elif is_text_operator:
-                if isinstance(valeur_item, str):
-                    cible_lower = valeur_cible_str.lower()
-                    item_lower = valeur_item.lower()
-
-                    if operateur == 'contient (texte)':
-                        match = cible_lower in item_lower
-                    elif operateur == 'commence par (texte)':
-                        match = item_lower.startswith(cible_lower)
-
-        except Exception:
-            pass
 
-        if match:
-            donnees_filtrees.append(item)
+def _lire_partition(chemin: str) -> Iterator[List[Tuple[Tuple, List[Any]]]]:
+    if not os.path.exists(chemin):
+        return
+    with open(chemin, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
 
-    # --- Étape 5 : Résultat et Retour ---
-    nb_filtre = len(donnees_filtrees)
-    print(f"\nFiltre appliqué avec succès : {nb_filtre} enregistrement(s) conservé(s) sur {nb_total}.")
 
-    if nb_filtre == 0:
-        print("Aucun enregistrement ne correspond au critère de filtrage.")
+def regrouper(data: Union[Donnees, Iterable[Dict[str, Any]]], cles: List[str],
+              agregats: List[Tuple[str, Optional[str]]], max_groupes: int = MAX_GROUPES_MEMOIRE,
+              dossier_temp: Optional[str] = None) -> FluxDonnees:
+    """
+    Regroupe une DataList, une TableColonnes ou un flux selon les colonnes 'cles' et produit
+    un enregistrement par groupe avec les agrégats [(fonction, colonne ou None), ...].
+    """
+    if not cles:
+        raise ValueError("Indiquez au moins une colonne de regroupement.")
+    fonctions = [agregat_par_nom(nom) for nom, _ in agregats]
+    noms = colonnes_regroupement(cles, agregats)
+    colonnes = cles + [colonne for _, colonne in agregats]
+    if isinstance(data, TableColonnes):
+        lignes = zip(*[itertools.repeat(True) if colonne is None else valeurs_colonne(data, colonne)
+                       for colonne in colonnes])
+    else:
+        # record.get(colonne, défaut) : True pour un agrégat sans colonne, None pour un champ absent
+        defauts = [True if colonne is None else None for colonne in colonnes]
+        lignes = (tuple(map(record.get, colonnes, defauts)) for record in data)
+
+    nb_cles = len(cles)
+    ajouts = [(nb_cles + j, j, fonction.ajouter) for j, fonction in enumerate(fonctions)]
+    initiaux = [fonction.initial for fonction in fonctions]
+    groupes: Dict[Tuple, List[Any]] = {}
+
+    with tempfile.TemporaryDirectory(prefix='data_filter_groupes_', dir=dossier_temp) as dossier:
+        fichiers: List[str] = []
+        for valeurs in lignes:
+            cle = valeurs[:nb_cles]
+            try:
+                etats = groupes.get(cle)
+            except TypeError:  # Valeur non hachable (liste) dans la clé
+                cle = tuple(map(_cle_hachable, cle))
+                etats = groupes.get(cle)
+            if etats is None:
+                if len(groupes) >= max_groupes:
+                    # Agrégation partielle : les états courants partent sur disque, la table repart vide
+                    fichiers = fichiers or [os.path.join(dossier, f"partition_{i}.pkl")
+                                            for i in range(NB_PARTITIONS_GROUPES)]
+                    _ecrire_partitions(groupes, fichiers)
+                    groupes.clear()
+                etats = groupes[cle] = [initial() for initial in initiaux]
+            for i, j, ajouter in ajouts:
+                etats[j] = ajouter(etats[j], valeurs[i])
+
+        if fichiers:
+            _ecrire_partitions(groupes, fichiers)
+            groupes.clear()
+            parties = (_fusionner_partition(chemin, fonctions) for chemin in fichiers)
+        else:
+            parties = (groupes,)
+        for partie in parties:
+            for cle, etats in partie.items():
+                yield dict(zip(noms, itertools.chain(
+                    cle, (fonction.resultat(etat) for fonction, etat in zip(fonctions, etats)))))
+
+
+def _fusionner_partition(chemin: str, fonctions: List[FonctionAgregat]) -> Dict[Tuple, List[Any]]:
+    """Fusionne les états partiels d'une partition (chaque clé n'appartient qu'à une partition)."""
+    groupes: Dict[Tuple, List[Any]] = {}
+    fusions = [fonction.fusionner for fonction in fonctions]
+    for paquet in _lire_partition(chemin):
+        for cle, etats in paquet:
+            existants = groupes.get(cle)
+            if existants is None:
+                groupes[cle] = etats
+            else:
+                groupes[cle] = [fusionner(a, b) for fusionner, a, b in zip(fusions, existants, etats)]
+    return groupes
+
+
+@instrumenter('regroupement')
+def regrouper_donnees(data: Donnees, cles: List[str], agregats: List[Tuple[str, Optional[str]]]) -> Donnees:
+    """Regroupement d'un jeu de données chargé ; le résultat garde sa représentation (lignes ou colonnes)."""
+    headers = get_all_headers(data)
+    inconnues = [colonne for colonne in cles + [c for _, c in agregats if c is not None] if colonne not in headers]
+    if inconnues:
+        raise ValueError(f"Colonne(s) inconnue(s) : {', '.join(dict.fromkeys(inconnues))}")
+    resultat = list(regrouper(data, cles, agregats))
+    return TableColonnes.depuis_datalist(resultat) if isinstance(data, TableColonnes) else resultat
+
+
+def gerer_regroupement(data: Donnees) -> Donnees:
+    """Gère le sous-menu de regroupement : colonnes clés et agrégats, puis remplacement des données."""
+    print("\n" + "-" * 50)
+    print("          REGROUPEMENT ET AGRÉGATION (GROUP BY)")
+    print("-" * 50)
+    if not data:
+        print("Veuillez d'abord charger les données.")
         input("Appuyez sur Entrée pour continuer...")
         return data
 
-    print("Les données ont été mises à jour avec le résultat du filtre.")
-    input("Appuyez sur Entrée pour continuer...")
-    return donnees_filtrees
+    headers = get_all_headers(data)
+    print("Colonnes disponibles :")
+    for i, header in enumerate(headers, 1):
+        print(f"{i}. {header}")
+    print("-" * 50)
+    print("Fonctions d'agrégat :")
+    for fonction in _agregats.values():
+        print(f"  {fonction.nom:<10} {fonction.libelle}")
+    print("-" * 50)
+
+    try:
+        saisie = input("Colonnes de regroupement, ex. 2,4 (Entrée pour annuler) : ").strip()
+        if not saisie:
+            return data
+        cles = _choisir_colonnes(headers, saisie)
+        agregats = analyser_agregats(input("Agrégats, ex. nombre, somme(price), moyenne(price) : ").strip())
+        resultat = regrouper_donnees(data, cles, agregats)
+    except ValueError as ve:
+        print(f"Erreur : {ve}")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
 
+    print(f"\n{len(resultat)} groupe(s) sur {len(data)} enregistrement(s).")
+    afficher_donnees(resultat)
+    if input("Remplacer les données par ce résultat ? (o/N) : ").strip().lower() != 'o':
+        return data
 
-def gerer_tri(data: DataList) -> DataList:
-    """(J8) Gère le sous-menu de tri multicritère."""
+    # Nouveau jeu de données, comme après un chargement : l'historique repart de celui-ci
+    obtenir_catalogue(resultat)
+    description = "Regroupement : " + ", ".join(cles) + " -> " + ", ".join(colonnes_regroupement([], agregats))
+    historique.reinitialiser(resultat, description)
+    print("Les données ont été remplacées par le résultat du regroupement.")
+    return resultat
+
+
+# --- JOINTURE ET DÉDOUBLONNAGE ---
+# Jointure par hachage entre les données chargées (à gauche) et un second jeu de données
+# (à droite) : le plus petit des deux est indexé (clé -> positions de ses lignes), l'autre est
+# parcouru une seule fois en produisant directement les lignes du résultat, sans liste
+# intermédiaire de paires. Trois modes : 'interne' (lignes qui se correspondent), 'gauche'
+# (toutes les lignes de gauche, complétées par None sans correspondance) et 'anti' (lignes
+# de gauche sans correspondance). Une clé contenant None ne correspond à rien.
+# Quand la gauche est indexée, ses lignes sans correspondance viennent après les autres.
+#
+# Le dédoublonnage garde une ligne par valeur des colonnes choisies (la première ou la
+# dernière) ; c'est une sélection de lignes, annulable dans l'historique.
+
+MODES_JOINTURE = {'interne': "lignes présentes des deux côtés",
+                  'gauche': "toutes les lignes de gauche (None sans correspondance)",
+                  'anti': "lignes de gauche sans correspondance à droite"}
+SUFFIXE_JOINTURE = '_2'  # Ajouté aux colonnes de droite dont le nom existe déjà à gauche
+
+
+def _cles_lignes(data: Donnees, cles: List[str]) -> Iterator[Tuple]:
+    """Clé (tuple des valeurs des colonnes 'cles') de chaque ligne, dans l'ordre."""
+    if isinstance(data, TableColonnes):
+        return zip(*[data.colonne(cle) for cle in cles])
+    return (tuple(map(record.get, cles)) for record in data)
+
+
+def _indexer_cles(data: Donnees, cles: List[str]) -> Dict[Tuple, List[int]]:
+    """Table de hachage clé -> positions des lignes (les clés contenant None sont ignorées)."""
+    table: Dict[Tuple, List[int]] = {}
+    for i, cle in enumerate(_cles_lignes(data, cles)):
+        if None in cle:
+            continue
+        try:
+            positions = table.get(cle)
+        except TypeError:  # Valeur non hachable (liste) dans la clé
+            cle = tuple(map(_cle_hachable, cle))
+            positions = table.get(cle)
+        if positions is None:
+            table[cle] = [i]
+        else:
+            positions.append(i)
+    return table
+
+
+def _correspondances(table: Dict[Tuple, List[int]], cle: Tuple) -> List[int]:
+    if None in cle:
+        return []
+    try:
+        return table.get(cle, [])
+    except TypeError:
+        return table.get(tuple(map(_cle_hachable, cle)), [])
+
+
+def joindre(gauche: Donnees, droite: Donnees, cles_gauche: List[str], cles_droite: Optional[List[str]] = None,
+            mode: str = 'interne', suffixe: str = SUFFIXE_JOINTURE) -> FluxDonnees:
+    """
+    Jointure par hachage (voir l'en-tête de section). Les colonnes clés de droite ne sont pas
+    reprises ; les autres colonnes de droite dont le nom existe à gauche reçoivent 'suffixe',
+    répété jusqu'à obtenir un nom libre (ex. 'prix_2_2' si 'prix_2' existe déjà).
+    """
+    cles_droite = cles_droite or cles_gauche
+    if not cles_gauche or len(cles_gauche) != len(cles_droite):
+        raise ValueError("Indiquez autant de colonnes clés à gauche qu'à droite (au moins une).")
+    if mode not in MODES_JOINTURE:
+        raise ValueError(f"Mode de jointure inconnu : '{mode}' (modes : {', '.join(MODES_JOINTURE)}).")
+
+    entetes_gauche = set(get_all_headers(gauche))
+    colonnes_droite = [] if mode == 'anti' else [nom for nom in get_all_headers(droite) if nom not in cles_droite]
+    # Un nom suffixé ne doit écraser aucune colonne de gauche ni une autre colonne de droite
+    utilises = entetes_gauche.union(colonnes_droite)
+    renommage = []
+    for nom in colonnes_droite:
+        sortie = nom
+        if nom in entetes_gauche:
+            while sortie in utilises:
+                sortie += suffixe
+            utilises.add(sortie)
+        renommage.append((nom, sortie))
+    vides = dict.fromkeys(sortie for _, sortie in renommage)
+
+    def assembler(ligne_gauche: Dict[str, Any], ligne_droite: Dict[str, Any]) -> Dict[str, Any]:
+        ligne = dict(ligne_gauche)  # Nouvelle ligne : le résultat ne partage rien avec les sources
+        for nom, sortie in renommage:
+            ligne[sortie] = ligne_droite.get(nom)
+        return ligne
+
+    if len(droite) <= len(gauche):
+        # Droite indexée, gauche parcourue : l'ordre des lignes de gauche est conservé
+        table = _indexer_cles(droite, cles_droite)
+        for ligne, cle in zip(gauche, _cles_lignes(gauche, cles_gauche)):
+            positions = _correspondances(table, cle)
+            if mode == 'interne':
+                for p in positions:
+                    yield assembler(ligne, droite[p])
+            elif mode == 'gauche':
+                if positions:
+                    for p in positions:
+                        yield assembler(ligne, droite[p])
+                else:
+                    yield {**ligne, **vides}
+            elif not positions:
+                yield dict(ligne)
+        return
+
+    # Gauche indexée, droite parcourue : on note les lignes de gauche qui ont trouvé une correspondance
+    table = _indexer_cles(gauche, cles_gauche)
+    trouvees = bytearray(len(gauche))
+    for ligne, cle in zip(droite, _cles_lignes(droite, cles_droite)):
+        for p in _correspondances(table, cle):
+            trouvees[p] = 1
+            if mode != 'anti':
+                yield assembler(gauche[p], ligne)
+    if mode != 'interne':
+        for p in itertools.compress(range(len(gauche)), map(operator.not_, trouvees)):
+            yield {**gauche[p], **vides}
+
+
+@instrumenter('jointure')
+def joindre_donnees(data: Donnees, autre: Donnees, cles_gauche: List[str], cles_droite: Optional[List[str]] = None,
+                    mode: str = 'interne') -> Donnees:
+    """Jointure des données chargées avec 'autre' ; le résultat garde la représentation de 'data'."""
+    headers, headers_autre = get_all_headers(data), get_all_headers(autre)
+    inconnues = [cle for cle in cles_gauche if cle not in headers] + \
+                [cle for cle in (cles_droite or cles_gauche) if cle not in headers_autre]
+    if inconnues:
+        raise ValueError(f"Colonne(s) clé(s) inconnue(s) : {', '.join(dict.fromkeys(inconnues))}")
+    resultat = list(joindre(data, autre, cles_gauche, cles_droite, mode))
+    return TableColonnes.depuis_datalist(resultat) if isinstance(data, TableColonnes) else resultat
+
+
+@instrumenter('dedoublonnage')
+def positions_uniques(data: Donnees, cles: Optional[List[str]] = None, garder: str = 'premier') -> array:
+    """
+    Positions (dans l'ordre d'origine) des lignes gardées : une par valeur des colonnes 'cles'
+    (toutes les colonnes par défaut), la première rencontrée ou la dernière selon 'garder'.
+    """
+    if garder not in ('premier', 'dernier'):
+        raise ValueError("'garder' doit valoir 'premier' ou 'dernier'.")
+    cles_lignes = _cles_lignes(data, cles or get_all_headers(data))
+    lignes: Iterable[Tuple[int, Tuple]] = enumerate(cles_lignes)
+    if garder == 'dernier':
+        cles_lignes = list(cles_lignes)
+        lignes = zip(range(len(cles_lignes) - 1, -1, -1), reversed(cles_lignes))
+
+    vues = set()
+    positions = _vecteur_positions((), len(data))
+    for i, cle in lignes:
+        nb_vues = len(vues)
+        try:
+            vues.add(cle)
+        except TypeError:
+            vues.add(tuple(map(_cle_hachable, cle)))
+        if len(vues) != nb_vues:
+            positions.append(i)
+    if garder == 'dernier':
+        positions.reverse()
+    return positions
+
+
+def gerer_jointure(data: Donnees) -> Donnees:
+    """Gère le sous-menu de jointure avec un second jeu de données et de dédoublonnage."""
+    print("\n" + "-" * 50)
+    print("          JOINTURE ET DÉDOUBLONNAGE")
+    print("-" * 50)
     if not data:
-        print("\n[SOUS-MENU TRI] Veuillez d'abord charger les données.")
+        print("Veuillez d'abord charger les données.")
         input("Appuyez sur Entrée pour continuer...")
         return data
 
+    print("J. Joindre un second jeu de données (jointure par clé)")
+    print("D. Dédoublonner selon des colonnes")
+    print("0. Retour au Menu Principal")
+    choix = input("Votre choix : ").strip().upper()
     headers = get_all_headers(data)
 
-    # Liste de tuples pour stocker les critères: [(clé_colonne, reverse_bool), ...]
-    critere_tri: List[Tuple[str, bool]] = []
-
-    while True:
-        print("\n" + "-" * 50)
-        print("          SOUS-MENU TRI (J8 - Multicritère et Linguistique)")
+    try:
+        if choix == 'D':
+            for i, header in enumerate(headers, 1):
+                print(f"{i}. {header}")
+            saisie = input("Colonnes formant la clé, ex. 1,3 (Entrée pour toutes) : ").strip()
+            cles = _choisir_colonnes(headers, saisie) if saisie else headers
+            garder = 'dernier' if input("Garder la première (p) ou la dernière (d) occurrence ? (p/d) : ") \
+                .strip().lower() == 'd' else 'premier'
+            positions = positions_uniques(data, cles, garder)
+            print(f"\n{len(data) - len(positions)} doublon(s) retiré(s), {len(positions)} enregistrement(s) conservé(s).")
+            if len(positions) != len(data):
+                data = historique.enregistrer_selection(
+                    data, positions, f"Dédoublonnage : {', '.join(cles)} ({garder})")
+            input("Appuyez sur Entrée pour continuer...")
+            return data
 
-        # Afficher les critères déjà sélectionnés
-        if critere_tri:
-            print(f"Critères actuels ({len(critere_tri)}) :")
-            for i, (cle, reverse) in enumerate(critere_tri, 1):
-                direction = "DESC" if reverse else "ASC"
-                print(f"  {i}. {cle} ({direction})")
-            print("-" * 50)
+        if choix != 'J':
+            return data
 
-        # Afficher les colonnes disponibles avec index
-        print("Colonnes disponibles :")
+        print("\nChargement du jeu de données à joindre (à droite) :")
+        autre = charger_donnees()
+        if not autre:
+            return data
+        headers_autre = get_all_headers(autre)
+        print("\nColonnes des données actuelles (gauche) :")
         for i, header in enumerate(headers, 1):
             print(f"{i}. {header}")
+        cles_gauche = _choisir_colonnes(headers, input("Colonnes clés à gauche, ex. 1 : ").strip())
+        print("\nColonnes du second jeu de données (droite) :")
+        for i, header in enumerate(headers_autre, 1):
+            print(f"{i}. {header}")
+        saisie = input("Colonnes clés à droite (Entrée pour les mêmes noms) : ").strip()
+        cles_droite = _choisir_colonnes(headers_autre, saisie) if saisie else cles_gauche
+        for i, (mode, libelle) in enumerate(MODES_JOINTURE.items(), 1):
+            print(f"{i}. {mode} : {libelle}")
+        choix_mode = input("Mode de jointure (Entrée = interne) : ").strip() or '1'
+        if not (choix_mode.isdigit() and 1 <= int(choix_mode) <= len(MODES_JOINTURE)):
+            raise ValueError("Mode de jointure invalide.")
+        mode = list(MODES_JOINTURE)[int(choix_mode) - 1]
+        resultat = joindre_donnees(data, autre, cles_gauche, cles_droite, mode)
+    except ValueError as ve:
+        print(f"Erreur : {ve}")
+        input("Appuyez sur Entrée pour continuer...")
+        return data
 
-        print("-" * 50)
-        print("A. Ajouter un critère de tri (Niveau supérieur)")
-        print("E. Exécuter le tri")
-        print("0. Annuler et Retour au Menu Principal")
-        print("-" * 50)
+    print(f"\nJointure {mode} : {len(resultat)} enregistrement(s) ({len(data)} à gauche, {len(autre)} à droite).")
+    afficher_donnees(resultat)
+    if not resultat or input("Remplacer les données par ce résultat ? (o/N) : ").strip().lower() != 'o':
+        return data
 
-        choix_action = input("Votre choix (A, E, ou 0) : ").strip().upper()
+    # Nouveau jeu de données, comme après un chargement : l'historique repart de celui-ci
+    obtenir_catalogue(resultat)
+    historique.reinitialiser(resultat, f"Jointure {mode} : {', '.join(cles_gauche)} = {', '.join(cles_droite)}")
+    print("Les données ont été remplacées par le résultat de la jointure.")
+    return resultat
 
-        if choix_action == '0':
-            return data
 
-        if choix_action == 'E':
-            if not critere_tri:
-                print("Veuillez ajouter au moins un critère avant d'exécuter.")
-                continue
-            break  # Sortir de la boucle pour exécuter le tri
+# --- PIPELINE EN FLUX (STREAMING) ---
+# Chargement -> filtre -> projection -> sauvegarde sans jamais matérialiser de DataList :
+# un seul enregistrement à la fois est en mémoire, quelle que soit la taille du fichier.
 
-        if choix_action == 'A':
-            # 1. Choix de la colonne
-            choix_colonne = input("Choisissez le NUMÉRO de la colonne à ajouter : ").strip()
-            try:
-                index_colonne = int(choix_colonne) - 1
-                if 0 <= index_colonne < len(headers):
-                    cle_tri = headers[index_colonne]
-                else:
-                    print("Choix de colonne invalide.")
-                    continue
-            except ValueError:
-                print("Entrée invalide. Veuillez entrer un numéro.")
-                continue
+def filtrer_flux(records: Iterable[Dict[str, Any]],
+                 predicat: Callable[[Dict[str, Any]], bool]) -> FluxDonnees:
+    """Étape de filtrage paresseuse : ne laisse passer que les enregistrements retenus."""
+    for record in records:
+        if predicat(record):
+            yield record
 
-            # 2. Choix de l'ordre
-            choix_ordre = input(
-                f"Sens du tri pour '{cle_tri}' (a/A pour Ascendant, d/D pour Descendant) : ").strip().lower()
-            if choix_ordre not in ('a', 'd'):
-                print("Ordre de tri invalide. Utilisez 'a' ou 'd'.")
-                continue
 
-            reverse_sort = (choix_ordre == 'd')
+def projeter_flux(records: Iterable[Dict[str, Any]], colonnes: List[str]) -> FluxDonnees:
+    """Étape de projection paresseuse : ne conserve que les colonnes demandées, dans l'ordre donné."""
+    for record in records:
+        yield {col: record.get(col) for col in colonnes}
 
-            # Ajout du critère à la liste
-            critere_tri.append((cle_tri, reverse_sort))
-            print(f"Critère '{cle_tri}' ajouté comme niveau {len(critere_tri)}.")
 
-        else:
-            print("Action invalide.")
-            continue
+def _choisir_colonnes(headers: List[str], saisie: str) -> List[str]:
+    """Traduit une saisie du type '1,3,4' en liste de noms de colonnes."""
+    colonnes = []
+    for morceau in saisie.split(','):
+        index_colonne = int(morceau.strip()) - 1
+        if not (0 <= index_colonne < len(headers)):
+            raise ValueError(f"Numéro de colonne hors limites : {morceau.strip()}")
+        colonnes.append(headers[index_colonne])
+    return colonnes
 
-    # --- Exécution du Tri Multicritère ---
-    print(f"\nExécution du tri sur {len(critere_tri)} critère(s)...")
 
-    # 1. Configuration de la locale pour le tri linguistique (si possible)
-    use_locale_sort = False
-    try:
-        # Tenter de définir la locale pour un tri linguistique correct
-        locale.setlocale(locale.LC_COLLATE, 'fr_FR.UTF-8')
-        use_locale_sort = True
-        print("Note: Tri linguistique (français) activé.")
-    except locale.Error:
-        try:
-            locale.setlocale(locale.LC_COLLATE, 'fr_FR')
-            use_locale_sort = True
-            print("Note: Tri linguistique (français) activé (locale générique).")
-        except locale.Error:
-            use_locale_sort = False
-            print("AVERTISSEMENT: Locale 'fr' non disponible. Retour au tri par défaut (Unicode).")
-            locale.setlocale(locale.LC_COLLATE, 'C')
+def traitement_flux():
+    """
+    Gère le sous-menu du traitement en flux : un fichier source est filtré et projeté
+    puis écrit directement dans le fichier de destination, à mémoire constante.
+    """
+    print("\n" + "-" * 50)
+    print("          TRAITEMENT EN FLUX (Fichier -> Fichier)")
+    print("-" * 50)
 
-    # 2. Tri stable par critère (du moins important au plus important)
-    # On commence avec une copie de la liste pour ne pas modifier l'originale
-    data_triee = list(data)
-
-    # Parcourir les critères en ordre INVERSE (du dernier critère au premier)
-    # critere_tri[0] est le critère Primaire, critere_tri[-1] est le Dernier critère
-    for cle_tri, reverse_sort in reversed(critere_tri):
-
-        # Définition de la fonction clé pour la colonne actuelle
-        def tri_key_multi(item):
-            value = item.get(cle_tri)
-
-            # La logique de tri par rang et type est cruciale pour la stabilité
-            if isinstance(value, (int, float)):
-                # Rang 0 : Numérique
-                return (0, value)
-            if isinstance(value, bool):
-                # Rang 1 : Booléen
-                return (1, value)
-            if isinstance(value, str):
-                # Rang 2 : Chaîne (avec tri linguistique si possible)
-                if use_locale_sort:
-                    return (2, locale.strxfrm(value))
-                else:
-                    return (2, value)
-            if value is None:
-                # Rang 3 : None (toujours à la fin)
-                return (3, 0)
+    # --- Étape 1 : Source ---
+    choix_source = _choisir_format('lire', "Lire un fichier")
+    if choix_source is None:
+        return
 
-            # Rang 4 : Types complexes
-            return (4, str(value))
+    chemin_source = input("Entrez le chemin du fichier source : ").strip()
 
-        # Appliquer le tri sur le résultat du tri précédent.
-        # Python's sorted() est stable, ce qui préserve l'ordre des éléments égaux.
-        data_triee = sorted(data_triee, key=tri_key_multi, reverse=reverse_sort)
+    try:
+        format_source = detecter_format(chemin_source) if choix_source == 'A' else choix_source
+        flux = format_source.lire(chemin_source)
+        # On lit le premier enregistrement pour connaître les colonnes, puis on le réinjecte
+        premier = next(flux, None)
+        if premier is None:
+            print("Le fichier source ne contient aucun enregistrement.")
+            input("Appuyez sur Entrée pour continuer...")
+            return
+        headers = list(premier.keys())
+        flux = itertools.chain([premier], flux)
 
-    print("Tri multicritère terminé. Les données ont été mises à jour.")
-    input("Appuyez sur Entrée pour continuer...")
-    return data_triee
+        print("\nColonnes détectées :")
+        for i, header in enumerate(headers, 1):
+            print(f"{i}. {header}")
 
+        # --- Étape 2 : Filtre optionnel ---
+        choix_colonne = input("Numéro de la colonne à filtrer, E pour une expression (Entrée pour aucun filtre) : ").strip()
+        if choix_colonne.upper() == 'E':
+            expression = input("Entrez l'expression de filtre : ").strip()
+            _, predicat, _, _ = compiler_filtre(analyser_filtre(expression), echantillon=[premier])
+            flux = filtrer_flux(flux, predicat)
+        elif choix_colonne:
+            cle_filtre = _choisir_colonnes(headers, choix_colonne)[0]
+            for num, op in OPERATEURS_FILTRE.items():
+                print(f"{num}. {op}")
+            choix_op = input("Choisissez le numéro de l'opérateur : ").strip()
+            if choix_op not in OPERATEURS_FILTRE:
+                raise ValueError("Opérateur invalide.")
+            operateur = OPERATEURS_FILTRE[choix_op]
+            valeur_cible_str = input(invite_valeur_cible(operateur)).strip()
+            flux = filtrer_flux(flux, construire_predicat(cle_filtre, operateur, valeur_cible_str))
+
+        # --- Étape 3 : Projection optionnelle ---
+        choix_proj = input("Colonnes à conserver, ex. 1,3 (Entrée pour toutes) : ").strip()
+        if choix_proj:
+            flux = projeter_flux(flux, _choisir_colonnes(headers, choix_proj))
+
+        # --- Étape 4 : Regroupement optionnel (mémoire bornée, débordement sur disque) ---
+        choix_groupe = input("Colonnes de regroupement, ex. 2,4 (Entrée pour aucun regroupement) : ").strip()
+        if choix_groupe:
+            cles = _choisir_colonnes(headers, choix_groupe)
+            agregats = analyser_agregats(input("Agrégats, ex. nombre, somme(price), moyenne(price) : ").strip())
+            flux = regrouper(flux, cles, agregats)
+            headers = colonnes_regroupement(cles, agregats)
+            print("Colonnes du résultat : " + ", ".join(f"{i}. {header}" for i, header in enumerate(headers, 1)))
+
+        # --- Étape 5 : Tri externe optionnel ---
+        choix_tri = input("Critères de tri, ex. 3d,2a (Entrée pour aucun tri) : ").strip()
+        if choix_tri:
+            critere_tri = _saisir_criteres_tri(headers, choix_tri)
+            choix_budget = input("Budget mémoire du tri en Mo (Entrée = "
+                                 f"{BUDGET_TRI_EXTERNE // (1024 * 1024)}) : ").strip()
+            budget = int(choix_budget) * 1024 * 1024 if choix_budget else BUDGET_TRI_EXTERNE
+            flux = tri_externe(flux, critere_tri, configurer_locale_tri(), budget)
+
+        # --- Étape 6 : Destination ---
+        destinations = formats_disponibles('ecrire')
+        for num, format_dest in enumerate(destinations, 1):
+            print(f"{num}. Écrire en {format_dest.libelle}")
+        print("S. Calculer les statistiques (aucun fichier écrit)")
+        choix_dest = input("Format du fichier de destination : ").strip()
+        if choix_dest.upper() == 'S':
+            stats = calculer_statistiques(flux)
+            print(f"\n[STATISTIQUES EN FLUX] {stats.nb_enregistrements} enregistrement(s) analysé(s).")
+            afficher_tableau_statistiques(stats)
+            input("Appuyez sur Entrée pour continuer...")
+            return
+        if not (choix_dest.isdigit() and 1 <= int(choix_dest) <= len(destinations)):
+            raise ValueError("Format de destination invalide.")
+        chemin_dest = input("Entrez le chemin du fichier de sortie : ").strip()
+        if not chemin_dest:
+            raise ValueError("Chemin du fichier non valide.")
+
+        format_dest = destinations[int(choix_dest) - 1]
+        nb_ecrits = format_dest.ecrire(flux, chemin_dest)
+        print(f"Succès : {nb_ecrits} enregistrements écrits au format {format_dest.libelle} dans '{chemin_dest}'.")
+
+    except FileNotFoundError:
+        print(f"Erreur : Le fichier à l'emplacement '{chemin_source}' n'a pas été trouvé.")
+    except ValueError as ve:
+        print(f"Erreur : {ve}")
+    except Exception as e:
+        print(f"Erreur lors du traitement en flux ({type(e).__name__}): {e}")
 
-def gerer_historique(data: DataList) -> DataList:
-    """(J12) Gère les opérations Undo/Redo."""
-    print("\n[HISTORIQUE - UNDO/REDO]")
-    print("Fonctionnalité en cours de développement (J12).")
     input("Appuyez sur Entrée pour continuer...")
-    return data
 
 
-def gerer_champs(data: DataList) -> DataList:
-    """(J12) Gère l'ajout ou le retrait de champs."""
-    print("\n[GESTION DES CHAMPS]")
+# --- MODE LOT (SANS INTERFACE) ---
+# Une spécification de traitement (arguments de la ligne de commande ou fichier YAML/JSON)
+# est appliquée à chaque fichier d'un motif glob, chaque fichier étant une tâche confiée à
+# un pool de processus. Exemple de fichier de tâche :
+#
+#   entrees: "donnees/*.csv"          # motif glob (ou liste de motifs)
+#   filtre: "price > 10 ET quantity <= 5"
+#   tri: "price:d,name"               # colonne[:a|d], séparées par des virgules
+#   colonnes: [id, name, price]       # projection (facultatif)
+#   limite: 100                       # facultatif
+#   sortie: "resultats/{nom}.json"    # {nom} : nom du fichier source sans extension
+#   statistiques: "resultats/{nom}.stats.json"
+#   processus: 4
+#
+# Sans tri, chaque fichier est traité en flux (mémoire constante) ; avec un tri, via PlanRequete.
+
+def _fonction_format(chemin: str, format_impose: Optional[str], operation: str) -> Callable:
+    """Fonction 'lire' ou 'ecrire' du format d'un fichier (imposé, sinon détecté)."""
+    format_donnees = detecter_format(chemin, format_impose)
+    fonction = getattr(format_donnees, operation)
+    if fonction is None:
+        raise ValueError(f"Le format {format_donnees.libelle} ne permet pas l'opération '{operation}'.")
+    return fonction
+
+
+def _lire_fichier_tache(chemin: str) -> Dict[str, Any]:
+    """Lit un fichier de tâche JSON ou YAML (yaml n'est importé que si nécessaire)."""
+    with open(chemin, 'r', encoding='utf-8') as f:
+        if chemin.lower().endswith('.json'):
+            spec = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Les fichiers de tâche YAML demandent le paquet 'PyYAML' "
+                                 "(pip install pyyaml) ; utilisez sinon un fichier .json.") from None
+            try:
+                spec = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Fichier de tâche YAML invalide : {e}") from e
+    if not isinstance(spec or {}, dict):
+        raise ValueError("Le fichier de tâche doit contenir un dictionnaire d'options.")
+    return spec or {}
+
+
+def analyser_tri_texte(texte: Union[str, List[str]]) -> List[Tuple[str, bool]]:
+    """Traduit 'price:d,name' (ou ['price:d', 'name']) en critères de tri [(colonne, décroissant)]."""
+    morceaux = texte.split(',') if isinstance(texte, str) else texte
+    critere_tri = []
+    for morceau in morceaux:
+        cle, _, sens = morceau.strip().partition(':')
+        sens = sens.strip().lower() or 'a'
+        if not cle or sens not in ('a', 'asc', 'd', 'desc'):
+            raise ValueError(f"Critère de tri invalide : '{morceau}' (attendu : colonne[:a|d]).")
+        critere_tri.append((cle.strip(), sens.startswith('d')))
+    return critere_tri
+
+
+def _compter(records: Iterable[Dict[str, Any]], compteur: List[int]) -> FluxDonnees:
+    """Laisse passer le flux en comptant ses enregistrements dans compteur[0]."""
+    for record in records:
+        compteur[0] += 1
+        yield record
+
+
+def _alimenter_statistiques(records: Iterable[Dict[str, Any]], stats: StatistiquesDonnees) -> FluxDonnees:
+    """Laisse passer le flux en alimentant les accumulateurs de statistiques."""
+    for record in records:
+        stats.ajouter_enregistrement(record)
+        yield record
+
+
+def executer_tache(spec: Dict[str, Any], chemin: str) -> Dict[str, Any]:
+    """
+    Applique la spécification à un fichier ; ne lève jamais d'exception.
+    Retourne le rapport de la tâche (statut, lignes lues et écrites, durée, sortie ou erreur).
+    """
+    debut = time.perf_counter()
+    nom = os.path.splitext(os.path.basename(chemin))[0]
+    rapport: Dict[str, Any] = {'fichier': chemin, 'statut': 'ok', 'lues': 0, 'ecrites': 0}
+    try:
+        # Les messages des fonctions interactives n'ont pas leur place dans le rapport
+        with contextlib.redirect_stdout(io.StringIO()):
+            lecteur = _fonction_format(chemin, spec.get('format'), 'lire')
+            sortie = spec['sortie'].format(nom=nom, ext=os.path.splitext(chemin)[1].lstrip('.'))
+            ecrivain = _fonction_format(sortie, spec.get('format_sortie'), 'ecrire')
+            stats = StatistiquesDonnees() if spec.get('statistiques') else None
+
+            if spec.get('tri'):
+                data = list(lecteur(chemin))
+                rapport['lues'] = len(data)
+                plan = PlanRequete(data)
+                if spec.get('filtre'):
+                    plan.filtrer(spec['filtre'])
+                plan.trier(analyser_tri_texte(spec['tri']))
+                if spec.get('colonnes'):
+                    plan.projeter(spec['colonnes'])
+                if spec.get('limite') is not None:
+                    plan.limiter(int(spec['limite']))
+                resultat: Iterable[Dict[str, Any]] = plan.resultat()
+            else:
+                lues = [0]
+                resultat = _compter(lecteur(chemin), lues)
+                if spec.get('filtre'):
+                    _, predicat, _, _ = compiler_filtre(analyser_filtre(spec['filtre']))
+                    resultat = filtrer_flux(resultat, predicat)
+                if spec.get('colonnes'):
+                    resultat = projeter_flux(resultat, spec['colonnes'])
+                if spec.get('limite') is not None:
+                    resultat = itertools.islice(resultat, int(spec['limite']))
+
+            if stats is not None:
+                resultat = _alimenter_statistiques(resultat, stats)
+            os.makedirs(os.path.dirname(sortie) or '.', exist_ok=True)
+            rapport['ecrites'] = ecrivain(resultat, sortie)
+            rapport['sortie'] = sortie
+            if not spec.get('tri'):
+                rapport['lues'] = lues[0]
+
+            if stats is not None:
+                chemin_stats = spec['statistiques'].format(nom=nom, ext=os.path.splitext(chemin)[1].lstrip('.'))
+                os.makedirs(os.path.dirname(chemin_stats) or '.', exist_ok=True)
+                with open(chemin_stats, 'w', encoding='utf-8') as f:
+                    json.dump(stats.en_dict(), f, indent=2, ensure_ascii=False)
+                rapport['statistiques'] = chemin_stats
+    except Exception as e:
+        rapport['statut'] = 'erreur'
+        rapport['erreur'] = f"{type(e).__name__}: {e}"
+    rapport['duree'] = round(time.perf_counter() - debut, 3)
+    return rapport
+
+
+def executer_lot(spec: Dict[str, Any], afficher: Callable[[Dict[str, Any]], None] = print) -> List[Dict[str, Any]]:
+    """
+    Exécute la spécification sur tous les fichiers de son motif 'entrees', en parallèle
+    (spec['processus'] processus, un par cœur par défaut). Chaque rapport est transmis à
+    'afficher' dès que sa tâche se termine ; retourne la liste des rapports.
+    """
+    if not spec.get('sortie'):
+        raise ValueError("La spécification doit indiquer une 'sortie' (ex. 'resultats/{nom}.csv').")
+    if spec.get('filtre'):
+        analyser_filtre(spec['filtre'])  # Erreur de syntaxe signalée avant de lancer les tâches
+    if spec.get('tri'):
+        analyser_tri_texte(spec['tri'])
+
+    motifs = spec.get('entrees') or []
+    motifs = [motifs] if isinstance(motifs, str) else motifs
+    fichiers = sorted({chemin for motif in motifs for chemin in glob.glob(motif, recursive=True)
+                       if os.path.isfile(chemin)})
+    if not fichiers:
+        raise ValueError(f"Aucun fichier ne correspond à : {', '.join(motifs) or '(aucun motif)'}")
+
+    nb_processus = min(int(spec.get('processus') or os.cpu_count() or 1), len(fichiers))
+    rapports = []
+    if nb_processus == 1:
+        for chemin in fichiers:
+            rapports.append(executer_tache(spec, chemin))
+            afficher(rapports[-1])
+        return rapports
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+        taches = [executeur.submit(executer_tache, spec, chemin) for chemin in fichiers]
+        for tache in as_completed(taches):
+            rapports.append(tache.result())
+            afficher(rapports[-1])
+    return rapports
+
+
+def _afficher_rapport(rapport: Dict[str, Any]):
+    """Une ligne par tâche terminée."""
+    if rapport['statut'] == 'ok':
+        print(f"[OK] {rapport['fichier']} : {rapport['lues']} lues -> {rapport['ecrites']} écrites "
+              f"dans '{rapport['sortie']}' ({rapport['duree']:.2f} s)")
+    else:
+        print(f"[ERREUR] {rapport['fichier']} : {rapport['erreur']} ({rapport['duree']:.2f} s)")
+
+
+def main_lot(arguments: List[str]) -> int:
+    """
+    Point d'entrée non interactif (cron, ordonnanceurs). Retourne le code de sortie :
+    0 si toutes les tâches ont réussi, 1 si au moins une a échoué, 2 si la spécification est invalide.
+    """
+    import argparse
+    noms_formats = [format_donnees.nom for format_donnees in formats_disponibles()]
+    parser = argparse.ArgumentParser(
+        prog='data_filter.py',
+        description="Applique un traitement (filtre, tri, projection, statistiques) à plusieurs fichiers.")
+    parser.add_argument('--job', help="fichier de tâche YAML ou JSON (les autres options le complètent)")
+    parser.add_argument('--entrees', nargs='+', help="motif(s) glob des fichiers à traiter")
+    parser.add_argument('--format', choices=noms_formats,
+                        help="format des fichiers source (détecté par défaut)")
+    parser.add_argument('--filtre', help="expression de filtre (ET / OU / NON)")
+    parser.add_argument('--tri', help="critères de tri, ex. 'price:d,name'")
+    parser.add_argument('--colonnes', help="colonnes à conserver, ex. 'id,name,price'")
+    parser.add_argument('--limite', type=int, help="nombre maximal d'enregistrements écrits par fichier")
+    parser.add_argument('--sortie', help="modèle du fichier de sortie, ex. 'resultats/{nom}.csv'")
+    parser.add_argument('--format-sortie', dest='format_sortie', choices=noms_formats,
+                        help="format de sortie (déduit de l'extension par défaut)")
+    parser.add_argument('--statistiques', help="modèle du fichier JSON de statistiques, ex. '{nom}.stats.json'")
+    parser.add_argument('--processus', type=int, help="nombre de processus (un par cœur par défaut)")
+    parser.add_argument('--rapport', help="fichier JSON Lines recevant le rapport de chaque tâche")
+    options = parser.parse_args(arguments)
+
+    spec: Dict[str, Any] = {}
+    try:
+        if options.job:
+            spec = _lire_fichier_tache(options.job)
+        for cle, valeur in vars(options).items():
+            if valeur is not None and cle not in ('job', 'rapport'):
+                spec[cle] = valeur
+        if isinstance(spec.get('colonnes'), str):
+            spec['colonnes'] = [cle.strip() for cle in spec['colonnes'].split(',')]
+
+        rapports = executer_lot(spec, _afficher_rapport)
+    except (OSError, ValueError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 2
+
+    if options.rapport:
+        save_jsonl(rapports, options.rapport)
+    nb_erreurs = sum(1 for rapport in rapports if rapport['statut'] != 'ok')
+    print(f"{len(rapports) - nb_erreurs} tâche(s) réussie(s), {nb_erreurs} en erreur.")
+    return 1 if nb_erreurs else 0
+
+
+# --- BOUCLE PRINCIPALE DE L'APPLICATION ---
+
+def basculer_stockage(data: Donnees) -> Donnees:
+    """Convertit les données chargées entre DataList (lignes) et TableColonnes (colonnes)."""
+    print("\n[STOCKAGE DES DONNÉES]")
     if not data:
         print("Veuillez d'abord charger les données.")
+        input("Appuyez sur Entrée pour continuer...")
         return data
-    print("Fonctionnalité en cours de développement (J12).")
+
+    catalogue = catalogue_connu(data)  # Mêmes lignes : le catalogue reste valable
+    if isinstance(data, TableColonnes):
+        taille_avant = data.taille_memoire()
+        data = data.vers_datalist()
+        taille_apres = taille_memoire_datalist(data)
+        print("Données converties en lignes (DataList).")
+    else:
+        taille_avant = taille_memoire_datalist(data)
+        data = TableColonnes.depuis_datalist(data)
+        taille_apres = data.taille_memoire()
+        print("Données converties en colonnes typées (TableColonnes).")
+    associer_catalogue(data, catalogue)
+
+    print(f"Mémoire estimée : {taille_avant / 1e6:.2f} Mo -> {taille_apres / 1e6:.2f} Mo")
     input("Appuyez sur Entrée pour continuer...")
     return data
 
 
-# --- BOUCLE PRINCIPALE DE L'APPLICATION ---
-
 def main():
-    data: DataList = []
+    data: Donnees = []
 
     while True:
         # Affichage de l'état actuel des données
         etat = f"{len(data)} enregistrement(s)" if data else "Aucune donnée chargée"
+        if isinstance(data, TableColonnes):
+            etat += " [colonnes]"
 
         print("\n" + "=" * 50)
         print("          PROJET DATA FILTER - Menu Principal")
@@ -781,6 +5750,11 @@ def main():
         print("-" * 50)
         print("7. Historique (Undo/Redo)")
         print("8. Gestion des Champs (Ajouter/Retirer)")
+        print("9. Traitement en Flux (Gros fichiers, mémoire constante)")
+        print("10. Stockage en Colonnes (Activer/Désactiver)")
+        print("11. Mode Différé (Plan de requête optimisé)")
+        print("12. Regroupement & Agrégation (Group By)")
+        print("13. Jointure & Dédoublonnage")
         print("0. Quitter")
         print("=" * 50)
 
@@ -790,6 +5764,8 @@ def main():
             new_data = charger_donnees()
             if new_data:
                 data = new_data
+                obtenir_catalogue(data)  # Schéma calculé une fois, puis tenu à jour par l'historique
+                historique.reinitialiser(data)  # L'ancien jeu de données n'est plus retenu
                 print(f"\nChargement terminé. {len(data)} enregistrement(s) prêts.")
         elif choix == '2':
             afficher_donnees(data)
@@ -805,12 +5781,26 @@ def main():
             data = gerer_historique(data)
         elif choix == '8':
             data = gerer_champs(data)
+        elif choix == '9':
+            traitement_flux()
+        elif choix == '10':
+            data = basculer_stockage(data)
+        elif choix == '11':
+            data = gerer_plan(data)
+        elif choix == '12':
+            data = gerer_regroupement(data)
+        elif choix == '13':
+            data = gerer_jointure(data)
         elif choix == '0':
             print("Merci d'avoir utilisé Data Filter. Au revoir!")
             sys.exit(0)
         else:
-            print("Choix invalide. Veuillez entrer un numéro de 0 à 8.")
+            print("Choix invalide. Veuillez entrer un numéro de 0 à 13.")
 
 
 if __name__ == "__main__":
+    _activer_instrumentation_environnement()
+    # Avec des arguments : mode lot non interactif (voir main_lot), sinon menu interactif
+    if len(sys.argv) > 1:
+        sys.exit(main_lot(sys.argv[1:]))
     main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+# data_filter.py est un module à la racine du dépôt, sans paquet installable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_filter  # noqa: E402
+from references import donnees_aleatoires  # noqa: E402
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers', "jeu_donnees(nb_lignes, graine, retouche=None): taille, graine et retouche du jeu "
+                   "fourni par la fixture 'donnees'")
+
+
+@pytest.fixture(autouse=True)
+def etat_global_vierge():
+    """Repart d'un historique, d'un cache de requêtes et d'index vides pour chaque test."""
+    data_filter.historique.reinitialiser([])
+    data_filter.cache_requetes.vider()
+    yield
+    data_filter.historique.reinitialiser([])
+    data_filter.cache_requetes.vider()
+
+
+@pytest.fixture
+def enregistrements():
+    """Petit jeu de données représentatif (types mélangés, valeurs nulles, doublons)."""
+    return [
+        {'id': 1, 'name': 'Clavier Méca', 'price': 49.9, 'category': 'peripherique', 'stock': 3},
+        {'id': 2, 'name': 'Souris USB', 'price': 12.5, 'category': 'peripherique', 'stock': None},
+        {'id': 3, 'name': 'Écran 4K', 'price': 299.0, 'category': 'ecran', 'stock': 7},
+        {'id': 4, 'name': 'Câble HDMI', 'price': 7.0, 'category': 'cable', 'stock': 0},
+        {'id': 5, 'name': 'Souris sans fil', 'price': 24.0, 'category': 'peripherique', 'stock': 12},
+        {'id': 6, 'name': 'Écran 27"', 'price': 189.0, 'category': 'ecran', 'stock': None},
+        {'id': 7, 'name': 'Câble USB-C', 'price': 9.5, 'category': 'cable', 'stock': 40},
+        {'id': 8, 'name': 'Souris USB', 'price': 12.5, 'category': 'peripherique', 'stock': 5},
+    ]
+
+
+@pytest.fixture(params=['datalist', 'colonnes'])
+def donnees(request):
+    """
+    (enregistrements de référence, mêmes données en DataList ou en TableColonnes), générés par
+    donnees_aleatoires selon le marqueur jeu_donnees du test ou du module ; 'retouche' modifie les
+    enregistrements avant leur mise en colonnes.
+    """
+    marqueur = request.node.get_closest_marker('jeu_donnees')
+    if marqueur is None:
+        raise pytest.UsageError("La fixture 'donnees' demande un marqueur jeu_donnees(nb_lignes, graine).")
+    data = _jeu_donnees(*marqueur.args, **marqueur.kwargs)
+    return data, (data if request.param == 'datalist' else data_filter.TableColonnes.depuis_datalist(data))
+
+
+def _jeu_donnees(nb_lignes, graine, retouche=None):
+    data = donnees_aleatoires(nb_lignes, graine)
+    if retouche is not None:
+        retouche(data)
+    return data
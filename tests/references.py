@@ -0,0 +1,118 @@
+"""
+Implémentations de référence reprises de la version d'origine de data_filter (avant les
+optimisations) : les tests vérifient que les chemins optimisés donnent les mêmes résultats.
+"""
+import random
+
+from data_filter import convertir_type, normaliser_texte
+
+
+def convertir_type_reference(value):
+    """convertir_type d'origine, appliqué cellule par cellule par nettoyer_donnees."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float, bool, list)):
+        return value
+    if not isinstance(value, str):
+        return value
+    lower_value = value.strip().lower()
+    if lower_value in ('', 'n/a', 'na', 'n.a.', 'nan', 'null'):
+        return None
+    try:
+        if '.' not in value and value.strip() != "":
+            return int(value)
+        return float(value)
+    except ValueError:
+        pass
+    if lower_value in ('true', 'vrai', 't', '1'):
+        return True
+    if lower_value in ('false', 'faux', 'f', '0'):
+        return False
+    return value
+
+
+def tri_reference(data, critere_tri):
+    """Tri multicritère d'origine (gerer_tri) : tris stables successifs, sans locale."""
+    data_triee = list(data)
+    for cle_tri, reverse_sort in reversed(critere_tri):
+        def tri_key_multi(item, cle_tri=cle_tri):
+            value = item.get(cle_tri)
+            # Seul écart voulu avec la version d'origine : bool testé avant int/float, les
+            # booléens ont leur propre rang au lieu d'être triés comme 0 et 1 parmi les nombres
+            if isinstance(value, bool):
+                return (1, value)
+            if isinstance(value, (int, float)):
+                return (0, value)
+            if isinstance(value, str):
+                return (2, value)
+            if value is None:
+                return (3, 0)
+            return (4, str(value))
+        data_triee = sorted(data_triee, key=tri_key_multi, reverse=reverse_sort)
+    return data_triee
+
+
+def critere_reference(item, cle, operateur, valeur_cible_str):
+    """Test d'un enregistrement par le filtre simple d'origine (gerer_filtrage)."""
+    valeur_item = item.get(cle)
+    valeur_cible = convertir_type(valeur_cible_str)
+    if operateur == '=':
+        return valeur_item == valeur_cible
+    if operateur == '!=':
+        return valeur_item != valeur_cible
+    if operateur in ('>', '<', '>=', '<='):
+        if isinstance(valeur_item, (int, float)) and isinstance(valeur_cible, (int, float)):
+            return {'>': valeur_item > valeur_cible, '<': valeur_item < valeur_cible,
+                    '>=': valeur_item >= valeur_cible, '<=': valeur_item <= valeur_cible}[operateur]
+        return False
+    if not isinstance(valeur_item, str):
+        return False
+    # Seul écart voulu avec la version d'origine (lower()) : casse et accents sont ignorés
+    _forme_texte = normaliser_texte
+    if operateur == 'contient (texte)':
+        return _forme_texte(valeur_cible_str) in _forme_texte(valeur_item)
+    if operateur == 'commence par (texte)':
+        return _forme_texte(valeur_item).startswith(_forme_texte(valeur_cible_str))
+    if operateur == 'contient un de (texte)':
+        termes = [_forme_texte(t.strip()) for t in valeur_cible_str.split('|') if t.strip()]
+        return any(t in _forme_texte(valeur_item) for t in termes)
+    raise ValueError(operateur)
+
+
+def evaluer_reference(arbre, item):
+    """Évaluation naïve d'un arbre de filtre, critère par critère, sans réordonnancement."""
+    nature = arbre[0]
+    if nature == 'cond':
+        return critere_reference(item, *arbre[1:])
+    if nature == 'non':
+        return not evaluer_reference(arbre[1], item)
+    resultats = [evaluer_reference(enfant, item) for enfant in arbre[1]]
+    return all(resultats) if nature == 'et' else any(resultats)
+
+
+MOTS = ['Clavier', 'clavier méca', 'Écran', 'ecran 4K', 'Souris', 'souris USB', 'Câble', 'câble HDMI',
+        'zèbre', 'Zoo', 'été', 'Ete', 'äpfel', 'Œuvre', '']
+
+
+def donnees_aleatoires(nb_lignes, graine=0, melange=True):
+    """
+    Enregistrements synthétiques : colonnes typées, colonnes de types mélangés (int/float/bool/
+    str/None/liste), doublons et clés absentes, pour comparer chemins optimisés et référence.
+    """
+    alea = random.Random(graine)
+    data = []
+    for i in range(nb_lignes):
+        record = {
+            'id': i,
+            'categorie': alea.choice(['a', 'b', 'c', None]),
+            'prix': alea.choice([alea.randint(-5, 50), round(alea.uniform(-5, 50), 2), None]),
+            'quantite': alea.randint(0, 20),
+            'nom': alea.choice(MOTS) + alea.choice(['', ' pro', ' mini']),
+            'actif': alea.choice([True, False]),
+        }
+        if melange:
+            record['mixte'] = alea.choice([1, 2.5, True, False, 'texte', 'Texte', None, [1, 2], 0, -3])
+        if alea.random() < 0.1:
+            del record['quantite']
+        data.append(record)
+    return data
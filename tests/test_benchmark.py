@@ -0,0 +1,67 @@
+import csv
+import json
+import os
+
+import benchmark
+import data_filter
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_generation_deterministe_au_schema_d_items_csv():
+    premiers = list(benchmark.generer_enregistrements(500))
+    assert premiers == list(benchmark.generer_enregistrements(500))
+    assert premiers != list(benchmark.generer_enregistrements(500, graine=1))
+    with open(os.path.join(RACINE, 'items.csv'), newline='', encoding='utf-8') as f:
+        assert list(premiers[0]) == csv.DictReader(f).fieldnames
+    # Données brutes réalistes : toutes chaînes, avec des marqueurs nuls et des prix non numériques
+    assert all(isinstance(value, str) for record in premiers for value in record.values())
+    converties = data_filter.nettoyer_donnees(premiers)
+    types_prix = {type(record['price']) for record in converties}
+    assert {int, float, str, type(None)} <= types_prix
+
+
+def test_csv_brut_relu_a_l_identique(tmp_path):
+    chemin = str(tmp_path / 'items.csv')
+    benchmark.ecrire_csv_brut(chemin, 300)
+    with open(chemin, newline='', encoding='utf-8') as f:
+        assert list(csv.DictReader(f)) == list(benchmark.generer_enregistrements(300))
+
+
+def test_comparer_signale_les_baisses_de_debit():
+    reference = {'mesures': [
+        {'etape': 'load', 'format': 'csv', 'lignes': 1000, 'lignes_par_seconde': 10_000},
+        {'etape': 'tri_multicritere', 'format': None, 'lignes': 1000, 'lignes_par_seconde': 5_000},
+        {'etape': 'statistiques', 'format': None, 'lignes': 1000, 'lignes_par_seconde': None},
+    ]}
+    mesures = [
+        {'etape': 'load', 'format': 'csv', 'lignes': 1000, 'lignes_par_seconde': 8_000},
+        {'etape': 'tri_multicritere', 'format': None, 'lignes': 1000, 'lignes_par_seconde': 4_600},
+        {'etape': 'statistiques', 'format': None, 'lignes': 1000, 'lignes_par_seconde': 10},
+        {'etape': 'load', 'format': 'csv', 'lignes': 2000, 'lignes_par_seconde': 1},  # Sans référence
+    ]
+    regressions = benchmark.comparer(mesures, reference, 0.10)
+    assert len(regressions) == 1 and regressions[0].startswith('load (csv), 1,000 lignes')
+    assert len(benchmark.comparer(mesures, reference, 0.05)) == 2
+
+
+def test_execution_complete_et_comparaison(tmp_path, capsys):
+    sortie = str(tmp_path / 'resultats.json')
+    assert benchmark.main(['--tailles', '60', '--formats', 'csv', 'jsonl', '--sans-memoire',
+                           '--sortie', sortie]) == 0
+    with open(sortie, encoding='utf-8') as f:
+        resultats = json.load(f)
+    etapes = {(mesure['etape'], mesure['format']) for mesure in resultats['mesures']}
+    assert {('save', 'csv'), ('load', 'jsonl'), ('filtre_combine', None), ('tri_multicritere', None),
+            ('statistiques', None)} <= etapes
+    assert all(mesure['lignes'] == 60 and mesure['secondes'] >= 0 for mesure in resultats['mesures'])
+
+    # Une référence au débit infini fait apparaître une régression sur chaque étape
+    for mesure in resultats['mesures']:
+        mesure['lignes_par_seconde'] = 10 ** 12
+    reference = str(tmp_path / 'reference.json')
+    with open(reference, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f)
+    assert benchmark.main(['--tailles', '60', '--formats', 'csv', '--sans-memoire', '--sortie', sortie,
+                           '--comparer', reference]) == 1
+    assert 'régression(s)' in capsys.readouterr().out
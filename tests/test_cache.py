@@ -0,0 +1,115 @@
+import datetime
+import json
+import mmap
+import os
+
+import pytest
+
+import data_filter
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Cache dans un dossier temporaire, actif quelle que soit la taille de la source."""
+    monkeypatch.setattr(data_filter, 'DOSSIER_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(data_filter, 'SEUIL_SOURCE_CACHE', 0)
+    monkeypatch.setattr(data_filter, 'CACHE_ACTIF', True)
+
+
+def charger(chemin):
+    format_donnees = data_filter.detecter_format(chemin)
+    return data_filter.charger_avec_cache(chemin, format_donnees.charger, {'format': format_donnees.nom},
+                                          format_donnees.lire)
+
+
+ENREGISTREMENTS = [{'id': i, 'name': f'produit {i % 7}', 'price': i * 1.5 if i % 3 else i,
+                    'tags': [i, 'x'] if i % 2 else 'seul', 'grand': 2 ** 70 if i == 3 else i,
+                    'actif': i % 2 == 0, 'vide': None} for i in range(500)]
+
+
+@pytest.fixture
+def source_json(tmp_path):
+    chemin = tmp_path / 'source.json'
+    chemin.write_text(json.dumps(ENREGISTREMENTS), encoding='utf-8')
+    return str(chemin)
+
+
+def test_chargement_depuis_le_cache_identique_au_chargement_direct(cache, source_json):
+    reference = data_filter.load_json(source_json)
+    premier = charger(source_json)
+    second = charger(source_json)
+    assert second.lecture_seule
+    assert list(premier) == list(second) == reference
+
+
+def test_premier_chargement_sans_copie_datalist(cache, source_json, monkeypatch):
+    def interdit(*args, **kwargs):
+        raise AssertionError("le chargement ne doit pas passer par une DataList")
+
+    monkeypatch.setattr(data_filter.TableColonnes, 'depuis_datalist', interdit)
+    monkeypatch.setattr(data_filter, 'load_json', interdit)
+    table = charger(source_json)
+    assert isinstance(table, data_filter.TableColonnes)
+    assert os.path.exists(data_filter.chemin_cache(source_json))
+
+
+def test_modification_de_meme_taille_et_meme_date_invalide_le_cache(cache, source_json):
+    charger(source_json)
+    texte = open(source_json, encoding='utf-8').read()
+    milieu = texte.index('produit', len(texte) // 2) + len('produit ')
+    nouveau_chiffre = '9' if texte[milieu] != '9' else '8'
+    etat = os.stat(source_json)
+    with open(source_json, 'w', encoding='utf-8') as f:
+        f.write(texte[:milieu] + nouveau_chiffre + texte[milieu + 1:])
+    os.utime(source_json, ns=(etat.st_atime_ns, etat.st_mtime_ns))
+
+    table = charger(source_json)
+    assert not table.lecture_seule  # Relu depuis la source, pas depuis le cache
+    assert list(table) == data_filter.load_json(source_json)
+
+
+def test_colonne_objet_ecrite_en_json_et_non_en_pickle(cache, source_json):
+    charger(source_json)
+    contenu = open(data_filter.chemin_cache(source_json), 'rb').read()
+    assert json.dumps([1, 'x']).encode() in contenu
+    assert b'\x80\x05' not in contenu  # En-tête d'un pickle (protocole 5)
+
+
+def test_valeur_non_json_empeche_la_mise_en_cache(cache, tmp_path):
+    table = data_filter.TableColonnes.depuis_flux([{'date': datetime.date(2025, 1, 2)}, {'date': (1, 2)}])
+    with pytest.raises(ValueError, match='non représentables en JSON'):
+        data_filter.ecrire_cache(table, str(tmp_path / 'source.yaml'), {})
+
+
+def test_cache_invalide_ignore_et_projection_refermee(cache, source_json, monkeypatch):
+    charger(source_json)
+    chemin = data_filter.chemin_cache(source_json)
+    contenu = open(chemin, 'rb').read()
+    with open(chemin, 'wb') as f:
+        f.write(contenu[:len(contenu) // 2])
+
+    projections = []
+
+    class MmapSurveille(mmap.mmap):
+        def __new__(cls, *args, **kwargs):
+            projections.append(super().__new__(cls, *args, **kwargs))
+            return projections[-1]
+
+    monkeypatch.setattr(data_filter.mmap, 'mmap', MmapSurveille)
+    with pytest.raises(ValueError, match='tronqué'):
+        data_filter.lire_cache(chemin)
+    assert projections and projections[0].closed
+
+    assert list(charger(source_json)) == data_filter.load_json(source_json)
+
+
+def test_options_du_chargeur_dans_la_cle(cache, tmp_path):
+    chemin = tmp_path / 'source.xml'
+    chemin.write_text('<racine><a><id>1</id></a><b><id>2</id></b></racine>', encoding='utf-8')
+    xml = data_filter.detecter_format(str(chemin))
+    tous = data_filter.charger_avec_cache(str(chemin), xml.charger, {'format': 'xml'}, xml.lire)
+    seulement_b = data_filter.charger_avec_cache(
+        str(chemin), lambda c: xml.charger(c, item_tag='b'), {'format': 'xml', 'item_tag': 'b'},
+        lambda c: xml.lire(c, item_tag='b'))
+    assert [r['id'] for r in tous] == [1, 2]
+    assert [r['id'] for r in seulement_b] == [2]
@@ -0,0 +1,156 @@
+import pytest
+
+import data_filter
+from data_filter import CacheRequetes, cache_requetes, historique
+from references import critere_reference, evaluer_reference, tri_reference
+
+
+pytestmark = pytest.mark.jeu_donnees(300, graine=22)
+
+
+@pytest.fixture
+def donnees(donnees):
+    """Jeu commun (voir conftest), devenu l'état courant de l'historique : seul celui-ci est mis en cache."""
+    _, data = donnees
+    historique.reinitialiser(data)
+    return data
+
+
+def attendu(data, cle, operateur, valeur):
+    return [i for i, item in enumerate(data) if critere_reference(item, cle, operateur, valeur)]
+
+
+def succes_apres(fonction, *args):
+    """Résultat de l'appel et nombre de succès du cache pendant celui-ci."""
+    avant = cache_requetes.succes
+    resultat = fonction(*args)
+    return resultat, cache_requetes.succes - avant
+
+
+def test_requete_repetee_servie_par_le_cache(donnees):
+    premier, succes = succes_apres(data_filter.positions_critere, donnees, 'prix', '>', '20')
+    assert succes == 0
+    second, succes = succes_apres(data_filter.positions_critere, donnees, 'prix', '>', '20')
+    assert succes == 1 and second is premier
+    assert list(second) == attendu(donnees, 'prix', '>', '20')
+
+
+@pytest.mark.parametrize('operateur', ['=', '!=', '>', '<', '>=', '<='])
+@pytest.mark.parametrize('premiere, seconde', [('10', '10.0'), ('10', ' 10 '), ('1', 'true'), ('0', 'FAUX'),
+                                               ('-3', '-3.0'), ('null', 'N/A')])
+def test_valeurs_equivalentes_partagent_le_resultat(donnees, operateur, premiere, seconde):
+    for cle in ('prix', 'mixte', 'actif'):
+        data_filter.positions_critere(donnees, cle, operateur, premiere)
+        resultat, succes = succes_apres(data_filter.positions_critere, donnees, cle, operateur, seconde)
+        assert succes == 1
+        # Le résultat partagé est bien celui qu'aurait donné la seconde saisie
+        assert list(resultat) == attendu(donnees, cle, operateur, seconde), cle
+
+
+@pytest.mark.parametrize('premiere, seconde', [('ECRAN', 'écran'), ('souris|zoo', 'ZOO|Souris|souris')])
+def test_saisies_texte_equivalentes_partagent_le_resultat(donnees, premiere, seconde):
+    operateur = 'contient un de (texte)' if '|' in premiere else 'contient (texte)'
+    data_filter.positions_critere(donnees, 'nom', operateur, premiere)
+    resultat, succes = succes_apres(data_filter.positions_critere, donnees, 'nom', operateur, seconde)
+    assert succes == 1 and list(resultat) == attendu(donnees, 'nom', operateur, seconde)
+
+
+def test_valeurs_differentes_ne_partagent_rien(donnees):
+    data_filter.positions_critere(donnees, 'prix', '=', '10')
+    for valeur in ('10.5', "'10'", '1'):
+        _, succes = succes_apres(data_filter.positions_critere, donnees, 'prix', '=', valeur)
+        assert succes == 0, valeur
+    _, succes = succes_apres(data_filter.positions_critere, donnees, 'quantite', '=', '10')
+    assert succes == 0
+
+
+def test_expressions_commutees_et_critere_simple(donnees):
+    expression = "prix > 10 AND (nom contient 'souris' OR quantite <= 3)"
+    positions, _ = data_filter.positions_expression(donnees, expression)
+    arbre = data_filter.analyser_filtre(expression)
+    assert list(positions) == [i for i, item in enumerate(donnees) if evaluer_reference(arbre, item)]
+    (commutees, _), succes = succes_apres(data_filter.positions_expression, donnees,
+                                          "(quantite <= 3 OR nom contient 'SOURIS') AND prix > 10.0")
+    assert succes == 1 and list(commutees) == list(positions)
+    # Un critère simple et l'expression qui s'y réduit partagent aussi le résultat
+    data_filter.positions_critere(donnees, 'prix', '<', '5')
+    (simple, _), succes = succes_apres(data_filter.positions_expression, donnees, "prix < 5")
+    assert succes == 1 and list(simple) == attendu(donnees, 'prix', '<', '5')
+
+
+def test_nouvel_etat_invalide_puis_annuler_reutilise(donnees):
+    initial = data_filter.positions_critere(donnees, 'prix', '>=', '20')
+
+    # Filtre : nouvelle version, le résultat est recalculé sur les lignes retenues
+    filtrees = historique.enregistrer_selection(donnees, list(range(0, len(donnees), 3)), "Filtre")
+    resultat, succes = succes_apres(data_filter.positions_critere, filtrees, 'prix', '>=', '20')
+    assert succes == 0 and list(resultat) == attendu(filtrees, 'prix', '>=', '20')
+
+    # Modification de champs : mêmes lignes, nouvelles valeurs
+    modifiees = historique.modifier_colonnes(filtrees, {'prix': [25] * len(filtrees)}, "Calcul")
+    resultat, succes = succes_apres(data_filter.positions_critere, modifiees, 'prix', '>=', '20')
+    assert succes == 0 and list(resultat) == list(range(len(modifiees)))
+
+    # Annuler deux fois revient à l'état initial : son résultat est réutilisé et toujours exact
+    historique.annuler()
+    data = historique.annuler()
+    resultat, succes = succes_apres(data_filter.positions_critere, data, 'prix', '>=', '20')
+    assert succes == 1 and resultat is initial
+    assert list(resultat) == attendu(data, 'prix', '>=', '20')
+    # Rétablir aussi
+    historique.retablir()
+    data = historique.retablir()
+    resultat, succes = succes_apres(data_filter.positions_critere, data, 'prix', '>=', '20')
+    assert succes == 1 and list(resultat) == list(range(len(data)))
+
+
+def test_renommage_invalide(donnees):
+    data_filter.positions_critere(donnees, 'nom', 'contient (texte)', 'souris')
+    renommees = historique.renommer_colonnes(donnees, {'nom': 'libelle', 'categorie': 'nom'}, "Renommage")
+    resultat, succes = succes_apres(data_filter.positions_critere, renommees, 'nom', 'contient (texte)', 'souris')
+    assert succes == 0 and list(resultat) == attendu(renommees, 'nom', 'contient (texte)', 'souris') == []
+
+
+def test_tri_mis_en_cache(donnees):
+    critere = [('categorie', False), ('prix', True)]
+    ordre = data_filter.calculer_ordre_tri(donnees, critere, False)
+    assert [donnees[i]['id'] for i in ordre] == [item['id'] for item in tri_reference(donnees, critere)]
+    memorise, succes = succes_apres(data_filter.calculer_ordre_tri, donnees, critere, False)
+    assert succes == 1 and list(memorise) == list(ordre)
+    # Autre limite ou autre sens : autre requête
+    premiers, succes = succes_apres(data_filter.calculer_ordre_tri, donnees, critere, False, None, 5)
+    assert succes == 0 and list(premiers) == list(ordre)[:5]
+    _, succes = succes_apres(data_filter.calculer_ordre_tri, donnees, [('categorie', True), ('prix', True)], False)
+    assert succes == 0
+
+    triees = historique.enregistrer_selection(donnees, ordre, "Tri")
+    modifiees = historique.modifier_colonnes(triees, {'prix': [-row['id'] for row in triees]}, "Calcul")
+    nouvel_ordre, succes = succes_apres(data_filter.calculer_ordre_tri, modifiees, critere, False)
+    assert succes == 0
+    assert [modifiees[i]['id'] for i in nouvel_ordre] == [item['id'] for item in tri_reference(modifiees, critere)]
+
+
+def test_donnees_hors_historique_jamais_en_cache(donnees):
+    copie = [dict(row) for row in donnees]
+    data_filter.positions_critere(copie, 'prix', '>', '20')
+    copie[0]['prix'] = 1000
+    data_filter.invalider_index(copie)  # Contrat des modifications en place hors historique
+    resultat, succes = succes_apres(data_filter.positions_critere, copie, 'prix', '>', '20')
+    assert succes == 0 and list(resultat) == attendu(copie, 'prix', '>', '20')
+    assert not cache_requetes.entrees
+
+
+def test_eviction_lru_dans_le_budget():
+    positions = list(range(100))
+    taille = CacheRequetes._taille_entree(data_filter._vecteur_positions(positions, 100))
+    cache = CacheRequetes(budget=3 * taille)
+    for n in range(3):
+        cache.ecrire(1, ('q', n), positions, 100)
+    assert cache.lire(1, ('q', 0)) is not None  # ('q', 0) devient le plus récent
+    cache.ecrire(1, ('q', 3), positions, 100)
+    assert cache.lire(1, ('q', 1)) is None
+    assert all(cache.lire(1, ('q', n)) is not None for n in (0, 2, 3))
+    assert cache.evictions == 1 and cache.taille == 3 * taille <= cache.budget
+    # Un résultat plus grand que tout le budget n'évince rien
+    cache.ecrire(1, ('grand',), range(10 ** 5), 10 ** 5)
+    assert len(cache.entrees) == 3 and cache.lire(1, ('grand',)) is None
@@ -0,0 +1,110 @@
+import random
+
+import pytest
+
+import data_filter
+from data_filter import CatalogueDonnees, TableColonnes, historique
+from references import donnees_aleatoires
+
+
+def entetes_reference(data):
+    """get_all_headers d'origine : clés de la première ligne, puis les autres clés triées."""
+    headers = set()
+    for row in data:
+        headers.update(row.keys())
+    if data:
+        return list(data[0].keys()) + sorted(headers - set(data[0].keys()))
+    return sorted(headers)
+
+
+def verifier_catalogue(data):
+    """Le catalogue dérivé doit correspondre à un nouveau parcours complet des données."""
+    catalogue = data_filter.catalogue_connu(data)
+    assert catalogue is not None, "catalogue perdu"
+    if isinstance(data, TableColonnes):
+        assert data_filter.get_all_headers(data) == data.noms_colonnes()
+    else:
+        assert data_filter.get_all_headers(data) == entetes_reference(data)
+    parcours = CatalogueDonnees.depuis_donnees(data)
+    assert catalogue.nb_lignes == parcours.nb_lignes == len(data)
+    assert set(catalogue.colonnes) == set(parcours.colonnes)
+    for nom, colonne in parcours.colonnes.items():
+        derivee = catalogue.colonnes[nom]
+        assert derivee.types == colonne.types, nom
+        if derivee.cardinalite_exacte:
+            assert derivee.cardinalite == colonne.cardinalite, nom
+        else:
+            assert derivee.cardinalite >= colonne.cardinalite, nom  # Borne haute
+
+
+def donnees_heterogenes(graine):
+    data = donnees_aleatoires(120, graine)
+    alea = random.Random(graine)
+    for record in alea.sample(data, 4):
+        record['remise'] = alea.choice([5, 10, None])  # Colonne rare, hors de la première ligne
+    return data
+
+
+def operation_aleatoire(data, alea):
+    choix = alea.randrange(7)
+    if choix == 0 and len(data) > 1:  # Filtre gardant une petite partie
+        positions = sorted(alea.sample(range(len(data)), len(data) // 4))
+        return historique.enregistrer_selection(data, positions, "filtre")
+    if choix == 1:  # Filtre gardant la plupart des lignes
+        positions = [i for i in range(len(data)) if alea.random() < 0.85]
+        return historique.enregistrer_selection(data, positions, "filtre")
+    if choix == 2:  # Tri (permutation)
+        positions = list(range(len(data)))
+        alea.shuffle(positions)
+        return historique.enregistrer_selection(data, positions, "tri")
+    if choix == 3:
+        nom = alea.choice(['calcul', 'prix', 'nom'])
+        valeurs = [alea.choice([1, 2.5, 'x', None]) for _ in range(len(data))]
+        return historique.modifier_colonnes(data, {nom: valeurs}, "calcul")
+    if choix == 4:
+        colonnes = [nom for nom in data_filter.get_all_headers(data) if nom != 'id']
+        if colonnes:
+            return historique.modifier_colonnes(data, {alea.choice(colonnes): None}, "suppression")
+        return data
+    if choix == 5:
+        colonnes = data_filter.get_all_headers(data)
+        ancien = alea.choice(colonnes)
+        nouveau = f"{ancien}_{alea.randrange(100)}"
+        if nouveau in colonnes:
+            return data
+        return historique.renommer_colonnes(data, {ancien: nouveau}, "renommage")
+    return historique.annuler() if alea.random() < 0.6 else historique.retablir()
+
+
+@pytest.mark.parametrize('stockage', ['datalist', 'colonnes'])
+@pytest.mark.parametrize('graine', range(6))
+def test_catalogue_coherent_apres_operations(stockage, graine):
+    data = donnees_heterogenes(graine)
+    if stockage == 'colonnes':
+        data = TableColonnes.depuis_datalist(data)
+    data_filter.obtenir_catalogue(data)
+    historique.reinitialiser(data)
+    alea = random.Random(graine)
+    for _ in range(25):
+        data = operation_aleatoire(data, alea)
+        verifier_catalogue(data)
+
+
+def test_colonne_absente_des_lignes_gardees():
+    data = [{'id': 1, 'a': 'x'}, {'id': 2}, {'id': 3, 'b': None}, {'id': 4}, {'id': 5}]
+    for positions in ([1, 3, 4], [1, 2, 3, 4], [4, 3]):
+        data_filter.obtenir_catalogue(data)
+        historique.reinitialiser(data)
+        verifier_catalogue(historique.enregistrer_selection(data, positions, "filtre"))
+
+
+def test_fusion_de_catalogues():
+    premiere, seconde = donnees_heterogenes(1)[:50], donnees_heterogenes(2)[50:]
+    for record in seconde[:3]:
+        record['nouvelle'] = 'n'
+    fusion = CatalogueDonnees.depuis_donnees(premiere).fusionner(CatalogueDonnees.depuis_donnees(seconde))
+    parcours = CatalogueDonnees.depuis_donnees(premiere + seconde)
+    assert fusion.nb_lignes == parcours.nb_lignes
+    for nom, colonne in parcours.colonnes.items():
+        assert fusion.colonnes[nom].types == colonne.types, nom
+        assert fusion.colonnes[nom].cardinalite >= colonne.cardinalite, nom
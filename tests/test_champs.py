@@ -0,0 +1,148 @@
+import ast
+import operator
+
+import pytest
+
+import data_filter
+from data_filter import historique
+
+OPERATEURS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.USub: operator.neg, ast.UAdd: operator.pos,
+    ast.Not: operator.not_,
+}
+ERREURS = (TypeError, ValueError, ZeroDivisionError, OverflowError, AttributeError)
+
+
+def appel_protege(fonction, *valeurs):
+    try:
+        return fonction(*valeurs)
+    except ERREURS:
+        return None
+
+
+def evaluer_ligne(noeud, row):
+    """Évaluation de référence, ligne par ligne, des règles documentées des champs calculés."""
+    if isinstance(noeud, ast.Constant):
+        return noeud.value
+    if isinstance(noeud, ast.Name):
+        return {'True': True, 'False': False, 'None': None}[noeud.id] if noeud.id in ('True', 'False', 'None') \
+            else row.get(noeud.id)
+    if isinstance(noeud, ast.BinOp):
+        a, b = evaluer_ligne(noeud.left, row), evaluer_ligne(noeud.right, row)
+        if isinstance(noeud.op, ast.Add):
+            if a is None or b is None:
+                return None
+        elif not (isinstance(a, (int, float)) and isinstance(b, (int, float))):
+            return None
+        return appel_protege(OPERATEURS[type(noeud.op)], a, b)
+    if isinstance(noeud, ast.UnaryOp):
+        a = evaluer_ligne(noeud.operand, row)
+        if not isinstance(noeud.op, ast.Not) and not isinstance(a, (int, float)):
+            return None
+        return appel_protege(OPERATEURS[type(noeud.op)], a)
+    if isinstance(noeud, ast.Compare):
+        a, b = evaluer_ligne(noeud.left, row), evaluer_ligne(noeud.comparators[0], row)
+        if not isinstance(noeud.ops[0], (ast.Eq, ast.NotEq)) and (a is None or b is None):
+            return None
+        return appel_protege(OPERATEURS[type(noeud.ops[0])], a, b)
+    if isinstance(noeud, ast.BoolOp):
+        resultat = evaluer_ligne(noeud.values[0], row)
+        for valeur in noeud.values[1:]:
+            suivant = evaluer_ligne(valeur, row)
+            resultat = (resultat and suivant) if isinstance(noeud.op, ast.And) else (resultat or suivant)
+        return resultat
+    if isinstance(noeud, ast.IfExp):
+        return evaluer_ligne(noeud.body if evaluer_ligne(noeud.test, row) else noeud.orelse, row)
+    if isinstance(noeud, ast.Call):
+        if noeud.func.id == 'col':
+            return row.get(noeud.args[0].value)
+        arguments = [evaluer_ligne(argument, row) for argument in noeud.args]
+        if any(argument is None for argument in arguments):
+            return None
+        return appel_protege(data_filter.FONCTIONS_EXPRESSION[noeud.func.id], *arguments)
+    raise AssertionError(ast.dump(noeud))
+
+
+EXPRESSIONS = [
+    "prix * quantite",
+    "prix + 1",
+    "prix / (quantite - 10)",
+    "quantite // 3 + prix % 2",
+    "-prix",
+    "prix ** 2 - quantite",
+    "nom + ' (' + str(id) + ')'",
+    "upper(nom) + categorie",
+    "len(strip(nom))",
+    "round(prix, 1)",
+    "abs(prix) if prix < 0 else quantite",
+    "prix > 10 and actif or quantite",
+    "not actif",
+    "categorie == None",
+    "mixte * 2",
+    "mixte + mixte",
+    "prix * 'a'",
+    "'x' * quantite",
+    "min(prix, quantite)",
+    "int(nom)",
+    "float(mixte)",
+    "col('prix') * 2",
+    "42",
+    "prix >= quantite",
+    "id % 7 == 0 or categorie != 'a'",
+]
+
+
+pytestmark = pytest.mark.jeu_donnees(350, graine=20)
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_expression_vectorisee_egale_evaluation_ligne_par_ligne(donnees, expression):
+    _, data = donnees
+    noeud = ast.parse(expression, mode='eval').body
+    attendu = [evaluer_ligne(noeud, row) for row in data]
+    obtenu = data_filter.evaluer_expression(data, expression, taille_lot=64)
+    assert [(type(v), v) for v in obtenu] == [(type(v), v) for v in attendu]
+
+
+@pytest.mark.parametrize('expression', ["__import__('os')", "prix.real", "nom[0]", "inconnue + 1", "open('x')",
+                                        "prix +", "col(nom)", "1 < prix < 3", "[prix]", "lambda: 1"])
+def test_expression_refusee(donnees, expression):
+    _, data = donnees
+    with pytest.raises(ValueError):
+        data_filter.evaluer_expression(data, expression)
+
+
+@pytest.mark.parametrize('definition', ["total =", "= prix", "prix", "a == b"])
+def test_definition_invalide(definition):
+    with pytest.raises(ValueError):
+        data_filter.analyser_colonne_calculee(definition)
+
+
+def test_ajout_retrait_renommage_annulables(donnees):
+    _, base = donnees
+    originales = [dict(row) for row in base]
+    totaux = data_filter.evaluer_expression(base, "prix * quantite")
+    data = data_filter.ajouter_colonne_calculee(base, "total = prix * quantite")
+    assert [row['total'] for row in data] == totaux
+    assert data_filter.get_all_headers(data)[-1] == 'total'
+    data = data_filter.retirer_colonnes(data, ['nom', 'mixte'])
+    assert all('nom' not in row and 'mixte' not in row for row in data)
+    assert 'nom' not in data_filter.get_all_headers(data)
+    data = data_filter.renommer_colonne(data, 'prix', 'tarif')
+    assert [row['tarif'] for row in data] == [row.get('prix') for row in originales]
+    with pytest.raises(ValueError):
+        data_filter.renommer_colonne(data, 'tarif', 'id')
+    with pytest.raises(ValueError):
+        data_filter.renommer_colonne(data, 'absente', 'x')
+
+    for _ in range(3):
+        historique.annuler()
+    assert [dict(row) for row in historique.donnees] == originales
+    for _ in range(3):
+        historique.retablir()
+    assert {'total', 'tarif'} <= set(data_filter.get_all_headers(historique.donnees))
+    assert [row['total'] for row in historique.donnees] == totaux
+    assert [row['tarif'] for row in historique.donnees] == [row.get('prix') for row in originales]
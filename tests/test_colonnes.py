@@ -0,0 +1,64 @@
+import pytest
+
+import data_filter
+from data_filter import Colonne, TableColonnes
+
+
+def test_aller_retour_datalist(enregistrements):
+    enregistrements = enregistrements + [{'id': 9, 'extra': [1, 2], 'price': 2 ** 70}]
+    table = TableColonnes.depuis_datalist(enregistrements)
+    attendu = [{cle: record.get(cle) for cle in table.noms_colonnes()} for record in enregistrements]
+    assert table.vers_datalist() == attendu
+    assert table[2] == attendu[2]
+    assert table[-1] == attendu[-1]
+    assert table[1:3] == attendu[1:3]
+
+
+@pytest.mark.parametrize('valeurs, type_attendu', [
+    ([1, 2, None], 'int'),
+    ([1.5, None, 2.0], 'float'),
+    ([1, 2.5, None], 'num'),
+    ([True, None, False], 'bool'),
+    (['a', None, 'b'], 'str'),
+    ([1, 'a', None], 'objet'),
+    ([None, None], 'vide'),
+])
+def test_type_de_stockage_et_valeurs(valeurs, type_attendu):
+    colonne = Colonne.depuis_valeurs(valeurs)
+    assert colonne.type == type_attendu
+    assert list(colonne) == valeurs
+    assert [type(v) for v in colonne] == [type(v) for v in valeurs]
+
+
+def test_selection_ne_modifie_pas_le_dictionnaire_source():
+    source = Colonne.depuis_valeurs(['a', 'b', None, 'a'])
+    selection = source.selection([3, 0])
+    selection.ajouter('nouveau')
+    assert source.dictionnaire == ['a', 'b']
+    assert 'nouveau' not in source.index_dictionnaire
+    assert list(source) == ['a', 'b', None, 'a']
+    assert list(selection) == ['a', 'a', 'nouveau']
+
+    source.ajouter('autre')
+    assert list(selection) == ['a', 'a', 'nouveau']
+    assert 'autre' not in selection.dictionnaire
+
+
+def test_table_filtree_sans_effet_sur_l_instantane_de_l_historique(enregistrements):
+    table = TableColonnes.depuis_datalist(enregistrements)
+    data_filter.historique.reinitialiser(table)
+    filtree = table.selection([0, 1])
+    filtree.ajouter_ligne({'id': 99, 'name': 'Inédit', 'category': 'nouvelle'})
+    assert 'Inédit' not in table.colonne('name').dictionnaire
+    assert list(data_filter.historique.donnees) == list(TableColonnes.depuis_datalist(enregistrements))
+
+
+def test_codes_de_chaines_au_plus_petit_type():
+    colonne = Colonne.depuis_valeurs(['x', 'y'] * 10)
+    assert colonne.valeurs.typecode == 'B'
+    colonne = Colonne.depuis_valeurs([f'v{i}' for i in range(300)])
+    assert colonne.valeurs.typecode == 'H'
+    colonne = Colonne.depuis_valeurs([f'v{i}' for i in range(70_000)])
+    assert colonne.valeurs.typecode == 'i'
+    assert colonne[255] == 'v255' and colonne[69_999] == 'v69999'
+    assert colonne.selection([65_537, 1])[0] == 'v65537'
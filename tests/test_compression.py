@@ -0,0 +1,86 @@
+import bz2
+import gzip
+import importlib.util
+import lzma
+import os
+import shutil
+
+import pytest
+
+import data_filter
+
+DECOMPRESSEURS = {'gzip': gzip.decompress, 'bz2': bz2.decompress, 'xz': lzma.decompress}
+EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'xz': '.xz'}
+FORMATS = ['csv', 'json', 'jsonl', 'yaml', 'xml']
+
+
+@pytest.mark.parametrize('compression', sorted(DECOMPRESSEURS))
+@pytest.mark.parametrize('nom', FORMATS)
+def test_aller_retour_compresse(tmp_path, enregistrements, nom, compression, capsys):
+    format_donnees = data_filter.format_par_nom(nom)
+    clair = str(tmp_path / f'donnees{format_donnees.extensions[0]}')
+    compresse = clair + EXTENSIONS[compression]
+    format_donnees.sauvegarder(enregistrements, clair)
+    format_donnees.sauvegarder(enregistrements, compresse)
+
+    contenu = open(compresse, 'rb').read()
+    assert contenu.startswith(data_filter.COMPRESSIONS[compression][1])
+    # Décompressé par la bibliothèque standard : exactement le fichier non compressé
+    assert DECOMPRESSEURS[compression](contenu) == open(clair, 'rb').read()
+
+    assert data_filter.detecter_format(compresse) is format_donnees
+    assert format_donnees.charger(compresse) == enregistrements
+    assert list(format_donnees.lire(compresse)) == enregistrements
+
+    # Mal nommé : les premiers octets font foi à la lecture
+    mal_nomme = str(tmp_path / f'copie{format_donnees.extensions[0]}')
+    shutil.copyfile(compresse, mal_nomme)
+    assert data_filter.compression_fichier(mal_nomme) == compression
+    assert format_donnees.charger(mal_nomme) == enregistrements
+
+
+@pytest.mark.parametrize('chemin, attendu', [
+    ('a.csv.gz', 'gzip'), ('a.CSV.GZIP', 'gzip'), ('a.json.bz2', 'bz2'), ('a.xml.xz', 'xz'),
+    ('a.jsonl.lzma', 'xz'), ('a.csv.zst', 'zstd'), ('a.csv', None), ('a.gz.csv', None), ('sans_extension', None),
+])
+def test_compression_selon_l_extension_en_ecriture(chemin, attendu):
+    assert data_filter.compression_fichier(chemin, ecriture=True) == attendu
+
+
+def test_fichier_clair_nomme_gz_lu_tel_quel(tmp_path, enregistrements, capsys):
+    chemin = str(tmp_path / 'donnees.csv')
+    data_filter.save_csv(enregistrements, chemin)
+    faux = str(tmp_path / 'donnees.csv.gz')
+    os.rename(chemin, faux)
+    assert data_filter.compression_fichier(faux) is None
+    assert data_filter.load_csv(faux) == enregistrements
+
+
+@pytest.mark.parametrize('chemin, attendu', [('a.csv.gz', 'a.csv'), ('d/a.JSON.XZ', 'd/a.JSON'),
+                                             ('a.csv', 'a.csv'), ('a.tar.zst', 'a.tar')])
+def test_chemin_sans_compression(chemin, attendu):
+    assert data_filter.chemin_sans_compression(chemin) == attendu
+
+
+@pytest.mark.parametrize('extension', ['', '.gz', '.bz2', '.xz'])
+def test_ouvrir_fichier_petits_tampons(tmp_path, monkeypatch, extension):
+    monkeypatch.setattr(data_filter, 'TAILLE_TAMPON_IO', 7)
+    texte = ''.join(f"ligne {i} é\r\n" for i in range(2000))
+    chemin = str(tmp_path / f'texte.txt{extension}')
+    with data_filter.ouvrir_fichier(chemin, 'w', newline='') as f:
+        f.write(texte)
+    with data_filter.ouvrir_fichier(chemin, 'r', newline='') as f:
+        assert f.read() == texte
+    with data_filter.ouvrir_fichier(chemin, 'rb') as f:
+        assert f.read() == texte.encode('utf-8')
+
+
+def test_zstandard_ou_message_clair(tmp_path, enregistrements, capsys):
+    chemin = str(tmp_path / 'donnees.jsonl.zst')
+    if importlib.util.find_spec('compression') is None and importlib.util.find_spec('zstandard') is None:
+        with pytest.raises(ValueError, match='zstandard'):
+            data_filter.save_jsonl(enregistrements, chemin)
+        return
+    data_filter.save_jsonl(enregistrements, chemin)
+    assert data_filter.compression_fichier(chemin) == 'zstd'
+    assert data_filter.load_jsonl(chemin) == enregistrements
@@ -0,0 +1,71 @@
+import math
+import random
+
+import pytest
+
+import data_filter
+from references import convertir_type_reference
+
+CELLULES = ['12', '-7', ' 42 ', '0', '1', '3.14', '-0.5', '1e5', '1E-3', '.5', '5.', 'inf', '-Infinity', 'nan',
+            'NaN', 'N/A', 'na', 'n.a.', 'null', 'NULL', '', '  ', 'true', 'Vrai', 'T', 'false', 'FAUX', 'f',
+            'abc', 'Écran', 'nord', 'inde', '1_000', '12abc', '0x1A', '١٢', '+3', 'None', 'oui']
+
+
+def egales(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def normaliser(lignes):
+    """Remplace NaN (différent de lui-même) par un marqueur pour comparer les lignes."""
+    return [{k: 'NaN' if isinstance(v, float) and math.isnan(v) else (type(v).__name__, v) for k, v in ligne.items()}
+            for ligne in lignes]
+
+
+@pytest.mark.parametrize('cellule', CELLULES)
+def test_convertir_type_comme_l_original(cellule):
+    assert egales(data_filter.convertir_type(cellule), convertir_type_reference(cellule))
+
+
+@pytest.mark.parametrize('graine', range(8))
+@pytest.mark.parametrize('taille', [1, 50, 2_500])
+def test_conversion_par_colonnes_egale_conversion_cellule_par_cellule(graine, taille, monkeypatch):
+    monkeypatch.setattr(data_filter, 'TAILLE_LOT', 1000)
+    alea = random.Random(graine)
+    # Colonnes majoritairement d'un type, avec des cellules inattendues pour forcer les replis
+    profils = {
+        'entier': ['12', '-7', ' 42 ', '0', '1'],
+        'flottant': ['3.14', '-0.5', '12', '1e5'],
+        'texte': ['abc', 'Écran', 'nord', 'vrai'],
+        'booleen': ['true', 'false', 'T', 'f'],
+        'mixte': CELLULES,
+    }
+    brutes = []
+    for _ in range(taille):
+        ligne = {}
+        for colonne, valeurs in profils.items():
+            ligne[colonne] = alea.choice(CELLULES) if alea.random() < 0.05 else alea.choice(valeurs)
+        brutes.append(ligne)
+    attendu = [{k: convertir_type_reference(v) for k, v in ligne.items()} for ligne in brutes]
+    assert normaliser(data_filter.nettoyer_donnees(brutes)) == normaliser(attendu)
+
+
+def test_enregistrements_heterogenes_et_deja_types():
+    brutes = [{'a': '1', 'b': [1, 2]}, {'a': 2.5, 'c': 'null'}, {'b': True, 'a': 'x'}, {}]
+    attendu = [{k: convertir_type_reference(v) for k, v in ligne.items()} for ligne in brutes]
+    assert data_filter.nettoyer_donnees(brutes) == attendu
+
+
+def test_flux_paresseux(monkeypatch):
+    monkeypatch.setattr(data_filter, 'TAILLE_LOT', 10)
+    lus = []
+
+    def source():
+        for i in range(100):
+            lus.append(i)
+            yield {'n': str(i)}
+
+    flux = data_filter.nettoyer_flux(source())
+    assert next(flux) == {'n': 0}
+    assert len(lus) == 10  # Un seul lot lu
@@ -0,0 +1,72 @@
+import csv
+import gzip
+import random
+
+import pytest
+
+import data_filter
+from references import convertir_type_reference
+
+CELLULES = ['12', '-3.5', '', 'N/A', 'vrai', 'texte simple', 'Écran "27"', 'a,b,c', 'ligne 1\nligne 2',
+            'fin\r\nWindows', '"', '\n', 'ça, "là"\net là', '1e3', '  espaces  ']
+
+
+def ecrire_csv(chemin, nb_lignes, graine, fin_ligne='\r\n'):
+    alea = random.Random(graine)
+    entetes = ['id', 'note', 'valeur', 'commentaire']
+    with open(chemin, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator=fin_ligne)
+        writer.writerow(entetes)
+        for i in range(nb_lignes):
+            writer.writerow([str(i)] + [alea.choice(CELLULES) for _ in entetes[1:]])
+    return str(chemin)
+
+
+def lecture_reference(chemin):
+    """Lecture séquentielle d'origine : csv.DictReader puis conversion cellule par cellule."""
+    with open(chemin, newline='', encoding='utf-8') as f:
+        return [{k: convertir_type_reference(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+
+@pytest.mark.parametrize('graine', range(4))
+@pytest.mark.parametrize('taille_morceau', [1, 37, 500, 10 ** 9])
+def test_parallele_egal_sequentiel(tmp_path, graine, taille_morceau, monkeypatch):
+    monkeypatch.setattr(data_filter, 'TAILLE_BLOC_LECTURE', 64)  # Frontières à cheval sur les blocs
+    chemin = ecrire_csv(tmp_path / 'donnees.csv', 300, graine, fin_ligne='\r\n' if graine % 2 else '\n')
+    parallele = list(data_filter.iter_csv_parallele(chemin, nb_processus=2, taille_morceau=taille_morceau))
+    assert parallele == list(data_filter.iter_csv(chemin)) == lecture_reference(chemin)
+
+
+def test_bornes_jamais_dans_un_champ_entre_guillemets(tmp_path):
+    chemin = ecrire_csv(tmp_path / 'donnees.csv', 200, 5)
+    with open(chemin, 'rb') as f:
+        contenu = f.read()
+    bornes = data_filter._bornes_csv(chemin, 1)
+    assert bornes[-1] == len(contenu)
+    for borne in bornes:
+        # Une frontière suit un saut de ligne et le nombre de guillemets qui la précèdent est pair
+        assert contenu[borne - 1:borne] == b'\n'
+        assert contenu[:borne].count(b'"') % 2 == 0
+
+
+@pytest.mark.parametrize('contenu', ['', 'a,b\n', 'a,b', 'a,b\n1,2', 'a,b\n\n1,2\n\n', 'a,"b\nc"\n1,"x\ny"\n'],
+                         ids=['vide', 'en-tete', 'en-tete sans fin', 'sans saut final', 'lignes vides',
+                              'en-tete multiligne'])
+def test_cas_limites(tmp_path, contenu):
+    chemin = tmp_path / 'petit.csv'
+    chemin.write_text(contenu, encoding='utf-8', newline='')
+    assert list(data_filter.iter_csv_parallele(str(chemin), nb_processus=2, taille_morceau=1)) == \
+        list(data_filter.iter_csv(str(chemin)))
+
+
+def test_flux_csv_choisit_la_lecture_parallele_au_dela_du_seuil(tmp_path, monkeypatch):
+    chemin = ecrire_csv(tmp_path / 'donnees.csv', 50, 2)
+    compresse = str(tmp_path / 'donnees.csv.gz')
+    with open(chemin, 'rb') as source, gzip.open(compresse, 'wb') as f:
+        f.write(source.read())
+    monkeypatch.setattr(data_filter, 'SEUIL_CSV_PARALLELE', 0)
+    monkeypatch.setattr(data_filter.os, 'cpu_count', lambda: 2)
+    assert data_filter.flux_csv(chemin).__name__ == 'iter_csv_parallele'
+    # Un fichier compressé ne se découpe pas en plages d'octets
+    assert data_filter.flux_csv(compresse).__name__ == 'iter_csv'
+    assert list(data_filter.flux_csv(chemin)) == lecture_reference(chemin)
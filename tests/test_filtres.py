@@ -0,0 +1,44 @@
+import pytest
+
+import data_filter
+from references import evaluer_reference
+
+
+EXPRESSIONS = [
+    "prix > 10",
+    "prix >= 10 AND prix <= 20",
+    "prix < 0 OR quantite = 0",
+    "NOT prix > 10",
+    "non (categorie = 'a' ou categorie = 'b') et actif = true",
+    "nom contient 'souris' AND (prix > 5 OR prix = null)",
+    "nom commence par 'ECRAN' || nom contient_un 'câble|zoo'",
+    "mixte = 1 OR mixte = 'texte' OR mixte != 2.5",
+    "absente = null AND !(quantite > 10)",
+    "prix > 'abc' OR id < 3",
+    "(((id >= 100)))",
+]
+
+
+pytestmark = pytest.mark.jeu_donnees(400, graine=4)
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_expression_comme_l_evaluation_naive(donnees, expression):
+    reference, data = donnees
+    arbre = data_filter.analyser_filtre(expression)
+    attendu = [i for i, item in enumerate(reference) if evaluer_reference(arbre, item)]
+    positions, _ = data_filter.positions_expression(data, expression)
+    assert list(positions) == attendu
+
+
+def test_arbre_analyse():
+    assert data_filter.analyser_filtre("a > 1 AND NOT (b = 'x y' OR c commence par z)") == (
+        'et', [('cond', 'a', '>', '1'),
+               ('non', ('ou', [('cond', 'b', '=', 'x y'), ('cond', 'c', 'commence par (texte)', 'z')]))])
+
+
+@pytest.mark.parametrize('expression', ["", "prix >", "prix ?? 3", "(prix > 3", "prix > 3 AND", "prix > 3 )"])
+def test_expression_invalide(expression):
+    with pytest.raises(ValueError):
+        data_filter.analyser_filtre(expression)
+
@@ -0,0 +1,122 @@
+import builtins
+import itertools
+import json
+
+import pytest
+
+import data_filter
+from references import critere_reference, donnees_aleatoires, tri_reference
+
+FORMATS = ['csv', 'json', 'jsonl', 'yaml', 'xml']
+CRITERES = [('prix', '>', '20'), ('nom', 'contient (texte)', 'ecran'), ('categorie', '=', 'null'),
+            ('quantite', '<=', '3.0'), ('actif', '=', 'vrai')]
+
+
+@pytest.fixture(scope='module')
+def base():
+    """Enregistrements aux mêmes clés, représentables dans tous les formats."""
+    data = donnees_aleatoires(150, graine=1, melange=False)
+    for record in data:
+        record.setdefault('quantite', None)
+    return data
+
+
+def ecrire_source(dossier, base, nom):
+    format_donnees = data_filter.format_par_nom(nom)
+    chemin = str(dossier / f'source{format_donnees.extensions[0]}')
+    format_donnees.sauvegarder(base, chemin)
+    return format_donnees, chemin
+
+
+def relire(chemin):
+    return data_filter.detecter_format(chemin).charger(chemin)
+
+
+@pytest.mark.parametrize('destination', FORMATS)
+@pytest.mark.parametrize('source', FORMATS)
+def test_pipeline_en_flux_comme_en_memoire(tmp_path, base, source, destination, capsys):
+    format_source, chemin = ecrire_source(tmp_path, base, source)
+    format_dest = data_filter.format_par_nom(destination)
+    charge = format_source.charger(chemin)
+    for n, (cle, operateur, valeur) in enumerate(CRITERES):
+        colonnes = ['nom', cle, 'id'] if n % 2 else None
+
+        # En mémoire : chargement complet, filtre d'origine, projection puis sauvegarde
+        attendu = [record for record in charge if critere_reference(record, cle, operateur, valeur)]
+        if colonnes:
+            attendu = [{col: record.get(col) for col in colonnes} for record in attendu]
+
+        flux = data_filter.filtrer_flux(format_source.lire(chemin),
+                                        data_filter.construire_predicat(cle, operateur, valeur))
+        if colonnes:
+            flux = data_filter.projeter_flux(flux, colonnes)
+        sortie_flux = str(tmp_path / f'flux_{n}{format_dest.extensions[0]}')
+        if not attendu:
+            continue
+        assert format_dest.ecrire(flux, sortie_flux) == len(attendu)
+
+        sortie_memoire = str(tmp_path / f'memoire_{n}{format_dest.extensions[0]}')
+        format_dest.sauvegarder(attendu, sortie_memoire)
+        assert relire(sortie_flux) == relire(sortie_memoire)
+        if destination != 'json':  # save_json indente, l'écriture en flux non
+            assert open(sortie_flux, 'rb').read() == open(sortie_memoire, 'rb').read()
+
+
+@pytest.mark.parametrize('destination', ['json', 'jsonl', 'yaml'])
+def test_flux_vide(tmp_path, destination):
+    format_dest = data_filter.format_par_nom(destination)
+    chemin = str(tmp_path / f'vide{format_dest.extensions[0]}')
+    assert format_dest.ecrire(iter([]), chemin) == 0
+    assert relire(chemin) == []
+    with pytest.raises(ValueError):
+        data_filter.ecrire_csv_flux(iter([]), str(tmp_path / 'vide.csv'))
+
+
+def test_etapes_paresseuses():
+    infini = ({'id': i, 'pair': i % 2 == 0} for i in itertools.count())
+    flux = data_filter.projeter_flux(data_filter.filtrer_flux(infini, lambda r: r['pair']), ['id', 'absente'])
+    assert list(itertools.islice(flux, 3)) == [{'id': 0, 'absente': None}, {'id': 2, 'absente': None},
+                                               {'id': 4, 'absente': None}]
+
+
+def test_en_tetes_csv_du_premier_enregistrement(tmp_path):
+    chemin = str(tmp_path / 'sortie.csv')
+    assert data_filter.ecrire_csv_flux(iter([{'a': 1, 'b': 2}, {'b': 3, 'c': 4}]), chemin) == 2
+    assert open(chemin, encoding='utf-8').read().splitlines() == ['a,b', '1,2', ',3']
+
+
+def repondre(monkeypatch, reponses):
+    reponses = iter(reponses)
+    monkeypatch.setattr(builtins, 'input', lambda invite='': next(reponses))
+
+
+def numero_format(nom):
+    return str([f.nom for f in data_filter.formats_disponibles('ecrire')].index(nom) + 1)
+
+
+def test_traitement_flux_critere_et_projection(tmp_path, base, monkeypatch, capsys):
+    _, source = ecrire_source(tmp_path, base, 'jsonl')
+    sortie = str(tmp_path / 'sortie.csv')
+    entetes = list(base[0])
+    repondre(monkeypatch, ['A', source, str(entetes.index('prix') + 1), '5', '20',
+                           f"{entetes.index('id') + 1},{entetes.index('prix') + 1}", '', '',
+                           numero_format('csv'), sortie, ''])
+    data_filter.traitement_flux()
+    attendu = [{'id': r['id'], 'prix': r['prix']} for r in base if critere_reference(r, 'prix', '>=', '20')]
+    assert data_filter.load_csv(sortie) == attendu
+
+
+def test_traitement_flux_expression_et_tri_externe(tmp_path, base, monkeypatch, capsys):
+    monkeypatch.setattr(data_filter, 'configurer_locale_tri', lambda: False)
+    _, source = ecrire_source(tmp_path, base, 'csv')
+    sortie = str(tmp_path / 'sortie.json')
+    entetes = list(base[0])
+    repondre(monkeypatch, ['A', source, 'E', "categorie = 'a' OR quantite > 15", '', '',
+                           f"{entetes.index('prix') + 1}d,{entetes.index('id') + 1}", '1',
+                           numero_format('json'), sortie, ''])
+    data_filter.traitement_flux()
+    charge = data_filter.load_csv(source)  # Le CSV relit '' comme None
+    retenus = [r for r in charge if r['categorie'] == 'a' or critere_reference(r, 'quantite', '>', '15')]
+    attendu = tri_reference(retenus, [('prix', True), ('id', False)])
+    with open(sortie, encoding='utf-8') as f:
+        assert json.load(f) == attendu
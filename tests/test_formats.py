@@ -0,0 +1,111 @@
+import gzip
+import subprocess
+import sys
+
+import pytest
+
+import data_filter
+from data_filter import FormatDonnees
+
+CONTENUS = {
+    'csv': b'id,name\n1,Clavier\n',
+    'json': b'[\n  {"id": 1, "name": "Clavier"}\n]',
+    'json_objet': b'\xef\xbb\xbf  {\n  "id": 1\n}',
+    'jsonl': b'{"id": 1, "name": "Clavier"}\n{"id": 2}\n',
+    'yaml': b'- id: 1\n  name: Clavier\n',
+    'yaml_document': b'---\n- id: 1\n',
+    'xml': b'<?xml version="1.0"?>\n<racine><enregistrement><id>1</id></enregistrement></racine>',
+}
+
+
+@pytest.fixture(autouse=True)
+def registre_restaure(monkeypatch):
+    """Chaque test peut modifier le registre : il est restauré ensuite."""
+    monkeypatch.setattr(data_filter, '_formats', dict(data_filter._formats))
+    monkeypatch.setattr(data_filter, '_formats_extensions', dict(data_filter._formats_extensions))
+
+
+@pytest.mark.parametrize('nom', sorted(CONTENUS))
+def test_detection_par_le_contenu(tmp_path, nom):
+    chemin = tmp_path / 'sans_extension'
+    chemin.write_bytes(CONTENUS[nom])
+    assert data_filter.detecter_format(str(chemin)).nom == nom.split('_')[0]
+    # Un fichier compressé est examiné décompressé
+    compresse = tmp_path / 'sans_extension.gz'
+    compresse.write_bytes(gzip.compress(CONTENUS[nom]))
+    assert data_filter.detecter_format(str(compresse)).nom == nom.split('_')[0]
+
+
+@pytest.mark.parametrize('chemin, nom', [
+    ('a.csv', 'csv'), ('A.CSV', 'csv'), ('a.json', 'json'), ('a.yml', 'yaml'), ('a.yaml', 'yaml'),
+    ('a.xml', 'xml'), ('a.jsonl', 'jsonl'), ('a.ndjson', 'jsonl'), ('a.csv.gz', 'csv'), ('a.jsonl.xz', 'jsonl'),
+])
+def test_detection_par_l_extension(tmp_path, chemin, nom):
+    # L'extension prime sur le contenu
+    (tmp_path / chemin).write_bytes(CONTENUS['xml'])
+    assert data_filter.detecter_format(str(tmp_path / chemin)).nom == nom
+
+
+def test_format_impose_et_format_inconnu(tmp_path):
+    assert data_filter.detecter_format('a.csv', 'JSON').nom == 'json'
+    with pytest.raises(ValueError):
+        data_filter.detecter_format('a.csv', 'parquet')
+    with pytest.raises(ValueError):
+        data_filter.detecter_format(str(tmp_path / 'absent'))
+    (tmp_path / 'binaire').write_bytes(b'\x00\x01\x02')
+    with pytest.raises(ValueError):
+        data_filter.detecter_format(str(tmp_path / 'binaire'))
+
+
+@pytest.mark.parametrize('nom', ['csv', 'json', 'jsonl', 'yaml', 'xml'])
+def test_aller_retour_par_le_registre(tmp_path, nom, enregistrements, capsys):
+    format_donnees = data_filter.format_par_nom(nom)
+    chemin = str(tmp_path / f'donnees{format_donnees.extensions[0]}')
+    assert format_donnees.ecrire(iter(enregistrements), chemin) == len(enregistrements)
+    assert list(data_filter.detecter_format(chemin).lire(chemin)) == enregistrements
+    format_donnees.sauvegarder(enregistrements, chemin)
+    assert format_donnees.charger(chemin) == enregistrements
+
+
+def test_format_tiers_enregistre_et_remplace(tmp_path):
+    ecrits = []
+    tsv = FormatDonnees('tsv', 'TSV', ['TSV'], lire=lambda filepath: iter([{'chemin': filepath}]),
+                        ecrire=lambda records, filepath: ecrits.append(list(records)) or len(ecrits[-1]),
+                        reconnaitre=lambda entete: b'\t' in entete.split(b'\n', 1)[0])
+    data_filter.enregistrer_format(tsv)
+    assert data_filter.detecter_format('x.tsv') is tsv
+    assert data_filter.formats_disponibles('lire')[-1] is tsv
+    assert tsv.charger('x.tsv') == [{'chemin': 'x.tsv'}]  # Chargement déduit de 'lire'
+    assert tsv.sauvegarder([{'a': 1}], 'x.tsv') == 1
+    (tmp_path / 'inconnu').write_bytes(b'id\tnom\n1\tx\n')
+    assert data_filter.detecter_format(str(tmp_path / 'inconnu')) is tsv  # Testé avant le CSV
+
+    # Remplacer un format garde sa place dans les menus et libère ses anciennes extensions
+    noms = [f.nom for f in data_filter.formats_disponibles()]
+    data_filter.enregistrer_format(FormatDonnees('csv', 'CSV maison', ['.txt'], lire=iter))
+    assert [f.nom for f in data_filter.formats_disponibles()] == noms
+    assert data_filter.detecter_format('a.txt').libelle == 'CSV maison'
+    with pytest.raises(ValueError):
+        data_filter.detecter_format('a.csv')
+    with pytest.raises(ValueError):
+        FormatDonnees('vide', 'Vide', ['.vide'])
+
+
+def test_formats_tiers_par_variable_d_environnement(tmp_path, monkeypatch):
+    (tmp_path / 'format_essai.py').write_text(
+        "import data_filter\n"
+        "data_filter.enregistrer_format(data_filter.FormatDonnees(\n"
+        "    'essai', 'Essai', ['.essai'], lire=lambda filepath: iter([])))\n", encoding='utf-8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setenv('DATA_FILTER_FORMATS', 'format_essai, module_absent')
+    monkeypatch.setattr(data_filter, '_formats_externes_charges', False)
+    assert data_filter.detecter_format('a.essai').nom == 'essai'
+    sys.modules.pop('format_essai', None)
+
+
+def test_dependances_importees_a_la_demande():
+    code = ("import sys, data_filter\n"
+            "assert 'yaml' not in sys.modules and 'xml.etree.ElementTree' not in sys.modules\n"
+            "data_filter.detecter_format('a.yaml')\n"
+            "assert 'yaml' not in sys.modules\n")
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=data_filter.__file__.rsplit('/', 1)[0])
@@ -0,0 +1,84 @@
+import copy
+
+import pytest
+
+import data_filter
+from data_filter import TableColonnes, historique
+
+
+def lignes(data):
+    """Instantané comparable (liste de dictionnaires recopiés) des données courantes."""
+    return [dict(row) for row in data]
+
+
+@pytest.fixture(params=['datalist', 'colonnes'])
+def donnees(request, enregistrements):
+    data = copy.deepcopy(enregistrements)
+    return data if request.param == 'datalist' else TableColonnes.depuis_datalist(data)
+
+
+def test_annuler_puis_retablir_chaque_operation(donnees):
+    historique.reinitialiser(donnees)
+    etats = [lignes(donnees)]
+
+    data = historique.enregistrer_selection(donnees, [4, 0, 2, 1], "Filtre")
+    etats.append(lignes(data))
+    data = historique.enregistrer_selection(data, [3, 1, 0], "Tri")
+    etats.append(lignes(data))
+    data = historique.modifier_colonnes(
+        data, {'total': [row['price'] * 2 for row in data], 'stock': None}, "Calcul")
+    etats.append(lignes(data))
+    data = historique.renommer_colonnes(data, {'name': 'nom'}, "Renommage")
+    etats.append(lignes(data))
+    assert 'nom' in etats[-1][0] and 'name' not in etats[-1][0]
+    assert 'stock' not in etats[-1][0]
+
+    for attendu in reversed(etats[:-1]):
+        data = historique.annuler()
+        assert lignes(data) == attendu
+    assert not historique.peut_annuler()
+    for attendu in etats[1:]:
+        data = historique.retablir()
+        assert lignes(data) == attendu
+    assert not historique.peut_retablir()
+
+
+def test_colonne_ajoutee_puis_annulee_redevient_absente(enregistrements):
+    data = copy.deepcopy(enregistrements)
+    del data[1]['stock']
+    historique.reinitialiser(data)
+    data = historique.modifier_colonnes(data, {'stock': [0] * len(data), 'note': [1] * len(data)}, "Calcul")
+    assert data[1]['stock'] == 0
+    data = historique.annuler()
+    assert 'stock' not in data[1] and 'note' not in data[0]
+    assert data[0]['stock'] == 3
+
+
+def test_nouvelle_operation_oublie_les_etats_retablissables(donnees):
+    historique.reinitialiser(donnees)
+    data = historique.enregistrer_selection(donnees, [0, 1], "Filtre")
+    historique.annuler()
+    data = historique.enregistrer_selection(historique.donnees, [2], "Autre filtre")
+    assert not historique.peut_retablir()
+    assert lignes(data) == lignes(donnees)[2:3]
+
+
+def test_donnees_remplacees_reinitialisent_l_historique(donnees, enregistrements):
+    historique.reinitialiser(donnees)
+    historique.enregistrer_selection(donnees, [0], "Filtre")
+    autres = copy.deepcopy(enregistrements[:3])
+    data = historique.enregistrer_selection(autres, [2, 1], "Tri")
+    assert lignes(data) == [autres[2], autres[1]]
+    assert lignes(historique.annuler()) == autres
+    assert not historique.peut_annuler()
+
+
+def test_budget_memoire_oublie_les_etats_les_plus_anciens(donnees, monkeypatch):
+    historique.reinitialiser(donnees)
+    monkeypatch.setattr(historique, 'budget', 0)
+    data = donnees
+    for _ in range(3):
+        data = historique.enregistrer_selection(data, range(len(data) - 1), "Filtre")
+    assert not historique.peut_annuler()
+    assert len(data) == len(donnees) - 3
+
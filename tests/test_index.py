@@ -0,0 +1,61 @@
+import pytest
+
+import data_filter
+from data_filter import TableColonnes
+from references import critere_reference, donnees_aleatoires
+
+OPERATEURS = ['=', '!=', '>', '>=', '<', '<=']
+CIBLES = ['10', '0', '1', '-3', '2.5', '12.0', 'vrai', 'faux', 'texte', 'null', 'abc', '1e1']
+
+
+def valeurs_particulieres(data):
+    data[0]['prix'] = float('nan')
+    data[1]['mixte'] = [1, 2]
+
+
+pytestmark = pytest.mark.jeu_donnees(400, graine=5, retouche=valeurs_particulieres)
+
+
+@pytest.mark.parametrize('cle', ['prix', 'mixte', 'actif', 'categorie', 'quantite'])
+@pytest.mark.parametrize('operateur', OPERATEURS)
+def test_index_comme_le_balayage(donnees, cle, operateur):
+    reference, data = donnees
+    index = data_filter.IndexDonnees(data)
+    for cible in CIBLES:
+        attendu = [i for i, item in enumerate(reference) if critere_reference(item, cle, operateur, cible)]
+        assert list(index.rechercher(cle, operateur, cible)) == attendu, cible
+
+
+@pytest.mark.parametrize('cle, operateur, valeur', [
+    ('prix', '>', '10'), ('prix', '<=', '0'), ('prix', '=', '12'), ('prix', '!=', '12'),
+    ('mixte', '=', '1'), ('mixte', '>', '0'), ('actif', '=', 'vrai'), ('categorie', '!=', 'null'),
+    ('absente', '=', 'x'), ('absente', '!=', 'x'),
+])
+def test_critere_simple_comme_le_filtre_d_origine(donnees, cle, operateur, valeur):
+    reference, data = donnees
+    attendu = [i for i, item in enumerate(reference) if critere_reference(item, cle, operateur, valeur)]
+    assert list(data_filter.positions_critere(data, cle, operateur, valeur)) == attendu
+    assert list(data_filter.positions_critere(data, cle, operateur, valeur)) == attendu
+
+
+def test_index_reutilise_puis_reconstruit_apres_modification():
+    data = donnees_aleatoires(50, graine=1)
+    index = data_filter.obtenir_index(data)
+    assert data_filter.obtenir_index(data) is index
+    data.append({'id': 50, 'prix': 1000})
+    nouvel_index = data_filter.obtenir_index(data)
+    assert nouvel_index is not index
+    assert nouvel_index.rechercher('prix', '>', '999') == [50]
+
+    data[0]['prix'] = 5000  # Modification en place : taille inchangée
+    data_filter.invalider_index(data)
+    assert data_filter.obtenir_index(data).rechercher('prix', '>', '999') == [0, 50]
+
+
+def test_index_d_une_table_attache_a_la_table():
+    table = TableColonnes.depuis_datalist(donnees_aleatoires(50, graine=2))
+    index = data_filter.obtenir_index(table)
+    assert table.index is index
+    table.ajouter_ligne({'id': 99, 'prix': 1000})
+    assert table.index is None
+    assert data_filter.obtenir_index(table).rechercher('prix', '>=', '1000') == [50]
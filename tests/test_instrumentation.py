@@ -0,0 +1,106 @@
+import io
+import json
+import os
+
+import pytest
+
+import data_filter
+
+
+@pytest.fixture(autouse=True)
+def mesures_vierges():
+    data_filter.desactiver_instrumentation()
+    data_filter.reinitialiser_mesures()
+    yield
+    data_filter.desactiver_instrumentation()
+    data_filter.reinitialiser_mesures()
+
+
+@pytest.fixture
+def fichier_csv(tmp_path, enregistrements):
+    chemin = str(tmp_path / 'produits.csv')
+    data_filter.save_csv(enregistrements, chemin)
+    return chemin
+
+
+def test_inactive_par_defaut_sans_mesure(fichier_csv, enregistrements, capsys):
+    data_filter.load_csv(fichier_csv)
+    data_filter.calculer_ordre_tri(enregistrements, [('price', True)], False)
+    assert data_filter.mesures_etapes() == []
+
+
+def test_resultats_identiques_avec_ou_sans_mesures(fichier_csv, enregistrements, capsys):
+    sans = data_filter.load_csv(fichier_csv)
+    ordre_sans = list(data_filter.calculer_ordre_tri(enregistrements, [('category', False), ('price', True)], False))
+    data_filter.activer_instrumentation()
+    assert data_filter.load_csv(fichier_csv) == sans == enregistrements
+    assert list(data_filter.calculer_ordre_tri(enregistrements, [('category', False), ('price', True)], False)) \
+        == ordre_sans
+
+
+def test_chargement_et_sauvegarde_mesures(fichier_csv, enregistrements, tmp_path, capsys):
+    journal = io.StringIO()
+    data_filter.activer_instrumentation(journal=journal)
+    data_filter.load_csv(fichier_csv)
+    sortie = str(tmp_path / 'copie.json')
+    data_filter.save_json(enregistrements, sortie)
+
+    chargement, = data_filter.mesures_etapes('chargement')
+    assert chargement['fonction'] == 'load_csv' and chargement['profondeur'] == 0
+    assert chargement['lignes_sortie'] == 8 and chargement['octets_lus'] == os.path.getsize(fichier_csv)
+    assert chargement['secondes'] >= 0 and chargement['cpu_secondes'] >= 0
+    # La conversion a lieu pendant le chargement : étape imbriquée
+    conversion, = data_filter.mesures_etapes('conversion')
+    assert conversion['lignes_entree'] == 8 and conversion['profondeur'] == 1
+    sauvegarde, = data_filter.mesures_etapes('sauvegarde')
+    assert sauvegarde['lignes_entree'] == sauvegarde['lignes_sortie'] == 8
+    assert sauvegarde['octets_ecrits'] == os.path.getsize(sortie)
+
+    lignes = [json.loads(ligne) for ligne in journal.getvalue().splitlines()]
+    assert lignes == data_filter.mesures_etapes()
+
+
+def test_etapes_de_tri_et_de_filtre(enregistrements):
+    data_filter.activer_instrumentation()
+    data_filter.calculer_ordre_tri(enregistrements, [('price', False)], False, limite=3)
+    data_filter.positions_expression(enregistrements, "price > 10")
+    etapes = [(mesure['etape'], mesure['profondeur']) for mesure in data_filter.mesures_etapes()]
+    assert ('tri', 0) in etapes and ('tri.cles', 1) in etapes and ('tri.ordre', 1) in etapes
+    assert data_filter.mesures_etapes('tri')[0]['lignes_entree'] == 8
+    assert data_filter.mesures_etapes('tri')[0]['lignes_sortie'] == 3
+    assert any(etape == 'filtre' for etape, _ in etapes)
+
+
+def test_erreur_enregistree_puis_propagee(tmp_path):
+    data_filter.activer_instrumentation()
+    with pytest.raises(FileNotFoundError):
+        data_filter.load_csv(str(tmp_path / 'absent.csv'))
+    mesure, = data_filter.mesures_etapes('chargement')
+    assert mesure['erreur'] == 'FileNotFoundError'
+    assert data_filter._profondeur_etapes == 0
+
+
+def test_journal_fichier_memoire_et_profil(fichier_csv, tmp_path, capsys):
+    journal = str(tmp_path / 'metriques.jsonl')
+    dossier_profils = str(tmp_path / 'profils')
+    data_filter.activer_instrumentation(journal=journal, memoire=True, profil=dossier_profils)
+    data_filter.load_csv(fichier_csv)
+    data_filter.desactiver_instrumentation()  # Referme le journal ouvert par activer_instrumentation
+
+    chargement, = data_filter.mesures_etapes('chargement')
+    assert chargement['memoire_pic_octets'] > 0
+    assert os.path.isfile(chargement['profil']) and os.path.dirname(chargement['profil']) == dossier_profils
+    with open(journal, encoding='utf-8') as f:
+        assert [json.loads(ligne)['etape'] for ligne in f] == ['conversion', 'chargement']
+
+
+def test_activation_par_variable_d_environnement(tmp_path, monkeypatch):
+    journal = str(tmp_path / 'env.jsonl')
+    monkeypatch.setenv('DATA_FILTER_METRIQUES', '1')
+    monkeypatch.setenv('DATA_FILTER_METRIQUES_JOURNAL', journal)
+    data_filter._activer_instrumentation_environnement()
+    assert data_filter._instrumentation_active
+    data_filter.desactiver_instrumentation()
+    monkeypatch.setenv('DATA_FILTER_METRIQUES', 'non')
+    data_filter._activer_instrumentation_environnement()
+    assert not data_filter._instrumentation_active
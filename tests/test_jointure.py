@@ -0,0 +1,97 @@
+import json
+import random
+
+import pytest
+
+import data_filter
+from data_filter import TableColonnes
+
+
+def jointure_naive(gauche, droite, cles_gauche, cles_droite, mode, sorties):
+    """Référence en boucles imbriquées ; 'sorties' associe chaque colonne de droite à son nom en sortie."""
+    resultat = []
+    for ligne in gauche:
+        cle = tuple(ligne.get(c) for c in cles_gauche)
+        correspondantes = [] if None in cle else [
+            autre for autre in droite if tuple(autre.get(c) for c in cles_droite) == cle]
+        if mode == 'anti':
+            if not correspondantes:
+                resultat.append(dict(ligne))
+            continue
+        for autre in correspondantes:
+            resultat.append({**ligne, **{sortie: autre.get(nom) for nom, sortie in sorties.items()}})
+        if mode == 'gauche' and not correspondantes:
+            resultat.append({**ligne, **dict.fromkeys(sorties.values())})
+    return resultat
+
+
+def multiensemble(lignes):
+    return sorted(json.dumps(ligne, sort_keys=True) for ligne in lignes)
+
+
+def jeux_aleatoires(graine, nb_gauche, nb_droite):
+    alea = random.Random(graine)
+    gauche = [{'id': alea.choice([1, 2, 3, 4, None]), 'cat': alea.choice('ab'), 'prix': alea.random()}
+              for _ in range(nb_gauche)]
+    droite = [{'id': alea.choice([1, 2, 3, 5, None]), 'cat': alea.choice('abc'), 'prix': alea.random(),
+               'stock': alea.randint(0, 9)} for _ in range(nb_droite)]
+    return gauche, droite
+
+
+@pytest.mark.parametrize('mode', ['interne', 'gauche', 'anti'])
+@pytest.mark.parametrize('nb_gauche, nb_droite', [(40, 15), (15, 40)], ids=['droite-indexee', 'gauche-indexee'])
+@pytest.mark.parametrize('colonnes', [False, True], ids=['datalist', 'colonnes'])
+@pytest.mark.parametrize('cles', [['id'], ['id', 'cat']])
+def test_jointure_comme_la_reference_naive(mode, nb_gauche, nb_droite, colonnes, cles):
+    gauche, droite = jeux_aleatoires(f"{mode}-{nb_gauche}-{len(cles)}", nb_gauche, nb_droite)
+    sorties = {'prix': 'prix_2', 'stock': 'stock'}
+    if cles == ['id']:
+        sorties = {'cat': 'cat_2', **sorties}
+    attendu = jointure_naive(gauche, droite, cles, cles, mode, sorties)
+    if colonnes:
+        gauche, droite = TableColonnes.depuis_datalist(gauche), TableColonnes.depuis_datalist(droite)
+    resultat = list(data_filter.joindre(gauche, droite, cles, mode=mode))
+    assert multiensemble(resultat) == multiensemble(attendu)
+    if nb_droite <= nb_gauche:
+        assert resultat == attendu  # Droite indexée : l'ordre des lignes de gauche est conservé
+
+
+def test_cles_de_noms_differents_et_valeurs_non_hachables():
+    gauche = [{'ref': [1, 2], 'x': 'a'}, {'ref': [3], 'x': 'b'}]
+    droite = [{'code': [1, 2], 'y': 10}, {'code': [1, 2], 'y': 11}]
+    resultat = list(data_filter.joindre(gauche, droite, ['ref'], ['code']))
+    assert resultat == [{'ref': [1, 2], 'x': 'a', 'y': 10}, {'ref': [1, 2], 'x': 'a', 'y': 11}]
+
+
+@pytest.mark.parametrize('mode', ['interne', 'gauche'])
+def test_suffixe_sans_ecraser_une_colonne_existante(mode):
+    gauche = [{'id': 1, 'x': 'gauche', 'x_2': 'gauche aussi'}, {'id': 2, 'x': 'seul', 'x_2': 'seul aussi'}]
+    droite = [{'id': 1, 'x': 'droite', 'x_2_2': 'droite aussi'}]
+    resultat = list(data_filter.joindre(gauche, droite, ['id'], mode=mode))
+    assert resultat[0] == {'id': 1, 'x': 'gauche', 'x_2': 'gauche aussi', 'x_2_2': 'droite aussi',
+                           'x_2_2_2': 'droite'}
+    if mode == 'gauche':
+        assert resultat[1] == {'id': 2, 'x': 'seul', 'x_2': 'seul aussi', 'x_2_2': None, 'x_2_2_2': None}
+
+
+def test_colonne_cle_inconnue(enregistrements):
+    with pytest.raises(ValueError, match='inconnue'):
+        data_filter.joindre_donnees(enregistrements, enregistrements, ['absente'])
+
+
+def dedoublonnage_naif(data, cles, garder):
+    vues = {}
+    for i, ligne in enumerate(data):
+        cle = json.dumps([ligne.get(c) for c in cles])
+        if cle not in vues or garder == 'dernier':
+            vues[cle] = i
+    return sorted(vues.values())
+
+
+@pytest.mark.parametrize('garder', ['premier', 'dernier'])
+@pytest.mark.parametrize('cles', [['name'], ['category', 'price'], None])
+@pytest.mark.parametrize('colonnes', [False, True], ids=['datalist', 'colonnes'])
+def test_dedoublonnage_comme_la_reference_naive(enregistrements, garder, cles, colonnes):
+    attendu = dedoublonnage_naif(enregistrements, cles or list(enregistrements[0]), garder)
+    data = TableColonnes.depuis_datalist(enregistrements) if colonnes else enregistrements
+    assert list(data_filter.positions_uniques(data, cles, garder)) == attendu
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+import data_filter
+
+
+@pytest.fixture
+def petits_morceaux(monkeypatch):
+    """Force des morceaux de quelques caractères pour couper les éléments à toutes les positions."""
+    monkeypatch.setattr(data_filter, 'TAILLE_MORCEAU_JSON', 7)
+
+
+@pytest.fixture
+def ecrire(tmp_path):
+    def _ecrire(texte, nom='donnees.json'):
+        chemin = tmp_path / nom
+        chemin.write_text(texte, encoding='utf-8')
+        return str(chemin)
+    return _ecrire
+
+
+ENREGISTREMENTS = [{'id': i, 'nom': "éé \"guillemets\" \\ " * 3, 'prix': -1.5e10 + i,
+                    'grand': 123456789012345678, 'drapeaux': [True, False, None], 'vide': {}}
+                   for i in range(40)]
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_tableau_decode_comme_json_load(petits_morceaux, ecrire, indent):
+    chemin = ecrire(json.dumps(ENREGISTREMENTS, indent=indent, ensure_ascii=False))
+    assert list(data_filter._iter_json_brut(chemin)) == ENREGISTREMENTS
+
+
+@pytest.mark.parametrize('texte', ['[]', ' \n[ \t] \n', '[\n\n\n]'])
+def test_liste_vide(petits_morceaux, ecrire, texte):
+    assert list(data_filter._iter_json_brut(ecrire(texte))) == []
+
+
+@pytest.mark.parametrize('texte, attendu', [
+    ('[123456789012345, 1.5e-300, -0.25]', [123456789012345, 1.5e-300, -0.25]),
+    ('["abc\\u00e9def", "\\\\"]', ['abcédef', '\\']),
+    ('[true, false, null]', [True, False, None]),
+])
+def test_litteraux_coupes_entre_deux_morceaux(petits_morceaux, ecrire, texte, attendu):
+    assert list(data_filter._iter_json_brut(ecrire(texte))) == attendu
+
+
+@pytest.mark.parametrize('texte, message', [
+    ('{"a": 1}', 'racine doit être une liste'),
+    ('', 'racine doit être une liste'),
+    ('[{"a": 1}, {"a": 2}', 'fin de fichier'),
+    ('[1, 2', 'fin de fichier'),
+    ('[1,', 'fin de fichier'),
+    ('[{"a": "tronqué', 'Unterminated string'),
+    ('[1 2]', "',' ou ']' attendu"),
+    ('[1,]', 'Expecting value'),
+    ('[tru]', 'Expecting value'),
+])
+def test_entree_tronquee_ou_invalide(petits_morceaux, ecrire, texte, message):
+    with pytest.raises(ValueError, match=message):
+        list(data_filter._iter_json_brut(ecrire(texte)))
+
+
+def test_elements_valides_produits_avant_l_erreur(petits_morceaux, ecrire):
+    flux = data_filter._iter_json_brut(ecrire('[{"a": 1}, {"a": 2} {"a": 3}]'))
+    assert next(flux) == {'a': 1}
+    assert next(flux) == {'a': 2}
+    with pytest.raises(ValueError):
+        next(flux)
+
+
+class LecteurCompteur:
+    """Enveloppe d'un fichier texte qui compte les caractères lus."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.caracteres_lus = 0
+
+    def read(self, taille=-1):
+        morceau = self.fichier.read(taille)
+        self.caracteres_lus += len(morceau)
+        return morceau
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fichier.close()
+
+
+@pytest.mark.parametrize('texte', [
+    '{"racine": "objet"' + ', "x": 1' * 100_000 + '}',
+    '[{"a": 1} {"a": 2}' + ', {"a": 3}' * 100_000 + ']',
+    '[{"a": 1}, {"a": tru}' + ', {"a": 3}' * 100_000 + ']',
+    '[{"a": 1}, {"a": 2},, ' + ', {"a": 3}' * 100_000 + ']',
+], ids=['racine-objet', 'virgule-manquante', 'litteral-invalide', 'virgule-double'])
+def test_erreur_signalee_sans_lire_la_suite_du_fichier(monkeypatch, ecrire, texte):
+    monkeypatch.setattr(data_filter, 'TAILLE_MORCEAU_JSON', 64)
+    chemin = ecrire(texte)
+    lecteurs = []
+
+    def ouvrir(chemin, *args, **kwargs):
+        lecteurs.append(LecteurCompteur(open(chemin, encoding='utf-8')))
+        return lecteurs[-1]
+
+    monkeypatch.setattr(data_filter, 'ouvrir_fichier', ouvrir)
+    with pytest.raises(ValueError):
+        list(data_filter._iter_json_brut(chemin))
+    assert lecteurs[0].caracteres_lus <= 3 * 64
+
+
+def test_iter_json_convertit_et_load_json_accepte_un_fichier_compresse(tmp_path):
+    chemin = str(tmp_path / 'donnees.json.gz')
+    data_filter.ecrire_json_flux(iter(ENREGISTREMENTS[:5]), chemin)
+    assert [r['id'] for r in data_filter.iter_json(chemin)] == list(range(5))
@@ -0,0 +1,109 @@
+import csv
+import json
+import sys
+
+import pytest
+
+import data_filter
+from references import convertir_type_reference, donnees_aleatoires, evaluer_reference, tri_reference
+
+COLONNES = ['id', 'categorie', 'prix', 'quantite', 'nom']
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """Trois fichiers CSV de contenus différents dans un dossier 'entrees'."""
+    dossier = tmp_path / 'entrees'
+    dossier.mkdir()
+    for numero in range(3):
+        with open(dossier / f'ventes_{numero}.csv', 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLONNES)
+            writer.writeheader()
+            for record in donnees_aleatoires(150, graine=numero, melange=False):
+                writer.writerow({cle: '' if record.get(cle) is None else record.get(cle) for cle in COLONNES})
+    return dossier
+
+
+def resultat_reference(chemin, filtre=None, tri=None, colonnes=None, limite=None):
+    """Lecture d'origine (DictReader + convertir_type) puis filtre, tri, projection et limite naïfs."""
+    with open(chemin, newline='', encoding='utf-8') as f:
+        lignes = [{k: convertir_type_reference(v) for k, v in row.items()} for row in csv.DictReader(f)]
+    if filtre:
+        arbre = data_filter.analyser_filtre(filtre)
+        lignes = [item for item in lignes if evaluer_reference(arbre, item)]
+    if tri:
+        lignes = tri_reference(lignes, data_filter.analyser_tri_texte(tri))
+    if colonnes:
+        lignes = [{cle: item.get(cle) for cle in colonnes} for item in lignes]
+    return lignes if limite is None else lignes[:limite]
+
+
+@pytest.mark.parametrize('processus', [1, 2])
+@pytest.mark.parametrize('tri', [None, 'prix:d,id'])
+def test_lot_egal_traitement_de_reference(sources, tmp_path, processus, tri, capsys):
+    arguments = ['--entrees', str(sources / '*.csv'), '--filtre', "prix > 10 ET categorie != 'c'",
+                 '--colonnes', 'id,prix,nom', '--limite', '40', '--sortie', str(tmp_path / 'sorties' / '{nom}.json'),
+                 '--processus', str(processus), '--rapport', str(tmp_path / 'rapport.jsonl')]
+    if tri:
+        arguments += ['--tri', tri]
+    assert data_filter.main_lot(arguments) == 0
+
+    for source in sorted(sources.iterdir()):
+        with open(tmp_path / 'sorties' / f'{source.stem}.json', encoding='utf-8') as f:
+            obtenu = json.load(f)
+        assert obtenu == resultat_reference(source, "prix > 10 ET categorie != 'c'", tri, ['id', 'prix', 'nom'], 40)
+
+    with open(tmp_path / 'rapport.jsonl', encoding='utf-8') as f:
+        rapports = [json.loads(ligne) for ligne in f]
+    assert sorted(rapport['fichier'] for rapport in rapports) == sorted(str(s) for s in sources.iterdir())
+    assert all(rapport['statut'] == 'ok' and rapport['ecrites'] == 40 for rapport in rapports)
+    # Sans tri, la lecture en flux s'arrête dès que la limite est atteinte
+    assert all((rapport['lues'] == 150) if tri else (40 <= rapport['lues'] < 150) for rapport in rapports)
+    assert "3 tâche(s) réussie(s), 0 en erreur." in capsys.readouterr().out
+
+
+def test_fichier_de_tache_et_statistiques(sources, tmp_path):
+    tache = tmp_path / 'tache.json'
+    tache.write_text(json.dumps({
+        'entrees': str(sources / 'ventes_1.csv'), 'tri': 'quantite:a', 'sortie': str(tmp_path / '{nom}.csv'),
+        'statistiques': str(tmp_path / '{nom}.stats.json'), 'processus': 1}), encoding='utf-8')
+    # Les options de la ligne de commande complètent (et remplacent) le fichier de tâche
+    assert data_filter.main_lot(['--job', str(tache), '--tri', 'id:d']) == 0
+
+    with open(tmp_path / 'ventes_1.csv', newline='', encoding='utf-8') as f:
+        ecrits = [{k: convertir_type_reference(v) for k, v in row.items()} for row in csv.DictReader(f)]
+    assert ecrits == resultat_reference(sources / 'ventes_1.csv', tri='id:d')
+    with open(tmp_path / 'ventes_1.stats.json', encoding='utf-8') as f:
+        stats = json.load(f)
+    assert stats['nb_enregistrements'] == 150
+    assert stats['colonnes']['id']['max'] == 149
+
+
+def test_une_tache_en_erreur_n_arrete_pas_les_autres(sources, tmp_path):
+    (sources / 'casse.json').write_text('[{"id": 1}, {"id": ', encoding='utf-8')
+    rapports = data_filter.executer_lot({'entrees': str(sources / '*'), 'sortie': str(tmp_path / '{nom}.jsonl'),
+                                         'processus': 2}, afficher=lambda rapport: None)
+    statuts = {rapport['fichier'].rsplit('/', 1)[-1]: rapport['statut'] for rapport in rapports}
+    assert statuts == {'casse.json': 'erreur', 'ventes_0.csv': 'ok', 'ventes_1.csv': 'ok', 'ventes_2.csv': 'ok'}
+    assert data_filter.main_lot(['--entrees', str(sources / '*'), '--sortie', str(tmp_path / '{nom}.jsonl'),
+                                 '--processus', '1']) == 1
+
+
+@pytest.mark.parametrize('arguments', [
+    ['--entrees', 'introuvable/*.csv', '--sortie', 'x.json'],
+    ['--entrees', '{entrees}/*.csv'],
+    ['--entrees', '{entrees}/*.csv', '--sortie', 'x.json', '--filtre', 'prix >'],
+    ['--entrees', '{entrees}/*.csv', '--sortie', 'x.json', '--tri', 'prix:z'],
+], ids=['aucun fichier', 'sans sortie', 'filtre invalide', 'tri invalide'])
+def test_specification_invalide(sources, arguments, capsys):
+    arguments = [argument.format(entrees=sources) for argument in arguments]
+    assert data_filter.main_lot(arguments) == 2
+    assert 'Erreur' in capsys.readouterr().err
+
+
+def test_fichier_de_tache_yaml_sans_pyyaml(sources, tmp_path, monkeypatch, capsys):
+    tache = tmp_path / 'tache.yaml'
+    tache.write_text(f"entrees: '{sources}/*.csv'\nsortie: '{tmp_path}/{{nom}}.json'\n", encoding='utf-8')
+    monkeypatch.setitem(sys.modules, 'yaml', None)  # import yaml lève ImportError
+    assert data_filter.main_lot(['--job', str(tache)]) == 2
+    assert 'PyYAML' in capsys.readouterr().err
@@ -0,0 +1,91 @@
+import pytest
+
+import data_filter
+from data_filter import PlanRequete
+from references import donnees_aleatoires, evaluer_reference, tri_reference
+
+# Étapes saisies dans l'ordre : ('filtre', expression), ('tri', critères), ('projection', colonnes), ('limite', k)
+PLANS = [
+    [('filtre', "prix > 10")],
+    [('tri', [('prix', True)]), ('limite', 5)],
+    [('tri', [('nom', False)]), ('filtre', "categorie = 'a'"), ('limite', 12)],
+    [('filtre', "actif = true"), ('filtre', "quantite >= 5 OR prix = null"), ('tri', [('quantite', False)])],
+    [('tri', [('id', True)]), ('tri', [('categorie', False), ('prix', True)]), ('limite', 30)],
+    [('projection', ['id', 'prix', 'nom']), ('filtre', "nom contient 'souris'"), ('tri', [('prix', False)])],
+    [('limite', 40), ('filtre', "prix < 20"), ('tri', [('mixte', True)])],
+    [('tri', [('prix', False)]), ('limite', 50), ('filtre', "prix > 0"), ('limite', 10)],
+    [('projection', ['id', 'nom', 'prix']), ('projection', ['prix', 'id']), ('limite', 0)],
+    [('tri', [('quantite', True)]), ('limite', 20), ('limite', 8), ('projection', ['quantite'])],
+    [('filtre', "NOT mixte = 'texte'"), ('tri', [('actif', False), ('mixte', True)]), ('limite', 1000)],
+]
+
+
+def executer_reference(data, plan):
+    """Exécution naïve du plan saisi, étape par étape, sans réécriture."""
+    lignes = list(data)
+    for nature, parametre in plan:
+        if nature == 'filtre':
+            arbre = data_filter.analyser_filtre(parametre)
+            lignes = [item for item in lignes if evaluer_reference(arbre, item)]
+        elif nature == 'tri':
+            lignes = tri_reference(lignes, parametre)
+        elif nature == 'projection':
+            lignes = [{cle: item.get(cle) for cle in parametre} for item in lignes]
+        else:
+            lignes = lignes[:parametre]
+    return lignes
+
+
+def construire(data, plan):
+    requete = PlanRequete(data)
+    actions = {'filtre': requete.filtrer, 'tri': requete.trier, 'projection': requete.projeter,
+               'limite': requete.limiter}
+    for nature, parametre in plan:
+        actions[nature](parametre)
+    return requete
+
+
+@pytest.fixture(autouse=True)
+def sans_locale(monkeypatch):
+    # La référence trie sans locale : le plan aussi
+    monkeypatch.setattr(data_filter, 'configurer_locale_tri', lambda: False)
+
+
+@pytest.mark.jeu_donnees(400, graine=12)
+@pytest.mark.parametrize('plan', PLANS, ids=str)
+def test_plan_optimise_egal_execution_naive(donnees, plan):
+    _, data = donnees
+    resultat = construire(data, plan).resultat()
+    assert list(resultat) == executer_reference(data, plan)
+
+
+def test_reecritures():
+    requete = construire(donnees_aleatoires(10), [
+        ('projection', ['id', 'prix']), ('tri', [('id', False)]), ('filtre', "prix > 1"), ('filtre', "id < 5"),
+        ('tri', [('prix', True)]), ('limite', 7), ('limite', 3)])
+    assert requete.optimiser() == [
+        ('filtre', ('et', [('cond', 'prix', '>', '1'), ('cond', 'id', '<', '5')])),
+        ('topk', [('prix', True), ('id', False)], 3),
+        ('projection', ['id', 'prix']),
+    ]
+    assert len(requete.etapes) == 7  # Le plan saisi est conservé
+
+
+def test_filtre_jamais_avance_avant_une_limite():
+    requete = construire(donnees_aleatoires(10), [('limite', 4), ('filtre', "prix > 1")])
+    assert [etape[0] for etape in requete.optimiser()] == ['limite', 'filtre']
+
+
+def test_colonne_retiree_par_une_projection():
+    requete = construire(donnees_aleatoires(10), [('projection', ['id'])])
+    with pytest.raises(ValueError):
+        requete.filtrer("prix > 3")
+    with pytest.raises(ValueError):
+        requete.limiter(-1)
+
+
+def test_expliquer_n_execute_rien(monkeypatch):
+    requete = construire(donnees_aleatoires(50), PLANS[2])
+    monkeypatch.setattr(data_filter, 'calculer_ordre_tri', None)  # Toute exécution échouerait
+    texte = requete.expliquer()
+    assert 'Plan optimisé' in texte and 'TOP-12' in texte
@@ -0,0 +1,105 @@
+import math
+import os
+
+import pytest
+
+import data_filter
+from data_filter import TableColonnes
+from references import donnees_aleatoires
+
+
+def numeriques(valeurs):
+    """Valeurs prises en compte par les agrégats numériques (booléens compris, NaN exclus des extrêmes)."""
+    return [v for v in valeurs if isinstance(v, (int, float))]
+
+
+def agregat_reference(nom, lignes, colonne):
+    if colonne is None:
+        return len(lignes)
+    valeurs = [ligne.get(colonne) for ligne in lignes]
+    if nom == 'nombre':
+        return sum(v is not None for v in valeurs)
+    if nom == 'somme':
+        return sum(numeriques(valeurs))
+    if nom == 'moyenne':
+        return sum(numeriques(valeurs)) / len(numeriques(valeurs)) if numeriques(valeurs) else None
+    comparables = [v for v in numeriques(valeurs) if not (isinstance(v, float) and math.isnan(v))]
+    if not comparables:
+        return None
+    return min(comparables) if nom == 'min' else max(comparables)
+
+
+def cle_reference(valeur):
+    return tuple(map(cle_reference, valeur)) if isinstance(valeur, list) else valeur
+
+
+def regrouper_reference(data, cles, agregats):
+    """GROUP BY naïf : toutes les lignes de chaque groupe en mémoire, puis agrégats calculés à part."""
+    groupes = {}
+    for ligne in data:
+        groupes.setdefault(tuple(cle_reference(ligne.get(cle)) for cle in cles), []).append(ligne)
+    noms = data_filter.colonnes_regroupement(cles, agregats)
+    return [dict(zip(noms, list(cle) + [agregat_reference(nom, lignes, colonne) for nom, colonne in agregats]))
+            for cle, lignes in groupes.items()]
+
+
+def comparable(resultat):
+    """Flottants arrondis (l'ordre des additions change avec le débordement), NaN rendus comparables."""
+    def forme(v):
+        if isinstance(v, float):
+            return 'nan' if math.isnan(v) else round(v, 6)
+        return v
+    return [{nom: forme(v) for nom, v in ligne.items()} for ligne in resultat]
+
+
+AGREGATS = [('nombre', None), ('nombre', 'quantite'), ('somme', 'prix'), ('moyenne', 'prix'),
+            ('min', 'prix'), ('max', 'quantite'), ('somme', 'mixte'), ('min', 'mixte'), ('moyenne', 'nom')]
+CLES = [['categorie'], ['actif', 'categorie'], ['mixte'], ['quantite'], ['nom', 'actif'], ['absente']]
+
+
+@pytest.fixture(scope='module')
+def base():
+    data = donnees_aleatoires(600, graine=23)
+    data[5]['prix'] = float('nan')
+    return data
+
+
+@pytest.mark.parametrize('stockage', ['datalist', 'colonnes', 'flux'])
+@pytest.mark.parametrize('cles', CLES)
+def test_regroupement_comme_la_reference(base, stockage, cles):
+    data = {'datalist': base, 'colonnes': TableColonnes.depuis_datalist(base), 'flux': iter(base)}[stockage]
+    obtenu = list(data_filter.regrouper(data, cles, AGREGATS))
+    # Sans débordement : un groupe par clé, dans l'ordre de première apparition
+    assert comparable(obtenu) == comparable(regrouper_reference(base, cles, AGREGATS))
+
+
+@pytest.mark.parametrize('max_groupes', [1, 3, 50])
+@pytest.mark.parametrize('cles', CLES)
+def test_debordement_sur_disque_comme_la_reference(base, tmp_path, cles, max_groupes):
+    obtenu = list(data_filter.regrouper(iter(base), cles, AGREGATS, max_groupes=max_groupes,
+                                        dossier_temp=str(tmp_path)))
+    attendu = regrouper_reference(base, cles, AGREGATS)
+    # Les groupes débordés sortent partition par partition : même contenu, dans un autre ordre
+    par_cle = lambda lignes: {tuple(ligne[c] for c in cles): ligne for ligne in comparable(lignes)}
+    assert len(obtenu) == len(attendu)
+    assert par_cle(obtenu) == par_cle(attendu)
+    assert os.listdir(tmp_path) == []  # Partitions temporaires supprimées
+
+
+def test_regrouper_donnees_garde_la_representation(enregistrements):
+    agregats = data_filter.analyser_agregats("count, sum(price), avg(stock), max('price')")
+    assert agregats == [('nombre', None), ('somme', 'price'), ('moyenne', 'stock'), ('max', 'price')]
+    attendu = regrouper_reference(enregistrements, ['category'], agregats)
+    assert data_filter.regrouper_donnees(enregistrements, ['category'], agregats) == attendu
+    table = data_filter.regrouper_donnees(TableColonnes.depuis_datalist(enregistrements), ['category'], agregats)
+    assert isinstance(table, TableColonnes) and list(table) == attendu
+    with pytest.raises(ValueError, match='inconnue'):
+        data_filter.regrouper_donnees(enregistrements, ['categorie'], agregats)
+    with pytest.raises(ValueError):
+        data_filter.regrouper_donnees(enregistrements, [], agregats)
+
+
+@pytest.mark.parametrize('texte', ['', 'mediane(price)', 'somme(price', ','])
+def test_agregats_invalides(texte):
+    with pytest.raises(ValueError):
+        data_filter.analyser_agregats(texte)
@@ -0,0 +1,156 @@
+import bisect
+import math
+import random
+import statistics
+from collections import Counter
+
+import pytest
+
+import data_filter
+from references import donnees_aleatoires
+
+
+def statistiques_reference(data):
+    """Calculs d'origine d'afficher_statistiques : listes complètes et module statistics."""
+    numeriques, types, valeurs = {}, {}, {}
+    for item in data:
+        for key, value in item.items():
+            types.setdefault(key, Counter())['None' if value is None else type(value).__name__] += 1
+            if isinstance(value, (int, float)):
+                numeriques.setdefault(key, []).append(float(value))
+            valeurs.setdefault(key, []).append(value)
+    resultat = {}
+    for key, comptes in types.items():
+        resume = {'types': dict(comptes)}
+        values = numeriques.get(key)
+        if values:
+            try:
+                ecart_type = statistics.stdev(values)
+            except statistics.StatisticsError:
+                ecart_type = float('nan')
+            resume.update({'min': min(values), 'max': max(values), 'moyenne': statistics.mean(values),
+                           'mediane': statistics.median(values), 'ecart_type': ecart_type,
+                           'nb_valeurs': len(values)})
+        try:
+            resume['mode'] = Counter(valeurs[key]).most_common(1)[0]
+        except TypeError:
+            pass  # Valeurs non hachables : « Erreur Mode » dans la version d'origine
+        resultat[key] = resume
+    return resultat
+
+
+def proches(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def verifier_comme_reference(stats, data):
+    reference = statistiques_reference(data)
+    resume = stats.en_dict()
+    assert resume['nb_enregistrements'] == len(data)
+    assert set(resume['colonnes']) == set(reference)
+    for key, attendu in reference.items():
+        obtenu = resume['colonnes'][key]
+        assert obtenu['types'] == attendu['types'], key
+        for champ in ('min', 'max', 'moyenne', 'ecart_type', 'nb_valeurs'):
+            if champ in attendu:
+                assert proches(obtenu[champ], attendu[champ]), (key, champ)
+            else:
+                assert champ not in obtenu
+        if 'mediane' in attendu:
+            if stats.colonnes[key].quantiles.exact:
+                assert proches(obtenu['mediane'], attendu['mediane']), key
+            else:
+                # Au-delà de la capacité de l'esquisse : médiane approchée, erreur de rang bornée
+                valeurs = sorted(x for x in (r.get(key) for r in data) if isinstance(x, (int, float)))
+                rang_bas = bisect.bisect_left(valeurs, obtenu['mediane']) / len(valeurs)
+                rang_haut = bisect.bisect_right(valeurs, obtenu['mediane']) / len(valeurs)
+                assert rang_bas - 3 * stats.erreur_quantiles <= 0.5 <= rang_haut + 3 * stats.erreur_quantiles, key
+        if 'mode' in attendu:
+            valeur, effectif = attendu['mode']
+            assert obtenu['effectif_mode'] == effectif, key
+            assert obtenu['mode'] == valeur, key
+
+
+@pytest.mark.parametrize('graine', range(5))
+@pytest.mark.parametrize('taille', [0, 1, 2, 37, 150])
+def test_flux_exact_comme_l_original(graine, taille):
+    # Sous le seuil de compaction de l'esquisse, médiane et mode sont exacts
+    data = donnees_aleatoires(taille, graine, melange=False)
+    verifier_comme_reference(data_filter.calculer_statistiques(data), data)
+
+
+def test_colonne_melangee_sans_mode_pour_les_listes():
+    data = donnees_aleatoires(120, 3)
+    stats = data_filter.calculer_statistiques(data).en_dict()
+    reference = statistiques_reference(data)
+    assert stats['colonnes']['mixte']['types'] == reference['mixte']['types']
+    assert proches(stats['colonnes']['mixte']['moyenne'], reference['mixte']['moyenne'])
+    # Les listes ne sont pas hachables : elles sont ignorées pour le mode au lieu de l'empêcher
+    mode = Counter(v for v in (r['mixte'] for r in data) if not isinstance(v, list)).most_common(1)[0]
+    assert (stats['colonnes']['mixte']['mode'], stats['colonnes']['mixte']['effectif_mode']) == mode
+
+
+@pytest.mark.parametrize('graine', range(3))
+def test_table_colonnes_comme_l_original(graine):
+    table = data_filter.TableColonnes.depuis_flux(donnees_aleatoires(300, graine))
+    # La table complète les clés absentes par None : la référence parcourt les mêmes lignes
+    verifier_comme_reference(data_filter.calculer_statistiques(table), list(table))
+
+
+def test_fusion_de_morceaux_egale_un_seul_passage():
+    data = donnees_aleatoires(500, 7, melange=False)
+    fusion = data_filter.StatistiquesDonnees()
+    for debut in range(0, len(data), 64):
+        fusion.fusionner(data_filter.calculer_statistiques(data[debut:debut + 64]))
+    verifier_comme_reference(fusion, data)
+
+
+def test_parallele_egal_serie():
+    data = donnees_aleatoires(400, 11, melange=False)
+    stats = data_filter.calculer_statistiques_parallele(iter(data), nb_processus=2, taille_lot=50)
+    verifier_comme_reference(stats, data)
+
+
+@pytest.mark.parametrize('erreur', [0.05, 0.01])
+def test_quantiles_approches_dans_la_borne_d_erreur(erreur):
+    alea = random.Random(5)
+    valeurs = [alea.gauss(0, 1) for _ in range(50_000)]
+    sketch = data_filter.SketchQuantiles(erreur)
+    for x in valeurs[:25_000]:
+        sketch.ajouter(x)
+    second = data_filter.SketchQuantiles(erreur)
+    for x in valeurs[25_000:]:
+        second.ajouter(x)
+    sketch.fusionner(second)
+    assert not sketch.exact
+    assert sketch.taille < len(valeurs) // 20  # Mémoire bornée
+    triees = sorted(valeurs)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        estimation = sketch.quantile(q)
+        rang = sum(1 for x in triees if x <= estimation) / len(triees)
+        assert abs(rang - q) <= 3 * erreur, q
+
+
+def test_mode_approche_trouve_la_valeur_majoritaire():
+    alea = random.Random(2)
+    valeurs = ['frequent'] * 3000 + [f'rare{i}' for i in range(20_000)]
+    alea.shuffle(valeurs)
+    sketch = data_filter.SketchMode(capacite=100)
+    for value in valeurs:
+        sketch.ajouter(value)
+    assert not sketch.exact
+    valeur, effectif = sketch.plus_frequent()
+    assert valeur == 'frequent'
+    # Misra-Gries sous-estime d'au plus n / (capacite + 1)
+    assert 3000 - len(valeurs) / 101 <= effectif <= 3000
+
+
+def test_welford_stable_sur_grandes_valeurs():
+    valeurs = [1e9 + x for x in (4.0, 7.0, 13.0, 16.0)] * 250
+    accumulateur = data_filter.AccumulateurNumerique()
+    for x in valeurs:
+        accumulateur.ajouter(x)
+    assert proches(accumulateur.moyenne, statistics.mean(valeurs))
+    assert math.isclose(accumulateur.ecart_type(), statistics.stdev(valeurs), rel_tol=1e-6)
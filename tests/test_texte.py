@@ -0,0 +1,63 @@
+import random
+import unicodedata
+
+import pytest
+
+import data_filter
+from references import critere_reference
+
+OPERATEURS_TEXTE = ['contient (texte)', 'commence par (texte)', 'contient un de (texte)']
+MOTIFS = ['', 'e', 'ec', 'ecr', 'ÉCRAN', 'écran 4', 'Ecran 4k', 'souris', 'SOURIS USB', 'cable', 'câble h',
+          'zoo', 'ete', 'été pro', 'apfel', 'oeuvre', 'Œuv', ' mini', 'pro', 'introuvable', 'b', 'x y z',
+          'ouris|lavier', 'ZÈBRE|zoo|', '|', 'e|ec|ecr', 'mini|pro|usb|hdmi|4k|zoo|ete|apfel|oeuvre|souris|'
+          'clavier|ecran|cable|zebre|meca|zzz|yyy']
+
+
+def noms_non_textuels(data):
+    data[3]['nom'] = 12  # Valeur non textuelle dans une colonne de texte
+    data[4]['nom'] = None
+
+
+pytestmark = pytest.mark.jeu_donnees(500, graine=21, retouche=noms_non_textuels)
+
+
+def normaliser_independant(texte):
+    """Forme attendue : décomposition NFKD sans diacritiques, casse repliée, ligatures œ/æ développées."""
+    sans_accents = ''.join(c for c in unicodedata.normalize('NFKD', texte) if not unicodedata.combining(c))
+    return sans_accents.casefold().replace('œ', 'oe').replace('æ', 'ae')
+
+
+@pytest.mark.parametrize('texte', ['Écran', 'ÉCRAN 4K', 'äpfel', 'Œuvre', 'Ægir', 'ﬁchier', 'Straße', 'été',
+                                   'ascii Pur', '', 'ça', 'Ñandú', '①'])
+def test_normaliser_texte(texte):
+    assert data_filter.normaliser_texte(texte) == normaliser_independant(texte)
+    if texte.isascii():
+        assert data_filter.normaliser_texte(texte) == texte.lower()  # Comportement d'origine inchangé
+
+
+@pytest.mark.parametrize('operateur', OPERATEURS_TEXTE)
+@pytest.mark.parametrize('cle', ['nom', 'categorie', 'mixte', 'absente'])
+def test_index_texte_comme_le_balayage(donnees, operateur, cle):
+    reference, data = donnees
+    index = data_filter.IndexDonnees(data)
+    for motif in MOTIFS:
+        attendu = [i for i, item in enumerate(reference) if critere_reference(item, cle, operateur, motif)]
+        assert list(index.rechercher(cle, operateur, motif)) == attendu, motif
+        assert list(data_filter.positions_critere(data, cle, operateur, motif)) == attendu, motif
+
+
+@pytest.mark.parametrize('graine', range(5))
+def test_automate_comme_la_recherche_naive(graine):
+    alea = random.Random(graine)
+    alphabet = 'abcé'
+    termes = list({''.join(alea.choice(alphabet) for _ in range(alea.randint(1, 4))) for _ in range(40)})
+    assert len(termes) >= data_filter.SEUIL_AHO_CORASICK
+    automate = data_filter.AutomateMotifs(termes)
+    for _ in range(300):
+        texte = ''.join(alea.choice(alphabet + 'xy') for _ in range(alea.randint(0, 12)))
+        assert automate.present(texte) == any(terme in texte for terme in termes), texte
+
+
+def test_decouper_termes():
+    assert data_filter.decouper_termes(' Écran | souris||ECRAN |  ') == ['ecran', 'souris']
+    assert data_filter.decouper_termes('') == []
@@ -0,0 +1,54 @@
+import pytest
+
+import data_filter
+from data_filter import TableColonnes
+from references import donnees_aleatoires, tri_reference
+
+CRITERES = [
+    [('prix', False)],
+    [('prix', True)],
+    [('mixte', False)],
+    [('mixte', True)],
+    [('nom', False), ('prix', True)],
+    [('categorie', True), ('quantite', False), ('id', True)],
+    [('actif', False), ('mixte', True), ('nom', False)],
+    [('absente', False), ('prix', False)],    [('actif', True), ('prix', False)],
+]
+
+
+pytestmark = pytest.mark.jeu_donnees(300, graine=6)
+
+
+@pytest.mark.parametrize('critere_tri', CRITERES, ids=str)
+def test_tri_comme_le_tri_d_origine(donnees, critere_tri):
+    reference, data = donnees
+    ordre = data_filter.calculer_ordre_tri(data, critere_tri, False)
+    assert [data[i] for i in ordre] == [
+        {cle: record.get(cle) for cle in data[0]} if isinstance(data, TableColonnes) else record
+        for record in tri_reference(reference, critere_tri)]
+
+
+@pytest.mark.parametrize('critere_tri', CRITERES[:6], ids=str)
+@pytest.mark.parametrize('limite', [0, 1, 7, 1000])
+def test_top_k_egal_au_debut_du_tri_complet(donnees, critere_tri, limite):
+    _, data = donnees
+    complet = list(data_filter.calculer_ordre_tri(data, critere_tri, False))
+    assert list(data_filter.calculer_ordre_tri(data, critere_tri, False, limite=limite)) == complet[:limite]
+
+
+def test_tri_restreint_a_des_lignes(donnees):
+    reference, data = donnees
+    lignes = list(range(0, len(reference), 3))
+    ordre = data_filter.calculer_ordre_tri(data, [('prix', True), ('id', False)], False, lignes=lignes)
+    attendu = tri_reference([reference[i] for i in lignes], [('prix', True), ('id', False)])
+    assert [reference[i]['id'] for i in ordre] == [record['id'] for record in attendu]
+
+
+@pytest.mark.parametrize('reverse_sort', [False, True])
+def test_booleens_entre_nombres_et_chaines(reverse_sort):
+    data = [{'v': v} for v in ['a', None, True, 2.5, False, -1, [1], 0, True, 1]]
+    ordre = data_filter.calculer_ordre_tri(data, [('v', reverse_sort)], False)
+    attendu = [-1, 0, 1, 2.5, False, True, True, 'a', None, [1]]
+    if reverse_sort:
+        attendu = [[1], None, 'a', True, True, False, 2.5, 1, 0, -1]
+    assert [(type(data[i]['v']), data[i]['v']) for i in ordre] == [(type(v), v) for v in attendu]
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import data_filter
+from references import donnees_aleatoires, tri_reference
+
+CRITERES = [
+    [('prix', False)],
+    [('prix', True)],
+    [('mixte', True)],
+    [('nom', False), ('prix', True)],
+    [('categorie', True), ('quantite', False), ('id', True)],
+    [('actif', False), ('mixte', True), ('nom', False)],
+    [('absente', True), ('prix', False)],    [('actif', True), ('prix', False)],
+]
+
+
+@pytest.mark.parametrize('critere_tri', CRITERES, ids=str)
+@pytest.mark.parametrize('budget', [1, 5_000, 10 ** 9], ids=['ligne', 'morceaux', 'memoire'])
+def test_tri_externe_comme_le_tri_d_origine(critere_tri, budget, tmp_path):
+    data = donnees_aleatoires(700, graine=8)
+    triees = list(data_filter.tri_externe(iter(data), critere_tri, False, budget, str(tmp_path)))
+    # Égalité stricte : même ordre, y compris entre enregistrements de clés égales (tri stable)
+    assert triees == tri_reference(data, critere_tri)
+    assert os.listdir(tmp_path) == []  # Fichiers temporaires supprimés
+
+
+def test_paquets_d_en_tetes_heterogenes(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_filter, 'LIGNES_PAR_PAQUET', 4)
+    data = donnees_aleatoires(200, graine=9)  # 'quantite' manque dans certains enregistrements
+    triees = list(data_filter.tri_externe(iter(data), [('quantite', True)], False, 3_000, str(tmp_path)))
+    attendu = tri_reference(data, [('quantite', True)])
+    assert triees == attendu
+    assert [list(record) for record in triees] == [list(record) for record in attendu]  # Ordre des clés
+
+
+def test_flux_vide(tmp_path):
+    assert list(data_filter.tri_externe(iter([]), [('prix', False)], False, 1, str(tmp_path))) == []
+
+
+def test_abandon_du_flux_supprime_les_fichiers(tmp_path):
+    flux = data_filter.tri_externe(iter(donnees_aleatoires(300, graine=1)), [('id', True)], False, 2_000,
+                                   str(tmp_path))
+    assert next(flux)['id'] == 299
+    assert os.listdir(tmp_path) != []
+    flux.close()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,83 @@
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import data_filter
+
+
+def xml_element_tree(data, chemin, indentation=True):
+    """Sauvegarde XML de référence (version d'origine de save_xml, arbre ElementTree complet)."""
+    racine = ET.Element('racine')
+    for record in data:
+        item = ET.SubElement(racine, 'enregistrement')
+        for key, value in record.items():
+            ET.SubElement(item, key).text = "" if value is None else str(value)
+    arbre = ET.ElementTree(racine)
+    if indentation:
+        ET.indent(arbre, space="  ", level=0)
+    arbre.write(chemin, encoding='utf-8', xml_declaration=True)
+
+
+@pytest.mark.parametrize('data', [
+    [{'id': 1, 'nom': 'a < b & "c"', 'vide': None, 'texte_vide': ''}, {}, {'id': 2.5}],
+    [{}],
+    [],
+], ids=['champs', 'enregistrement-vide', 'aucun'])
+@pytest.mark.parametrize('indentation', ["  ", None])
+def test_ecriture_identique_a_element_tree(tmp_path, data, indentation):
+    reference, flux = tmp_path / 'reference.xml', tmp_path / 'flux.xml'
+    xml_element_tree(data, reference, indentation is not None)
+    assert data_filter.ecrire_xml_flux(iter(data), str(flux), indentation=indentation) == len(data)
+    assert flux.read_bytes() == reference.read_bytes()
+
+
+def test_aller_retour(tmp_path, enregistrements):
+    chemin = str(tmp_path / 'donnees.xml.gz')
+    data_filter.ecrire_xml_flux(iter(enregistrements), chemin)
+    assert list(data_filter.iter_xml(chemin)) == enregistrements
+
+
+def test_enfants_de_la_racine_et_attributs(tmp_path):
+    chemin = tmp_path / 'donnees.xml'
+    chemin.write_text('<racine><produit id="1"><nom>A</nom></produit><produit id="2"/>'
+                      '<produit><nom>B</nom><prix>3</prix></produit></racine>', encoding='utf-8')
+    assert list(data_filter._iter_xml_brut(str(chemin))) == [
+        {'nom': 'A', 'id': '1'}, {'id': '2'}, {'nom': 'B', 'prix': '3'}]
+
+
+def test_balise_d_enregistrement_a_toute_profondeur(tmp_path):
+    chemin = tmp_path / 'donnees.xml'
+    chemin.write_text('<export><meta><auteur>x</auteur></meta><lot><item><id>1</id></item>'
+                      '<note>ignorée</note><item><id>2</id><item><id>imbriqué</id></item></item></lot>'
+                      '<item><id>3</id></item></export>', encoding='utf-8')
+    records = list(data_filter._iter_xml_brut(str(chemin), item_tag='item'))
+    assert [r['id'] for r in records] == ['1', '2', '3']
+
+
+@pytest.mark.parametrize('item_tag', [None, 'item'])
+def test_memoire_bornee_avec_elements_hors_enregistrement(tmp_path, item_tag):
+    chemin = tmp_path / 'gros.xml'
+    with open(chemin, 'w', encoding='utf-8') as f:
+        f.write('<racine><lot>' if item_tag else '<racine>')
+        for i in range(60_000):
+            f.write(f'<item><id>{i}</id><nom>produit {i}</nom></item>')
+            if item_tag:
+                f.write(f'<meta><horodatage>{i}</horodatage></meta>')
+        f.write('</lot></racine>' if item_tag else '</racine>')
+
+    tracemalloc.start()
+    try:
+        nombre = sum(1 for _ in data_filter._iter_xml_brut(str(chemin), item_tag=item_tag))
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert nombre == 60_000
+    assert pic < 4 * 1024 * 1024
+
+
+def test_xml_invalide(tmp_path):
+    chemin = tmp_path / 'invalide.xml'
+    chemin.write_text('<racine><item><id>1</id></item><item>', encoding='utf-8')
+    with pytest.raises(ET.ParseError):
+        list(data_filter._iter_xml_brut(str(chemin)))